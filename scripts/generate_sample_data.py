@@ -15,6 +15,14 @@ Usage:
     # Run the script
     python scripts/generate_sample_data.py
 
+    # Record the responses as fixtures, or replay them offline through the
+    # local stand-in server (see scripts/run_api_standin.py)
+    python scripts/generate_sample_data.py --no-cache --record data/fixtures/api
+    python scripts/generate_sample_data.py --no-cache --api-root http://127.0.0.1:8765
+
+    # Fetch datasets concurrently with up to 8 worker threads
+    python scripts/generate_sample_data.py --workers 8
+
 Requirements:
     pip install pandas requests
 """
@@ -22,36 +30,237 @@ Requirements:
 import os
 import sys
 import json
+import argparse
+import threading
 import requests
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from kranalytics.data_utils import get_api_key
+from kranalytics.api_cache import ResponseCache
+from kranalytics.api_standin import FixtureStore, RecordingSession, standin_url
+from kranalytics.columnar import columnar_path, write_columnar
+from kranalytics.bls_sync import BLSSeriesStore, parse_bls_response, sync_bls_series
+from kranalytics.census_planner import ACSQuery, fetch_queries, naive_request_count, plan_queries
+from kranalytics.scheduler import RequestScheduler, ScheduledSession
+from kranalytics.schema import infer_schema
+
+
+def _to_numeric(values: pd.Series) -> pd.Series:
+    """Parse API values, keeping whole-number counts as integers in the CSV."""
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.notna().all() and (numbers % 1 == 0).all():
+        return numbers.astype('int64')
+    return numbers
+
+
+# Every ACS pull of the generator, fetched together by one query plan
+CENSUS_QUERIES = (
+    ACSQuery('census_income_2022',
+             ['B19013_001E', 'B19301_001E', 'B17001_002E', 'B19001_001E'], year=2022),
+    ACSQuery('census_inequality_2022',
+             ['B19083_001E', 'B19001_002E', 'B19001_017E', 'B19025_001E'], year=2022),
+)
 
 
 class SampleDataGenerator:
     """Generate sample datasets from government APIs."""
     
-    def __init__(self, output_dir: str = None):
-        """Initialize the generator."""
+    def __init__(self, output_dir: str = None, max_workers: int = 4,
+                 cache: Optional[ResponseCache] = None,
+                 bls_store: Optional[BLSSeriesStore] = None, bls_revision_months: int = 12,
+                 scheduler: Optional[RequestScheduler] = None, api_root: Optional[str] = None,
+                 recorder: Optional[FixtureStore] = None):
+        """
+        Initialize the generator.
+
+        Parameters
+        ----------
+        output_dir : str, optional
+            Directory for generated files (default: data/sample_datasets)
+        max_workers : int
+            Maximum number of datasets fetched concurrently by generate_all.
+            Use 1 to run every generator sequentially.
+        cache : ResponseCache, optional
+            On-disk API response cache; when omitted every run hits the APIs
+        bls_store : BLSSeriesStore, optional
+            Local BLS observation store enabling incremental delta sync
+        bls_revision_months : int
+            Trailing months re-requested in incremental mode to pick up revisions
+        scheduler : RequestScheduler, optional
+            Shared rate limiter, daily quota tracker and retry policy for
+            every API request (default: a scheduler with the standard
+            BLS/Census limits)
+        api_root : str, optional
+            Root URL of a local API stand-in server; Census and BLS requests
+            are sent there instead of the live APIs
+        recorder : FixtureStore, optional
+            Record every successful Census/BLS response as a replay fixture
+        """
         if output_dir is None:
             output_dir = Path(__file__).parent.parent / 'data' / 'sample_datasets'
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, int(max_workers))
+        self.cache = cache
+        self.bls_store = bls_store
+        self.bls_revision_months = bls_revision_months
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.api_root = api_root
+        self.recorder = recorder
         
         # Track generated files
         self.manifest = []
         self.errors = []
         
+        # Concurrency state: one pooled session per provider host, a lock
+        # guarding shared state and per-task buffers for manifest/errors
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions: Dict[str, ScheduledSession] = {}
+        self._census_lock = threading.Lock()
+        self._census_results: Optional[Dict[str, pd.DataFrame]] = None
+        
         print(f"📁 Output directory: {self.output_dir}")
         print(f"📅 Generation date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
     
+    def _route(self, url: str) -> str:
+        """Point Census and BLS URLs at the stand-in server when one is configured."""
+        if self.api_root and urlsplit(url).netloc in ('api.census.gov', 'api.bls.gov'):
+            return standin_url(url, self.api_root)
+        return url
+    
+    def _get_session(self, url: str) -> ScheduledSession:
+        """Return the pooled, scheduled HTTP session for the host serving ``url``."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session = ScheduledSession(session, self.scheduler)
+                if self.recorder is not None:
+                    session = RecordingSession(session, self.recorder)
+                self._sessions[host] = session
+        return session
+    
+    def _fetch_json(self, url: str, params: Optional[Dict] = None,
+                    payload: Optional[Dict] = None, **kwargs):
+        """
+        Fetch a JSON API response through the pooled session and cache.
+
+        A ``payload`` is sent as a JSON POST body (BLS); otherwise ``params``
+        are sent as a GET query string (Census).
+        """
+        url = self._route(url)
+        session = self._get_session(url)
+        if self.cache is not None:
+            return self.cache.fetch_json(session, url, params=params, payload=payload,
+                                         timeout=30, **kwargs)
+        
+        kwargs.pop('cacheable', None)
+        if payload is not None:
+            headers = {'Content-type': 'application/json'}
+            response = session.post(url, data=json.dumps(payload), headers=headers, timeout=30)
+        else:
+            response = session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
+    def _census_data(self, name: str, api_key: str) -> pd.DataFrame:
+        """
+        Return one Census dataset from the shared ACS query plan.
+
+        The first caller plans and fetches every entry of CENSUS_QUERIES at
+        once (overlapping pulls share requests); concurrent callers wait for
+        that result instead of sending their own requests.
+        """
+        with self._census_lock:
+            if self._census_results is None:
+                plan = plan_queries(CENSUS_QUERIES)
+                print(f"  🧩 Census plan: {len(plan)} request(s) for {len(CENSUS_QUERIES)} "
+                      f"datasets (instead of {naive_request_count(CENSUS_QUERIES)})")
+                self._census_results = fetch_queries(
+                    CENSUS_QUERIES, api_key=api_key, max_workers=self.max_workers,
+                    fetch_json=lambda url, params: self._fetch_json(url, params=params))
+        return self._census_results[name].copy()
+    
+    def _write_columnar(self, df: pd.DataFrame, output_file: Path) -> Dict:
+        """
+        Write the typed columnar copy of a dataset next to its CSV.
+
+        Returns
+        -------
+        dict
+            Manifest entry describing the columnar files and their schema
+        """
+        directory = columnar_path(output_file.name, self.output_dir)
+        schema = write_columnar(df, directory)
+        return {
+            'path': str(directory.relative_to(self.output_dir)),
+            'format': 'npy',
+            'schema': schema,
+        }
+    
+    def close(self):
+        """Close all pooled HTTP sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+    
+    def _record_manifest(self, entry: Dict):
+        """Record a manifest entry for the dataset currently being generated."""
+        buffer = getattr(self._local, 'manifest', None)
+        if buffer is not None:
+            buffer.append(entry)
+        else:
+            with self._lock:
+                self.manifest.append(entry)
+    
+    def _record_error(self, message: str):
+        """Record an error for the dataset currently being generated."""
+        buffer = getattr(self._local, 'errors', None)
+        if buffer is not None:
+            buffer.append(message)
+        else:
+            with self._lock:
+                self.errors.append(message)
+    
+    def _run_dataset(self, func: Callable[[], bool]) -> Tuple[bool, List[Dict], List[str]]:
+        """
+        Run one generator with thread-local manifest/error buffers.
+
+        Returns
+        -------
+        tuple
+            (success flag, manifest entries, error messages) so that results
+            can be merged in a deterministic order after all tasks finish.
+        """
+        self._local.manifest = []
+        self._local.errors = []
+        try:
+            success = func()
+        except Exception as e:
+            success = False
+            self._local.errors.append(f"Unexpected error in {func.__name__}: {e}")
+        finally:
+            manifest, errors = self._local.manifest, self._local.errors
+            del self._local.manifest, self._local.errors
+        return success, manifest, errors
+    
     def generate_census_income_data(self) -> bool:
         """Generate Census ACS income data sample."""
         print("\n📊 Generating Census Income Data...")
@@ -59,29 +268,14 @@ class SampleDataGenerator:
         api_key = get_api_key('CENSUS_API_KEY', required=False)
         if not api_key:
             print("⚠️  CENSUS_API_KEY not found - skipping Census data")
-            self.errors.append("Census API key not available")
+            self._record_error("Census API key not available")
             return False
         
         try:
             # Get median household income by state for 2020-2022
             # Note: Using only B-series (detailed tables) as S-series (subject tables) 
             # are not available in acs5 endpoint
-            base_url = "https://api.census.gov/data/2022/acs/acs5"
-            
-            params = {
-                'get': 'NAME,B19013_001E,B19301_001E,B17001_002E,B19001_001E',
-                'for': 'state:*',
-                'key': api_key
-            }
-            
-            print(f"  🔗 Fetching from: {base_url}")
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(data[1:], columns=data[0])
+            df = self._census_data('census_income_2022', api_key)
             
             # Rename columns for clarity
             df.columns = ['state_name', 'median_household_income', 'per_capita_income', 
@@ -91,7 +285,7 @@ class SampleDataGenerator:
             numeric_cols = ['median_household_income', 'per_capita_income', 
                            'poverty_count', 'total_households']
             for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = _to_numeric(df[col])
             
             # Calculate poverty rate
             df['poverty_rate'] = (df['poverty_count'] / df['total_households'] * 100).round(2)
@@ -104,17 +298,20 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'census_income_2022.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name}")
             print(f"  📊 Records: {len(df)}")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'Census ACS income and poverty data by state (2022)',
                 'records': len(df),
                 'source': 'US Census Bureau ACS 5-Year Estimates',
                 'api': 'https://api.census.gov/data/2022/acs/acs5',
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -123,7 +320,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating Census income data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def generate_census_inequality_data(self) -> bool:
@@ -136,21 +333,8 @@ class SampleDataGenerator:
             return False
         
         try:
-            # Get Gini index and income brackets by state
-            base_url = "https://api.census.gov/data/2022/acs/acs5"
-            
-            params = {
-                'get': 'NAME,B19083_001E,B19001_002E,B19001_017E,B19025_001E',
-                'for': 'state:*',
-                'key': api_key
-            }
-            
-            print(f"  🔗 Fetching from: {base_url}")
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            df = pd.DataFrame(data[1:], columns=data[0])
+            # Gini index and income brackets by state
+            df = self._census_data('census_inequality_2022', api_key)
             
             # Rename columns
             df.columns = ['state_name', 'gini_index', 'income_under_10k', 
@@ -159,7 +343,7 @@ class SampleDataGenerator:
             # Convert numeric columns
             numeric_cols = ['gini_index', 'income_under_10k', 'income_200k_plus', 'aggregate_income']
             for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+                df[col] = _to_numeric(df[col])
             
             # Add metadata
             df['year'] = 2022
@@ -169,17 +353,20 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'census_inequality_2022.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name}")
             print(f"  📊 Records: {len(df)}")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'Census ACS inequality metrics by state (2022)',
                 'records': len(df),
                 'source': 'US Census Bureau ACS 5-Year Estimates',
                 'api': 'https://api.census.gov/data/2022/acs/acs5',
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -188,7 +375,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating Census inequality data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def generate_bls_employment_data(self) -> bool:
@@ -198,7 +385,7 @@ class SampleDataGenerator:
         api_key = get_api_key('BLS_API_KEY', required=False)
         if not api_key:
             print("⚠️  BLS_API_KEY not found - skipping BLS data")
-            self.errors.append("BLS API key not available")
+            self._record_error("BLS API key not available")
             return False
         
         try:
@@ -212,45 +399,31 @@ class SampleDataGenerator:
                 'CES0000000001'  # Total nonfarm employment
             ]
             
-            headers = {'Content-type': 'application/json'}
-            data = json.dumps({
-                'seriesid': series_ids,
-                'startyear': '2018',
-                'endyear': '2023',
-                'registrationkey': api_key
-            })
+            def fetch(batch, start_year, end_year):
+                payload = {
+                    'seriesid': batch,
+                    'startyear': str(start_year),
+                    'endyear': str(end_year),
+                    'registrationkey': api_key
+                }
+                result = self._fetch_json(
+                    base_url, payload=payload,
+                    cacheable=lambda r: r.get('status') == 'REQUEST_SUCCEEDED'
+                )
+                return parse_bls_response(result)
             
             print(f"  🔗 Fetching from: {base_url}")
-            response = requests.post(base_url, data=data, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Check for API errors
-            if result.get('status') != 'REQUEST_SUCCEEDED':
-                error_msg = result.get('message', ['Unknown API error'])
-                raise Exception(f"BLS API error: {error_msg}")
-            
-            # Parse results
-            records = []
-            for series in result['Results']['series']:
-                series_id = series['seriesID']
-                for item in series['data']:
-                    # Safely get footnotes
-                    footnotes = []
-                    if 'footnotes' in item and item['footnotes']:
-                        footnotes = [f.get('text', '') for f in item['footnotes'] if isinstance(f, dict)]
-                    
-                    records.append({
-                        'series_id': series_id,
-                        'year': int(item['year']),
-                        'period': item['period'],
-                        'period_name': item['periodName'],
-                        'value': float(item['value']),
-                        'footnotes': '; '.join(footnotes) if footnotes else ''
-                    })
-            
-            df = pd.DataFrame(records)
+            if self.bls_store is not None:
+                # Incremental mode: request only periods after the last stored
+                # observation (plus the revision window) and merge in place
+                summary = sync_bls_series(series_ids, self.bls_store, 2018, 2023,
+                                          revision_months=self.bls_revision_months,
+                                          fetch=fetch)
+                print(f"  🔄 Delta sync: {summary['requests']} request(s), "
+                      f"{summary['added']} new, {summary['revised']} revised")
+                df = self.bls_store.to_frame(series_ids, 2018, 2023)
+            else:
+                df = fetch(series_ids, 2018, 2023)
             
             # Add descriptive names
             series_names = {
@@ -267,11 +440,12 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'bls_employment_national.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name}")
             print(f"  📊 Records: {len(df)}")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'BLS national employment indicators (2018-2023)',
                 'records': len(df),
@@ -279,6 +453,8 @@ class SampleDataGenerator:
                 'api': 'https://api.bls.gov/publicAPI/v2/timeseries/data/',
                 'series_ids': series_ids,
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -287,7 +463,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating BLS employment data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def generate_bls_qcew_data(self) -> bool:
@@ -326,18 +502,21 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'bls_employment_counties_sample.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name} (sample data)")
             print(f"  📊 Records: {len(df)}")
             print(f"  ℹ️  Note: This is representative sample data")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'BLS QCEW county employment data (sample - top 10 counties)',
                 'records': len(df),
                 'source': 'Bureau of Labor Statistics QCEW (Sample)',
                 'note': 'Representative sample data for tutorial purposes',
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -346,7 +525,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating QCEW data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def generate_epa_environmental_data(self) -> bool:
@@ -360,24 +539,26 @@ class SampleDataGenerator:
             print("  ℹ️  Creating sample EPA EJScreen data")
             
             # Sample data for states
+            # A local RandomState(42) reproduces the legacy np.random.seed(42)
+            # stream without touching global state shared across threads
             import numpy as np
-            np.random.seed(42)
+            rng = np.random.RandomState(42)
             
             states = ['California', 'Texas', 'Florida', 'New York', 'Pennsylvania',
                      'Illinois', 'Ohio', 'Georgia', 'North Carolina', 'Michigan']
             
             sample_data = {
                 'state': states,
-                'pm25_percentile': np.random.uniform(30, 90, 10).round(1),
-                'ozone_percentile': np.random.uniform(25, 85, 10).round(1),
-                'diesel_pm_percentile': np.random.uniform(35, 95, 10).round(1),
-                'traffic_proximity_percentile': np.random.uniform(40, 90, 10).round(1),
-                'lead_paint_percentile': np.random.uniform(30, 80, 10).round(1),
-                'superfund_proximity_percentile': np.random.uniform(20, 75, 10).round(1),
-                'rmp_proximity_percentile': np.random.uniform(25, 70, 10).round(1),
-                'hazardous_waste_percentile': np.random.uniform(30, 85, 10).round(1),
-                'low_income_percentile': np.random.uniform(35, 80, 10).round(1),
-                'minority_percentile': np.random.uniform(30, 90, 10).round(1)
+                'pm25_percentile': rng.uniform(30, 90, 10).round(1),
+                'ozone_percentile': rng.uniform(25, 85, 10).round(1),
+                'diesel_pm_percentile': rng.uniform(35, 95, 10).round(1),
+                'traffic_proximity_percentile': rng.uniform(40, 90, 10).round(1),
+                'lead_paint_percentile': rng.uniform(30, 80, 10).round(1),
+                'superfund_proximity_percentile': rng.uniform(20, 75, 10).round(1),
+                'rmp_proximity_percentile': rng.uniform(25, 70, 10).round(1),
+                'hazardous_waste_percentile': rng.uniform(30, 85, 10).round(1),
+                'low_income_percentile': rng.uniform(35, 80, 10).round(1),
+                'minority_percentile': rng.uniform(30, 90, 10).round(1)
             }
             
             df = pd.DataFrame(sample_data)
@@ -388,18 +569,21 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'epa_environmental_burden_sample.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name} (sample data)")
             print(f"  📊 Records: {len(df)}")
             print(f"  ℹ️  Note: This is representative sample data")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'EPA EJScreen environmental burden indicators by state (sample)',
                 'records': len(df),
                 'source': 'EPA EJScreen (Sample)',
                 'note': 'Representative sample data for tutorial purposes',
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -408,7 +592,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating EPA data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def generate_fbi_crime_data(self) -> bool:
@@ -421,7 +605,7 @@ class SampleDataGenerator:
             
             # Sample crime data for states (2018-2022)
             import numpy as np
-            np.random.seed(42)
+            rng = np.random.RandomState(42)
             
             states = ['California', 'Texas', 'Florida', 'New York', 'Pennsylvania'] * 5
             years = sorted([2018, 2019, 2020, 2021, 2022] * 5)
@@ -430,15 +614,15 @@ class SampleDataGenerator:
                 'state': states,
                 'year': years,
                 'population': [39500000, 29000000, 21500000, 19500000, 12800000] * 5,
-                'violent_crime': np.random.randint(100000, 200000, 25),
-                'murder': np.random.randint(1000, 3000, 25),
-                'rape': np.random.randint(5000, 15000, 25),
-                'robbery': np.random.randint(20000, 50000, 25),
-                'aggravated_assault': np.random.randint(50000, 120000, 25),
-                'property_crime': np.random.randint(400000, 900000, 25),
-                'burglary': np.random.randint(80000, 180000, 25),
-                'larceny_theft': np.random.randint(250000, 600000, 25),
-                'motor_vehicle_theft': np.random.randint(50000, 150000, 25)
+                'violent_crime': rng.randint(100000, 200000, 25),
+                'murder': rng.randint(1000, 3000, 25),
+                'rape': rng.randint(5000, 15000, 25),
+                'robbery': rng.randint(20000, 50000, 25),
+                'aggravated_assault': rng.randint(50000, 120000, 25),
+                'property_crime': rng.randint(400000, 900000, 25),
+                'burglary': rng.randint(80000, 180000, 25),
+                'larceny_theft': rng.randint(250000, 600000, 25),
+                'motor_vehicle_theft': rng.randint(50000, 150000, 25)
             }
             
             df = pd.DataFrame(sample_data)
@@ -453,18 +637,21 @@ class SampleDataGenerator:
             # Save to CSV
             output_file = self.output_dir / 'fbi_crime_stats_sample.csv'
             df.to_csv(output_file, index=False)
+            columnar = self._write_columnar(df, output_file)
             
             print(f"  ✅ Saved: {output_file.name} (sample data)")
             print(f"  📊 Records: {len(df)}")
             print(f"  ℹ️  Note: This is representative sample data")
             
-            self.manifest.append({
+            self._record_manifest({
                 'filename': output_file.name,
                 'description': 'FBI UCR crime statistics by state (2018-2022, sample)',
                 'records': len(df),
                 'source': 'FBI Uniform Crime Reports (Sample)',
                 'note': 'Representative sample data for tutorial purposes',
                 'columns': list(df.columns),
+                'dtypes': infer_schema(df),
+                'columnar': columnar,
                 'date_generated': datetime.now().isoformat()
             })
             
@@ -473,7 +660,7 @@ class SampleDataGenerator:
         except Exception as e:
             error_msg = f"Error generating FBI crime data: {e}"
             print(f"  ❌ {error_msg}")
-            self.errors.append(error_msg)
+            self._record_error(error_msg)
             return False
     
     def create_version_file(self):
@@ -551,9 +738,18 @@ Version: 1.0.0
         
         print(f"  ✅ Created: {manifest_txt.name}")
     
-    def generate_all(self):
-        """Generate all sample datasets."""
+    def generate_all(self, max_workers: Optional[int] = None):
+        """
+        Generate all sample datasets.
+
+        Datasets are fetched concurrently on a thread pool bounded by
+        ``max_workers`` (default: the value given at construction). Manifest
+        entries and errors are merged in the declared dataset order,
+        regardless of completion order.
+        """
+        workers = self.max_workers if max_workers is None else max(1, int(max_workers))
         print("\n🚀 Starting Sample Data Generation")
+        print(f"  ⚙️  Workers: {workers}")
         print("=" * 70)
         
         # Track successes
@@ -569,8 +765,16 @@ Version: 1.0.0
             ('FBI Crime', self.generate_fbi_crime_data),
         ]
         
-        for name, func in datasets:
-            if func():
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(datasets))) as executor:
+                results = list(executor.map(lambda item: self._run_dataset(item[1]), datasets))
+        else:
+            results = [self._run_dataset(func) for _, func in datasets]
+        
+        for (name, _), (success, manifest, errors) in zip(datasets, results):
+            self.manifest.extend(manifest)
+            self.errors.extend(errors)
+            if success:
                 successes.append(name)
         
         # Create metadata files
@@ -592,6 +796,15 @@ Version: 1.0.0
             for error in self.errors:
                 print(f"  • {error}")
         
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"\n💾 API cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB)")
+        
+        stats = self.scheduler.stats
+        print(f"\n⏱️  API requests: {stats['requests']} sent, {stats['retries']} retried, "
+              f"{stats['throttled']} throttled, {stats['waited_seconds']:.1f}s waiting")
+        
         print("\n📝 Files created:")
         for item in self.manifest:
             print(f"  ✓ {item['filename']} ({item['records']:,} records)")
@@ -607,6 +820,23 @@ Version: 1.0.0
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description='Generate KRAnalytics sample datasets')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Maximum datasets fetched concurrently (1 = sequential)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='API response cache directory (default: data/cache/api)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always fetch fresh API responses')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Delta-sync BLS series against the local store (data/cache/bls)')
+    parser.add_argument('--revision-months', type=int, default=12,
+                        help='Trailing months re-pulled in incremental mode (default: 12)')
+    parser.add_argument('--api-root', default=None,
+                        help='Send Census/BLS requests to a local API stand-in server')
+    parser.add_argument('--record', metavar='DIR', default=None,
+                        help='Record Census/BLS responses as replay fixtures in DIR')
+    args = parser.parse_args()
+    
     print("\n" + "=" * 70)
     print("  KRAnalytics Sample Data Generator")
     print("=" * 70)
@@ -633,8 +863,16 @@ def main():
         print("   export BLS_API_KEY='your_key'")
     
     # Generate datasets
-    generator = SampleDataGenerator()
-    success = generator.generate_all()
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    bls_store = BLSSeriesStore() if args.incremental else None
+    recorder = FixtureStore(args.record) if args.record else None
+    generator = SampleDataGenerator(max_workers=args.workers, cache=cache, bls_store=bls_store,
+                                    bls_revision_months=args.revision_months,
+                                    api_root=args.api_root, recorder=recorder)
+    try:
+        success = generator.generate_all()
+    finally:
+        generator.close()
     
     if success:
         print("\n🎉 All datasets generated successfully!")
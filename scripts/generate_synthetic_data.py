@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Generate Large Synthetic Datasets for Load Testing
+
+Streams synthetic county-year, series-month or geography rows in chunks on
+parallel workers and writes them as partitioned columnar files. The output
+depends only on the dataset, entity count, seed and block size, never on the
+chunk size or number of workers.
+
+Usage:
+    # 10M county-year rows (714,286 counties x 14 years) on 8 workers
+    python scripts/generate_synthetic_data.py county_crime --entities 714286 --workers 8
+
+    # Monthly unemployment series into a custom directory
+    python scripts/generate_synthetic_data.py state_unemployment --entities 100000 \\
+        --output data/synthetic/unemployment
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from kranalytics.synthetic import (DATASETS, DEFAULT_BLOCK_ENTITIES, DEFAULT_CHUNK_ROWS,
+                                   generate_partitioned, n_rows)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Generate partitioned synthetic datasets')
+    parser.add_argument('dataset', choices=sorted(DATASETS), help='Synthetic dataset')
+    parser.add_argument('--entities', type=int, required=True,
+                        help='Number of counties, series or geographies')
+    parser.add_argument('--output', default=None,
+                        help='Output directory (default: data/synthetic/<dataset>)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='Target rows per partition (default: 1,000,000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=42, help='Root seed (default: 42)')
+    parser.add_argument('--block-entities', type=int, default=DEFAULT_BLOCK_ENTITIES,
+                        help='Entities per random stream (default: 1024)')
+    args = parser.parse_args()
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).parent.parent / 'data' / 'synthetic' / args.dataset)
+
+    print("\n" + "=" * 70)
+    print(f"  KRAnalytics Synthetic Data ({args.dataset})")
+    print("=" * 70)
+    print(f"\n📊 Rows: {n_rows(args.dataset, args.entities):,} "
+          f"({args.entities:,} entities)")
+    print(f"📁 Output: {output}")
+
+    start = time.perf_counter()
+    manifest = generate_partitioned(args.dataset, args.entities, output,
+                                    chunk_rows=args.chunk_rows, seed=args.seed,
+                                    block_entities=args.block_entities,
+                                    max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Wrote {manifest['rows']:,} rows in {len(manifest['partitions'])} partitions "
+          f"({elapsed:.1f}s, {manifest['rows'] / elapsed:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
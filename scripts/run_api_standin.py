@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Run the Local Census/BLS API Stand-in Server
+
+Replays recorded API responses (data/fixtures/api) so every fetch path can
+be exercised, benchmarked and regression-tested without network access
+(see src/kranalytics/api_standin.py).
+
+Usage:
+    # Build fixtures from the bundled sample datasets (no keys needed)
+    python scripts/run_api_standin.py --seed-from-samples
+
+    # Serve them with 50-150 ms latency, 10 req/s throttling and 2% errors
+    python scripts/run_api_standin.py --latency 0.05 --jitter 0.1 --rate 10 --error-rate 0.02
+
+    # Point the generator at it (any non-empty key enables the API paths)
+    CENSUS_API_KEY=offline BLS_API_KEY=offline \\
+        python scripts/generate_sample_data.py --no-cache --api-root http://127.0.0.1:8765
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from kranalytics.api_standin import (DEFAULT_COUNTIES_PER_STATE, DEFAULT_FIXTURE_DIR,
+                                     FixtureStore, StandInServer, seed_from_samples)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run the local Census/BLS API stand-in')
+    parser.add_argument('--fixtures', default=str(DEFAULT_FIXTURE_DIR),
+                        help='Fixture directory (default: data/fixtures/api)')
+    parser.add_argument('--seed-from-samples', action='store_true',
+                        help='Write fixtures built from the bundled sample datasets')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Extra random delay of up to this many seconds')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Requests per second before answering 429 (default: unlimited)')
+    parser.add_argument('--burst', type=float, default=None,
+                        help='Burst size for --rate (default: the rate)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 503')
+    parser.add_argument('--counties-per-state', type=int, default=DEFAULT_COUNTIES_PER_STATE,
+                        help='Counties synthesized per state from state fixtures (0 = off)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    store = FixtureStore(args.fixtures)
+    if args.seed_from_samples:
+        seed_from_samples(store)
+        print(f"🌱 Fixtures written to {store.directory}")
+    if not len(store):
+        print(f"❌ No fixtures in {store.directory} "
+              f"(record with generate_sample_data.py --record, or use --seed-from-samples)")
+        return 1
+
+    server = StandInServer(store, args.host, args.port, latency=args.latency,
+                           jitter=args.jitter, rate=args.rate, burst=args.burst,
+                           error_rate=args.error_rate,
+                           counties_per_state=args.counties_per_state, seed=args.seed)
+    server.start()
+    print(f"🚀 API stand-in serving {len(store)} fixture(s) on {server.url}")
+    print(f"   Census: {server.url_for('https://api.census.gov/data')}")
+    print(f"   BLS:    {server.url_for('https://api.bls.gov/publicAPI/v2/timeseries/data/')}")
+    try:
+        server.serve_forever()
+    finally:
+        print(f"\n📊 {server.stats}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Run KRAnalytics Performance Benchmarks
+
+Times the tutorial hot paths (synthetic data generation, inequality indices,
+sample dataset loading, BLS reshapes, Census parsing) at a chosen scale and
+compares them against a stored JSON baseline.
+
+Usage:
+    # Record a baseline at county scale
+    python scripts/run_benchmarks.py --size county --save-baseline
+
+    # Check the current tree against it (exit code 1 on regressions); the
+    # first run without a baseline records one instead
+    python scripts/run_benchmarks.py --size county --compare
+
+    # Run selected workloads only
+    python scripts/run_benchmarks.py --size large --workload inequality_indices
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from kranalytics.benchmarks import (DEFAULT_BASELINE, DEFAULT_TOLERANCE, SIZES, WORKLOADS,
+                                    compare_to_baseline, load_baseline, run_benchmarks,
+                                    save_baseline)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run KRAnalytics performance benchmarks')
+    parser.add_argument('--size', default='small',
+                        help=f"Workload size: {', '.join(SIZES)} or a number (default: small)")
+    parser.add_argument('--workload', action='append', choices=sorted(WORKLOADS),
+                        help='Workload to run (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per workload (default: 3)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help='Baseline JSON file (default: data/benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare against the baseline and fail on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed relative slowdown before flagging (default: 0.2)')
+    args = parser.parse_args()
+
+    size = args.size if args.size in SIZES else int(args.size)
+
+    print("\n" + "=" * 70)
+    print(f"  KRAnalytics Benchmarks (size={args.size})")
+    print("=" * 70 + "\n")
+    results = run_benchmarks(size, names=args.workload, repeat=args.repeat, verbose=True)
+
+    status = 0
+    if args.compare:
+        baseline_path = Path(args.baseline)
+        if not baseline_path.exists():
+            path = save_baseline(results, baseline_path)
+            print(f"\n💾 No baseline yet; saved these results as {path}")
+            return 0
+        report = compare_to_baseline(results, load_baseline(baseline_path), args.tolerance)
+        print(f"\n📊 Comparison against {baseline_path}")
+        print(report[['name', 'size', 'time_ratio', 'memory_ratio', 'regression']]
+              .to_string(index=False, float_format=lambda x: f'{x:.2f}x'))
+        regressions = report[report['regression']]
+        if regressions.empty:
+            print("\n✅ No regressions")
+        else:
+            print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions['name'])}")
+            status = 1
+
+    if args.save_baseline:
+        path = save_baseline(results, args.baseline)
+        print(f"\n💾 Baseline saved: {path}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Run the KRAnalytics Shared Data Service
+
+Starts the per-host daemon that loads each dataset once, publishes it to
+shared memory and serves every notebook kernel and job from that copy
+(see src/kranalytics/data_service.py).
+
+Usage:
+    # Start the service (Ctrl+C to stop)
+    python scripts/run_data_service.py
+
+    # Pre-register live loaders (run with sample-data fallback)
+    python scripts/run_data_service.py \\
+        --register census_income_2022=mypkg.census:fetch_income:CENSUS_API_KEY
+
+    # Let clients run a loader for any dataset (other loaders run client-side)
+    python scripts/run_data_service.py --allow mypkg.census:fetch_county_income
+
+    # Point kernels at it
+    export KRANALYTICS_DATA_SERVICE=$(python scripts/run_data_service.py --print-socket)
+
+    # Show counters of a running service
+    python scripts/run_data_service.py --stats
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from kranalytics.data_service import (DEFAULT_MAX_BYTES, DataService, DataServiceClient,
+                                      allow_loader, resolve_loader, default_shm_dir,
+                                      default_socket_path, register_loader)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run the KRAnalytics shared data service')
+    parser.add_argument('--socket', default=str(default_socket_path()),
+                        help=f'Unix socket path (default: {default_socket_path()})')
+    parser.add_argument('--shm-dir', default=str(default_shm_dir()),
+                        help=f'Shared-memory store directory (default: {default_shm_dir()})')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help='Store budget in bytes; LRU datasets are evicted beyond it')
+    parser.add_argument('--data-dir', help='Sample dataset directory')
+    parser.add_argument('--register', action='append', default=[],
+                        metavar='NAME=MODULE:FUNCTION[:API_KEY]',
+                        help='Serve NAME from a live loader (repeatable)')
+    parser.add_argument('--allow', action='append', default=[], metavar='MODULE:FUNCTION',
+                        help='Let clients request a live loader by name (repeatable)')
+    parser.add_argument('--print-socket', action='store_true',
+                        help='Print the socket path and exit')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print the counters of a running service and exit')
+    args = parser.parse_args()
+
+    if args.print_socket:
+        print(args.socket)
+        return 0
+    if args.stats:
+        try:
+            stats = DataServiceClient(args.socket, timeout=5).stats()
+        except ConnectionError as e:
+            print(f"❌ {e}")
+            return 1
+        for name, value in stats.items():
+            print(f"  {name}: {value}")
+        return 0
+
+    for spec in args.register:
+        name, _, target = spec.partition('=')
+        module, _, rest = target.partition(':')
+        function, _, api_key_name = rest.partition(':')
+        if not name or not module or not function:
+            parser.error(f"--register expects NAME=MODULE:FUNCTION[:API_KEY], got '{spec}'")
+        register_loader(name, resolve_loader(f'{module}:{function}'), api_key_name or None)
+        print(f"📥 {name} ← {module}:{function}")
+    for spec in args.allow:
+        if ':' not in spec:
+            parser.error(f"--allow expects MODULE:FUNCTION, got '{spec}'")
+        allow_loader(resolve_loader(spec))
+        print(f"📥 * ← {spec}")
+
+    service = DataService(args.socket, args.shm_dir, max_bytes=args.max_bytes,
+                          data_dir=args.data_dir)
+    print(f"🚀 Data service listening on {service.socket_path}")
+    print(f"   Store: {service.store.cache_dir}")
+    print(f"   export KRANALYTICS_DATA_SERVICE={service.socket_path}")
+    service.serve_forever()
+    print("\n👋 Data service stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
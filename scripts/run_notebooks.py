@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Execute KRAnalytics Tutorial Notebooks Headlessly
+
+Runs the notebooks in parallel worker processes against the offline sample
+data, reports the slowest cells and exits non-zero if any notebook fails.
+Cells whose source and upstream inputs are unchanged since the last run are
+restored from the cell cache (data/cache/notebooks) instead of re-executed.
+
+Usage:
+    # Run every tutorial in notebooks/examples on 4 workers
+    python scripts/run_notebooks.py --workers 4
+
+    # Run one notebook without the cell cache
+    python scripts/run_notebooks.py notebooks/examples/03_Inequality_Analysis_Tutorial.ipynb --no-cache
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from kranalytics.notebook_runner import cell_timings, run_notebooks
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'notebooks' / 'examples'
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Execute KRAnalytics notebooks headlessly')
+    parser.add_argument('notebooks', nargs='*',
+                        help='Notebooks to run (default: notebooks/examples/*.ipynb)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Notebooks executed concurrently (default: CPU count)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Cell cache directory (default: data/cache/notebooks)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Execute every cell')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Slowest cells to report (default: 10)')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.notebooks] or sorted(EXAMPLES_DIR.glob('*.ipynb'))
+
+    print("\n" + "=" * 70)
+    print(f"  KRAnalytics Notebook Runner ({len(paths)} notebooks)")
+    print("=" * 70 + "\n")
+    results = run_notebooks(paths, max_workers=args.workers, cache_dir=args.cache_dir,
+                            use_cache=not args.no_cache)
+
+    for result in results:
+        icon = '✓' if result['status'] == 'ok' else '✗'
+        print(f"  {icon} {Path(result['notebook']).name:<45} {result['wall_seconds']:>7.1f}s  "
+              f"({result['executed']} run, {result['cached']} cached)")
+        for cell in result['cells']:
+            if cell['error']:
+                print(f"      cell {cell['index']}: {cell['error']}")
+        if result.get('error'):
+            print(f"      {result['error']}")
+
+    timings = cell_timings(results)
+    if not timings.empty:
+        print("\n⏱  Slowest cells")
+        print(timings.head(args.top)[['notebook', 'index', 'cached', 'wall_seconds',
+                                      'peak_rss_delta_bytes']].to_string(index=False))
+
+    failed = [r for r in results if r['status'] != 'ok']
+    if failed:
+        print(f"\n❌ {len(failed)} notebook(s) failed")
+        return 1
+    print("\n✅ All notebooks executed successfully")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
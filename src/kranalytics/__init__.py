@@ -0,0 +1,86 @@
+"""
+KRAnalytics: open-source analytics framework for government data.
+
+Submodules and their public functions are loaded on first attribute access
+(PEP 562), so ``import kranalytics`` stays cheap: NumPy, pandas and the
+modelling and plotting stacks (statsmodels, scikit-learn, prophet, plotly)
+are imported only when a feature that needs them is first used.
+
+Example
+-------
+>>> import kranalytics
+>>> df = kranalytics.load_sample_dataset('census_income_2022')   # imports columnar
+>>> from kranalytics import compute_inequality_indices            # imports inequality
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+__version__ = '1.0.0'
+
+_SUBMODULES = frozenset({
+    'api_cache', 'api_standin', 'auto_arima', 'backtesting', 'benchmarks', 'bls_sync',
+    'census_acs', 'census_planner', 'columnar', 'count_models', 'data_service', 'data_utils',
+    'forecasting', 'geography', 'inequality', 'inequality_bootstrap', 'khipu_analytics',
+    'notebook_runner', 'pipeline', 'plotting', 'results_cache', 'scheduler', 'schema',
+    'synthetic',
+})
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'get_api_key': 'data_utils',
+    'load_data_with_fallback': 'data_utils',
+    'load_sample_data': 'data_utils',
+    'save_sample_data': 'data_utils',
+    'ResponseCache': 'api_cache',
+    'load_sample_dataset': 'columnar',
+    'read_columnar': 'columnar',
+    'write_columnar': 'columnar',
+    'BLSSeriesStore': 'bls_sync',
+    'sync_bls_series': 'bls_sync',
+    'fetch_acs': 'census_acs',
+    'build_panel': 'geography',
+    'compute_inequality_indices': 'inequality',
+    'bootstrap_inequality_indices': 'inequality_bootstrap',
+    'forecast_panel': 'forecasting',
+    'select_orders': 'auto_arima',
+    'rolling_origin_backtest': 'backtesting',
+    'backtest_metrics': 'backtesting',
+    'fit_count_models': 'count_models',
+    'infer_schema': 'schema',
+    'memoize': 'results_cache',
+    'apply_schema': 'schema',
+}
+
+__all__ = ['__version__'] + sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from kranalytics.api_cache import ResponseCache
+    from kranalytics.auto_arima import select_orders
+    from kranalytics.backtesting import backtest_metrics, rolling_origin_backtest
+    from kranalytics.bls_sync import BLSSeriesStore, sync_bls_series
+    from kranalytics.census_acs import fetch_acs
+    from kranalytics.columnar import load_sample_dataset, read_columnar, write_columnar
+    from kranalytics.count_models import fit_count_models
+    from kranalytics.data_utils import (get_api_key, load_data_with_fallback,
+                                        load_sample_data, save_sample_data)
+    from kranalytics.forecasting import forecast_panel
+    from kranalytics.geography import build_panel
+    from kranalytics.inequality import compute_inequality_indices
+    from kranalytics.inequality_bootstrap import bootstrap_inequality_indices
+    from kranalytics.results_cache import memoize
+    from kranalytics.schema import apply_schema, infer_schema
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
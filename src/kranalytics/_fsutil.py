@@ -0,0 +1,122 @@
+"""Filesystem helpers shared by the on-disk caches."""
+
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write ``data`` to ``path`` atomically.
+
+    The bytes are written to a temporary file in the destination directory
+    and moved into place with ``os.replace``, so concurrent readers (in this
+    or another process) never observe a partially written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix=path.suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def iter_entries(directory: Path, pattern: str = '*') -> Iterator[Tuple[float, int, Path]]:
+    """Yield ``(mtime, size, path)`` for cache files below ``directory``."""
+    for path in Path(directory).rglob(pattern):
+        if path.name.startswith('.tmp-'):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # Removed by another process
+        if path.is_file():
+            yield stat.st_mtime, stat.st_size, path
+
+
+def evict_lru(directory: Path, max_bytes: int, pattern: str = '*') -> int:
+    """
+    Delete least-recently-used files until ``directory`` fits in ``max_bytes``.
+
+    Recency is the file modification time, which cache readers refresh on
+    every hit. Files removed concurrently by another process are skipped.
+
+    Returns
+    -------
+    int
+        Number of files evicted
+    """
+    return evict_lru_sized(directory, max_bytes, pattern)[0]
+
+
+def evict_lru_sized(directory: Path, max_bytes: int, pattern: str = '*',
+                    low_water: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Like :func:`evict_lru`, also returning the bytes left: ``(evicted, total)``.
+
+    A directory over ``max_bytes`` is trimmed down to ``low_water`` bytes
+    (default: ``max_bytes``), leaving headroom before the next eviction.
+    """
+    entries = sorted(iter_entries(directory, pattern))
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    if total <= max_bytes:
+        return evicted, total
+    target = max_bytes if low_water is None else min(low_water, max_bytes)
+    for _, size, path in entries:
+        if total <= target:
+            break
+        try:
+            path.unlink()
+            evicted += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+    return evicted, total
+
+
+def touch(path: Path) -> None:
+    """Mark ``path`` as recently used, ignoring files evicted meanwhile."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive OS lock on ``<path>.lock`` across processes.
+
+    Uses ``fcntl.flock`` on POSIX and ``msvcrt.locking`` on Windows; the
+    lock is released when the block exits or the process dies.
+    """
+    lock_path = Path(f'{path}.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,303 @@
+"""
+Persistent on-disk cache for Census and BLS API responses.
+
+Responses are stored content-addressed: the cache key is a SHA-256 digest of
+the endpoint, the normalized request parameters (API keys removed) and the
+API vintage. Entries expire after a per-source TTL, the cache directory is
+kept under a byte budget with least-recently-used eviction, and writes are
+atomic so several processes can share one cache directory. Each cache keeps
+a running total of the bytes it has stored and only scans the directory
+when that total crosses the budget; eviction then trims the directory to
+90% of the budget, so a full cache is not rescanned on every write.
+
+Example
+-------
+>>> cache = ResponseCache()
+>>> payload = cache.fetch_json(
+...     requests.Session(),
+...     'https://api.census.gov/data/2022/acs/acs5',
+...     params={'get': 'NAME,B19013_001E', 'for': 'state:*', 'key': api_key},
+... )
+>>> cache.stats()['hits']
+0
+"""
+
+import hashlib
+import json
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from kranalytics._fsutil import atomic_write_bytes, evict_lru_sized, iter_entries, touch
+from kranalytics.khipu_analytics.execution_tracking import record_cache_hit
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'api'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Share of the byte budget an eviction trims the cache down to
+EVICT_LOW_WATER = 0.9
+
+# Time-to-live per data source in seconds. ACS vintages are published once a
+# year, while BLS series are revised and extended monthly.
+DEFAULT_TTLS = {
+    'census': 30 * 24 * 3600,
+    'bls': 12 * 3600,
+    'default': 24 * 3600,
+}
+
+# Request fields that carry credentials and must never reach the cache key
+SECRET_PARAMS = frozenset({'key', 'registrationkey', 'api_key', 'apikey'})
+
+_CENSUS_VINTAGE = re.compile(r'/data/(\d{4})/')
+
+_LOOPBACK_HOSTS = frozenset({'127.0.0.1', 'localhost', '::1'})
+
+
+def upstream_host(endpoint: str) -> str:
+    """
+    Return the API host an endpoint addresses.
+
+    Local stand-in servers (see :mod:`kranalytics.api_standin`) mirror the
+    upstream host as the first path segment, e.g.
+    ``http://127.0.0.1:8765/api.census.gov/data/2022/acs/acs5``.
+    """
+    parts = urlsplit(endpoint)
+    if (parts.hostname or '') in _LOOPBACK_HOSTS:
+        first = parts.path.lstrip('/').split('/', 1)[0]
+        if '.' in first:
+            return first.lower()
+    return parts.netloc.lower()
+
+
+def infer_source(endpoint: str) -> str:
+    """Return the data source name ('census', 'bls' or 'default') for an endpoint."""
+    host = upstream_host(endpoint)
+    if host.endswith('census.gov'):
+        return 'census'
+    if host.endswith('bls.gov'):
+        return 'bls'
+    return 'default'
+
+
+def infer_vintage(endpoint: str) -> Optional[str]:
+    """Return the API vintage encoded in a Census endpoint URL, if any."""
+    match = _CENSUS_VINTAGE.search(endpoint)
+    return match.group(1) if match else None
+
+
+def normalize_params(params: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Normalize request parameters for use in a cache key.
+
+    Credential fields are dropped, keys are sorted and scalar values are
+    converted to strings so that ``{'year': 2022}`` and ``{'year': '2022'}``
+    address the same entry. List order is preserved because it determines
+    the column order of Census and BLS responses.
+    """
+    normalized = {}
+    for name in sorted(params or {}):
+        if name.lower() in SECRET_PARAMS:
+            continue
+        value = params[name]
+        if isinstance(value, (list, tuple)):
+            normalized[name] = [str(v) for v in value]
+        else:
+            normalized[name] = str(value)
+    return normalized
+
+
+def cache_key(endpoint: str, params: Optional[Mapping[str, Any]] = None,
+              vintage: Optional[str] = None) -> str:
+    """Return the content address for a request."""
+    if vintage is None:
+        vintage = infer_vintage(endpoint)
+    canonical = json.dumps({
+        'endpoint': endpoint.rstrip('/'),
+        'params': normalize_params(params),
+        'vintage': vintage,
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed response cache with TTL and LRU eviction.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Cache directory (default: data/cache/api)
+    max_bytes : int
+        Byte budget for the cache directory; least-recently-used entries
+        are evicted after a store takes the running size total beyond it,
+        down to ``EVICT_LOW_WATER`` of the budget.
+        The total is resynchronized with the directory on every eviction,
+        so entries written by other processes are counted from then on
+    ttls : dict, optional
+        Per-source TTL overrides in seconds, merged over DEFAULT_TTLS
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Mapping[str, float]] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = int(max_bytes)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._bytes: Optional[int] = None  # Running size total; None until first scanned
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def ttl_for(self, source: str) -> float:
+        """Return the TTL in seconds for a data source."""
+        return self.ttls.get(source, self.ttls['default'])
+
+    def get(self, endpoint: str, params: Optional[Mapping[str, Any]] = None,
+            vintage: Optional[str] = None, source: Optional[str] = None) -> Optional[Any]:
+        """
+        Return the cached payload for a request, or None on a miss.
+
+        Expired entries are deleted and counted as misses.
+        """
+        path = self._path(cache_key(endpoint, params, vintage))
+        try:
+            entry = json.loads(path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            self._count('misses')
+            return None
+
+        age = time.time() - entry['stored_at']
+        if age > self.ttl_for(source or entry['source']):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._count('misses')
+            return None
+
+        touch(path)
+        self._count('hits')
+        record_cache_hit()
+        return entry['payload']
+
+    def set(self, endpoint: str, payload: Any, params: Optional[Mapping[str, Any]] = None,
+            vintage: Optional[str] = None, source: Optional[str] = None) -> str:
+        """Store a JSON-serializable payload and return its cache key."""
+        if vintage is None:
+            vintage = infer_vintage(endpoint)
+        key = cache_key(endpoint, params, vintage)
+        entry = {
+            'endpoint': endpoint,
+            'params': normalize_params(params),
+            'vintage': vintage,
+            'source': source or infer_source(endpoint),
+            'stored_at': time.time(),
+            'payload': payload,
+        }
+        path = self._path(key)
+        data = json.dumps(entry).encode('utf-8')
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        atomic_write_bytes(path, data)
+        with self._lock:
+            self.stores += 1
+            if self._bytes is not None:
+                self._bytes += len(data) - replaced
+            over_budget = self._bytes is None or self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return key
+
+    def evict(self) -> int:
+        """Evict least-recently-used entries down to the low-water mark once over budget."""
+        evicted, total = evict_lru_sized(self.cache_dir, self.max_bytes, '*.json',
+                                         int(self.max_bytes * EVICT_LOW_WATER))
+        with self._lock:
+            self._bytes = total
+            self.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size."""
+        entries = list(iter_entries(self.cache_dir, '*.json')) if self.cache_dir.exists() else []
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+    def fetch_json(self, session, endpoint: str, params: Optional[Mapping[str, Any]] = None,
+                   payload: Optional[Mapping[str, Any]] = None, vintage: Optional[str] = None,
+                   source: Optional[str] = None, timeout: float = 30,
+                   cacheable: Optional[Callable[[Any], bool]] = None, **kwargs) -> Any:
+        """
+        Return the JSON response for a request, using the cache when possible.
+
+        Parameters
+        ----------
+        session : requests.Session
+            Session used on a cache miss
+        endpoint : str
+            Request URL
+        params : dict, optional
+            Query parameters (GET requests)
+        payload : dict, optional
+            JSON body; when given the request is sent as a POST (BLS API)
+        vintage : str, optional
+            API vintage; inferred from Census URLs when omitted
+        source : str, optional
+            Data source for TTL selection; inferred from the host when omitted
+        timeout : float
+            Request timeout in seconds
+        cacheable : callable, optional
+            Predicate on the decoded payload; responses failing it (e.g. BLS
+            ``REQUEST_NOT_PROCESSED``) are returned but not stored
+        **kwargs
+            Passed through to ``session.request``
+
+        Returns
+        -------
+        object
+            Decoded JSON payload
+        """
+        key_params = {**(params or {}), **(payload or {})}
+        cached = self.get(endpoint, key_params, vintage, source)
+        if cached is not None:
+            return cached
+
+        if payload is not None:
+            headers = {'Content-type': 'application/json', **kwargs.pop('headers', {})}
+            response = session.post(endpoint, data=json.dumps(payload), headers=headers,
+                                    timeout=timeout, **kwargs)
+        else:
+            response = session.get(endpoint, params=params, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        result = response.json()
+
+        if cacheable is None or cacheable(result):
+            self.set(endpoint, result, key_params, vintage, source)
+        return result
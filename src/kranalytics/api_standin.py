@@ -0,0 +1,590 @@
+"""
+Record/replay stand-in for the Census and BLS APIs.
+
+Without live keys every fetch path can only run its sample-data fallback,
+so its concurrency, retries and parsing speed cannot be tested offline.
+This module closes that gap:
+
+- :class:`FixtureStore` keeps recorded responses on disk (one JSON file per
+  request under ``data/fixtures/api/<host>/``, keyed like the response
+  cache with API keys stripped), so fixtures can be shared and committed
+- :class:`RecordingSession` wraps a ``requests.Session`` (or a
+  ``ScheduledSession``) and records every successful JSON response;
+  :func:`seed_from_samples` builds fixtures from the bundled sample
+  datasets when no live keys are available at all
+- :class:`StandInServer` is a local threaded HTTP server that replays them.
+  Census requests are answered by exact match or assembled from indexed
+  fixture rows, so any variable split or merge of the query planner works;
+  county and place requests without county fixtures are synthesized from
+  the state fixtures (``counties_per_state`` per state, ~3,100 in all by
+  default). BLS batches are assembled per series, and unknown series are
+  synthesized from a recorded one. Latency, jitter, 429 throttling (with
+  ``Retry-After``) and 5xx error rates are configurable.
+
+The server mirrors the upstream host as the first path segment, and
+:func:`~kranalytics.api_cache.infer_source` maps such URLs back to their
+provider, so the scheduler and response cache treat them as Census/BLS
+traffic.
+
+Example
+-------
+>>> store = seed_from_samples(FixtureStore(tmp_dir))
+>>> with StandInServer(store, latency=0.05, rate=10, error_rate=0.02) as server:
+...     df = fetch_acs(['B19013_001E'], 'county', base_url=server.url_for(ACS_BASE_URL))
+>>> len(df)                  # 51 states x 62 synthesized counties
+3162
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from kranalytics._fsutil import atomic_write_bytes
+from kranalytics.api_cache import cache_key, normalize_params, upstream_host
+from kranalytics.scheduler import TokenBucket
+
+DEFAULT_FIXTURE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'fixtures' / 'api'
+DEFAULT_COUNTIES_PER_STATE = 62
+
+CENSUS_HOST = 'api.census.gov'
+BLS_HOST = 'api.bls.gov'
+
+# Sample dataset columns and the ACS variables they were generated from
+SAMPLE_CENSUS_VARIABLES = {
+    'census_income_2022': {
+        'B19013_001E': 'median_household_income',
+        'B19301_001E': 'per_capita_income',
+        'B17001_002E': 'poverty_count',
+        'B19001_001E': 'total_households',
+    },
+    'census_inequality_2022': {
+        'B19083_001E': 'gini_index',
+        'B19001_002E': 'income_under_10k',
+        'B19001_017E': 'income_200k_plus',
+        'B19025_001E': 'aggregate_income',
+    },
+}
+
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+           'September', 'October', 'November', 'December')
+
+
+def standin_url(url: str, root: str) -> str:
+    """Rewrite an upstream API URL to the stand-in server at ``root``."""
+    parts = urlsplit(url)
+    return f"{root.rstrip('/')}/{parts.netloc}{parts.path}"
+
+
+def _request_key(host: str, path: str, request: Optional[Mapping[str, Any]]) -> str:
+    return cache_key(f'{host}/{path.strip("/")}', request, vintage='')
+
+
+class FixtureStore:
+    """
+    Recorded API responses on disk.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Fixture directory (default: data/fixtures/api)
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory is not None else DEFAULT_FIXTURE_DIR
+        self.version = 0  # Incremented by every record, so readers can refresh derived data
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    def _path(self, host: str, key: str) -> Path:
+        return self.directory / host / f'{key}.json'
+
+    def record(self, url: str, request: Optional[Mapping[str, Any]], payload: Any,
+               method: str = 'GET') -> str:
+        """Store one response; ``request`` is the query (GET) or JSON body (POST)."""
+        parts = urlsplit(url)
+        host, path = upstream_host(url), parts.path.strip('/')
+        if host != parts.netloc.lower():            # Recorded through a stand-in URL
+            path = path[len(host):]
+        path = '/' + path.strip('/')
+        key = _request_key(host, path, request)
+        entry = {
+            'host': host,
+            'path': path,
+            'method': method,
+            'request': normalize_params(request),
+            'recorded_at': datetime.now().isoformat(),
+            'payload': payload,
+        }
+        atomic_write_bytes(self._path(host, key), json.dumps(entry).encode('utf-8'))
+        with self._lock:
+            self._entries = None
+            self.version += 1
+        return key
+
+    def entries(self) -> Dict[str, Dict]:
+        """Return every fixture by key (loaded once, reloaded after a record)."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = {}
+                for path in sorted(self.directory.glob('*/*.json')):
+                    self._entries[path.stem] = json.loads(path.read_text())
+            return self._entries
+
+    def lookup(self, host: str, path: str, request: Optional[Mapping[str, Any]]) -> Optional[Any]:
+        """Return the payload recorded for exactly this request, or None."""
+        entry = self.entries().get(_request_key(host, '/' + path.strip('/'), request))
+        return entry['payload'] if entry is not None else None
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+
+class RecordingSession:
+    """
+    ``requests.Session`` stand-in that records successful JSON responses.
+
+    Wrap the outermost session (e.g. around a ``ScheduledSession``) so only
+    final responses are recorded.
+    """
+
+    def __init__(self, session, store: FixtureStore):
+        self.session = session
+        self.store = store
+
+    def _record(self, url, request, response, method):
+        if response.status_code != 200:
+            return
+        try:
+            payload = response.json()
+        except ValueError:
+            return
+        self.store.record(url, request, payload, method)
+
+    def get(self, url, params=None, **kwargs):
+        response = self.session.get(url, params=params, **kwargs)
+        self._record(url, params, response, 'GET')
+        return response
+
+    def post(self, url, data=None, json=None, **kwargs):
+        response = self.session.post(url, data=data, json=json, **kwargs)
+        body = json if json is not None else _json_loads(data)
+        self._record(url, body, response, 'POST')
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+def _json_loads(data):
+    try:
+        return json.loads(data) if data is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def seed_from_samples(store: FixtureStore, data_dir=None) -> FixtureStore:
+    """
+    Build Census state and BLS fixtures from the bundled sample datasets.
+
+    Returns
+    -------
+    FixtureStore
+        ``store``, for chaining
+    """
+    from kranalytics.columnar import load_sample_dataset
+
+    for dataset, variables in SAMPLE_CENSUS_VARIABLES.items():
+        df = load_sample_dataset(dataset, data_dir=data_dir)
+        year = int(df['year'].iloc[0])
+        rows = [['NAME'] + list(variables) + ['state']]
+        for record in df.itertuples(index=False):
+            values = [getattr(record, column) for column in variables.values()]
+            rows.append([record.state_name] + [_census_value(v) for v in values]
+                        + [f'{int(record.state_fips):02d}'])
+        store.record(f'https://{CENSUS_HOST}/data/{year}/acs/acs5',
+                     {'get': ','.join(rows[0][:-1]), 'for': 'state:*'}, rows)
+
+    df = load_sample_dataset('bls_employment_national', data_dir=data_dir)
+    series = []
+    for series_id, group in df.groupby('series_id', sort=False):
+        series.append({'seriesID': series_id, 'data': [
+            {'year': str(r.year), 'period': r.period, 'periodName': r.period_name,
+             'value': _census_value(r.value), 'footnotes': [{}]}
+            for r in group.itertuples(index=False)]})
+    years = df['year'].astype(int)
+    store.record(f'https://{BLS_HOST}/publicAPI/v2/timeseries/data/',
+                 {'seriesid': [s['seriesID'] for s in series],
+                  'startyear': str(years.min()), 'endyear': str(years.max())},
+                 _bls_result(series), method='POST')
+    return store
+
+
+def _census_value(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _bls_result(series: List[Dict]) -> Dict:
+    return {'status': 'REQUEST_SUCCEEDED', 'responseTime': 1, 'message': [],
+            'Results': {'series': series}}
+
+
+class _CensusTables:
+    """Fixture rows indexed by (path, geography level) and geography codes."""
+
+    def __init__(self, store: FixtureStore):
+        self.tables: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entry in store.entries().values():
+            if entry['host'] != CENSUS_HOST or entry['method'] != 'GET':
+                continue
+            payload = entry['payload']
+            if not isinstance(payload, list) or not payload:
+                continue
+            geo = _geo_names(entry['request'])
+            header = payload[0]
+            table = self.tables.setdefault((entry['path'], geo[-1]),
+                                           {'geo': geo, 'rows': {}})
+            positions = [header.index(name) for name in geo]
+            for row in payload[1:]:
+                code = tuple(row[i] for i in positions)
+                values = table['rows'].setdefault(code, {})
+                values.update((name, value) for name, value in zip(header, row)
+                              if name not in geo)
+
+    def select(self, path: str, level: str, wanted: List[str], codes: Optional[List[str]],
+               states: Optional[List[str]]) -> Optional[List[Tuple[tuple, Dict]]]:
+        """Rows of one level with every wanted column, or None if any is missing."""
+        table = self.tables.get((path, level))
+        if table is None:
+            return None
+        geo = table['geo']
+        rows = []
+        for code, values in table['rows'].items():
+            if codes is not None and code[-1] not in codes:
+                continue
+            if states is not None and 'state' in geo and code[geo.index('state')] not in states:
+                continue
+            rows.append((code, values))
+        if not rows or any(name not in values for _, values in rows for name in wanted):
+            return None
+        return sorted(rows, key=lambda item: item[0])
+
+
+def _bls_series(store: FixtureStore) -> Dict[str, List[Dict]]:
+    """Every recorded BLS observation by series ID, merged across batches, newest first."""
+    series: Dict[str, List[Dict]] = {}
+    for entry in store.entries().values():
+        payload = entry['payload']
+        if entry['host'] != BLS_HOST or not isinstance(payload, dict):
+            continue
+        for item in payload.get('Results', {}).get('series', []):
+            known = {(d['year'], d['period']): d for d in series.get(item['seriesID'], [])}
+            known.update(((d['year'], d['period']), d) for d in item['data'])
+            series[item['seriesID']] = sorted(known.values(), reverse=True,
+                                              key=lambda d: (d['year'], d['period']))
+    return series
+
+
+def _geo_names(request: Mapping[str, Any]) -> List[str]:
+    names = []
+    for part in (request.get('in'), request.get('for')):
+        if part:
+            names.append(part.split(':')[0])
+    return names
+
+
+class StandInServer:
+    """
+    Local HTTP server replaying (and extrapolating) recorded API responses.
+
+    Parameters
+    ----------
+    store : FixtureStore
+        Recorded responses
+    host, port : str, int
+        Address to bind (port 0 picks a free port)
+    latency : float
+        Seconds added to every response
+    jitter : float
+        Extra uniformly distributed delay, up to this many seconds
+    rate : float, optional
+        Sustained requests per second before answering 429 (default: no limit)
+    burst : float, optional
+        Requests allowed in a burst (default: ``rate``)
+    error_rate : float
+        Probability of answering 503
+    counties_per_state : int
+        Geographies synthesized per state for county/place requests that the
+        fixtures cannot answer (0 disables synthesis)
+    synthesize_series : bool
+        Answer unknown BLS series with synthesized data
+    seed : int
+        Seed for injected failures and synthesized values
+    """
+
+    def __init__(self, store: FixtureStore, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, rate: Optional[float] = None,
+                 burst: Optional[float] = None, error_rate: float = 0.0,
+                 counties_per_state: int = DEFAULT_COUNTIES_PER_STATE,
+                 synthesize_series: bool = True, seed: int = 0):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket = TokenBucket(rate, burst or max(1.0, rate)) if rate else None
+        self.error_rate = error_rate
+        self.counties_per_state = counties_per_state
+        self.synthesize_series = synthesize_series
+        self.seed = seed
+        self.stats = {'requests': 0, 'replayed': 0, 'assembled': 0, 'synthesized': 0,
+                      'throttled': 0, 'errors': 0, 'missing': 0}
+        self._random = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._census_tables: Optional[_CensusTables] = None
+        self._bls_series: Optional[Dict[str, List[Dict]]] = None
+        self._indexed_version: Optional[int] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Root URL of the running server."""
+        return f'http://{self.host}:{self.port}'
+
+    def url_for(self, upstream: str) -> str:
+        """Return the stand-in URL for an upstream endpoint (e.g. ``ACS_BASE_URL``)."""
+        return standin_url(upstream, self.url)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _draw(self) -> float:
+        with self._lock:
+            return float(self._random.random())
+
+    def _sync_indexes(self) -> None:
+        """Drop the Census tables and BLS series after the store records (call holding _lock)."""
+        version = self.store.version
+        if version != self._indexed_version:
+            self._census_tables = None
+            self._bls_series = None
+            self._indexed_version = version
+
+    def _tables(self) -> _CensusTables:
+        with self._lock:
+            self._sync_indexes()
+            if self._census_tables is None:
+                self._census_tables = _CensusTables(self.store)
+            return self._census_tables
+
+    def _series(self) -> Dict[str, List[Dict]]:
+        with self._lock:
+            self._sync_indexes()
+            if self._bls_series is None:
+                self._bls_series = _bls_series(self.store)
+            return self._bls_series
+
+    # Request handling --------------------------------------------------------
+
+    def respond(self, method: str, path: str, request: Dict[str, Any]) -> Tuple[int, Dict, Any]:
+        """Return (status, headers, JSON body) for one request."""
+        self._count('requests')
+        delay = self.latency + (self.jitter * self._draw() if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if self.bucket is not None:
+            wait = self.bucket.try_acquire()
+            if wait:
+                self._count('throttled')
+                return 429, {'Retry-After': f'{max(1, int(np.ceil(wait)))}'}, \
+                    {'error': 'Too Many Requests'}
+        if self.error_rate and self._draw() < self.error_rate:
+            self._count('errors')
+            return 503, {}, {'error': 'Service Unavailable (injected)'}
+
+        host, _, rest = path.lstrip('/').partition('/')
+        rest = '/' + rest.strip('/')
+        request = {k: v for k, v in request.items()
+                   if k.lower() not in ('key', 'registrationkey')}
+        recorded = self.store.lookup(host, rest, request)
+        if recorded is not None:
+            self._count('replayed')
+            return 200, {}, recorded
+        if host == CENSUS_HOST and method == 'GET':
+            body = self._census(rest, request)
+        elif host == BLS_HOST and method == 'POST':
+            body = self._bls(request)
+        else:
+            body = None
+        if body is None:
+            self._count('missing')
+            return 404, {}, {'error': f'No fixture for {method} {path} {request}'}
+        return 200, {}, body
+
+    def _census(self, path: str, request: Dict[str, Any]) -> Optional[List[List]]:
+        tables = self._tables()
+        columns = request.get('get', '').split(',')
+        wanted = [c for c in columns if c != 'NAME']
+        level, _, codes = request.get('for', '').partition(':')
+        codes = None if codes in ('', '*') else codes.split(',')
+        states = None
+        if request.get('in', '').startswith('state:'):
+            states = request['in'].split(':', 1)[1]
+            states = None if states == '*' else states.split(',')
+        geo = _geo_names({'for': request.get('for'),
+                          'in': 'state:*' if level in ('county', 'place') else None})
+
+        rows = tables.select(path, level, columns, codes, states)
+        if rows is not None:
+            self._count('assembled')
+            return [columns + geo] + [[values.get(c) for c in columns] + list(code)
+                                      for code, values in rows]
+
+        if level not in ('county', 'place') or not self.counties_per_state:
+            return None
+        state_rows = tables.select(path, 'state', columns, states, None)
+        if state_rows is None:
+            return None
+        self._count('synthesized')
+        body = [columns + geo]
+        for (state,), values in state_rows:
+            random = np.random.default_rng([self.seed, int(state)])
+            factors = np.exp(random.normal(0, 0.25, (self.counties_per_state, len(wanted))))
+            for i in range(self.counties_per_state):
+                code = f'{2 * i + 1:03d}'
+                if codes is not None and code not in codes:
+                    continue
+                row = []
+                for column in columns:
+                    if column == 'NAME':
+                        row.append(f"{level.title()} {code}, {values.get('NAME', state)}")
+                    else:
+                        row.append(_scale(values.get(column), factors[i, wanted.index(column)]))
+                body.append(row + [state, code])
+        return body
+
+    def _bls(self, request: Dict[str, Any]) -> Optional[Dict]:
+        series = self._series()
+        start, end = int(request.get('startyear', 0)), int(request.get('endyear', 9999))
+        results = []
+        synthesized = False
+        for series_id in request.get('seriesid', []):
+            data = series.get(series_id)
+            if data is None:
+                if not self.synthesize_series:
+                    return None
+                data = self._synthesize_series(series, series_id, start, end)
+                synthesized = True
+            results.append({'seriesID': series_id,
+                            'data': [d for d in data if start <= int(d['year']) <= end]})
+        self._count('synthesized' if synthesized else 'assembled')
+        return _bls_result(results)
+
+    def _synthesize_series(self, series: Dict[str, List[Dict]], series_id: str, start: int,
+                           end: int) -> List[Dict]:
+        """Monthly random walk around a recorded series (or 100) for an unknown ID."""
+        random = np.random.default_rng([self.seed, sum(map(ord, series_id))])
+        templates = sorted(series)
+        level = 100.0
+        if templates:
+            template = series[templates[random.integers(len(templates))]]
+            level = float(np.median([float(d['value']) for d in template]))
+        months = (end - start + 1) * 12
+        values = level * np.exp(np.cumsum(random.normal(0, 0.01, months)))
+        data = []
+        for i, value in enumerate(values):
+            year, month = start + i // 12, i % 12
+            data.append({'year': str(year), 'period': f'M{month + 1:02d}',
+                         'periodName': _MONTHS[month], 'value': f'{value:.1f}',
+                         'footnotes': [{}]})
+        return data[::-1]
+
+    # Lifecycle ---------------------------------------------------------------
+
+    def start(self) -> 'StandInServer':
+        """Serve in a background thread; returns self."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, method, request):
+                status, headers, body = server.respond(method, urlsplit(self.path).path,
+                                                       request)
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json;charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply('GET', dict(parse_qsl(urlsplit(self.path).query,
+                                                  keep_blank_values=True)))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self._reply('POST', _json_loads(self.rfile.read(length)) or {})
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name='kranalytics-api-standin')
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve until interrupted (starting first if needed)."""
+        if self._server is None:
+            self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _scale(value, factor: float) -> Optional[str]:
+    """Perturb one recorded Census value, keeping integers integral."""
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number < 0:          # Annotation sentinels pass through unchanged
+        return value
+    if number.is_integer() and '.' not in str(value):
+        return str(int(round(number * factor)))
+    # Ratios such as the Gini index vary much less between counties
+    factor = float(factor) ** 0.2 if number < 1 else float(factor)
+    return repr(round(number * factor, 4 if number < 1 else 2))
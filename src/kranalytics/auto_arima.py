@@ -0,0 +1,361 @@
+"""
+Automatic ARIMA order selection for single series and whole panels.
+
+The Employment Forecasting tutorial fits ``ARIMA(..., order=(1, 1, 1))`` for
+every state, and its ``adfuller`` / ``seasonal_decompose`` calls only feed
+printed diagnostics. :func:`select_order` chooses the order per series
+instead:
+
+- the differencing orders are fixed once per series: the seasonal order
+  ``D`` from the STL seasonal strength, then ``d`` from repeated KPSS (or
+  ADF) unit-root tests on the seasonally differenced series
+- every candidate ARMA(p, q)(P, Q) is fitted to that same differenced
+  series, so the differencing and the tests are not repeated per candidate
+  and the information criteria of all candidates are comparable
+- candidates are visited by increasing ``p + q + P + Q``; a candidate is
+  fitted only if one of the models it extends by a single term scored
+  within ``prune_delta`` of the best criterion seen so far, so unpromising
+  branches of the grid are never fitted
+- the candidates of each complexity level are fitted concurrently
+- the chosen order is refitted on the original series
+
+:func:`select_orders` runs the search for every series of a long-format
+panel in a process pool, and ``forecast_panel(..., order='auto')`` uses it
+to pick each series' order from its train window.
+
+Example
+-------
+>>> selection = select_order(df_focus_single['value'], seasonal_period=12)
+>>> selection.order, selection.seasonal_order
+((2, 1, 0), (0, 0, 0, 0))
+>>> selection.results.forecast(12)
+>>> df_orders = select_orders(df_employment, seasonal_period=12, max_workers=8)
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+CRITERIA = ('aic', 'aicc', 'bic', 'hqic')
+UNIT_ROOT_TESTS = ('kpss', 'adf')
+
+# Hyndman & Athanasopoulos: seasonally difference when F_s exceeds 0.64
+SEASONAL_STRENGTH_THRESHOLD = 0.64
+
+SELECTION_COLUMNS = ['series_id', 'p', 'd', 'q', 'P', 'D', 'Q', 'm', 'criterion', 'ic',
+                     'n_fits', 'n_grid', 'status', 'error']
+
+
+def difference(values: np.ndarray, d: int = 0, D: int = 0, m: int = 0) -> np.ndarray:
+    """Apply ``D`` seasonal differences of lag ``m``, then ``d`` regular ones."""
+    x = np.asarray(values, dtype=float)
+    for _ in range(D):
+        x = x[m:] - x[:-m]
+    for _ in range(d):
+        x = np.diff(x)
+    return x
+
+
+def _is_stationary(x: np.ndarray, test: str, alpha: float) -> bool:
+    from statsmodels.tsa.stattools import adfuller, kpss
+
+    if np.ptp(x) == 0:
+        return True
+    with warnings.catch_warnings():
+        # KPSS warns when its p-value is outside the interpolation table
+        warnings.simplefilter('ignore')
+        if test == 'kpss':
+            return kpss(x, regression='c', nlags='auto')[1] >= alpha
+        return adfuller(x, autolag='AIC')[1] < alpha
+
+
+def ndiffs(values: np.ndarray, test: str = 'kpss', alpha: float = 0.05, max_d: int = 2) -> int:
+    """
+    Estimate the number of regular differences needed for stationarity.
+
+    Parameters
+    ----------
+    values : array-like
+        Series (already seasonally differenced, if needed)
+    test : str
+        'kpss' (null: stationary) or 'adf' (null: unit root)
+    alpha : float
+        Test level
+    max_d : int
+        Maximum differences
+
+    Returns
+    -------
+    int
+    """
+    if test not in UNIT_ROOT_TESTS:
+        raise ValueError(f"Invalid test: {test}. Must be one of: {', '.join(UNIT_ROOT_TESTS)}")
+    x = np.asarray(values, dtype=float)
+    d = 0
+    while d < max_d and len(x) > 10 and not _is_stationary(x, test, alpha):
+        x = np.diff(x)
+        d += 1
+    return d
+
+
+def seasonal_strength(values: np.ndarray, m: int) -> float:
+    """STL seasonal strength ``max(0, 1 - Var(R) / Var(S + R))``."""
+    from statsmodels.tsa.seasonal import STL
+
+    x = np.asarray(values, dtype=float)
+    decomposition = STL(x, period=m, robust=True).fit()
+    remainder = np.var(decomposition.resid)
+    total = np.var(decomposition.seasonal + decomposition.resid)
+    return float(max(0.0, 1 - remainder / total)) if total > 0 else 0.0
+
+
+def nsdiffs(values: np.ndarray, m: int, max_D: int = 1,
+            threshold: float = SEASONAL_STRENGTH_THRESHOLD) -> int:
+    """Estimate the number of seasonal differences from the seasonal strength."""
+    x = np.asarray(values, dtype=float)
+    D = 0
+    while D < max_D and len(x) >= 2 * m + 1 and seasonal_strength(x, m) > threshold:
+        x = x[m:] - x[:-m]
+        D += 1
+    return D
+
+
+@dataclass
+class OrderSelection:
+    """
+    Outcome of an order search.
+
+    ``candidates`` has one row per fitted candidate (p, q, P, Q, ic, error),
+    best first; ``n_fits`` of ``n_grid`` grid points were fitted.
+    ``results`` is the chosen model refitted on the original series (None
+    when selecting with ``fit=False``).
+    """
+
+    order: Tuple[int, int, int]
+    seasonal_order: Tuple[int, int, int, int]
+    criterion: str
+    ic: float
+    candidates: pd.DataFrame
+    n_fits: int
+    n_grid: int
+    results: Any = None
+
+    @property
+    def trend(self) -> str:
+        """Constant term for undifferenced models, none otherwise."""
+        return 'c' if self.order[1] + self.seasonal_order[1] == 0 else 'n'
+
+
+def _fit_candidate(x: np.ndarray, candidate: Tuple[int, int, int, int], m: int, trend: str,
+                   criterion: str) -> Tuple[float, Optional[str]]:
+    """Fit ARMA(p, q)(P, Q) to the differenced series; return (ic, error)."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    p, q, P, Q = candidate
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            results = ARIMA(x, order=(p, 0, q),
+                            seasonal_order=(P, 0, Q, m) if m else (0, 0, 0, 0),
+                            trend=trend).fit()
+        ic = float(getattr(results, criterion))
+    except Exception as e:
+        return np.inf, f'{type(e).__name__}: {e}'
+    if not np.isfinite(ic):
+        return np.inf, f'non-finite {criterion}'
+    return ic, None
+
+
+def _parents(candidate: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    """Models that ``candidate`` extends by one term."""
+    return [candidate[:i] + (value - 1,) + candidate[i + 1:]
+            for i, value in enumerate(candidate) if value > 0]
+
+
+def select_order(values: Sequence[float], seasonal_period: Optional[int] = None,
+                 max_p: int = 3, max_q: int = 3, max_P: int = 1, max_Q: int = 1,
+                 max_order: Optional[int] = 5, d: Optional[int] = None,
+                 D: Optional[int] = None, max_d: int = 2, max_D: int = 1,
+                 test: str = 'kpss', alpha: float = 0.05, criterion: str = 'aicc',
+                 prune_delta: Optional[float] = 2.0, fit: bool = True,
+                 max_workers: Optional[int] = None) -> OrderSelection:
+    """
+    Choose a (seasonal) ARIMA order for one series.
+
+    Parameters
+    ----------
+    values : array-like
+        Series in time order, without gaps
+    seasonal_period : int, optional
+        Seasonal period (12 for monthly data); None searches non-seasonal
+        models only
+    max_p, max_q, max_P, max_Q : int
+        Grid bounds
+    max_order : int, optional
+        Maximum ``p + q + P + Q`` (None: no bound)
+    d, D : int, optional
+        Fixed differencing orders (default: estimated with ``ndiffs`` and
+        ``nsdiffs``)
+    max_d, max_D : int
+        Bounds for the estimated differencing orders
+    test : str
+        Unit-root test for ``d``: 'kpss' or 'adf'
+    alpha : float
+        Unit-root test level
+    criterion : str
+        One of CRITERIA
+    prune_delta : float, optional
+        Extend a model only if its criterion is within this margin of the
+        best so far; None fits the whole grid
+    fit : bool
+        Refit the chosen order on ``values`` and return it as ``results``
+    max_workers : int, optional
+        Threads fitting the candidates of a level (default: CPU count)
+
+    Returns
+    -------
+    OrderSelection
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"Invalid criterion: {criterion}. Must be one of: {', '.join(CRITERIA)}")
+    values = np.asarray(values, dtype=float)
+    if np.isnan(values).any():
+        raise ValueError("Series contains missing values")
+    m = int(seasonal_period or 0)
+    if m == 1:
+        m = 0
+    if not m:
+        max_P = max_Q = 0
+        D = 0
+
+    if D is None:
+        D = nsdiffs(values, m, max_D)
+    x = difference(values, D=D, m=m)
+    if d is None:
+        d = ndiffs(x, test, alpha, max_d)
+    x = difference(x, d=d)
+    trend = 'c' if d + D == 0 else 'n'
+
+    grid = [c for c in product(range(max_p + 1), range(max_q + 1),
+                               range(max_P + 1), range(max_Q + 1))
+            if max_order is None or sum(c) <= max_order]
+    levels: Dict[int, List[Tuple[int, ...]]] = {}
+    for candidate in grid:
+        levels.setdefault(sum(candidate), []).append(candidate)
+
+    fitted: Dict[Tuple[int, ...], Tuple[float, Optional[str]]] = {}
+    best = np.inf
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for level in sorted(levels):
+            candidates = [c for c in levels[level] if level == 0 or prune_delta is None or any(
+                parent in fitted and fitted[parent][0] <= best + prune_delta
+                for parent in _parents(c))]
+            if not candidates:
+                break
+            scores = executor.map(lambda c: _fit_candidate(x, c, m, trend, criterion),
+                                  candidates)
+            for candidate, score in zip(candidates, scores):
+                fitted[candidate] = score
+                best = min(best, score[0])
+
+    if not np.isfinite(best):
+        errors = sorted({error for _, error in fitted.values() if error})
+        raise ValueError(f"No candidate ARIMA model could be fitted: {'; '.join(errors)}")
+
+    candidates = pd.DataFrame([(*c, ic, error) for c, (ic, error) in fitted.items()],
+                              columns=['p', 'q', 'P', 'Q', 'ic', 'error'])
+    candidates = candidates.sort_values(['ic', 'p', 'q', 'P', 'Q'], kind='stable',
+                                        ignore_index=True)
+    p, q, P, Q = (int(v) for v in candidates.loc[0, ['p', 'q', 'P', 'Q']])
+    selection = OrderSelection(order=(p, d, q), seasonal_order=(P, D, Q, m) if m else (0, 0, 0, 0),
+                               criterion=criterion, ic=float(candidates.loc[0, 'ic']),
+                               candidates=candidates, n_fits=len(fitted), n_grid=len(grid))
+    if fit:
+        from statsmodels.tsa.arima.model import ARIMA
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            selection.results = ARIMA(values, order=selection.order,
+                                      seasonal_order=selection.seasonal_order,
+                                      trend=selection.trend).fit()
+    return selection
+
+
+def _select_one(task: Tuple) -> Dict:
+    """Search one panel series; failures become status rows."""
+    series_id, values, options, keep_results = task
+    try:
+        selection = select_order(values, fit=keep_results, max_workers=1, **options)
+    except Exception as e:
+        return {'series_id': series_id, 'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+    p, d, q = selection.order
+    P, D, Q, m = selection.seasonal_order
+    row = {'series_id': series_id, 'p': p, 'd': d, 'q': q, 'P': P, 'D': D, 'Q': Q, 'm': m,
+           'criterion': selection.criterion, 'ic': selection.ic, 'n_fits': selection.n_fits,
+           'n_grid': selection.n_grid, 'status': 'ok', 'error': None}
+    if keep_results:
+        row['results'] = selection.results
+    return row
+
+
+def _init_worker() -> None:
+    warnings.simplefilter('ignore')
+
+
+def select_orders(df: pd.DataFrame, id_col: str = 'series_id', date_col: str = 'date',
+                  value_col: str = 'value', series: Optional[Iterable] = None,
+                  keep_results: bool = False, max_workers: Optional[int] = None,
+                  **options) -> pd.DataFrame:
+    """
+    Choose an ARIMA order for every series of a long-format panel.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Long-format panel, e.g. ``df_employment`` or a county panel
+    id_col, date_col, value_col : str
+        Series identifier, date and value columns
+    series : iterable, optional
+        Subset of series IDs (default: all)
+    keep_results : bool
+        Refit each chosen order and return it in a 'results' column
+    max_workers : int, optional
+        Worker processes (default: CPU count); 1 runs in-process
+    **options
+        Passed to :func:`select_order` (seasonal_period, max_p, criterion,
+        prune_delta, ...)
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per series with columns: series_id, p, d, q, P, D, Q, m,
+        criterion, ic, n_fits, n_grid, status, error (and results). A
+        series whose search failed has status 'failed'.
+    """
+    panel = df[[id_col, date_col, value_col]].sort_values([id_col, date_col], kind='stable')
+    if series is not None:
+        panel = panel[panel[id_col].isin(list(series))]
+    tasks = [(series_id, group[value_col].to_numpy(dtype=float), options, keep_results)
+             for series_id, group in panel.groupby(id_col, sort=False)]
+
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        rows = [_select_one(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            rows = list(executor.map(_select_one, tasks, chunksize=chunksize))
+
+    columns = SELECTION_COLUMNS + (['results'] if keep_results else [])
+    result = pd.DataFrame(rows, columns=columns)
+    for column in ('p', 'd', 'q', 'P', 'D', 'Q', 'm', 'n_fits', 'n_grid'):
+        result[column] = result[column].astype('Int64')
+    return result.rename(columns={'series_id': id_col} if id_col != 'series_id' else {})
@@ -0,0 +1,308 @@
+"""
+Performance benchmarks with size-parameterized workloads.
+
+Each workload reproduces one hot path of the tutorials at a configurable
+scale (``small``, ``state``, ``county``, ``large``): the chunked county-year
+generator that follows the Crime Prediction tutorial's model (see
+:mod:`kranalytics.synthetic`), the Inequality Analysis bracket data and
+index computation, sample dataset loading (CSV and columnar), the BLS
+long-to-wide reshape and Census response parsing.
+
+:func:`run_benchmarks` records, per workload and size, the median and best
+wall time over ``repeat`` runs, the peak traced memory of one extra run
+(``tracemalloc``; NumPy allocations included) and the throughput in rows
+per second. Results are saved as JSON baselines and :func:`compare_to_baseline`
+flags workloads whose median time or peak memory grew beyond a tolerance.
+
+Example
+-------
+>>> results = run_benchmarks(size='county')
+>>> save_baseline(results, 'data/benchmarks/baseline.json')
+>>> report = compare_to_baseline(run_benchmarks(size='county'),
+...                              load_baseline('data/benchmarks/baseline.json'))
+>>> report[report['regression']]
+"""
+
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'data' / 'benchmarks' / 'baseline.json'
+
+# Number of geographies (or series) per workload size; 'county' matches the
+# 3,143 US counties the tutorials are meant to scale to
+SIZES = {
+    'small': 150,
+    'state': 51,
+    'county': 3_143,
+    'large': 50_000,
+}
+
+DEFAULT_TOLERANCE = 0.20
+
+WORKLOADS: Dict[str, Callable] = {}
+
+
+def workload(name: str):
+    """
+    Register a workload.
+
+    The decorated function receives the size ``n`` and a scratch directory,
+    performs any untimed setup and returns the timed callable, which must
+    return the number of rows it processed.
+    """
+    def register(func):
+        WORKLOADS[name] = func
+        return func
+    return register
+
+
+def income_bracket_counts(n_geographies: int, seed: int = 42) -> np.ndarray:
+    """Household counts over the 16 ACS B19001 brackets, as in the fallback data."""
+    rng = np.random.default_rng(seed)
+    households = rng.lognormal(11, 1.0, n_geographies)
+    shares = rng.dirichlet(np.linspace(2.0, 0.6, 16), n_geographies)
+    return np.round(shares * households[:, np.newaxis])
+
+
+INCOME_BRACKET_MIDPOINTS = np.array([5000, 12500, 17500, 22500, 27500, 32500, 37500, 42500,
+                                     47500, 55000, 67500, 87500, 112500, 137500, 175000, 250000])
+
+
+@workload('synthetic_crime_chunks')
+def _synthetic_crime_chunks(n: int, workdir: Path) -> Callable[[], int]:
+    from kranalytics.synthetic import iter_chunks
+
+    return lambda: sum(len(chunk) for chunk in iter_chunks('county_crime', n))
+
+
+@workload('inequality_indices')
+def _inequality_indices(n: int, workdir: Path) -> Callable[[], int]:
+    from kranalytics.inequality import compute_inequality_indices
+
+    counts = income_bracket_counts(n)
+    return lambda: len(compute_inequality_indices(counts, INCOME_BRACKET_MIDPOINTS))
+
+
+def _write_sample(n: int, workdir: Path) -> str:
+    from kranalytics.synthetic import iter_chunks
+
+    df = pd.concat(iter_chunks('county_crime', n, start_year=2023, end_year=2023),
+                   ignore_index=True)
+    df.insert(0, 'state_fips', np.char.zfill((np.arange(n) % 56 + 1).astype(str), 2))
+    df.to_csv(workdir / 'benchmark_sample.csv', index=False)
+    return 'benchmark_sample'
+
+
+@workload('csv_load')
+def _csv_load(n: int, workdir: Path) -> Callable[[], int]:
+    from kranalytics.columnar import load_sample_dataset
+
+    name = _write_sample(n, workdir)
+    return lambda: len(load_sample_dataset(name, data_dir=workdir))
+
+
+@workload('columnar_load')
+def _columnar_load(n: int, workdir: Path) -> Callable[[], int]:
+    from kranalytics.columnar import convert_csv, load_sample_dataset
+
+    name = _write_sample(n, workdir)
+    convert_csv(workdir / f'{name}.csv')
+    columns = ['state_fips', 'poverty_rate', 'crime_count']
+
+    def run():
+        df = load_sample_dataset(name, columns, data_dir=workdir)
+        df['crime_count'].sum()  # touch the mapped pages
+        return len(df)
+    return run
+
+
+@workload('bls_long_to_wide')
+def _bls_long_to_wide(n: int, workdir: Path) -> Callable[[], int]:
+    rng = np.random.default_rng(42)
+    dates = pd.date_range('2015-01-01', periods=120, freq='MS')
+    df = pd.DataFrame({
+        'series_id': np.repeat([f'LAUCN{i:010d}03' for i in range(n)], len(dates)),
+        'date': np.tile(dates, n),
+        'value': rng.normal(4.5, 1.5, n * len(dates)).round(1),
+    })
+
+    def run():
+        df.pivot(index='date', columns='series_id', values='value')
+        return len(df)
+    return run
+
+
+@workload('census_parse')
+def _census_parse(n: int, workdir: Path) -> Callable[[], int]:
+    from kranalytics.census_acs import parse_census_json
+
+    variables = [f'B19001_{i:03d}E' for i in range(1, 18)]
+    counts = income_bracket_counts(n).astype(int)
+    rows = [['NAME'] + variables + ['state', 'county']]
+    rows += [[f'County {i}', str(int(counts[i].sum()))] + [str(v) for v in counts[i]]
+             + [f'{i % 56:02d}', f'{i:03d}'] for i in range(n)]
+    body = json.dumps(rows)
+    chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+    return lambda: len(parse_census_json(chunks, variables))
+
+
+def measure(func: Callable[[], int], repeat: int = 3) -> Dict:
+    """
+    Time a workload callable and trace its peak memory.
+
+    Timing runs are not traced (tracing slows allocation-heavy code); the
+    peak is taken from one additional traced run.
+
+    Returns
+    -------
+    dict
+        rows, wall_time (median seconds), wall_time_min, peak_memory_bytes
+        and throughput (rows per second at the median time)
+    """
+    times = []
+    rows = 0
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        rows = func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        'rows': int(rows),
+        'wall_time': median,
+        'wall_time_min': min(times),
+        'peak_memory_bytes': int(peak),
+        'throughput': rows / median if median > 0 else float('inf'),
+    }
+
+
+def run_benchmarks(size: str = 'small', names: Optional[Iterable[str]] = None,
+                   repeat: int = 3, verbose: bool = False) -> List[Dict]:
+    """
+    Run registered workloads at one size.
+
+    Parameters
+    ----------
+    size : str or int
+        A key of SIZES, or an explicit number of geographies/series
+    names : iterable of str, optional
+        Workloads to run (default: all registered)
+    repeat : int
+        Timed runs per workload
+    verbose : bool
+        Print one line per workload as it completes
+
+    Returns
+    -------
+    list of dict
+        One result per workload (see ``measure``) with name, size and n
+    """
+    n = SIZES[size] if isinstance(size, str) else int(size)
+    names = list(WORKLOADS) if names is None else list(names)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        raise ValueError(f"Unknown workloads: {unknown}. Available: {', '.join(WORKLOADS)}")
+
+    results = []
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix='kranalytics-bench-') as workdir:
+            func = WORKLOADS[name](n, Path(workdir))
+            result = {'name': name, 'size': str(size), 'n': n, **measure(func, repeat)}
+        results.append(result)
+        if verbose:
+            print(f"  {name:<20} {result['wall_time'] * 1000:>10.1f} ms  "
+                  f"{result['peak_memory_bytes'] / 1e6:>8.1f} MB  "
+                  f"{result['throughput']:>14,.0f} rows/s")
+    return results
+
+
+def save_baseline(results: List[Dict], path=None) -> Path:
+    """Write benchmark results and environment details as a JSON baseline."""
+    path = Path(path) if path is not None else DEFAULT_BASELINE
+    baseline = {
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+    atomic_write_bytes(path, json.dumps(baseline, indent=2).encode('utf-8'))
+    return path
+
+
+def load_baseline(path=None) -> Dict:
+    """Read a JSON baseline written by ``save_baseline``."""
+    path = Path(path) if path is not None else DEFAULT_BASELINE
+    return json.loads(path.read_text())
+
+
+def compare_to_baseline(results: List[Dict], baseline: Dict,
+                        tolerance: float = DEFAULT_TOLERANCE,
+                        memory_tolerance: Optional[float] = None) -> pd.DataFrame:
+    """
+    Compare benchmark results against a stored baseline.
+
+    Parameters
+    ----------
+    results : list of dict
+        Output of ``run_benchmarks``
+    baseline : dict
+        Output of ``load_baseline``
+    tolerance : float
+        Allowed relative increase in median wall time (0.2 = 20% slower)
+    memory_tolerance : float, optional
+        Allowed relative increase in peak memory (default: ``tolerance``)
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per workload and size found in both runs with baseline and
+        current time/memory, their ratios and a boolean 'regression'
+    """
+    memory_tolerance = tolerance if memory_tolerance is None else memory_tolerance
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in results:
+        base = previous.get((result['name'], result['size']))
+        if base is None:
+            continue
+        time_ratio = result['wall_time'] / base['wall_time'] if base['wall_time'] else np.inf
+        memory_ratio = (result['peak_memory_bytes'] / base['peak_memory_bytes']
+                        if base['peak_memory_bytes'] else 1.0)
+        rows.append({
+            'name': result['name'],
+            'size': result['size'],
+            'baseline_time': base['wall_time'],
+            'current_time': result['wall_time'],
+            'time_ratio': time_ratio,
+            'baseline_memory': base['peak_memory_bytes'],
+            'current_memory': result['peak_memory_bytes'],
+            'memory_ratio': memory_ratio,
+            'regression': bool(time_ratio > 1 + tolerance
+                               or memory_ratio > 1 + memory_tolerance),
+        })
+    return pd.DataFrame(rows, columns=['name', 'size', 'baseline_time', 'current_time',
+                                       'time_ratio', 'baseline_memory', 'current_memory',
+                                       'memory_ratio', 'regression'])
@@ -0,0 +1,396 @@
+"""
+Incremental delta sync for BLS time series.
+
+A :class:`BLSSeriesStore` keeps every observation on disk, one CSV per series,
+keyed by ``(series_id, year, period)``. :func:`sync_bls_series` asks the BLS
+API only for the years after the last stored period of each series, plus a
+configurable trailing revision window, and merges the response in place:
+new periods are appended and revised values overwrite the stored ones.
+
+Series that need the same start year are batched together (up to the API's
+50-series limit), so a daily refresh of the 51 LAUS state series is a
+couple of single-year requests instead of a full ``start_year..end_year``
+pull per run.
+
+For bulk pulls that may outlast the daily API quota,
+:func:`queued_sync_bls_series` persists the plan as a resumable job queue
+and sends it through a :class:`~kranalytics.scheduler.RequestScheduler`.
+
+Example
+-------
+>>> store = BLSSeriesStore('data/cache/bls')
+>>> summary = sync_bls_series(series_ids, store, 2010, 2024, api_key=api_key)
+>>> df = store.to_frame(series_ids, 2010, 2024)
+"""
+
+import io
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+
+BLS_API_URL = 'https://api.bls.gov/publicAPI/v2/timeseries/data/'
+MAX_SERIES_PER_REQUEST = 50
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'bls'
+
+KEY_COLUMNS = ['series_id', 'year', 'period']
+STORE_COLUMNS = KEY_COLUMNS + ['period_name', 'value', 'footnotes']
+
+_PERIOD = re.compile(r'^[A-Z](\d{2})$')
+
+
+def period_number(period: str) -> int:
+    """Return the numeric part of a BLS period code ('M07' -> 7, 'Q02' -> 2)."""
+    match = _PERIOD.match(period)
+    if not match:
+        raise ValueError(f"Unrecognized BLS period code: {period!r}")
+    return int(match.group(1))
+
+
+def parse_bls_response(result: Dict) -> pd.DataFrame:
+    """
+    Convert a BLS API v2 JSON response into a long-format DataFrame.
+
+    Parameters
+    ----------
+    result : dict
+        Decoded response from the timeseries/data endpoint
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns: series_id, year, period, period_name, value, footnotes
+
+    Raises
+    ------
+    RuntimeError
+        If the API reports anything other than REQUEST_SUCCEEDED
+    """
+    if result.get('status') != 'REQUEST_SUCCEEDED':
+        raise RuntimeError(f"BLS API error: {result.get('message', ['Unknown API error'])}")
+
+    records = []
+    for series in result['Results']['series']:
+        series_id = series['seriesID']
+        for item in series['data']:
+            footnotes = [f.get('text', '') for f in item.get('footnotes') or []
+                         if isinstance(f, dict) and f.get('text')]
+            records.append({
+                'series_id': series_id,
+                'year': int(item['year']),
+                'period': item['period'],
+                'period_name': item['periodName'],
+                'value': float(item['value']),
+                'footnotes': '; '.join(footnotes),
+            })
+    return pd.DataFrame(records, columns=STORE_COLUMNS)
+
+
+def fetch_bls_series(series_ids: List[str], start_year: int, end_year: int,
+                     api_key: Optional[str] = None, session=None, cache=None,
+                     url: str = BLS_API_URL) -> pd.DataFrame:
+    """
+    Fetch one batch of BLS series (at most 50) for a year window.
+
+    Parameters
+    ----------
+    series_ids : list of str
+        BLS series IDs
+    start_year, end_year : int
+        Inclusive year window
+    api_key : str, optional
+        BLS registration key
+    session : requests.Session, optional
+        Session to reuse (a new one is created when omitted)
+    cache : ResponseCache, optional
+        On-disk response cache
+    url : str
+        API endpoint
+
+    Returns
+    -------
+    pandas.DataFrame
+        Parsed observations (see ``parse_bls_response``)
+    """
+    if len(series_ids) > MAX_SERIES_PER_REQUEST:
+        raise ValueError(f"BLS accepts at most {MAX_SERIES_PER_REQUEST} series per request")
+    if session is None:
+        import requests
+        session = requests.Session()
+
+    payload = {
+        'seriesid': list(series_ids),
+        'startyear': str(start_year),
+        'endyear': str(end_year),
+    }
+    if api_key:
+        payload['registrationkey'] = api_key
+
+    if cache is not None:
+        result = cache.fetch_json(session, url, payload=payload,
+                                  cacheable=lambda r: r.get('status') == 'REQUEST_SUCCEEDED')
+    else:
+        import json
+        response = session.post(url, data=json.dumps(payload),
+                                headers={'Content-type': 'application/json'}, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+    return parse_bls_response(result)
+
+
+class BLSSeriesStore:
+    """
+    Local per-series observation store keyed by (series_id, year, period).
+
+    Parameters
+    ----------
+    store_dir : str or Path, optional
+        Directory holding one ``<series_id>.csv`` per series
+        (default: data/cache/bls)
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = Path(store_dir) if store_dir is not None else DEFAULT_STORE_DIR
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, series_id: str) -> Path:
+        return self.store_dir / f'{series_id}.csv'
+
+    def series_ids(self) -> List[str]:
+        """Return the IDs of all stored series."""
+        return sorted(p.stem for p in self.store_dir.glob('*.csv'))
+
+    def load(self, series_id: str) -> pd.DataFrame:
+        """Return the stored observations of one series (empty if unknown)."""
+        path = self._path(series_id)
+        if not path.exists():
+            return pd.DataFrame(columns=STORE_COLUMNS)
+        return pd.read_csv(path, dtype={'series_id': str, 'period': str, 'period_name': str,
+                                        'footnotes': str}, keep_default_na=False)
+
+    def last_period(self, series_id: str) -> Optional[Tuple[int, str]]:
+        """Return the latest stored (year, period) of a series, or None."""
+        df = self.load(series_id)
+        if df.empty:
+            return None
+        order = df['year'] * 100 + df['period'].map(period_number)
+        row = df.loc[order.idxmax()]
+        return int(row['year']), row['period']
+
+    def upsert(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Merge observations into the store, replacing revised values.
+
+        Returns
+        -------
+        dict
+            Counts of 'added' and 'revised' observations
+        """
+        added = revised = 0
+        for series_id, new in df.groupby('series_id', sort=False):
+            old = self.load(series_id)
+            merged = new[STORE_COLUMNS] if old.empty else pd.concat(
+                [old, new[STORE_COLUMNS]], ignore_index=True)
+            merged = merged.drop_duplicates(KEY_COLUMNS, keep='last')
+
+            if old.empty:
+                added += len(new)
+            else:
+                joined = new.merge(old[KEY_COLUMNS + ['value']], on=KEY_COLUMNS, how='left',
+                                   suffixes=('', '_old'), indicator=True)
+                added += int((joined['_merge'] == 'left_only').sum())
+                both = joined[joined['_merge'] == 'both']
+                revised += int((both['value'] != both['value_old']).sum())
+
+            order = merged['year'] * 100 + merged['period'].map(period_number)
+            merged = (merged.assign(_order=order)
+                      .sort_values('_order', ascending=False, kind='stable')
+                      .drop(columns='_order'))
+            buffer = io.StringIO()
+            merged.to_csv(buffer, index=False)
+            atomic_write_bytes(self._path(series_id), buffer.getvalue().encode('utf-8'))
+        return {'added': added, 'revised': revised}
+
+    def to_frame(self, series_ids: Optional[Iterable[str]] = None,
+                 start_year: Optional[int] = None, end_year: Optional[int] = None) -> pd.DataFrame:
+        """
+        Return stored observations in BLS order (series, newest period first).
+
+        Parameters
+        ----------
+        series_ids : list of str, optional
+            Series to include (default: every stored series)
+        start_year, end_year : int, optional
+            Inclusive year filter
+        """
+        series_ids = self.series_ids() if series_ids is None else list(series_ids)
+        frames = [self.load(series_id) for series_id in series_ids]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=STORE_COLUMNS)
+        if start_year is not None:
+            df = df[df['year'] >= start_year]
+        if end_year is not None:
+            df = df[df['year'] <= end_year]
+        return df.reset_index(drop=True)
+
+
+def plan_sync(store: BLSSeriesStore, series_ids: Iterable[str], start_year: int,
+              end_year: int, revision_months: int = 12,
+              batch_size: int = MAX_SERIES_PER_REQUEST) -> List[Tuple[int, List[str]]]:
+    """
+    Plan the requests needed to bring ``series_ids`` up to date.
+
+    A series with no stored data is requested from ``start_year``. Otherwise
+    the request starts at the year containing the month ``revision_months``
+    before its last stored period (never before ``start_year``), so recent
+    BLS revisions are picked up. The API filters by year only, so that is
+    the finest window it can express.
+
+    Returns
+    -------
+    list of (start_year, series batch)
+        Batches share a start year and hold at most ``batch_size`` series
+    """
+    batch_size = min(batch_size, MAX_SERIES_PER_REQUEST)
+    groups = defaultdict(list)
+    for series_id in series_ids:
+        last = store.last_period(series_id)
+        if last is None:
+            start = start_year
+        else:
+            year, period = last
+            month_index = year * 12 + min(period_number(period), 12) - 1 - revision_months
+            start = max(start_year, month_index // 12)
+        groups[min(start, end_year)].append(series_id)
+
+    plan = []
+    for start in sorted(groups):
+        batch = groups[start]
+        for i in range(0, len(batch), batch_size):
+            plan.append((start, batch[i:i + batch_size]))
+    return plan
+
+
+def sync_bls_series(series_ids: Iterable[str], store: BLSSeriesStore, start_year: int,
+                    end_year: int, api_key: Optional[str] = None, revision_months: int = 12,
+                    batch_size: int = MAX_SERIES_PER_REQUEST, session=None, cache=None,
+                    fetch: Optional[Callable[[List[str], int, int], pd.DataFrame]] = None) -> Dict:
+    """
+    Bring the local store up to date for ``series_ids``.
+
+    Parameters
+    ----------
+    series_ids : list of str
+        BLS series IDs
+    store : BLSSeriesStore
+        Local observation store, updated in place
+    start_year, end_year : int
+        Inclusive year window of interest
+    api_key : str, optional
+        BLS registration key
+    revision_months : int
+        Trailing window re-requested before the last stored period
+    batch_size : int
+        Series per request (max 50)
+    session, cache : optional
+        Passed to ``fetch_bls_series``
+    fetch : callable, optional
+        ``fetch(batch, start_year, end_year) -> DataFrame`` override, used
+        to route requests through a caller's own session or scheduler
+
+    Returns
+    -------
+    dict
+        requests, series, added and revised counts
+    """
+    series_ids = list(series_ids)
+    if fetch is None:
+        if session is None:
+            import requests
+            session = requests.Session()
+
+        def fetch(batch, start, end):
+            return fetch_bls_series(batch, start, end, api_key=api_key,
+                                    session=session, cache=cache)
+
+    summary = {'requests': 0, 'series': len(series_ids), 'added': 0, 'revised': 0}
+    for batch_start, batch in plan_sync(store, series_ids, start_year, end_year,
+                                        revision_months, batch_size):
+        df = fetch(batch, batch_start, end_year)
+        counts = store.upsert(df)
+        summary['requests'] += 1
+        summary['added'] += counts['added']
+        summary['revised'] += counts['revised']
+    return summary
+
+
+def queued_sync_bls_series(series_ids: Iterable[str], store: BLSSeriesStore, start_year: int,
+                           end_year: int, queue_path, scheduler=None,
+                           api_key: Optional[str] = None, revision_months: int = 12,
+                           session=None, cache=None) -> Dict:
+    """
+    Resumable, quota-aware variant of :func:`sync_bls_series`.
+
+    The sync plan is stored as one job per series in a
+    :class:`~kranalytics.scheduler.JobQueue` at ``queue_path``. Batches
+    are sized by the scheduler's adaptive BLS batch size and every request
+    goes through its rate limit, daily quota and retry policy. When the
+    quota runs out the run stops cleanly; calling again with the same
+    ``queue_path`` (e.g. the next day) continues with the unfinished
+    series and retries the ones that failed in earlier runs. The queue file
+    is removed once every job is done.
+
+    Returns
+    -------
+    dict
+        requests, series, added and revised counts, plus 'done', 'pending'
+        and 'failed' job counts and 'stopped' ('quota' or None)
+    """
+    import requests
+
+    from kranalytics.scheduler import JobQueue, QuotaExceededError, RequestScheduler, \
+        ScheduledSession
+
+    scheduler = scheduler or RequestScheduler()
+    session = ScheduledSession(session or requests.Session(), scheduler, 'bls', api_key)
+    queue = JobQueue(queue_path)
+    series_ids = list(series_ids)
+    if not queue.jobs:
+        queue.add({series_id: {'start_year': start}
+                   for start, batch in plan_sync(store, series_ids, start_year, end_year,
+                                                 revision_months, batch_size=1)
+                   for series_id in batch})
+    else:
+        queue.retry_failed()
+
+    summary = {'requests': 0, 'series': len(series_ids), 'added': 0, 'revised': 0,
+               'stopped': None}
+    while True:
+        batch = queue.take(min(scheduler.batch_size('bls'), MAX_SERIES_PER_REQUEST),
+                           key=lambda payload: payload['start_year'])
+        if not batch:
+            break
+        batch_start = queue.payload(batch[0])['start_year']
+        try:
+            df = fetch_bls_series(batch, batch_start, end_year, api_key=api_key,
+                                  session=session, cache=cache)
+        except QuotaExceededError:
+            summary['stopped'] = 'quota'
+            break
+        except Exception as e:
+            scheduler.report_batch_failure('bls')
+            queue.fail(batch, f'{type(e).__name__}: {e}')
+            continue
+        counts = store.upsert(df)
+        queue.complete(batch)
+        summary['requests'] += 1
+        summary['added'] += counts['added']
+        summary['revised'] += counts['revised']
+
+    summary.update(queue.counts())
+    if summary['done'] == len(queue.jobs):
+        Path(queue_path).unlink(missing_ok=True)
+    return summary
@@ -0,0 +1,357 @@
+"""
+Parallel, streaming Census ACS fetcher.
+
+Large geographies are split into shards that run concurrently on a bounded
+thread pool and are merged into one frame:
+
+- ``county`` and ``place`` requests are sharded per state (``in=state:XX``)
+- every level is additionally split into variable groups of at most
+  ``variables_per_request`` variables (the API caps a call at 50), which is
+  how ``zip`` (ZCTA) and ``metro`` pulls are parallelized, since those
+  geographies cannot be nested within states
+
+Each response is parsed as a stream: the body is read in chunks, complete
+rows are cut out of each chunk and appended to typed column buffers
+(float64 arrays for estimate variables, lists for names and geography
+codes). The full ``[[header], rows...]`` list of string rows is never
+materialized, and no per-column ``pd.to_numeric`` pass is needed afterwards.
+
+Example
+-------
+>>> df = fetch_acs(['B19013_001E', 'B19301_001E'], geography='county',
+...                year=2022, api_key=CENSUS_API_KEY, max_workers=8)
+"""
+
+import codecs
+import json
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ACS_BASE_URL = 'https://api.census.gov/data'
+MAX_VARIABLES_PER_REQUEST = 50
+
+GEOGRAPHY_LEVELS = {
+    'state': 'state',
+    'county': 'county',
+    'metro': 'metropolitan statistical area/micropolitan statistical area',
+    'zip': 'zip code tabulation area',
+    'place': 'place',
+}
+
+# Levels the API lets us nest within a state, and therefore shard per state
+STATE_SHARDED_LEVELS = frozenset({'county', 'place'})
+
+STATE_FIPS_CODES = (
+    '01', '02', '04', '05', '06', '08', '09', '10', '11', '12', '13', '15', '16',
+    '17', '18', '19', '20', '21', '22', '23', '24', '25', '26', '27', '28', '29',
+    '30', '31', '32', '33', '34', '35', '36', '37', '38', '39', '40', '41', '42',
+    '44', '45', '46', '47', '48', '49', '50', '51', '53', '54', '55', '56',
+)
+
+# Census annotation values (e.g. -666666666 "estimate not available")
+CENSUS_SENTINELS = frozenset({-111111111.0, -222222222.0, -333333333.0, -444444444.0,
+                              -555555555.0, -666666666.0, -777777777.0, -888888888.0,
+                              -999999999.0})
+
+_SENTINEL_ARRAY = np.array(sorted(CENSUS_SENTINELS))
+
+# One complete ``[...]`` row; quoted strings may contain brackets and escapes
+_ROW = re.compile(r'\[(?:[^\[\]"]|"(?:[^"\\]|\\.)*")*\]')
+_SEPARATOR = re.compile(r'[\s,]*')
+
+
+class _ColumnSink:
+    """Typed column buffers filled one chunk of rows at a time."""
+
+    def __init__(self, numeric_columns: Iterable[str], sentinels_to_nan: bool):
+        self.numeric_columns = set(numeric_columns)
+        self.sentinels_to_nan = sentinels_to_nan
+        self.header: Optional[List[str]] = None
+        self.parts: List[List] = []
+        self.numeric: List[bool] = []
+        self.rows = 0
+
+    def set_header(self, header: List[str]) -> None:
+        self.header = header
+        self.numeric = [name in self.numeric_columns for name in header]
+        self.parts = [[] for _ in header]
+
+    def extend(self, rows: List[List]) -> None:
+        """Append a batch of decoded rows, converting numeric columns in bulk."""
+        width = len(self.header)
+        for offset, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError(f"Row {self.rows + offset + 1} has {len(row)} values, "
+                                 f"expected {width}")
+        for parts, numeric, values in zip(self.parts, self.numeric, zip(*rows)):
+            parts.append(self._to_float(values) if numeric else list(values))
+        self.rows += len(rows)
+
+    def _to_float(self, values) -> np.ndarray:
+        try:
+            numbers = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            numbers = np.array([_to_float(v) for v in values], dtype=np.float64)
+        if self.sentinels_to_nan:
+            numbers[np.isin(numbers, _SENTINEL_ARRAY)] = np.nan
+        return numbers
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.header is None:
+            return pd.DataFrame()
+        data = {}
+        for name, numeric, parts in zip(self.header, self.numeric, self.parts):
+            if numeric:
+                data[name] = np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+            else:
+                data[name] = [value for part in parts for value in part]
+        return pd.DataFrame(data, columns=self.header)
+
+
+def _to_float(value) -> float:
+    """Convert one API value to float; null, empty and non-numeric become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def parse_census_json(chunks: Iterable[str], numeric_columns: Iterable[str] = (),
+                      sentinels_to_nan: bool = True) -> pd.DataFrame:
+    """
+    Parse a Census ``[[header], [row], ...]`` JSON body incrementally.
+
+    Complete rows are cut out of each chunk, decoded and appended to the
+    column buffers before the next chunk is read, so at most one chunk of
+    rows is held as Python lists at any time.
+
+    Parameters
+    ----------
+    chunks : iterable of str
+        Decoded text chunks of the response body, in order
+    numeric_columns : iterable of str
+        Columns parsed into float64 buffers; all others stay strings
+    sentinels_to_nan : bool
+        Replace Census annotation values (-666666666, ...) with NaN
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    sink = _ColumnSink(numeric_columns, sentinels_to_nan)
+    opened = closed = False
+    pending = ''
+
+    for chunk in chunks:
+        buffer = pending + chunk
+        pos = _SEPARATOR.match(buffer).end()
+        if not opened and pos < len(buffer):
+            if buffer[pos] != '[':
+                raise ValueError(f"Malformed Census JSON near: {buffer[pos:pos + 40]!r}")
+            opened = True
+            pos = _SEPARATOR.match(buffer, pos + 1).end()
+
+        rows = []
+        while opened and not closed and pos < len(buffer):
+            match = _ROW.match(buffer, pos)
+            if match is None:
+                if buffer[pos] == ']':
+                    closed = True
+                    pos += 1
+                break
+            row = json.loads(match.group())
+            if sink.header is None:
+                sink.set_header(row)
+            else:
+                rows.append(row)
+            pos = _SEPARATOR.match(buffer, match.end()).end()
+        if rows:
+            sink.extend(rows)
+        pending = buffer[pos:]
+
+    if opened and not closed:
+        raise ValueError("Truncated Census response")
+    if pending.strip():
+        raise ValueError(f"Malformed Census JSON near: {pending[:40]!r}")
+    return sink.to_frame()
+
+
+def _decode(byte_chunks: Iterable[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in byte_chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def build_shards(variables: Sequence[str], geography: str = 'state',
+                 state_fips: Optional[Iterable[str]] = None,
+                 variables_per_request: int = MAX_VARIABLES_PER_REQUEST) -> List[Dict]:
+    """
+    Split a logical ACS pull into independent request parameter sets.
+
+    Parameters
+    ----------
+    variables : list of str
+        ACS variables (``NAME`` is added to the first variable group)
+    geography : str
+        One of GEOGRAPHY_LEVELS
+    state_fips : iterable of str, optional
+        States to include (default: all); state-sharded levels get one
+        request per state, other levels are filtered with ``in=state:``
+        where the API supports it
+    variables_per_request : int
+        Maximum variables per call, including NAME
+
+    Returns
+    -------
+    list of dict
+        Request parameters (without the API key)
+    """
+    if geography not in GEOGRAPHY_LEVELS:
+        raise ValueError(f"Invalid geography: {geography}. "
+                         f"Must be one of: {', '.join(GEOGRAPHY_LEVELS)}")
+    limit = max(1, min(variables_per_request, MAX_VARIABLES_PER_REQUEST))
+    columns = ['NAME'] + [v for v in variables if v != 'NAME']
+    groups = [columns[i:i + limit] for i in range(0, len(columns), limit)]
+
+    level = GEOGRAPHY_LEVELS[geography]
+    states = list(state_fips) if state_fips is not None else None
+    if geography in STATE_SHARDED_LEVELS:
+        geo_filters = [{'for': f'{level}:*', 'in': f'state:{fips}'}
+                       for fips in (states or STATE_FIPS_CODES)]
+    elif geography == 'state' and states:
+        geo_filters = [{'for': f"state:{','.join(states)}"}]
+    else:
+        geo_filters = [{'for': f'{level}:*'}]
+
+    return [{'get': ','.join(group), **geo} for geo in geo_filters for group in groups]
+
+
+def fetch_acs_shard(params: Dict, year: int = 2022, dataset: str = 'acs/acs5',
+                    api_key: Optional[str] = None, session=None, base_url: str = ACS_BASE_URL,
+                    timeout: float = 60, chunk_size: int = 1 << 16) -> pd.DataFrame:
+    """
+    Fetch one shard and stream-parse it into a typed DataFrame.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Empty if the API reports no content for the shard (HTTP 204)
+    """
+    if session is None:
+        import requests
+        session = requests.Session()
+    request_params = dict(params)
+    if api_key:
+        request_params['key'] = api_key
+
+    url = f"{base_url.rstrip('/')}/{year}/{dataset}"
+    numeric = [v for v in params['get'].split(',') if v != 'NAME']
+    with session.get(url, params=request_params, timeout=timeout, stream=True) as response:
+        if response.status_code == 204:
+            return pd.DataFrame()
+        response.raise_for_status()
+        return parse_census_json(_decode(response.iter_content(chunk_size)), numeric)
+
+
+def fetch_acs(variables: Sequence[str], geography: str = 'state', year: int = 2022,
+              dataset: str = 'acs/acs5', api_key: Optional[str] = None,
+              state_fips: Optional[Iterable[str]] = None, max_workers: int = 8,
+              variables_per_request: int = MAX_VARIABLES_PER_REQUEST, session=None,
+              base_url: str = ACS_BASE_URL) -> pd.DataFrame:
+    """
+    Fetch ACS variables for a geography level with sharded, concurrent requests.
+
+    Parameters
+    ----------
+    variables : list of str
+        ACS variables, e.g. ``list(ACS_VARIABLES)``
+    geography : str
+        'state', 'county', 'metro', 'zip' or 'place'
+    year : int
+        ACS vintage
+    dataset : str
+        Dataset path below the vintage (default: 'acs/acs5')
+    api_key : str, optional
+        Census API key
+    state_fips : iterable of str, optional
+        Restrict to these states (default: all)
+    max_workers : int
+        Maximum concurrent requests
+    variables_per_request : int
+        Variable group size (max 50 including NAME)
+    session : requests.Session, optional
+        Shared session; its connection pool should allow ``max_workers``
+        connections
+    base_url : str
+        API root (overridable for local stand-in servers)
+
+    Returns
+    -------
+    pandas.DataFrame
+        NAME, the requested variables as float64 and the geography code
+        columns, with shards concatenated in state order
+    """
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_maxsize=max_workers))
+        session.mount('http://', HTTPAdapter(pool_maxsize=max_workers))
+
+    shards = build_shards(variables, geography, state_fips, variables_per_request)
+
+    def run(params):
+        return fetch_acs_shard(params, year, dataset, api_key, session, base_url)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards)))) as executor:
+        frames = list(executor.map(run, shards))
+
+    return merge_shards(shards, frames)
+
+
+def merge_shards(shards: List[Dict], frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Reassemble shard results into one frame.
+
+    Frames for the same geography filter are joined column-wise on their
+    geography code columns; the per-filter results are then concatenated.
+    """
+    by_filter: Dict[tuple, List[pd.DataFrame]] = {}
+    for params, frame in zip(shards, frames):
+        if frame.empty:
+            continue
+        key = (params['for'], params.get('in'))
+        by_filter.setdefault(key, []).append(frame)
+
+    parts = []
+    for group in by_filter.values():
+        merged = group[0]
+        for frame in group[1:]:
+            geo_columns = [c for c in frame.columns if c in merged.columns]
+            merged = merged.merge(frame, on=geo_columns, how='outer', sort=False)
+        parts.append(merged)
+
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    geo_columns = _geo_columns(shards)
+    variables = [c for c in df.columns if c not in geo_columns]
+    return df[variables + [c for c in geo_columns if c in df.columns]]
+
+
+def _geo_columns(shards: List[Dict]) -> List[str]:
+    """Return the geography code column names produced by a shard plan."""
+    columns = []
+    for params in shards:
+        for part in (params.get('in'), params['for']):
+            if part:
+                name = part.split(':')[0]
+                if name not in columns:
+                    columns.append(name)
+    return columns
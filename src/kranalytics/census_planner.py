@@ -0,0 +1,259 @@
+"""
+Census ACS query planner.
+
+Tutorials and the sample data generator each describe the ACS columns they
+need, and each used to send its own requests. Several of those requests hit
+the same endpoint for the same geographies, and a long variable list breaks
+the API's 50-variable cap. The planner takes every wanted
+(variables x geography x vintage) from all callers at once and:
+
+- merges compatible queries, i.e. those with the same vintage, dataset and
+  geography level, into one logical pull over the union of their variables
+  (state-sharded levels are merged per state, so a query restricted to a
+  few states never widens another query's pull)
+- splits each pull into requests of at most ``variables_per_request``
+  variables with :func:`~kranalytics.census_acs.build_shards`
+- runs the whole plan on one bounded thread pool
+- reassembles each caller's columns, rows and names from the merged
+  results
+
+Example
+-------
+>>> queries = [
+...     ACSQuery('income', {'B19013_001E': 'median_household_income'}),
+...     ACSQuery('inequality', {'B19083_001E': 'gini_index'}),
+... ]
+>>> plan = plan_queries(queries)
+>>> len(plan)                       # one request instead of two
+1
+>>> frames = fetch_queries(queries, api_key=CENSUS_API_KEY)
+>>> frames['inequality'].columns.tolist()
+['NAME', 'gini_index', 'state']
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from kranalytics.census_acs import (ACS_BASE_URL, GEOGRAPHY_LEVELS, MAX_VARIABLES_PER_REQUEST,
+                                    STATE_FIPS_CODES, STATE_SHARDED_LEVELS, _ColumnSink,
+                                    build_shards, fetch_acs_shard, merge_shards)
+
+
+@dataclass
+class ACSQuery:
+    """
+    One caller's logical ACS pull.
+
+    Parameters
+    ----------
+    name : str
+        Caller or dataset name; keys the result of :func:`fetch_queries`
+    variables : list of str or dict
+        ACS variables, or a mapping of variable to output column name
+        (e.g. ``ACS_VARIABLES``)
+    geography : str
+        One of GEOGRAPHY_LEVELS
+    year : int
+        ACS vintage
+    dataset : str
+        Dataset path below the vintage
+    state_fips : list of str, optional
+        Restrict to these states (default: all)
+    """
+
+    name: str
+    variables: Union[Sequence[str], Mapping[str, str]]
+    geography: str = 'state'
+    year: int = 2022
+    dataset: str = 'acs/acs5'
+    state_fips: Optional[Sequence[str]] = None
+
+    def __post_init__(self):
+        if self.geography not in GEOGRAPHY_LEVELS:
+            raise ValueError(f"Invalid geography: {self.geography}. "
+                             f"Must be one of: {', '.join(GEOGRAPHY_LEVELS)}")
+        if self.state_fips is not None:
+            self.state_fips = tuple(str(fips).zfill(2) for fips in self.state_fips)
+
+    @property
+    def codes(self) -> List[str]:
+        """ACS variable codes, in request order."""
+        return [v for v in self.variables if v != 'NAME']
+
+    @property
+    def group(self) -> Tuple[int, str, str]:
+        """Queries with the same group key can share requests."""
+        return self.year, self.dataset, self.geography
+
+
+@dataclass
+class PlannedRequest:
+    """One API call of a plan, and the queries it serves."""
+
+    year: int
+    dataset: str
+    geography: str
+    params: Dict[str, str]
+    queries: List[str] = field(default_factory=list)
+
+    @property
+    def variables(self) -> List[str]:
+        """ACS variable codes requested by this call."""
+        return [v for v in self.params['get'].split(',') if v != 'NAME']
+
+    @property
+    def group(self) -> Tuple[int, str, str]:
+        return self.year, self.dataset, self.geography
+
+
+def _union(lists: Iterable[Iterable[str]]) -> List[str]:
+    """Ordered union, keeping the first occurrence."""
+    return list(dict.fromkeys(v for values in lists for v in values))
+
+
+def plan_queries(queries: Sequence[ACSQuery],
+                 variables_per_request: int = MAX_VARIABLES_PER_REQUEST) -> List[PlannedRequest]:
+    """
+    Merge and split queries into the API calls that serve all of them.
+
+    Parameters
+    ----------
+    queries : list of ACSQuery
+        Every caller's pull; names must be unique
+    variables_per_request : int
+        Maximum variables per call, including NAME
+
+    Returns
+    -------
+    list of PlannedRequest
+    """
+    names = [query.name for query in queries]
+    if len(set(names)) != len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Duplicate query names: {', '.join(duplicates)}")
+
+    groups: Dict[Tuple[int, str, str], List[ACSQuery]] = {}
+    for query in queries:
+        groups.setdefault(query.group, []).append(query)
+
+    plan = []
+    for (year, dataset, geography), members in groups.items():
+        if geography in STATE_SHARDED_LEVELS:
+            # One pull per state over the variables of the queries covering it
+            extra = {f for q in members for f in q.state_fips or ()} - set(STATE_FIPS_CODES)
+            pulls = []
+            for fips in STATE_FIPS_CODES + tuple(sorted(extra)):
+                wanted = [q for q in members if q.state_fips is None or fips in q.state_fips]
+                if wanted:
+                    pulls.append((wanted, [fips]))
+        else:
+            states = None
+            if all(q.state_fips is not None for q in members):
+                states = sorted({f for q in members for f in q.state_fips})
+            pulls = [(members, states)]
+
+        for wanted, states in pulls:
+            variables = _union(q.codes for q in wanted)
+            for params in build_shards(variables, geography, states, variables_per_request):
+                requested = set(params['get'].split(','))
+                served = [q.name for q in wanted if requested & set(q.codes) or not q.codes]
+                plan.append(PlannedRequest(year, dataset, geography, params, served))
+    return plan
+
+
+def naive_request_count(queries: Sequence[ACSQuery],
+                        variables_per_request: int = MAX_VARIABLES_PER_REQUEST) -> int:
+    """Number of calls the queries would need when fetched one by one."""
+    return sum(len(build_shards(q.codes, q.geography, q.state_fips, variables_per_request))
+               for q in queries)
+
+
+def _rows_to_frame(rows: List[List], numeric: Sequence[str]) -> pd.DataFrame:
+    """Build a typed frame from a decoded ``[[header], rows...]`` response."""
+    sink = _ColumnSink(numeric, sentinels_to_nan=True)
+    if rows:
+        sink.set_header(rows[0])
+        sink.extend(rows[1:])
+    return sink.to_frame()
+
+
+def fetch_queries(queries: Sequence[ACSQuery], api_key: Optional[str] = None,
+                  max_workers: int = 8, session=None, base_url: str = ACS_BASE_URL,
+                  fetch_json: Optional[Callable[[str, Dict], List[List]]] = None,
+                  variables_per_request: int = MAX_VARIABLES_PER_REQUEST
+                  ) -> Dict[str, pd.DataFrame]:
+    """
+    Plan, run and reassemble a set of ACS queries.
+
+    Parameters
+    ----------
+    queries : list of ACSQuery
+        Every caller's pull
+    api_key : str, optional
+        Census API key
+    max_workers : int
+        Maximum concurrent requests for the whole plan
+    session : requests.Session, optional
+        Shared session (e.g. a ScheduledSession, so the plan respects the
+        Census rate limits)
+    base_url : str
+        API root (overridable for local stand-in servers)
+    fetch_json : callable, optional
+        ``fetch_json(url, params) -> [[header], rows...]`` used instead of
+        the streaming fetch, e.g. to go through a response cache; ``params``
+        include the API key
+    variables_per_request : int
+        Maximum variables per call, including NAME
+
+    Returns
+    -------
+    dict of str to pandas.DataFrame
+        Per query: NAME, its variables (renamed when given as a mapping)
+        and the geography code columns, in the API's row order
+    """
+    plan = plan_queries(queries, variables_per_request)
+    if not plan:
+        return {}
+    if session is None and fetch_json is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_maxsize=max_workers))
+        session.mount('http://', HTTPAdapter(pool_maxsize=max_workers))
+
+    def run(request: PlannedRequest) -> pd.DataFrame:
+        if fetch_json is None:
+            return fetch_acs_shard(request.params, request.year, request.dataset, api_key,
+                                   session, base_url)
+        url = f"{base_url.rstrip('/')}/{request.year}/{request.dataset}"
+        params = dict(request.params, **({'key': api_key} if api_key else {}))
+        return _rows_to_frame(fetch_json(url, params) or [], request.variables)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan)))) as executor:
+        frames = list(executor.map(run, plan))
+
+    parts: Dict[Tuple[int, str, str], Tuple[List[Dict], List[pd.DataFrame]]] = {}
+    for request, frame in zip(plan, frames):
+        shards, results = parts.setdefault(request.group, ([], []))
+        shards.append(request.params)
+        results.append(frame)
+    merged = {key: merge_shards(*value) for key, value in parts.items()}
+
+    return {query.name: _select(query, merged[query.group]) for query in queries}
+
+
+def _select(query: ACSQuery, df: pd.DataFrame) -> pd.DataFrame:
+    """Cut one query's rows and columns out of its group's merged frame."""
+    if df.empty:
+        return df
+    if query.state_fips is not None and 'state' in df.columns:
+        df = df[df['state'].isin(query.state_fips)]
+    geo_columns = [c for c in ('state', GEOGRAPHY_LEVELS[query.geography]) if c in df.columns]
+    columns = ['NAME'] + query.codes + list(dict.fromkeys(geo_columns))
+    out = df[[c for c in columns if c in df.columns]].reset_index(drop=True)
+    if isinstance(query.variables, Mapping):
+        out = out.rename(columns={k: v for k, v in query.variables.items() if k != 'NAME'})
+    return out
@@ -0,0 +1,198 @@
+"""
+Typed columnar storage for sample datasets.
+
+Each dataset is stored as a directory with one ``.npy`` file per column plus a
+``_schema.json`` file recording column order, dtypes and row count. Columns
+are loaded with ``numpy.load(mmap_mode='r')``, so reading a projection such as
+``['state_fips', 'gini_index']`` maps only those two files and never parses
+or touches the rest of the dataset.
+
+String columns are stored as fixed-width unicode arrays, which keeps codes
+like ``state_fips='01'`` intact (no leading-zero loss) and stays
+memory-mappable. Missing strings are stored as empty strings.
+
+Layout
+------
+data/sample_datasets/
+    census_inequality_2022.csv
+    columnar/
+        census_inequality_2022/
+            _schema.json
+            state_name.npy
+            gini_index.npy
+            ...
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[2] / 'data' / 'sample_datasets'
+COLUMNAR_DIRNAME = 'columnar'
+SCHEMA_FILENAME = '_schema.json'
+
+
+def is_code_column(name: str) -> bool:
+    """Return True for identifier columns that must be read as strings (FIPS codes)."""
+    return name.lower().endswith('fips')
+
+
+def _column_array(series: pd.Series) -> np.ndarray:
+    """Convert a column to a memory-mappable numpy array."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        if series.isna().any() and pd.api.types.is_integer_dtype(series):
+            return series.to_numpy(dtype='float64', na_value=np.nan)
+        return series.to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype='datetime64[ns]')
+    values = series.astype(object).where(series.notna(), '').astype(str).to_numpy(dtype=str)
+    if values.dtype.itemsize == 0:
+        values = values.astype('<U1')
+    return values
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.npy')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_columnar(df: pd.DataFrame, directory) -> Dict[str, str]:
+    """
+    Write a DataFrame as one ``.npy`` file per column.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Dataset to store; column names must be unique
+    directory : str or Path
+        Target directory (created if needed)
+
+    Returns
+    -------
+    dict
+        Column name -> numpy dtype string, in column order
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    schema = {}
+    for column in df.columns:
+        array = _column_array(df[column])
+        _save_array(directory / f'{column}.npy', array)
+        schema[str(column)] = array.dtype.str
+
+    atomic_write_bytes(directory / SCHEMA_FILENAME, json.dumps({
+        'format': 'npy',
+        'rows': len(df),
+        'columns': schema,
+    }, indent=2).encode('utf-8'))
+    return schema
+
+
+def read_schema(directory) -> Dict:
+    """Return the stored schema for a columnar dataset directory."""
+    return json.loads((Path(directory) / SCHEMA_FILENAME).read_text())
+
+
+def read_columnar(directory, columns: Optional[Iterable[str]] = None,
+                  mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a columnar dataset, mapping only the requested columns.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Dataset directory written by ``write_columnar``
+    columns : list of str, optional
+        Column projection (default: all columns, in stored order)
+    mmap : bool
+        Memory-map the column files instead of reading them into memory
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    directory = Path(directory)
+    schema = read_schema(directory)['columns']
+    selected = list(schema) if columns is None else list(columns)
+
+    missing = [c for c in selected if c not in schema]
+    if missing:
+        raise KeyError(f"Columns not in {directory.name}: {missing}")
+
+    data = {
+        column: np.load(directory / f'{column}.npy', mmap_mode='r' if mmap else None,
+                        allow_pickle=False)
+        for column in selected
+    }
+    return pd.DataFrame(data, columns=selected, copy=False)
+
+
+def columnar_path(name: str, data_dir=None) -> Path:
+    """Return the columnar directory for a sample dataset name or CSV filename."""
+    data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+    return data_dir / COLUMNAR_DIRNAME / Path(name).stem
+
+
+def load_sample_dataset(name: str, columns: Optional[Iterable[str]] = None,
+                        data_dir=None, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a sample dataset, preferring its columnar copy over the CSV.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name, with or without ``.csv`` (e.g. 'census_inequality_2022')
+    columns : list of str, optional
+        Column projection; only these columns are read
+    data_dir : str or Path, optional
+        Sample dataset directory (default: data/sample_datasets)
+    mmap : bool
+        Memory-map columnar files
+
+    Returns
+    -------
+    pandas.DataFrame
+        FIPS code columns are returned as strings in both code paths.
+    """
+    directory = columnar_path(name, data_dir)
+    if (directory / SCHEMA_FILENAME).exists():
+        return read_columnar(directory, columns, mmap=mmap)
+
+    data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+    csv_path = data_dir / f'{Path(name).stem}.csv'
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtype = {c: str for c in header if is_code_column(c)}
+    if columns is None:
+        return pd.read_csv(csv_path, dtype=dtype)
+    columns = list(columns)
+    return pd.read_csv(csv_path, usecols=columns, dtype=dtype)[columns]
+
+
+def convert_csv(csv_path, data_dir=None) -> Dict[str, str]:
+    """
+    Write the columnar copy of an existing sample CSV.
+
+    Returns
+    -------
+    dict
+        Column name -> numpy dtype string
+    """
+    csv_path = Path(csv_path)
+    data_dir = Path(data_dir) if data_dir is not None else csv_path.parent
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(csv_path, dtype={c: str for c in header if is_code_column(c)})
+    return write_columnar(df, columnar_path(csv_path.name, data_dir))
@@ -0,0 +1,513 @@
+"""
+Scalable count models for county x year panels.
+
+The Crime Prediction tutorial fits statsmodels Poisson/NegativeBinomial
+GLMs and scikit-learn tree ensembles on a dense 150-row frame. For panels
+with millions of rows and state/year (or county) fixed effects:
+
+- :class:`DesignMatrix` builds the design once as a float32 CSR matrix:
+  standardized numeric columns next to sparse one-hot fixed effects
+  (first level dropped), so dummies cost one stored value per row and
+  effect instead of a dense column per level
+- :func:`fit_poisson` and :func:`fit_negative_binomial` run a vectorized
+  IRLS whose ``X'WX`` and ``X'Wz`` products are accumulated over row chunks
+  in float64, bounding the temporary memory; the NB2 fit starts from the
+  Poisson coefficients and alternates IRLS steps with a maximum-likelihood
+  update of the dispersion ``alpha``
+- :func:`fit_hist_gradient_boosting` is the tree baseline, using
+  scikit-learn's multi-threaded histogram gradient boosting with a Poisson
+  loss and native categorical fixed effects
+
+Coefficients are reported in the original units of the numeric columns.
+
+Example
+-------
+>>> design = DesignMatrix(['poverty_rate', 'unemployment_rate'], ['state', 'year'])
+>>> X = design.fit_transform(train)
+>>> poisson = fit_poisson(X, train['crime_count'], offset=np.log(train['population']),
+...                       design=design)
+>>> nb = fit_negative_binomial(X, train['crime_count'], offset=np.log(train['population']),
+...                            start=poisson, design=design)
+>>> nb.predict(design.transform(test), offset=np.log(test['population']))
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+MODELS = ('poisson', 'negative_binomial', 'hist_gradient_boosting')
+DEFAULT_CHUNK_ROWS = 262_144
+
+# Linear predictor bounds that keep exp() finite in float64
+_ETA_BOUNDS = (-30.0, 30.0)
+
+
+class DesignMatrix:
+    """
+    Sparse float32 design matrix with one-hot fixed effects.
+
+    Parameters
+    ----------
+    numeric : list of str
+        Numeric columns; standardized with the training mean and std
+    fixed_effects : list of str
+        Categorical columns encoded as sparse one-hot with the first level
+        dropped; unseen levels at transform time fall into the baseline
+    intercept : bool
+        Add an intercept column
+    """
+
+    def __init__(self, numeric: Sequence[str], fixed_effects: Sequence[str] = (),
+                 intercept: bool = True):
+        self.numeric = list(numeric)
+        self.fixed_effects = list(fixed_effects)
+        self.intercept = intercept
+        self.levels: Dict[str, pd.Index] = {}
+        self.mean = self.std = None
+
+    @property
+    def names(self) -> List[str]:
+        """Column names of the design matrix."""
+        names = ['const'] if self.intercept else []
+        names += self.numeric
+        for column in self.fixed_effects:
+            names += [f'{column}[{level}]' for level in self.levels[column][1:]]
+        return names
+
+    def fit(self, df: pd.DataFrame) -> 'DesignMatrix':
+        """Learn fixed-effect levels and numeric scaling from training data."""
+        values = df[self.numeric].to_numpy(dtype=np.float64)
+        self.mean = values.mean(axis=0)
+        std = values.std(axis=0)
+        self.std = np.where(std > 0, std, 1.0)
+        self.levels = {column: pd.Index(pd.unique(df[column].dropna())).sort_values()
+                       for column in self.fixed_effects}
+        return self
+
+    def transform(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        """Return the float32 CSR design matrix for ``df``."""
+        if self.mean is None:
+            raise ValueError("DesignMatrix must be fit before transform")
+        n = len(df)
+        blocks = []
+        if self.intercept:
+            blocks.append(sparse.csr_matrix(np.ones((n, 1), dtype=np.float32)))
+        if self.numeric:
+            values = (df[self.numeric].to_numpy(dtype=np.float64) - self.mean) / self.std
+            blocks.append(sparse.csr_matrix(values.astype(np.float32)))
+        for column in self.fixed_effects:
+            levels = self.levels[column]
+            codes = levels.get_indexer(df[column])
+            rows = np.flatnonzero(codes > 0)
+            blocks.append(sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.float32), (rows, codes[rows] - 1)),
+                shape=(n, len(levels) - 1)))
+        return sparse.hstack(blocks, format='csr', dtype=np.float32)
+
+    def fit_transform(self, df: pd.DataFrame) -> sparse.csr_matrix:
+        return self.fit(df).transform(df)
+
+    def _unscale_block(self) -> np.ndarray:
+        """Linear map from the leading (intercept + numeric) coefficients to original units."""
+        k = len(self.numeric)
+        start = 1 if self.intercept else 0
+        transform = np.eye(start + k)
+        transform[start:, start:] /= self.std
+        if self.intercept:
+            transform[0, 1:] = -self.mean / self.std
+        return transform
+
+    def unscale(self, params: np.ndarray) -> np.ndarray:
+        """Convert coefficients on standardized columns to original units."""
+        params = np.asarray(params, dtype=np.float64).copy()
+        transform = self._unscale_block()
+        lead = len(transform)
+        params[:lead] = transform @ params[:lead]
+        return params
+
+    def unscale_bse(self, cov: np.ndarray) -> np.ndarray:
+        """Return standard errors in original units from the standardized covariance."""
+        bse = np.sqrt(np.clip(np.diag(cov), 0, None))
+        transform = self._unscale_block()
+        lead = len(transform)
+        block = transform @ cov[:lead, :lead] @ transform.T
+        bse[:lead] = np.sqrt(np.clip(np.diag(block), 0, None))
+        return bse
+
+
+class CountModelFit:
+    """
+    Fitted GLM count model.
+
+    Attributes
+    ----------
+    family : str
+        'poisson' or 'negative_binomial'
+    coef : numpy.ndarray
+        Coefficients for the design matrix columns (standardized scale)
+    params : pandas.Series or None
+        Coefficients in original units, indexed by name (when fitted with
+        a ``design``)
+    cov : numpy.ndarray
+        Covariance of ``coef`` (conditional on ``alpha`` for NB2)
+    bse : pandas.Series or numpy.ndarray
+        Standard errors, matching ``params`` when fitted with a ``design``
+        and ``coef`` otherwise
+    alpha : float
+        NB2 dispersion (0 for Poisson)
+    deviance, loglike : float
+    iterations : int
+        IRLS iterations
+    converged : bool
+    """
+
+    def __init__(self, family: str, coef: np.ndarray, cov: np.ndarray, alpha: float,
+                 deviance: float, loglike: float, iterations: int, converged: bool,
+                 design: Optional[DesignMatrix] = None):
+        self.family = family
+        self.coef = coef
+        self.cov = cov
+        self.alpha = alpha
+        self.deviance = deviance
+        self.loglike = loglike
+        self.iterations = iterations
+        self.converged = converged
+        if design is not None:
+            self.params = pd.Series(design.unscale(coef), index=design.names)
+            self.bse = pd.Series(design.unscale_bse(cov), index=design.names)
+        else:
+            self.params = None
+            self.bse = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+    def predict(self, X: sparse.spmatrix, offset=None) -> np.ndarray:
+        """Return the expected counts for a design matrix."""
+        return np.exp(_linear_predictor(X, self.coef, offset))
+
+
+def _linear_predictor(X, coef: np.ndarray, offset) -> np.ndarray:
+    eta = np.asarray(X @ coef, dtype=np.float64).ravel()
+    if offset is not None:
+        eta += np.asarray(offset, dtype=np.float64)
+    return np.clip(eta, *_ETA_BOUNDS)
+
+
+def _weighted_normal_equations(X, w: np.ndarray, z: np.ndarray, chunk_rows: int):
+    """Accumulate X'WX and X'Wz in float64 over row chunks."""
+    p = X.shape[1]
+    gram = np.zeros((p, p))
+    rhs = np.zeros(p)
+    for start in range(0, X.shape[0], chunk_rows):
+        stop = start + chunk_rows
+        chunk = X[start:stop].astype(np.float64)
+        weights = w[start:stop]
+        weighted = chunk.multiply(weights[:, np.newaxis]).tocsr()
+        product = chunk.T @ weighted
+        gram += product.toarray() if sparse.issparse(product) else product
+        rhs += chunk.T @ (weights * z[start:stop])
+    return gram, rhs
+
+
+def _solve(gram: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.solve(gram, rhs)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(gram, rhs, rcond=None)[0]
+
+
+def _poisson_deviance(y: np.ndarray, mu: np.ndarray) -> float:
+    ratio = np.where(y > 0, y / mu, 1.0)
+    return float(2 * np.sum(y * np.log(ratio) - (y - mu)))
+
+
+def _nb_deviance(y: np.ndarray, mu: np.ndarray, alpha: float) -> float:
+    size = 1 / alpha
+    ratio = np.where(y > 0, y / mu, 1.0)
+    return float(2 * np.sum(y * np.log(ratio) - (y + size) * np.log((y + size) / (mu + size))))
+
+
+def _nb_loglike(y: np.ndarray, mu: np.ndarray, alpha: float) -> float:
+    from scipy.special import gammaln
+
+    size = 1 / alpha
+    return float(np.sum(gammaln(y + size) - gammaln(size) - gammaln(y + 1)
+                        + size * np.log(size / (size + mu)) + y * np.log(mu / (size + mu))))
+
+
+def _poisson_loglike(y: np.ndarray, mu: np.ndarray) -> float:
+    from scipy.special import gammaln
+
+    return float(np.sum(y * np.log(mu) - mu - gammaln(y + 1)))
+
+
+def _irls(X, y: np.ndarray, offset, coef: Optional[np.ndarray], alpha: float, tol: float, max_iter: int,
+          chunk_rows: int):
+    """
+    Run IRLS for a log-link Poisson (alpha=0) or NB2 model with fixed alpha.
+
+    Without starting coefficients the usual GLM start ``mu = (y + mean(y)) / 2``
+    is used.
+    """
+    base = 0.0 if offset is None else np.asarray(offset, dtype=np.float64)
+    if coef is None:
+        mu = (y + y.mean()) / 2 + 1e-8
+        eta = np.log(mu)
+    else:
+        eta = _linear_predictor(X, coef, offset)
+        mu = np.exp(eta)
+    deviance = np.inf
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        w = mu / (1 + alpha * mu)
+        z = eta - base + (y - mu) / mu
+        gram, rhs = _weighted_normal_equations(X, w, z, chunk_rows)
+        coef = _solve(gram, rhs)
+        eta = _linear_predictor(X, coef, offset)
+        mu = np.exp(eta)
+        previous, deviance = deviance, _poisson_deviance(y, mu)
+        if abs(previous - deviance) <= tol * (abs(deviance) + 0.1):
+            converged = True
+            break
+    w = mu / (1 + alpha * mu)
+    gram, _ = _weighted_normal_equations(X, w, np.zeros_like(w), chunk_rows)
+    return coef, np.linalg.pinv(gram), mu, iterations, converged
+
+
+def _as_target(y) -> np.ndarray:
+    y = np.asarray(y, dtype=np.float64)
+    if np.any(y < 0) or not np.all(np.isfinite(y)):
+        raise ValueError("Count targets must be finite and non-negative")
+    return y
+
+
+def fit_poisson(X: sparse.spmatrix, y, offset=None, start: Optional[np.ndarray] = None,
+                tol: float = 1e-8, max_iter: int = 50, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                design: Optional[DesignMatrix] = None) -> CountModelFit:
+    """
+    Fit a log-link Poisson GLM by IRLS.
+
+    Parameters
+    ----------
+    X : scipy.sparse matrix
+        Design matrix (see :class:`DesignMatrix`)
+    y : array-like
+        Non-negative counts
+    offset : array-like, optional
+        Linear-predictor offset, e.g. ``log(population)`` for rates
+    start : numpy.ndarray, optional
+        Starting coefficients
+    tol : float
+        Relative deviance change at which IRLS stops
+    max_iter : int
+        Maximum IRLS iterations
+    chunk_rows : int
+        Rows per chunk when accumulating the normal equations
+    design : DesignMatrix, optional
+        Used to report ``params`` in original units
+
+    Returns
+    -------
+    CountModelFit
+    """
+    y = _as_target(y)
+    if start is not None:
+        start = np.asarray(start, dtype=np.float64)
+    coef, cov, mu, iterations, converged = _irls(X, y, offset, start, 0.0, tol, max_iter,
+                                                 chunk_rows)
+    return CountModelFit('poisson', coef, cov, 0.0, _poisson_deviance(y, mu),
+                         _poisson_loglike(y, mu), iterations, converged, design)
+
+
+def _fit_alpha(y: np.ndarray, mu: np.ndarray) -> float:
+    from scipy.optimize import minimize_scalar
+
+    result = minimize_scalar(lambda log_alpha: -_nb_loglike(y, mu, np.exp(log_alpha)),
+                             bounds=(-12.0, 5.0), method='bounded',
+                             options={'xatol': 1e-6})
+    return float(np.exp(result.x))
+
+
+def fit_negative_binomial(X: sparse.spmatrix, y, offset=None,
+                          start: Optional[CountModelFit] = None, alpha: Optional[float] = None,
+                          tol: float = 1e-8, max_iter: int = 50, max_outer: int = 25,
+                          chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                          design: Optional[DesignMatrix] = None) -> CountModelFit:
+    """
+    Fit an NB2 (log-link, ``Var = mu + alpha mu^2``) model.
+
+    Starts from a Poisson fit (``start``, fitted here when omitted) and
+    alternates IRLS for the coefficients at fixed ``alpha`` with a
+    maximum-likelihood update of ``alpha`` until both settle. Each IRLS
+    pass is warm-started from the previous coefficients, so later passes
+    take one or two iterations.
+
+    Parameters
+    ----------
+    X, y, offset, tol, max_iter, chunk_rows, design
+        As in :func:`fit_poisson`
+    start : CountModelFit, optional
+        Poisson fit to warm-start from
+    alpha : float, optional
+        Fixed dispersion; estimated by maximum likelihood when omitted
+    max_outer : int
+        Maximum coefficient/dispersion alternations
+
+    Returns
+    -------
+    CountModelFit
+    """
+    y = _as_target(y)
+    if start is None:
+        start = fit_poisson(X, y, offset, tol=tol, max_iter=max_iter, chunk_rows=chunk_rows)
+    coef = start.coef
+    mu = start.predict(X, offset)
+
+    estimate = alpha is None
+    if estimate:
+        alpha = _fit_alpha(y, mu)
+
+    iterations = 0
+    converged = False
+    for _ in range(max_outer):
+        coef, cov, mu, steps, converged = _irls(X, y, offset, coef, alpha, tol, max_iter,
+                                                chunk_rows)
+        iterations += steps
+        if not estimate:
+            break
+        previous, alpha = alpha, _fit_alpha(y, mu)
+        if abs(alpha - previous) <= 1e-6 * max(alpha, 1e-8) and steps <= 2:
+            break
+
+    return CountModelFit('negative_binomial', coef, cov, alpha, _nb_deviance(y, mu, alpha),
+                         _nb_loglike(y, mu, alpha), iterations, converged, design)
+
+
+def fit_hist_gradient_boosting(df: pd.DataFrame, target: str, numeric: Sequence[str],
+                               fixed_effects: Sequence[str] = (), max_iter: int = 200,
+                               learning_rate: float = 0.1, max_leaf_nodes: int = 31,
+                               random_state: int = 42, **kwargs):
+    """
+    Fit a Poisson-loss histogram gradient boosting baseline.
+
+    Fixed effects with at most 255 levels are passed as native categorical
+    features; larger ones (e.g. counties) as integer codes. Training is
+    multi-threaded through OpenMP.
+
+    Returns
+    -------
+    sklearn.ensemble.HistGradientBoostingRegressor
+        Fitted model; predict with :func:`gradient_boosting_features`
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    features, categorical, levels = gradient_boosting_features(df, numeric, fixed_effects)
+    model = HistGradientBoostingRegressor(loss='poisson', max_iter=max_iter,
+                                          learning_rate=learning_rate,
+                                          max_leaf_nodes=max_leaf_nodes,
+                                          categorical_features=categorical or None,
+                                          random_state=random_state, **kwargs)
+    model.fit(features, _as_target(df[target]))
+    model.kranalytics_levels_ = levels
+    return model
+
+
+def gradient_boosting_features(df: pd.DataFrame, numeric: Sequence[str],
+                               fixed_effects: Sequence[str] = (), levels=None):
+    """
+    Build the float32 feature matrix for :func:`fit_hist_gradient_boosting`.
+
+    Returns
+    -------
+    tuple
+        (features, categorical column mask, fixed-effect levels); pass the
+        levels of the fitted model to encode new data consistently
+    """
+    if levels is None:
+        levels = {column: pd.Index(pd.unique(df[column].dropna())).sort_values()
+                  for column in fixed_effects}
+    columns = [df[list(numeric)].to_numpy(dtype=np.float32)]
+    categorical = [False] * len(numeric)
+    for column in fixed_effects:
+        codes = levels[column].get_indexer(df[column]).astype(np.float32)
+        codes[codes < 0] = np.nan
+        columns.append(codes[:, np.newaxis])
+        categorical.append(len(levels[column]) <= 255)
+    return np.hstack(columns), categorical, levels
+
+
+def _metrics(y: np.ndarray, prediction: np.ndarray) -> Dict[str, float]:
+    error = prediction - y
+    nonzero = y != 0
+    return {
+        'MAE': float(np.mean(np.abs(error))),
+        'RMSE': float(np.sqrt(np.mean(error ** 2))),
+        'R²': float(1 - np.sum(error ** 2) / np.sum((y - y.mean()) ** 2)),
+        'MAPE (%)': float(np.mean(np.abs(error[nonzero] / y[nonzero])) * 100),
+    }
+
+
+def fit_count_models(train: pd.DataFrame, test: pd.DataFrame, target: str,
+                     numeric: Sequence[str], fixed_effects: Sequence[str] = (),
+                     exposure: Optional[str] = None, models: Sequence[str] = MODELS,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Fit the tutorial's count models on a panel and compare them on a test set.
+
+    Parameters
+    ----------
+    train, test : pandas.DataFrame
+        Panel rows
+    target : str
+        Count column (e.g. 'crime_count')
+    numeric : list of str
+        Numeric predictors
+    fixed_effects : list of str
+        Categorical fixed effects (e.g. ['state', 'year'])
+    exposure : str, optional
+        Exposure column; ``log(exposure)`` is the GLM offset and an extra
+        boosting feature
+    models : list of str
+        Any of MODELS
+    chunk_rows : int
+        Row chunk for the IRLS normal equations
+
+    Returns
+    -------
+    tuple
+        (dict of fitted models, DataFrame of MAE/RMSE/R²/MAPE per model,
+        sorted by RMSE)
+    """
+    unknown = [m for m in models if m not in MODELS]
+    if unknown:
+        raise ValueError(f"Unknown models: {unknown}. Must be any of: {', '.join(MODELS)}")
+
+    y_test = _as_target(test[target])
+    offsets = (None, None) if exposure is None else (np.log(train[exposure].to_numpy(float)),
+                                                     np.log(test[exposure].to_numpy(float)))
+    fits, predictions = {}, {}
+    if 'poisson' in models or 'negative_binomial' in models:
+        design = DesignMatrix(numeric, fixed_effects)
+        X_train = design.fit_transform(train)
+        X_test = design.transform(test)
+        poisson = fit_poisson(X_train, train[target], offsets[0], chunk_rows=chunk_rows,
+                              design=design)
+        if 'poisson' in models:
+            fits['poisson'] = poisson
+            predictions['poisson'] = poisson.predict(X_test, offsets[1])
+        if 'negative_binomial' in models:
+            nb = fit_negative_binomial(X_train, train[target], offsets[0], start=poisson,
+                                       chunk_rows=chunk_rows, design=design)
+            fits['negative_binomial'] = nb
+            predictions['negative_binomial'] = nb.predict(X_test, offsets[1])
+    if 'hist_gradient_boosting' in models:
+        features = list(numeric) + ([exposure] if exposure else [])
+        model = fit_hist_gradient_boosting(train, target, features, fixed_effects)
+        test_features, _, _ = gradient_boosting_features(test, features, fixed_effects,
+                                                         model.kranalytics_levels_)
+        fits['hist_gradient_boosting'] = model
+        predictions['hist_gradient_boosting'] = model.predict(test_features)
+
+    rows = [{'Model': name, **_metrics(y_test, predictions[name])} for name in predictions]
+    return fits, pd.DataFrame(rows).sort_values('RMSE', ignore_index=True)
@@ -0,0 +1,456 @@
+"""
+Local data service: one loaded, shared-memory copy of each dataset per host.
+
+Every kernel that calls :func:`~kranalytics.data_utils.load_sample_data` or
+:func:`~kranalytics.data_utils.load_data_with_fallback` normally parses its
+own copy, and concurrent kernels may send the same Census request at the
+same moment. :class:`DataService` is an optional per-host daemon listening
+on a Unix socket:
+
+- a dataset is loaded once per key (name, loader parameters and the size
+  and modification time of its sample files) and published to a :class:`~kranalytics.results_cache.ResultStore` in shared memory
+  (``/dev/shm``): typed ``.npy`` columns that every client memory-maps
+  read-only, so 20 kernels share one physical copy of the numeric columns
+- concurrent requests for a key that is still loading wait on the single
+  in-flight load instead of starting their own (request coalescing)
+- live loaders (e.g. a Census API call) run inside the service with the
+  usual sample-data fallback. Only loaders set up in the service process
+  are run: registered for a dataset with :func:`register_loader`, or
+  allowed for any dataset with :func:`allow_loader`. Clients name them by
+  ``module:function`` (see :func:`loader_spec`), which the service looks
+  up among those loaders and never imports; any other loader is rejected
+  and the client runs it locally. Datasets without a loader are served
+  from the bundled sample datasets
+
+Clients opt in by exporting ``KRANALYTICS_DATA_SERVICE=<socket path>``;
+the data utilities then ask the service first and silently load locally
+when it is not running. The socket is created with mode 0600 (same user)
+by default.
+
+The protocol is one JSON object per line. Requests carry ``op`` ('get',
+'stats', 'invalidate', 'ping'); a 'get' reply names the store directory
+and key to attach to.
+
+Example
+-------
+$ python scripts/run_data_service.py --register census_income_2022=mypkg.census:fetch_income \
+      --allow mypkg.census:fetch_county_income
+$ export KRANALYTICS_DATA_SERVICE=/tmp/kranalytics-1000/data.sock
+>>> df = load_sample_data('bls_employment_national')     # served, memory-mapped
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from kranalytics.columnar import DEFAULT_DATA_DIR, SCHEMA_FILENAME, columnar_path
+from kranalytics.results_cache import ResultStore
+from kranalytics.schema import MANIFEST_FILENAME
+
+logger = logging.getLogger(__name__)
+
+ENV_VARIABLE = 'KRANALYTICS_DATA_SERVICE'
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_TIMEOUT = 600.0
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+# Dataset name -> (loader, API key environment variable)
+LOADERS: Dict[str, tuple] = {}
+
+# 'module:function' -> loader that clients may name for any dataset
+ALLOWED_LOADERS: Dict[str, Callable] = {}
+
+# Set in the service process so its own data-utils calls never call back into it
+_serving = threading.local()
+
+
+def _runtime_dir() -> Path:
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return Path(base) / f'kranalytics-{os.getuid()}'
+
+
+def default_socket_path() -> Path:
+    """Return the per-user socket path (under ``$XDG_RUNTIME_DIR`` or the temp dir)."""
+    return _runtime_dir() / 'data.sock'
+
+
+def default_shm_dir() -> Path:
+    """Return the per-user shared-memory store directory (``/dev/shm`` when available)."""
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / f'kranalytics-{os.getuid()}'
+    return _runtime_dir() / 'shm'
+
+
+def register_loader(name: str, loader: Callable[..., pd.DataFrame],
+                    api_key_name: Optional[str] = None) -> None:
+    """
+    Serve dataset ``name`` from ``loader(**params)``, with sample-data fallback.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name; also the sample dataset used as the fallback
+    loader : callable
+        Live loader, as passed to ``load_data_with_fallback``
+    api_key_name : str, optional
+        Environment variable holding the loader's API key
+    """
+    LOADERS[name] = (loader, api_key_name)
+
+
+def allow_loader(loader: Callable[..., pd.DataFrame]) -> None:
+    """
+    Let clients request any dataset through ``loader`` by its :func:`loader_spec`.
+
+    Parameters
+    ----------
+    loader : callable
+        Importable live loader (not a lambda or a ``__main__`` function)
+
+    Raises
+    ------
+    ValueError
+        If the loader has no ``'module:function'`` spec
+    """
+    spec = loader_spec(loader)
+    if spec is None:
+        raise ValueError(f"Invalid loader: {loader!r}. Must be an importable module-level "
+                         f"function")
+    ALLOWED_LOADERS[spec] = loader
+
+
+def loader_spec(func: Callable) -> Optional[str]:
+    """Return ``'module:function'`` for an importable loader, or None (lambdas, __main__)."""
+    module = getattr(func, '__module__', None)
+    qualname = getattr(func, '__qualname__', '')
+    if not module or module == '__main__' or '<' in qualname:
+        return None
+    return f'{module}:{qualname}'
+
+
+def resolve_loader(spec: str) -> Callable:
+    """
+    Import the loader named by a ``'module:function'`` spec.
+
+    For the service operator's own configuration only: specs sent by
+    clients are looked up with :func:`allowed_loader` and never imported.
+    """
+    module, _, qualname = spec.partition(':')
+    obj = importlib.import_module(module)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def allowed_loader(spec: str) -> Callable:
+    """
+    Return the registered or allowed loader named by a client's spec.
+
+    Raises
+    ------
+    PermissionError
+        If no loader with that spec was registered or allowed
+    """
+    if spec in ALLOWED_LOADERS:
+        return ALLOWED_LOADERS[spec]
+    for loader, _ in LOADERS.values():
+        if loader_spec(loader) == spec:
+            return loader
+    raise PermissionError(f"Loader '{spec}' is not registered with the data service; "
+                          f"use register_loader or allow_loader in the service process")
+
+
+def sample_signature(dataset: str, data_dir=None) -> List[list]:
+    """
+    Return ``[file, size, mtime_ns]`` of the files a sample load reads.
+
+    These are the CSV, the columnar copy's schema (rewritten last when the
+    copy is regenerated) and the manifest (the registered dtypes);
+    missing files are listed with size and time -1.
+    """
+    data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+    paths = [data_dir / f'{Path(dataset).stem}.csv',
+             columnar_path(dataset, data_dir) / SCHEMA_FILENAME,
+             data_dir / MANIFEST_FILENAME]
+    signature = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            signature.append([path.name, stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            signature.append([path.name, -1, -1])
+    return signature
+
+
+def request_key(dataset: str, params: Optional[Dict[str, Any]] = None,
+                loader: Optional[str] = None, sources: Optional[List[list]] = None) -> str:
+    """Return the store key of a dataset request (``sources``: its :func:`sample_signature`)."""
+    canonical = json.dumps({'dataset': dataset, 'params': params or {}, 'loader': loader,
+                            'sources': sources},
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class DataService:
+    """
+    Unix-socket daemon that loads each dataset once and shares it.
+
+    Parameters
+    ----------
+    socket_path : str or Path, optional
+        Socket to listen on (default: :func:`default_socket_path`)
+    shm_dir : str or Path, optional
+        Shared-memory store directory (default: :func:`default_shm_dir`)
+    max_bytes : int
+        Store budget; least-recently-used datasets are evicted beyond it
+    data_dir : str or Path, optional
+        Sample dataset directory
+    mode : int
+        Socket permissions (0o600: owner only)
+    """
+
+    def __init__(self, socket_path=None, shm_dir=None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 data_dir=None, mode: int = 0o600):
+        self.socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        self.store = ResultStore(shm_dir if shm_dir is not None else default_shm_dir(),
+                                 max_bytes=max_bytes)
+        self.data_dir = data_dir
+        self.mode = mode
+        self.stats = {'requests': 0, 'loads': 0, 'coalesced': 0, 'hits': 0, 'errors': 0}
+        self._sources: Dict[str, str] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _load(self, dataset: str, params: Dict[str, Any], loader: Optional[str],
+              api_key_name: Optional[str]):
+        """Load a dataset in this process; returns (frame, data source)."""
+        from kranalytics.data_utils import load_data_with_fallback, load_sample_data
+
+        _serving.active = True
+        try:
+            params = dict(params)
+            compact = params.pop('compact', True)
+            if loader is not None:
+                func = allowed_loader(loader)
+            elif dataset in LOADERS:
+                func, api_key_name = LOADERS[dataset]
+            else:
+                func = None
+            if func is not None:
+                df = load_data_with_fallback(func, dataset, api_key_name,
+                                             data_dir=self.data_dir, compact=compact, **params)
+                return df, df.attrs.get('data_source', 'api')
+            if params:
+                raise ValueError(f"No loader registered for '{dataset}'; sample datasets "
+                                 f"take no parameters (got {sorted(params)})")
+            return load_sample_data(dataset, data_dir=self.data_dir, compact=compact), 'sample'
+        finally:
+            _serving.active = False
+
+    def get(self, dataset: str, params: Optional[Dict[str, Any]] = None,
+            loader: Optional[str] = None, api_key_name: Optional[str] = None) -> Dict[str, Any]:
+        """Publish a dataset (loading it at most once concurrently) and describe it."""
+        params = params or {}
+        # Sample files are part of the key: a regenerated dataset is loaded again
+        # instead of being served from a copy published before the change
+        key = request_key(dataset, params, loader, sample_signature(dataset, self.data_dir))
+        with self._lock:
+            self.stats['requests'] += 1
+            if self.store.contains(key):
+                self.stats['hits'] += 1
+                return self._reply(key)
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+
+        if owner:
+            try:
+                df, source = self._load(dataset, params, loader, api_key_name)
+                self.store.set(key, df, dataset)
+                with self._lock:
+                    self._sources[key] = source
+                    self.stats['loads'] += 1
+                future.set_result(None)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        future.result()
+        return self._reply(key)
+
+    def _reply(self, key: str) -> Dict[str, Any]:
+        return {'status': 'ok', 'key': key, 'store': str(self.store.cache_dir),
+                'data_source': self._sources.get(key, 'sample')}
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one protocol message."""
+        op = message.get('op')
+        try:
+            if op == 'get':
+                return self.get(message['dataset'], message.get('params'),
+                                message.get('loader'), message.get('api_key_name'))
+            if op == 'stats':
+                with self._lock:
+                    return {'status': 'ok', **self.stats, 'store': self.store.stats()}
+            if op == 'invalidate':
+                self.store.clear()
+                return {'status': 'ok'}
+            if op == 'ping':
+                return {'status': 'ok', 'pid': os.getpid()}
+            return {'status': 'error', 'error': f'Unknown op: {op!r}'}
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            logger.warning(f"Request {message!r} failed: {type(e).__name__}: {e}")
+            return {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+    def start(self) -> 'DataService':
+        """Listen in a background thread; returns self."""
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        reply = service.handle(json.loads(line))
+                    except ValueError:
+                        reply = {'status': 'error', 'error': 'Malformed request'}
+                    self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # Stale socket from a previous run
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.socket_path, self.mode)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name='kranalytics-data-service')
+        self._thread.start()
+        logger.info(f"Data service listening on {self.socket_path} "
+                    f"(store: {self.store.cache_dir})")
+        return self
+
+    def serve_forever(self) -> None:
+        """Listen until interrupted."""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop listening and remove the socket (the published data stays)."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> 'DataService':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class DataServiceClient:
+    """
+    Client of a running :class:`DataService`.
+
+    Parameters
+    ----------
+    socket_path : str or Path, optional
+        Service socket (default: :func:`default_socket_path`)
+    timeout : float
+        Seconds to wait for a reply (a first load may take a while)
+    """
+
+    def __init__(self, socket_path=None, timeout: float = DEFAULT_TIMEOUT):
+        self.socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        self.timeout = timeout
+
+    def request(self, op: str, **message) -> Dict[str, Any]:
+        """Send one message and return the reply; raises ConnectionError if unreachable."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps({'op': op, **message}).encode('utf-8') + b'\n')
+                with sock.makefile('rb') as reader:
+                    line = reader.readline(MAX_MESSAGE_BYTES)
+        except OSError as e:
+            raise ConnectionError(f"Data service at {self.socket_path} unavailable: {e}") from e
+        if not line:
+            raise ConnectionError(f"Data service at {self.socket_path} closed the connection")
+        return json.loads(line)
+
+    def get(self, dataset: str, loader: Optional[str] = None,
+            api_key_name: Optional[str] = None, **params) -> pd.DataFrame:
+        """
+        Return a dataset attached from shared memory.
+
+        Numeric, boolean and datetime columns are read-only memory maps of
+        the shared copy; copy a frame before modifying it in place.
+
+        Parameters
+        ----------
+        dataset : str
+            Dataset name
+        loader : str, optional
+            Live loader as ``'module:function'``, run by the service with
+            sample-data fallback (the API key must be set in its environment)
+        api_key_name : str, optional
+            Environment variable holding the loader's API key
+        **params
+            Loader keyword arguments (JSON-serializable) and ``compact``
+
+        Raises
+        ------
+        RuntimeError
+            If the service failed to load the dataset
+        """
+        for _ in range(2):
+            reply = self.request('get', dataset=dataset, params=params, loader=loader,
+                                 api_key_name=api_key_name)
+            if reply.get('status') != 'ok':
+                raise RuntimeError(reply.get('error', 'Data service error'))
+            df = ResultStore(reply['store'], max_bytes=DEFAULT_MAX_BYTES).get(reply['key'])
+            if df is not None:
+                df.attrs['data_source'] = reply['data_source']
+                return df
+        raise RuntimeError(f"'{dataset}' was evicted while attaching; retry")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the service's request, load, coalescing and store counters."""
+        return self.request('stats')
+
+
+def client() -> Optional[DataServiceClient]:
+    """Return a client when ``KRANALYTICS_DATA_SERVICE`` is set (and not inside the service)."""
+    path = os.environ.get(ENV_VARIABLE, '').strip()
+    if not path or getattr(_serving, 'active', False):
+        return None
+    return DataServiceClient(path)
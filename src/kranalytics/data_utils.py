@@ -0,0 +1,225 @@
+"""
+Core data loading utilities.
+
+Tutorials load data through :func:`load_data_with_fallback`, which tries a
+live API loader when its key is configured and falls back to the bundled
+sample datasets otherwise. Sample datasets are read through their columnar
+copy when present (see :mod:`kranalytics.columnar`) and cast to the compact
+dtypes registered in ``MANIFEST.json`` (see :mod:`kranalytics.schema`).
+When ``KRANALYTICS_DATA_SERVICE`` points at a running
+:mod:`kranalytics.data_service`, both are served from its shared-memory copy
+instead of being loaded in every kernel.
+
+Example
+-------
+>>> df = load_sample_data('bls_employment_national')
+>>> df = load_sample_data('bls_employment_national', memory_budget='1MB')
+>>> df.attrs['memory_report']['saved_bytes']
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Union
+
+# pandas, columnar and schema are imported by the loaders, so scripts that
+# only need get_api_key stay free of the data stack
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_FORMATS = ('csv', 'columnar')
+
+
+def get_api_key(key_name: str, required: bool = True) -> Optional[str]:
+    """
+    Return an API key from the environment.
+
+    Parameters
+    ----------
+    key_name : str
+        Environment variable name (e.g. 'CENSUS_API_KEY')
+    required : bool
+        Raise if the key is not set
+
+    Returns
+    -------
+    str or None
+        The key, or None when it is not set and not required
+
+    Raises
+    ------
+    ValueError
+        If the key is required but not set
+    """
+    value = os.environ.get(key_name, '').strip()
+    if value:
+        return value
+    if required:
+        raise ValueError(f"{key_name} is not set; export it as an environment variable "
+                         f"(see docs/api-configuration.md)")
+    return None
+
+
+def load_sample_data(dataset_name: str, columns: Optional[Iterable[str]] = None,
+                     data_dir=None, compact: bool = True,
+                     memory_budget: Optional[Union[int, str]] = None) -> 'pd.DataFrame':
+    """
+    Load a bundled sample dataset.
+
+    Parameters
+    ----------
+    dataset_name : str
+        Dataset name, with or without ``.csv`` (e.g. 'census_income_2022')
+    columns : list of str, optional
+        Column projection
+    data_dir : str or Path, optional
+        Sample dataset directory (default: data/sample_datasets)
+    compact : bool
+        Apply the dtypes registered in ``MANIFEST.json`` (or, for datasets
+        without a registered schema, the inferred lossless ones)
+    memory_budget : int or str, optional
+        Byte budget ('64MB'); downcasts further when the compact frame is
+        still larger and records the savings in ``attrs['memory_report']``
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    if data_dir is None and memory_budget is None:
+        df = _from_service(dataset_name, compact=compact)
+        if df is not None:
+            return df[list(columns)] if columns is not None else df
+    from kranalytics.columnar import load_sample_dataset
+
+    df = load_sample_dataset(dataset_name, columns, data_dir=data_dir)
+    return _compact(df, dataset_name, data_dir, compact, memory_budget)
+
+
+def _from_service(dataset_name: str, loader: Optional[Callable] = None,
+                  api_key_name: Optional[str] = None, **params) -> Optional['pd.DataFrame']:
+    """Fetch from the shared data service; None when it is unset, down or cannot serve."""
+    from kranalytics import data_service
+
+    client = data_service.client()
+    if client is None:
+        return None
+    spec = None
+    if loader is not None:
+        spec = data_service.loader_spec(loader)
+        if spec is None:
+            return None
+    try:
+        json.dumps(params)
+    except TypeError:
+        return None
+    try:
+        return client.get(dataset_name, loader=spec, api_key_name=api_key_name, **params)
+    except (ConnectionError, RuntimeError) as e:
+        logger.info(f"Data service unavailable ({e}); loading '{dataset_name}' locally")
+        return None
+
+
+def _compact(df: 'pd.DataFrame', dataset_name: str, data_dir, compact: bool,
+             memory_budget) -> 'pd.DataFrame':
+    from kranalytics.schema import apply_schema, fit_memory_budget, infer_schema, load_schema
+
+    schema = load_schema(dataset_name, data_dir) if compact else {}
+    if compact and schema is None:
+        schema = infer_schema(df)
+    if memory_budget is not None:
+        return fit_memory_budget(df, memory_budget, schema)
+    return apply_schema(df, schema) if schema else df
+
+
+def load_data_with_fallback(api_loader_func: Optional[Callable[..., 'pd.DataFrame']],
+                            dataset_name: str, api_key_name: Optional[str] = None,
+                            data_dir=None, compact: bool = True,
+                            memory_budget: Optional[Union[int, str]] = None,
+                            **loader_kwargs) -> 'pd.DataFrame':
+    """
+    Load live API data, falling back to the bundled sample dataset.
+
+    The API loader runs only when ``api_key_name`` is unset or its key is
+    configured; any exception it raises falls back to the sample data.
+
+    Parameters
+    ----------
+    api_loader_func : callable, optional
+        ``api_loader_func(**loader_kwargs) -> DataFrame``
+    dataset_name : str
+        Sample dataset used as the fallback and for the dtype schema
+    api_key_name : str, optional
+        Environment variable holding the loader's API key
+    data_dir, compact, memory_budget
+        As in :func:`load_sample_data`; the registered schema is applied to
+        live data too, so both paths return the same dtypes
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``attrs['data_source']`` is 'api' or 'sample'
+    """
+    if data_dir is None and memory_budget is None:
+        df = _from_service(dataset_name, api_loader_func, api_key_name, compact=compact,
+                           **loader_kwargs)
+        if df is not None:
+            return df
+    has_key = api_key_name is None or get_api_key(api_key_name, required=False) is not None
+    if api_loader_func is not None and has_key:
+        try:
+            df = _compact(api_loader_func(**loader_kwargs), dataset_name, data_dir, compact,
+                          memory_budget)
+            df.attrs['data_source'] = 'api'
+            return df
+        except Exception as e:
+            logger.warning(f"API load failed ({type(e).__name__}: {e}); "
+                           f"using sample data '{dataset_name}'")
+    elif api_loader_func is not None:
+        logger.info(f"{api_key_name} not set; using sample data '{dataset_name}'")
+
+    df = load_sample_data(dataset_name, data_dir=data_dir, compact=compact,
+                          memory_budget=memory_budget)
+    df.attrs['data_source'] = 'sample'
+    return df
+
+
+def save_sample_data(df: 'pd.DataFrame', dataset_name: str, format: str = 'csv',
+                     data_dir=None) -> Path:
+    """
+    Save a frame as a sample dataset and register its dtypes.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Data to save
+    dataset_name : str
+        Dataset name, with or without ``.csv``
+    format : str
+        'csv' or 'columnar' (typed ``.npy`` columns)
+    data_dir : str or Path, optional
+        Sample dataset directory (default: data/sample_datasets)
+
+    Returns
+    -------
+    Path
+        The written CSV file or columnar directory
+    """
+    from kranalytics.columnar import DEFAULT_DATA_DIR, columnar_path, write_columnar
+    from kranalytics.schema import infer_schema, register_schema
+
+    if format not in SAMPLE_FORMATS:
+        raise ValueError(f"Unknown format '{format}'. Choose from: {', '.join(SAMPLE_FORMATS)}")
+    data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    if format == 'csv':
+        path = data_dir / f'{Path(dataset_name).stem}.csv'
+        df.to_csv(path, index=False)
+    else:
+        path = columnar_path(dataset_name, data_dir)
+        write_columnar(df, path)
+    register_schema(dataset_name, infer_schema(df), data_dir)
+    return path
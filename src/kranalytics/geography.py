@@ -0,0 +1,469 @@
+"""
+Canonical geography index and integer-keyed multi-source panels.
+
+The sample datasets identify geographies differently: the Census files
+carry ``state_name`` and ``state_fips``, the FBI and EPA samples only a
+``state`` name, and the QCEW county sample ``area_fips`` with names such as
+``'Los Angeles, CA'``. :class:`GeographyIndex` maps every form to an integer
+FIPS code:
+
+- states, DC and the territories by two-digit FIPS (``'06'``, ``6``), name
+  (case, punctuation and ``Saint``/``St.`` insensitive) and USPS abbreviation
+- counties by five-digit FIPS or by ``'<county>, <state>'`` names, with the
+  state part given as a name or abbreviation; the county -> state relation
+  is ``fips // 1000``
+
+State entries are built in; counties are learned from the registered
+county-level sources. The index is built once and persisted as typed
+columns under ``data/cache/geography``, together with the list of sources
+it was built from, so registering a new county source rebuilds it.
+
+:func:`build_panel` aligns registered datasets on integer ``(fips, year)``
+keys. Each source's geography column is resolved once per file content
+(names are matched per distinct value, not per row) into sorted key
+positions, and every value column is placed with a single ``take``. Rows
+whose geography cannot be resolved are never dropped silently: they are
+listed in ``panel.attrs['unmatched']`` (or raise with ``strict=True``).
+
+Example
+-------
+>>> panel = build_panel(['census_income_2022', 'fbi_crime_stats_sample',
+...                      'epa_environmental_burden_sample'])
+>>> panel.query('year == 2022')[['fips', 'median_household_income', 'violent_crime_rate']]
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+from kranalytics.columnar import (SCHEMA_FILENAME, load_sample_dataset, read_columnar,
+                                  write_columnar)
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'geography'
+SOURCES_FILENAME = '_sources.json'
+LEVELS = ('state', 'county')
+UNMATCHED = -1
+
+# (FIPS, name, USPS abbreviation) for the states, DC and the territories
+STATES = (
+    (1, 'Alabama', 'AL'), (2, 'Alaska', 'AK'), (4, 'Arizona', 'AZ'), (5, 'Arkansas', 'AR'),
+    (6, 'California', 'CA'), (8, 'Colorado', 'CO'), (9, 'Connecticut', 'CT'),
+    (10, 'Delaware', 'DE'), (11, 'District of Columbia', 'DC'), (12, 'Florida', 'FL'),
+    (13, 'Georgia', 'GA'), (15, 'Hawaii', 'HI'), (16, 'Idaho', 'ID'), (17, 'Illinois', 'IL'),
+    (18, 'Indiana', 'IN'), (19, 'Iowa', 'IA'), (20, 'Kansas', 'KS'), (21, 'Kentucky', 'KY'),
+    (22, 'Louisiana', 'LA'), (23, 'Maine', 'ME'), (24, 'Maryland', 'MD'),
+    (25, 'Massachusetts', 'MA'), (26, 'Michigan', 'MI'), (27, 'Minnesota', 'MN'),
+    (28, 'Mississippi', 'MS'), (29, 'Missouri', 'MO'), (30, 'Montana', 'MT'),
+    (31, 'Nebraska', 'NE'), (32, 'Nevada', 'NV'), (33, 'New Hampshire', 'NH'),
+    (34, 'New Jersey', 'NJ'), (35, 'New Mexico', 'NM'), (36, 'New York', 'NY'),
+    (37, 'North Carolina', 'NC'), (38, 'North Dakota', 'ND'), (39, 'Ohio', 'OH'),
+    (40, 'Oklahoma', 'OK'), (41, 'Oregon', 'OR'), (42, 'Pennsylvania', 'PA'),
+    (44, 'Rhode Island', 'RI'), (45, 'South Carolina', 'SC'), (46, 'South Dakota', 'SD'),
+    (47, 'Tennessee', 'TN'), (48, 'Texas', 'TX'), (49, 'Utah', 'UT'), (50, 'Vermont', 'VT'),
+    (51, 'Virginia', 'VA'), (53, 'Washington', 'WA'), (54, 'West Virginia', 'WV'),
+    (55, 'Wisconsin', 'WI'), (56, 'Wyoming', 'WY'), (60, 'American Samoa', 'AS'),
+    (66, 'Guam', 'GU'), (69, 'Northern Mariana Islands', 'MP'), (72, 'Puerto Rico', 'PR'),
+    (78, 'U.S. Virgin Islands', 'VI'),
+)
+
+_STATE_ALIASES = {'washington dc': 11, 'washington d c': 11, 'us virgin islands': 78,
+                  'virgin islands': 78}
+_COUNTY_SUFFIX = re.compile(r' (county|parish|borough|census area|city and borough|'
+                            r'municipality|municipio)$')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name: str) -> str:
+    """Return the lookup form of a place name ('St. Louis County' -> 'st louis county')."""
+    text = _NON_ALNUM.sub(' ', str(name).casefold()).strip()
+    return re.sub(r'\bsaint\b', 'st', text)
+
+
+def _county_key(name: str) -> str:
+    return _COUNTY_SUFFIX.sub('', normalize_name(name))
+
+
+class GeographyIndex:
+    """
+    FIPS <-> name <-> abbreviation lookups for states and counties.
+
+    Parameters
+    ----------
+    table : pandas.DataFrame, optional
+        Rows with fips, level, name, abbreviation and state_fips (default:
+        the built-in states only)
+    """
+
+    COLUMNS = ['fips', 'level', 'name', 'abbreviation', 'state_fips']
+
+    def __init__(self, table: Optional[pd.DataFrame] = None):
+        if table is None:
+            table = pd.DataFrame(STATES, columns=['fips', 'name', 'abbreviation'])
+            table['level'] = 'state'
+            table['state_fips'] = table['fips']
+        self.table = (table[self.COLUMNS].astype({'fips': np.int32, 'state_fips': np.int32})
+                      .sort_values(['level', 'fips'], kind='stable').reset_index(drop=True))
+        self._build_lookups()
+
+    def _build_lookups(self) -> None:
+        states = self.table[self.table['level'] == 'state']
+        counties = self.table[self.table['level'] == 'county']
+        self._states: Dict[str, int] = dict(_STATE_ALIASES)
+        for fips, name, abbreviation in zip(states['fips'], states['name'],
+                                            states['abbreviation']):
+            self._states[normalize_name(name)] = int(fips)
+            self._states[abbreviation.lower()] = int(fips)
+        self._counties: Dict[Tuple[int, str], int] = {
+            (int(state), _county_key(name)): int(fips)
+            for fips, name, state in zip(counties['fips'], counties['name'],
+                                         counties['state_fips'])}
+        self._known = {level: set(self.table.loc[self.table['level'] == level, 'fips'].tolist())
+                       for level in LEVELS}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def add_counties(self, fips, names) -> int:
+        """
+        Learn county names from ``(fips, name)`` pairs; returns the number added.
+
+        Names may carry a state suffix (``'Los Angeles, CA'``), which is
+        stripped; existing counties are kept.
+        """
+        fips = pd.to_numeric(pd.Series(fips), errors='coerce').to_numpy()
+        rows = []
+        for code, name in zip(fips, names):
+            if np.isnan(code) or int(code) in self._known['county'] or pd.isna(name):
+                continue
+            code = int(code)
+            rows.append((code, 'county', str(name).split(',')[0].strip(), '', code // 1000))
+            self._known['county'].add(code)
+        if rows:
+            added = pd.DataFrame(rows, columns=self.COLUMNS)
+            self.table = (pd.concat([self.table, added], ignore_index=True)
+                          .astype({'fips': np.int32, 'state_fips': np.int32})
+                          .sort_values(['level', 'fips'], kind='stable').reset_index(drop=True))
+            self._build_lookups()
+        return len(rows)
+
+    def _resolve_one(self, value, level: str) -> int:
+        if isinstance(value, (int, np.integer, float, np.floating)) and not pd.isna(value):
+            code = int(value)
+            if level == 'state':
+                return code if code in self._known['state'] else UNMATCHED
+            # The county list is learned from the data, so any code of a known state is valid
+            known = code in self._known['county'] or code // 1000 in self._known['state']
+            return code if code >= 1000 and known else UNMATCHED
+        if pd.isna(value):
+            return UNMATCHED
+        text = str(value).strip()
+        if text.isdigit():
+            return self._resolve_one(int(text), level)
+        if level == 'state':
+            return self._states.get(normalize_name(text), UNMATCHED)
+        if ',' not in text:
+            return UNMATCHED
+        county, state = text.rsplit(',', 1)
+        state_fips = self._states.get(normalize_name(state), UNMATCHED)
+        return self._counties.get((state_fips, _county_key(county)), UNMATCHED)
+
+    def resolve(self, values, level: str = 'state') -> np.ndarray:
+        """
+        Map FIPS codes, names or abbreviations to integer FIPS codes.
+
+        Each distinct value is resolved once. Unresolved values map to -1.
+
+        Parameters
+        ----------
+        values : array-like
+            Codes ('06', 6, '06037') or names ('California', 'CA',
+            'Los Angeles, CA', 'Los Angeles County, California')
+        level : str
+            'state' or 'county'
+
+        Returns
+        -------
+        numpy.ndarray
+            int32 FIPS codes
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level!r}. Must be one of: {', '.join(LEVELS)}")
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        resolved = np.array([self._resolve_one(value, level) for value in uniques],
+                            dtype=np.int32)
+        return np.where(codes >= 0, resolved[np.maximum(codes, 0)], UNMATCHED).astype(np.int32)
+
+    def names(self, fips, level: str = 'state') -> np.ndarray:
+        """Return the names of FIPS codes (None where unknown)."""
+        lookup = self.table[self.table['level'] == level].set_index('fips')['name']
+        return lookup.reindex(np.asarray(fips, dtype=np.int64)).to_numpy(dtype=object)
+
+    def abbreviations(self, fips) -> np.ndarray:
+        """Return the USPS abbreviations of state FIPS codes (None where unknown)."""
+        lookup = self.table[self.table['level'] == 'state'].set_index('fips')['abbreviation']
+        return lookup.reindex(np.asarray(fips, dtype=np.int64)).to_numpy(dtype=object)
+
+    @staticmethod
+    def state_of(county_fips) -> np.ndarray:
+        """Return the state FIPS of county FIPS codes."""
+        return (np.asarray(county_fips, dtype=np.int64) // 1000).astype(np.int32)
+
+    def save(self, directory=None) -> Path:
+        """Persist the index as typed columns; returns the directory."""
+        directory = Path(directory) if directory is not None else DEFAULT_INDEX_DIR
+        write_columnar(self.table, directory)
+        return directory
+
+    @classmethod
+    def load(cls, directory=None) -> 'GeographyIndex':
+        """Load a persisted index."""
+        directory = Path(directory) if directory is not None else DEFAULT_INDEX_DIR
+        return cls(read_columnar(directory, mmap=False))
+
+
+@dataclass
+class PanelSource:
+    """
+    How to key one dataset on (fips, year).
+
+    Attributes
+    ----------
+    name : str
+        Sample dataset name (and default loader)
+    geography : str
+        Column holding FIPS codes, names or abbreviations
+    level : str
+        'state' or 'county'
+    year : str or int
+        Year column, or a constant year for single-year datasets
+    columns : list of str, optional
+        Value columns (default: every column except keys and metadata)
+    county_names : str, optional
+        Column with county names to add to the geography index
+    loader : callable, optional
+        Returns the dataset (default: ``load_sample_dataset(name)``)
+    """
+
+    name: str
+    geography: str
+    level: str = 'state'
+    year: object = 'year'
+    columns: Optional[List[str]] = None
+    county_names: Optional[str] = None
+    loader: Optional[Callable[[], pd.DataFrame]] = field(default=None, repr=False)
+
+    def load(self, data_dir=None) -> pd.DataFrame:
+        if self.loader is not None:
+            return self.loader()
+        return load_sample_dataset(self.name, data_dir=data_dir)
+
+
+# Columns describing a row rather than measuring something
+METADATA_COLUMNS = frozenset({'source', 'generated_date', 'state', 'state_name', 'state_fips',
+                              'area_fips', 'county_name', 'year', 'quarter'})
+
+SOURCES: Dict[str, PanelSource] = {}
+
+# Index directory -> (county source signature, index)
+_indexes: Dict[Path, Tuple[List, GeographyIndex]] = {}
+_index_lock = threading.Lock()
+# Source name -> (content signature, int64 keys, unmatched geography values)
+_keys: Dict[str, Tuple[object, np.ndarray, List]] = {}
+
+
+def register_source(source: PanelSource) -> PanelSource:
+    """Register a dataset for :func:`build_panel` (replacing one with the same name)."""
+    if source.level not in LEVELS:
+        raise ValueError(f"Unknown level: {source.level!r}. Must be one of: {', '.join(LEVELS)}")
+    SOURCES[source.name] = source
+    _keys.pop(source.name, None)
+    return source
+
+
+for _source in (
+    PanelSource('census_income_2022', 'state_fips'),
+    PanelSource('census_inequality_2022', 'state_fips'),
+    PanelSource('fbi_crime_stats_sample', 'state'),
+    PanelSource('epa_environmental_burden_sample', 'state'),
+    PanelSource('bls_employment_counties_sample', 'area_fips', level='county',
+                county_names='county_name'),
+):
+    register_source(_source)
+
+
+def _county_sources() -> List[PanelSource]:
+    return [source for source in SOURCES.values()
+            if source.level == 'county' and source.county_names]
+
+
+def _sources_signature() -> List:
+    return sorted([source.name, source.geography, source.county_names]
+                  for source in _county_sources())
+
+
+def load_geography_index(directory=None, data_dir=None, rebuild: bool = False) -> GeographyIndex:
+    """
+    Return the persisted geography index, building it on first use.
+
+    The index holds the built-in states plus the counties named in every
+    registered county-level source. It is cached in memory per directory,
+    and rebuilt (in memory and on disk) when the registered county sources
+    differ from those it was built from.
+    """
+    directory = (Path(directory) if directory is not None else DEFAULT_INDEX_DIR).resolve()
+    signature = _sources_signature()
+    with _index_lock:
+        cached = _indexes.get(directory)
+        if cached is not None and cached[0] == signature and not rebuild:
+            return cached[1]
+        sources_file = directory / SOURCES_FILENAME
+        if not rebuild and (directory / SCHEMA_FILENAME).exists() and sources_file.exists() \
+                and json.loads(sources_file.read_text()) == signature:
+            index = GeographyIndex.load(directory)
+            _indexes[directory] = (signature, index)
+            return index
+        index = GeographyIndex()
+        for source in _county_sources():
+            try:
+                df = source.load(data_dir)
+            except (FileNotFoundError, OSError):
+                continue
+            index.add_counties(df[source.geography], df[source.county_names])
+        index.save(directory)
+        atomic_write_bytes(sources_file, json.dumps(signature).encode('utf-8'))
+        _indexes[directory] = (signature, index)
+        return index
+
+
+def _source_keys(source: PanelSource, df: pd.DataFrame,
+                 index: GeographyIndex) -> Tuple[np.ndarray, List]:
+    """Return int64 ``fips * 10_000 + year`` keys per row, cached per content."""
+    signature = (id(index), len(index), pd.util.hash_pandas_object(
+        df[[source.geography] + ([source.year] if isinstance(source.year, str) else [])],
+        index=False).sum())
+    cached = _keys.get(source.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2]
+
+    fips = index.resolve(df[source.geography], source.level).astype(np.int64)
+    if isinstance(source.year, str):
+        years = pd.to_numeric(df[source.year], errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        years = np.full(len(df), float(source.year))
+    keys = np.where((fips >= 0) & np.isfinite(years),
+                    fips * 10_000 + np.nan_to_num(years).astype(np.int64), UNMATCHED)
+    unmatched = sorted(set(df[source.geography][fips < 0].astype(str)))
+    _keys[source.name] = (signature, keys, unmatched)
+    return keys, unmatched
+
+
+def build_panel(sources: Optional[Sequence[str]] = None, level: str = 'state',
+                years: Optional[Iterable[int]] = None, data_dir=None,
+                index: Optional[GeographyIndex] = None, strict: bool = False) -> pd.DataFrame:
+    """
+    Align registered datasets on integer (fips, year) keys.
+
+    Parameters
+    ----------
+    sources : sequence of str, optional
+        Registered source names (default: every source of ``level``, plus
+        state sources for a county panel)
+    level : str
+        Panel geography: 'state' or 'county'. State-level sources are
+        broadcast to their counties in a county panel; county-level sources
+        cannot join a state panel (aggregation is left to the caller).
+    years : iterable of int, optional
+        Keep only these years
+    data_dir : str or Path, optional
+        Sample dataset directory
+    index : GeographyIndex, optional
+        Geography index (default: :func:`load_geography_index`)
+    strict : bool
+        Raise ValueError when a source has unresolvable geographies
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (fips, year) present in any panel-level source, sorted,
+        with int32 ``fips``, int16 ``year``, ``name`` (and ``state_fips``
+        for counties) followed by each source's value columns. A column
+        present in several sources is suffixed with the source name.
+        Duplicate keys within a source keep the last row.
+        ``attrs['unmatched']`` maps sources to geography values that could
+        not be resolved.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level: {level!r}. Must be one of: {', '.join(LEVELS)}")
+    if sources is None:
+        sources = [name for name, s in SOURCES.items() if s.level == level or level == 'county']
+    unknown = [name for name in sources if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown sources: {unknown}. Must be any of: {', '.join(SOURCES)}")
+    specs = [SOURCES[name] for name in sources]
+    if level == 'state' and any(s.level == 'county' for s in specs):
+        raise ValueError("County-level sources cannot join a state panel; "
+                         "aggregate them to states first")
+    index = index or load_geography_index(data_dir=data_dir)
+    year_filter = None if years is None else np.array(sorted(set(years)), dtype=np.int64)
+
+    loaded = []
+    unmatched = {}
+    for spec in specs:
+        df = spec.load(data_dir)
+        keys, missing = _source_keys(spec, df, index)
+        if missing:
+            unmatched[spec.name] = missing
+        valid = keys >= 0
+        if year_filter is not None:
+            valid &= np.isin(keys % 10_000, year_filter)
+        loaded.append((spec, df, keys, valid))
+    if unmatched and strict:
+        raise ValueError(f"Unresolved geographies: {unmatched}")
+
+    # Panel universe: sorted unique keys of the panel-level sources
+    panel_keys = [keys[valid] for spec, _, keys, valid in loaded if spec.level == level]
+    universe = np.unique(np.concatenate(panel_keys)) if panel_keys else np.empty(0, np.int64)
+    fips, year = universe // 10_000, universe % 10_000
+    state_keys = (fips // 1000) * 10_000 + year if level == 'county' else universe
+
+    value_columns = {
+        spec.name: spec.columns or [c for c in df.columns if c not in METADATA_COLUMNS
+                                    and c != spec.geography and c != spec.year
+                                    and c != spec.county_names]
+        for spec, df, _, _ in loaded}
+    counts = pd.Series([c for cols in value_columns.values() for c in cols]).value_counts()
+
+    result = {'fips': fips.astype(np.int32), 'year': year.astype(np.int16),
+              'name': index.names(fips, level)}
+    if level == 'county':
+        result['state_fips'] = GeographyIndex.state_of(fips)
+    for spec, df, keys, valid in loaded:
+        rows = np.flatnonzero(valid)
+        # Positional indexer: panel row -> source row (-1 where the source has no row)
+        targets = state_keys if spec.level != level else universe
+        order = np.argsort(keys[rows], kind='stable')
+        sorted_keys = keys[rows][order]
+        if len(sorted_keys) == 0:
+            # No rows left after the year filter: the source contributes only gaps
+            taker = np.full(len(targets), -1)
+        else:
+            last = np.searchsorted(sorted_keys, targets, side='right') - 1
+            found = (last >= 0) & (sorted_keys[np.maximum(last, 0)] == targets)
+            taker = np.where(found, rows[order][np.maximum(last, 0)], -1)
+        gaps = bool((taker < 0).any())
+        for column in value_columns[spec.name]:
+            name = column if counts[column] == 1 else f'{column}_{spec.name}'
+            values, dtype = df[column].array, df[column].dtype
+            if gaps and isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+                values = pd.array(values, dtype=dtype.name.capitalize())  # Keep integers
+            result[name] = pd.api.extensions.take(values, taker, allow_fill=True)
+    panel = pd.DataFrame(result)
+    panel.attrs['unmatched'] = unmatched
+    return panel
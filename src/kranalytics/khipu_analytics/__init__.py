@@ -0,0 +1,43 @@
+"""
+Khipu analytics: execution tracking and provenance for notebooks.
+
+Attributes are resolved on first access (PEP 562), like the parent package.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+_SUBMODULES = frozenset({'execution_tracking'})
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'setup_notebook_tracking': 'execution_tracking',
+    'finalize_notebook_tracking': 'execution_tracking',
+    'get_execution_summary': 'execution_tracking',
+    'list_recent_executions': 'execution_tracking',
+    'track_stage': 'execution_tracking',
+    'tracked_stage': 'execution_tracking',
+    'record_cache_hit': 'execution_tracking',
+    'slowest_stages': 'execution_tracking',
+}
+
+__all__ = sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from kranalytics.khipu_analytics.execution_tracking import (
+        finalize_notebook_tracking, get_execution_summary, list_recent_executions,
+        record_cache_hit, setup_notebook_tracking, slowest_stages, track_stage, tracked_stage)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
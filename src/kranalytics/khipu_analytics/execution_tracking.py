@@ -0,0 +1,384 @@
+"""
+Execution tracking for notebooks and pipelines.
+
+Every notebook run gets an execution record: a unique ID, environment
+metadata, the random seed, whole-run timing and, with stage
+instrumentation, a breakdown of where the run spent its time. Records are
+written as JSON to ``logs/execution/exec_<execution_id>.json``.
+
+Stages are named blocks of work (the architecture doc's pipeline: fetch,
+clean, feature, fit, evaluate, visualize, export). Each stage records wall
+time, CPU time, the growth of the process's peak RSS, rows in/out and
+cache hits. Instrumentation costs a few microseconds per stage, so it can
+stay on in production runs.
+
+Example
+-------
+>>> metadata = setup_notebook_tracking(notebook_name="Income_Analysis.ipynb", seed=42)
+>>> with track_stage('fetch') as stage:
+...     df = load_sample_dataset('census_income_2022')
+...     stage.rows_out = len(df)
+>>> @tracked_stage('fit')
+... def fit_model(df): ...
+>>> final_metadata = finalize_notebook_tracking(metadata, results={'data_points': len(df)})
+>>> slowest_stages(limit=10)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from kranalytics._fsutil import atomic_write_bytes
+
+DEFAULT_LOG_DIR = Path(__file__).resolve().parents[3] / 'logs' / 'execution'
+LOG_PREFIX = 'exec_'
+
+# Stage names used by the analysis pipeline in docs/system-architecture.md
+PIPELINE_STAGES = ('fetch', 'clean', 'feature', 'fit', 'evaluate', 'visualize', 'export')
+
+_active_execution: Optional[Dict[str, Any]] = None
+_current_stage: contextvars.ContextVar = contextvars.ContextVar('kranalytics_stage', default=None)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Return the process's peak resident set size in bytes, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    if hours:
+        return f'{hours}h {minutes}m {seconds:.1f}s'
+    if minutes:
+        return f'{minutes}m {seconds:.1f}s'
+    return f'{seconds:.2f}s'
+
+
+def _environment() -> Dict[str, Any]:
+    packages = {}
+    for name in ('numpy', 'pandas', 'statsmodels', 'sklearn', 'plotly'):
+        module = sys.modules.get(name)
+        if module is not None:
+            packages[name] = getattr(module, '__version__', 'unknown')
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'hostname': socket.gethostname(),
+        'cwd': os.getcwd(),
+        'packages': packages,
+    }
+
+
+def setup_notebook_tracking(notebook_name: str, version: str = 'v1.0', seed: int = 42,
+                            save_log: bool = True, log_dir=None) -> Dict[str, Any]:
+    """
+    Start an execution record and seed the random number generators.
+
+    Parameters
+    ----------
+    notebook_name : str
+        Notebook (or pipeline) name
+    version : str
+        Notebook version
+    seed : int
+        Seed applied to ``random`` and ``numpy.random``
+    save_log : bool
+        Write the record to the execution log directory when finalized
+    log_dir : str or Path, optional
+        Log directory (default: logs/execution)
+
+    Returns
+    -------
+    dict
+        Execution metadata; it becomes the active execution that stages
+        are recorded into
+    """
+    global _active_execution
+    import random
+
+    import numpy as np
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    now = datetime.now()
+    metadata = {
+        'execution_id': f'{now:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}',
+        'notebook_name': notebook_name,
+        'version': version,
+        'seed': seed,
+        'start_time': now.isoformat(),
+        'timestamp': now.isoformat(),
+        'environment': _environment(),
+        'save_log': save_log,
+        'log_dir': str(Path(log_dir) if log_dir is not None else DEFAULT_LOG_DIR),
+        'stages': [],
+        '_start_perf': time.perf_counter(),
+        '_start_cpu': time.process_time(),
+    }
+    _active_execution = metadata
+    return metadata
+
+
+def finalize_notebook_tracking(metadata: Dict[str, Any], results: Optional[Dict] = None,
+                               errors: Optional[List] = None) -> Dict[str, Any]:
+    """
+    Complete an execution record and write it to the log directory.
+
+    Returns
+    -------
+    dict
+        The metadata with end_time, duration_seconds, duration_formatted,
+        cpu_seconds, status, results, errors and log_file (None when the
+        log is not saved)
+    """
+    global _active_execution
+    errors = list(errors or [])
+    duration = time.perf_counter() - metadata.pop('_start_perf', time.perf_counter())
+    cpu = time.process_time() - metadata.pop('_start_cpu', time.process_time())
+    metadata.update({
+        'end_time': datetime.now().isoformat(),
+        'duration_seconds': duration,
+        'duration_formatted': _format_duration(duration),
+        'cpu_seconds': cpu,
+        'status': 'failed' if errors else 'completed',
+        'results': results or {},
+        'errors': [str(e) for e in errors],
+        'log_file': None,
+    })
+
+    if metadata.get('save_log', True):
+        path = Path(metadata['log_dir']) / f"{LOG_PREFIX}{metadata['execution_id']}.json"
+        metadata['log_file'] = str(path)
+        atomic_write_bytes(path, json.dumps(metadata, indent=2, default=str).encode('utf-8'))
+
+    if _active_execution is metadata:
+        _active_execution = None
+    return metadata
+
+
+def get_active_execution() -> Optional[Dict[str, Any]]:
+    """Return the execution started by the last ``setup_notebook_tracking``, if running."""
+    return _active_execution
+
+
+def get_execution_summary(execution_id: str, log_dir=None) -> Dict[str, Any]:
+    """Return the stored record of one execution."""
+    log_dir = Path(log_dir) if log_dir is not None else DEFAULT_LOG_DIR
+    return json.loads((log_dir / f'{LOG_PREFIX}{execution_id}.json').read_text())
+
+
+def list_recent_executions(limit: int = 10, log_dir=None,
+                           notebook_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Return the most recent execution records, newest first.
+
+    Parameters
+    ----------
+    limit : int
+        Maximum number of records
+    log_dir : str or Path, optional
+        Log directory (default: logs/execution)
+    notebook_name : str, optional
+        Only return executions of this notebook
+    """
+    log_dir = Path(log_dir) if log_dir is not None else DEFAULT_LOG_DIR
+    if not log_dir.exists():
+        return []
+    records = []
+    # Execution IDs start with a sortable timestamp
+    for path in sorted(log_dir.glob(f'{LOG_PREFIX}*.json'), reverse=True):
+        try:
+            record = json.loads(path.read_text())
+        except ValueError:
+            continue
+        if notebook_name is not None and record.get('notebook_name') != notebook_name:
+            continue
+        records.append(record)
+        if len(records) >= limit:
+            break
+    return records
+
+
+class StageRecord:
+    """
+    Measurements of one stage; ``rows_in``, ``rows_out`` and ``cache_hits``
+    may be set or incremented inside the stage.
+    """
+
+    __slots__ = ('name', 'parent', 'rows_in', 'rows_out', 'cache_hits', 'wall_seconds',
+                 'cpu_seconds', 'peak_rss_delta_bytes', 'status', 'started_at')
+
+    def __init__(self, name: str, parent: Optional[str] = None, rows_in: Optional[int] = None):
+        self.name = name
+        self.parent = parent
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.cache_hits = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_delta_bytes: Optional[int] = None
+        self.status = 'running'
+        self.started_at = datetime.now().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+@contextmanager
+def track_stage(name: str, rows_in: Optional[int] = None,
+                metadata: Optional[Dict[str, Any]] = None) -> Iterator[StageRecord]:
+    """
+    Time a named stage and record it in the execution log.
+
+    Parameters
+    ----------
+    name : str
+        Stage name, e.g. one of PIPELINE_STAGES
+    rows_in : int, optional
+        Rows entering the stage
+    metadata : dict, optional
+        Execution record to append to (default: the active execution);
+        without one the stage is still measured but not logged
+
+    Yields
+    ------
+    StageRecord
+        Set ``rows_out`` (and ``cache_hits``) on it inside the block
+    """
+    parent = _current_stage.get()
+    stage = StageRecord(name, parent.name if parent is not None else None, rows_in)
+    token = _current_stage.set(stage)
+    peak_before = _peak_rss_bytes()
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    try:
+        yield stage
+        stage.status = 'completed'
+    except BaseException:
+        stage.status = 'failed'
+        raise
+    finally:
+        stage.wall_seconds = time.perf_counter() - start
+        stage.cpu_seconds = time.process_time() - start_cpu
+        peak_after = _peak_rss_bytes()
+        if peak_before is not None:
+            stage.peak_rss_delta_bytes = peak_after - peak_before
+        _current_stage.reset(token)
+        execution = metadata if metadata is not None else _active_execution
+        if execution is not None:
+            execution.setdefault('stages', []).append(stage.to_dict())
+
+
+def tracked_stage(name: Optional[str] = None) -> Callable:
+    """
+    Decorator form of ``track_stage``.
+
+    ``rows_in`` is taken from the length of the first argument and
+    ``rows_out`` from the length of the return value, when they have one.
+    """
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows_in = _length(args[0]) if args else None
+            with track_stage(stage_name, rows_in=rows_in) as stage:
+                result = func(*args, **kwargs)
+                stage.rows_out = _length(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def _length(value) -> Optional[int]:
+    if value is None or isinstance(value, (str, bytes, dict)):
+        return None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def record_cache_hit(count: int = 1) -> None:
+    """Add cache hits to the stage currently running in this context, if any."""
+    stage = _current_stage.get()
+    if stage is not None:
+        stage.cache_hits += count
+
+
+def slowest_stages(limit: int = 10, top: Optional[int] = None, log_dir=None,
+                   notebook_name: Optional[str] = None, executions: Optional[List[Dict]] = None):
+    """
+    Rank stages by total wall time across recent executions.
+
+    Parameters
+    ----------
+    limit : int
+        Number of recent executions to include (see ``list_recent_executions``)
+    top : int, optional
+        Return only the ``top`` slowest stages
+    log_dir : str or Path, optional
+        Log directory (default: logs/execution)
+    notebook_name : str, optional
+        Only include executions of this notebook
+    executions : list of dict, optional
+        Execution records to summarize instead of reading the log directory
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (notebook_name, stage) with runs, total/mean/max wall
+        seconds, total CPU seconds, max peak RSS delta, rows in/out, cache
+        hits and share of total stage time, slowest first
+    """
+    import pandas as pd
+
+    if executions is None:
+        executions = list_recent_executions(limit, log_dir, notebook_name)
+    rows = [{'notebook_name': record.get('notebook_name'), 'execution_id': record.get('execution_id'),
+             **stage}
+            for record in executions for stage in record.get('stages', [])]
+    columns = ['notebook_name', 'stage', 'runs', 'total_wall_seconds', 'mean_wall_seconds',
+               'max_wall_seconds', 'total_cpu_seconds', 'max_peak_rss_delta_bytes',
+               'rows_in', 'rows_out', 'cache_hits', 'share_of_time']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.DataFrame(rows)
+    summary = df.groupby(['notebook_name', 'name'], sort=False, dropna=False).agg(
+        runs=('wall_seconds', 'size'),
+        total_wall_seconds=('wall_seconds', 'sum'),
+        mean_wall_seconds=('wall_seconds', 'mean'),
+        max_wall_seconds=('wall_seconds', 'max'),
+        total_cpu_seconds=('cpu_seconds', 'sum'),
+        max_peak_rss_delta_bytes=('peak_rss_delta_bytes', 'max'),
+        rows_in=('rows_in', 'sum'),
+        rows_out=('rows_out', 'sum'),
+        cache_hits=('cache_hits', 'sum'),
+    ).reset_index().rename(columns={'name': 'stage'})
+    # Nested stages are counted inside their parents; share uses top-level time
+    top_level = df.loc[df['parent'].isna(), 'wall_seconds'].sum()
+    summary['share_of_time'] = summary['total_wall_seconds'] / top_level if top_level else 0.0
+    summary = summary.sort_values('total_wall_seconds', ascending=False, kind='stable')
+    summary = summary.reset_index(drop=True)[columns]
+    return summary.head(top) if top is not None else summary
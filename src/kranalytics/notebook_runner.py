@@ -0,0 +1,426 @@
+"""
+Parallel headless notebook execution with per-cell timing and caching.
+
+Notebooks run in a pool of worker processes, one fresh process and IPython
+shell per notebook, from the notebook's own directory and against the
+offline sample data (API key variables are removed from the worker
+environment, so every ``get_*_data`` call takes its sample-data fallback).
+For each code cell the runner records wall time, CPU time, RSS growth and
+the cell's output.
+
+Cell cache
+----------
+Each cell is keyed by a hash chain: the key of cell *i* covers the source
+of cells 0..i, the Python version, the installed distributions and their
+versions, and the content of the input files (``data/sample_datasets`` and
+the ``kranalytics`` sources by default). A cell whose key is unchanged
+therefore has unchanged source, unchanged upstream inputs and runs against
+unchanged library code. Fingerprints use file contents rather than mtimes,
+so a cache restored onto a fresh checkout (e.g. in CI) still hits.
+
+After a cell runs, its outputs are stored under its key, together with a
+pickled checkpoint of the notebook namespace when it can be pickled
+(functions defined in the notebook are stored by code; modules by name).
+On the next run the runner restores the latest checkpoint within the
+unchanged prefix and executes only the cells after it. Cells before the
+checkpoint are reported as ``cached`` with their recorded timings.
+
+Example
+-------
+>>> results = run_notebooks(sorted(Path('notebooks/examples').glob('*.ipynb')),
+...                         max_workers=4)
+>>> [r['notebook'] for r in results if r['status'] != 'ok']
+[]
+>>> cell_timings(results).head(10)        # slowest cells
+"""
+
+import functools
+import hashlib
+import importlib
+import json
+import marshal
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from kranalytics._fsutil import atomic_write_bytes, evict_lru, touch
+from kranalytics.khipu_analytics.execution_tracking import _peak_rss_bytes
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / 'data' / 'cache' / 'notebooks'
+PACKAGE_DIR = Path(__file__).resolve().parent
+DEFAULT_INPUT_PATHS = (PROJECT_ROOT / 'data' / 'sample_datasets', PACKAGE_DIR)
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3
+MAX_CHECKPOINT_BYTES = 256 * 1024 ** 2
+MAX_OUTPUT_CHARS = 20_000
+
+# Removed from the worker environment so notebooks use their offline fallbacks
+API_KEY_VARIABLES = ('CENSUS_API_KEY', 'BLS_API_KEY', 'BLS API KEY', 'EPA_API_KEY',
+                     'FBI_CRIME_API_KEY', 'FRED_API_KEY', 'BEA_API_KEY')
+
+# Namespace entries owned by IPython, never checkpointed
+_SHELL_NAMES = frozenset({'In', 'Out', 'get_ipython', 'exit', 'quit', 'open'})
+
+_restore_namespace: Optional[Dict] = None
+
+
+def _rss_bytes() -> Optional[int]:
+    """Return the current resident set size (Linux), or None."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_code_cells(path) -> List[str]:
+    """Return the source of every code cell of a notebook, in order."""
+    nb = json.loads(Path(path).read_text(encoding='utf-8'))
+    cells = []
+    for cell in nb.get('cells', []):
+        if cell.get('cell_type') == 'code':
+            source = cell.get('source', '')
+            cells.append(''.join(source) if isinstance(source, list) else source)
+    return cells
+
+
+def fingerprint_inputs(paths: Iterable = DEFAULT_INPUT_PATHS) -> str:
+    """Hash the relative path and content of every file below the input paths."""
+    digest = hashlib.sha256()
+    for root in paths:
+        root = Path(root)
+        files = sorted(root.rglob('*')) if root.is_dir() else [root]
+        for path in files:
+            if not path.is_file() or '__pycache__' in path.parts or path.suffix == '.pyc':
+                continue
+            name = path.relative_to(root).as_posix() if root.is_dir() else path.name
+            digest.update(f'{root.name}/{name}\n'.encode('utf-8'))
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def environment_fingerprint() -> str:
+    """Hash the name and version of every installed distribution."""
+    from importlib import metadata
+
+    packages = sorted({f"{(dist.metadata['Name'] or '').lower()}=={dist.version}"
+                       for dist in metadata.distributions()})
+    return hashlib.sha256('\n'.join(packages).encode('utf-8')).hexdigest()
+
+
+def cell_keys(cells: Sequence[str], inputs_fingerprint: str) -> List[str]:
+    """Return the hash-chain cache key of every cell."""
+    previous = hashlib.sha256(f'{sys.version}|{environment_fingerprint()}|'
+                              f'{inputs_fingerprint}'.encode('utf-8')).hexdigest()
+    keys = []
+    for source in cells:
+        previous = hashlib.sha256(f'{previous}\n{source}'.encode('utf-8')).hexdigest()
+        keys.append(previous)
+    return keys
+
+
+def _rebuild_function(code: bytes, name: str, qualname: str, defaults, kwdefaults, doc):
+    function = types.FunctionType(marshal.loads(code), _restore_namespace, name, defaults)
+    function.__qualname__ = qualname
+    function.__kwdefaults__ = kwdefaults
+    function.__doc__ = doc
+    return function
+
+
+class _NamespacePickler(pickle.Pickler):
+    """Pickle a notebook namespace, storing notebook-defined functions by code."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, types.ModuleType):
+            return importlib.import_module, (obj.__name__,)
+        if isinstance(obj, types.FunctionType) and obj.__module__ == '__main__':
+            if obj.__closure__:
+                raise pickle.PicklingError(f'closure {obj.__name__} cannot be checkpointed')
+            return _rebuild_function, (marshal.dumps(obj.__code__), obj.__name__,
+                                       obj.__qualname__, obj.__defaults__,
+                                       obj.__kwdefaults__, obj.__doc__)
+        if isinstance(obj, type) and obj.__module__ == '__main__':
+            raise pickle.PicklingError(f'class {obj.__name__} cannot be checkpointed')
+        return NotImplemented
+
+
+def _dump_namespace(namespace: Dict) -> Optional[bytes]:
+    """Pickle the user variables of a namespace, or return None if impossible."""
+    import io
+
+    state = {name: value for name, value in namespace.items()
+             if not name.startswith('_') and name not in _SHELL_NAMES}
+    rng = {'random': random.getstate()}
+    if 'numpy' in sys.modules:
+        rng['numpy'] = sys.modules['numpy'].random.get_state()
+    buffer = io.BytesIO()
+    try:
+        _NamespacePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump((state, rng))
+    except Exception:
+        return None
+    data = buffer.getvalue()
+    return data if len(data) <= MAX_CHECKPOINT_BYTES else None
+
+
+def _load_namespace(data: bytes, namespace: Dict) -> None:
+    global _restore_namespace
+    _restore_namespace = namespace
+    try:
+        state, rng = pickle.loads(data)
+    finally:
+        _restore_namespace = None
+    namespace.update(state)
+    random.setstate(rng['random'])
+    if 'numpy' in rng:
+        import numpy as np
+        np.random.set_state(rng['numpy'])
+
+
+class CellCache:
+    """
+    Content-hash cache of cell results and namespace checkpoints.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Cache directory (default: data/cache/notebooks)
+    max_bytes : int
+        Byte budget for checkpoints; least-recently-used ones are evicted
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = int(max_bytes)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f'{key}{suffix}'
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored result of a cell, or None."""
+        try:
+            return json.loads(self._path(key, '.json').read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: str, record: Dict) -> None:
+        atomic_write_bytes(self._path(key, '.json'), json.dumps(record).encode('utf-8'))
+
+    def has_checkpoint(self, key: str) -> bool:
+        return self._path(key, '.pkl').exists()
+
+    def get_checkpoint(self, key: str) -> Optional[bytes]:
+        path = self._path(key, '.pkl')
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        touch(path)
+        return data
+
+    def set_checkpoint(self, key: str, data: bytes) -> None:
+        atomic_write_bytes(self._path(key, '.pkl'), data)
+        evict_lru(self.cache_dir, self.max_bytes, '*.pkl')
+
+
+def _text_outputs(captured) -> Dict[str, str]:
+    display = []
+    for output in captured.outputs:
+        text = output.data.get('text/plain')
+        if text:
+            display.append(text)
+    return {
+        'stdout': captured.stdout[-MAX_OUTPUT_CHARS:],
+        'stderr': captured.stderr[-MAX_OUTPUT_CHARS:],
+        'display': '\n'.join(display)[-MAX_OUTPUT_CHARS:],
+    }
+
+
+def _cell_record(index: int, key: str, status: str, **fields) -> Dict:
+    record = {'index': index, 'key': key, 'status': status, 'cached': False,
+              'wall_seconds': None, 'cpu_seconds': None, 'rss_delta_bytes': None,
+              'peak_rss_delta_bytes': None, 'error': None}
+    record.update(fields)
+    return record
+
+
+def run_notebook(path, cache_dir=None, inputs_fingerprint: Optional[str] = None,
+                 use_cache: bool = True, offline: bool = True) -> Dict:
+    """
+    Execute one notebook in a fresh IPython shell in this process.
+
+    Prefer ``run_notebooks``, which gives every notebook its own worker
+    process; calling this directly leaves the notebook's imports, working
+    directory and random state behind in the caller.
+
+    Returns
+    -------
+    dict
+        notebook, status ('ok' or 'error'), wall_seconds, executed and
+        cached cell counts, and 'cells': one record per code cell with
+        status ('ok', 'error', 'not_run'), cached, wall_seconds,
+        cpu_seconds, rss_delta_bytes, peak_rss_delta_bytes, error and
+        captured text outputs
+    """
+    from IPython.core.interactiveshell import InteractiveShell
+    from IPython.utils.capture import capture_output
+
+    path = Path(path).resolve()
+    cells = read_code_cells(path)
+    if inputs_fingerprint is None:
+        inputs_fingerprint = fingerprint_inputs()
+    keys = cell_keys(cells, inputs_fingerprint)
+    cache = CellCache(cache_dir) if use_cache else None
+
+    if offline:
+        for variable in API_KEY_VARIABLES:
+            os.environ.pop(variable, None)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    os.environ.setdefault('PLOTLY_RENDERER', 'notebook_connected')
+    os.chdir(path.parent)
+
+    shell = InteractiveShell.instance()
+    records: List[Dict] = []
+
+    # Longest unchanged prefix, then the latest checkpoint inside it
+    resume = 0
+    if cache is not None:
+        stored = []
+        for key in keys:
+            record = cache.get(key)
+            if record is None or record['status'] != 'ok':
+                break
+            stored.append(record)
+        for i in range(len(stored) - 1, -1, -1):
+            data = cache.get_checkpoint(keys[i]) if cache.has_checkpoint(keys[i]) else None
+            if data is None:
+                continue
+            try:
+                _load_namespace(data, shell.user_ns)
+            except Exception:
+                continue
+            records = [{**record, 'cached': True} for record in stored[:i + 1]]
+            resume = i + 1
+            break
+
+    start = time.perf_counter()
+    status = 'ok'
+    for index in range(resume, len(cells)):
+        key = keys[index]
+        if status != 'ok':
+            records.append(_cell_record(index, key, 'not_run'))
+            continue
+
+        rss_before, peak_before = _rss_bytes(), _peak_rss_bytes()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        with capture_output() as captured:
+            result = shell.run_cell(cells[index], store_history=True, silent=False)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rss_after, peak_after = _rss_bytes(), _peak_rss_bytes()
+
+        error = result.error_before_exec or result.error_in_exec
+        record = _cell_record(
+            index, key, 'error' if error else 'ok', wall_seconds=wall, cpu_seconds=cpu,
+            rss_delta_bytes=None if rss_before is None else rss_after - rss_before,
+            peak_rss_delta_bytes=None if peak_before is None else peak_after - peak_before,
+            error=f'{type(error).__name__}: {error}' if error else None,
+            **_text_outputs(captured))
+        records.append(record)
+
+        if error:
+            status = 'error'
+        elif cache is not None:
+            cache.set(key, record)
+            checkpoint = _dump_namespace(shell.user_ns)
+            if checkpoint is not None:
+                cache.set_checkpoint(key, checkpoint)
+
+    return {
+        'notebook': str(path),
+        'status': status,
+        'wall_seconds': time.perf_counter() - start,
+        'executed': sum(1 for r in records if not r['cached'] and r['status'] != 'not_run'),
+        'cached': sum(1 for r in records if r['cached']),
+        'cells': records,
+    }
+
+
+def _run_worker(task) -> Dict:
+    path, cache_dir, fingerprint, use_cache, offline = task
+    try:
+        return run_notebook(path, cache_dir, fingerprint, use_cache, offline)
+    except Exception as e:
+        return {'notebook': str(path), 'status': 'error', 'wall_seconds': 0.0, 'executed': 0,
+                'cached': 0, 'cells': [], 'error': f'{type(e).__name__}: {e}'}
+
+
+def run_notebooks(paths: Iterable, max_workers: Optional[int] = None, cache_dir=None,
+                  input_paths: Iterable = DEFAULT_INPUT_PATHS, use_cache: bool = True,
+                  offline: bool = True) -> List[Dict]:
+    """
+    Execute notebooks in parallel, one fresh worker process per notebook.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Notebook files
+    max_workers : int, optional
+        Concurrent notebooks (default: CPU count)
+    cache_dir : str or Path, optional
+        Cell cache directory (default: data/cache/notebooks)
+    input_paths : iterable of str or Path
+        Files or directories whose changes invalidate every cell
+    use_cache : bool
+        Reuse unchanged cells and record new results
+    offline : bool
+        Remove API keys from the worker environment
+
+    Returns
+    -------
+    list of dict
+        ``run_notebook`` results in the order of ``paths``
+    """
+    paths = [Path(p) for p in paths]
+    fingerprint = fingerprint_inputs(input_paths)
+    tasks = [(str(p), str(cache_dir) if cache_dir is not None else None, fingerprint,
+              use_cache, offline) for p in paths]
+    if not tasks:
+        return []
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    options = {'max_workers': workers, 'mp_context': multiprocessing.get_context('spawn')}
+    if sys.version_info >= (3, 11):
+        options['max_tasks_per_child'] = 1
+    with ProcessPoolExecutor(**options) as executor:
+        return list(executor.map(_run_worker, tasks))
+
+
+def cell_timings(results: List[Dict]):
+    """
+    Return every cell of every run as a frame, slowest first.
+
+    Returns
+    -------
+    pandas.DataFrame
+        notebook, index, status, cached, wall_seconds, cpu_seconds,
+        rss_delta_bytes, peak_rss_delta_bytes and error
+    """
+    import pandas as pd
+
+    columns = ['notebook', 'index', 'status', 'cached', 'wall_seconds', 'cpu_seconds',
+               'rss_delta_bytes', 'peak_rss_delta_bytes', 'error']
+    rows = [{'notebook': Path(result['notebook']).name, **cell}
+            for result in results for cell in result['cells']]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(rows)[columns]
+    return df.sort_values('wall_seconds', ascending=False, na_position='last',
+                          kind='stable').reset_index(drop=True)
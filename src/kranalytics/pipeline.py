@@ -0,0 +1,453 @@
+"""
+Declarative staged analysis pipeline with dirty tracking.
+
+The tutorials chain Raw -> Cleaning -> Feature Engineering -> Model
+Training -> Evaluation -> Visualization -> Export as notebook cells guarded
+by ``if 'df_employment' not in globals()`` checks, so changing one
+configuration value means re-running everything or remembering which cells
+depend on it. A :class:`Pipeline` makes the dependencies explicit: each
+stage declares the artifacts it reads (``inputs``), the artifacts it
+produces (``outputs``) and the configuration keys it uses (``params``).
+
+On :meth:`Pipeline.run` every stage gets a fingerprint computed from:
+
+- its code, via :func:`~kranalytics.results_cache.call_key` (editing a stage
+  invalidates it; the key does not depend on the process, so a restarted
+  kernel finds the persisted artifacts)
+- the values of its declared ``params``
+- the fingerprints of the stages producing its inputs, so a change anywhere
+  upstream propagates downstream without hashing the data itself
+- the content checksums of declared input ``files``
+
+A stage runs only if no artifact with its fingerprint is available, either
+from the previous run in this process or persisted in a
+:class:`~kranalytics.results_cache.ResultStore`. Changing ``forecast_horizon``
+therefore re-runs the forecast stage and everything downstream of it, while
+the BLS fetch and cleaning results are reused. Stages whose inputs are
+ready run concurrently on a thread pool, so independent branches (e.g. the
+ARIMA and Prophet fits) overlap. Each stage that runs is timed with
+:func:`~kranalytics.khipu_analytics.execution_tracking.track_stage`, and
+reused stages count as cache hits of the caller's stage.
+
+Example
+-------
+>>> pipeline = Pipeline('employment', config=T3_EMPLOYMENT_CONFIG)
+>>> @pipeline.stage(outputs='df_raw', params=('api_start_year', 'api_end_year'))
+... def fetch(api_start_year, api_end_year):
+...     return fetch_bls_data_batched(series_ids, api_start_year, api_end_year)
+>>> @pipeline.stage(inputs='df_raw', outputs='df_employment')
+... def clean(df_raw):
+...     return df_raw.dropna(subset=['value'])
+>>> @pipeline.stage(inputs='df_employment', outputs='df_forecast',
+...                 params=('forecast_horizon',))
+... def forecast(df_employment, forecast_horizon):
+...     return forecast_panel(df_employment, horizon=forecast_horizon)
+>>> run = pipeline.run()
+>>> run = pipeline.run(config={'forecast_horizon': 24})
+>>> run.status
+{'fetch': 'memory', 'clean': 'memory', 'forecast': 'ran'}
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from kranalytics.khipu_analytics.execution_tracking import record_cache_hit, track_stage
+from kranalytics.results_cache import ResultStore, call_key
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'pipelines'
+
+# Where a stage's outputs came from in a run
+STATUSES = ('ran', 'memory', 'store')
+
+_MISSING = object()
+
+
+class _Upstream:
+    """Stands in for an input artifact in a stage fingerprint."""
+
+    __slots__ = ('fingerprint',)
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+
+    def __repr__(self) -> str:
+        return f'artifact:{self.fingerprint}'
+
+
+def _names(value: Union[str, Sequence[str], None]) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    ``func`` is called with every input artifact and param as a keyword
+    argument. It returns the single output, or a tuple or dict holding
+    one value per declared output.
+    """
+
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    params: Tuple[str, ...] = ()
+    files: Tuple[Union[str, Path], ...] = ()
+    version: str = ''
+    persist: bool = True
+
+    def unpack(self, result: Any) -> Dict[str, Any]:
+        """Map a stage's return value onto its declared outputs."""
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        if isinstance(result, Mapping):
+            missing = [name for name in self.outputs if name not in result]
+            if missing:
+                raise ValueError(f"Stage '{self.name}' did not return: {', '.join(missing)}")
+            return {name: result[name] for name in self.outputs}
+        if not isinstance(result, tuple) or len(result) != len(self.outputs):
+            raise ValueError(f"Stage '{self.name}' must return {len(self.outputs)} values "
+                             f"({', '.join(self.outputs)})")
+        return dict(zip(self.outputs, result))
+
+
+@dataclass
+class PipelineRun:
+    """Artifacts, per-stage status ('ran', 'memory' or 'store') and timings of a run."""
+
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    status: Dict[str, str] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.artifacts[name]
+
+    @property
+    def ran(self) -> List[str]:
+        """Stages that were (re)computed."""
+        return [name for name, status in self.status.items() if status == 'ran']
+
+
+class Pipeline:
+    """
+    Declared stages, their dependency graph and the artifacts of the last run.
+
+    Parameters
+    ----------
+    name : str
+        Pipeline name; namespaces persisted artifacts
+    config : dict, optional
+        Configuration the stages' ``params`` are read from (e.g.
+        ``T3_EMPLOYMENT_CONFIG``)
+    store : ResultStore, optional
+        Store for persisted artifacts (default: data/cache/pipelines/<name>)
+    persist : bool
+        Persist artifacts so a fresh kernel can resume; stages can opt out
+    max_workers : int, optional
+        Maximum stages run concurrently (default: CPU count)
+    """
+
+    def __init__(self, name: str, config: Optional[Mapping[str, Any]] = None,
+                 store: Optional[ResultStore] = None, persist: bool = True,
+                 max_workers: Optional[int] = None):
+        self.name = name
+        self.config = dict(config or {})
+        self.persist = persist
+        self.store = store if store is not None else (
+            ResultStore(DEFAULT_CACHE_DIR / name) if persist else None)
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self._producers: Dict[str, str] = {}
+        self._memory: Dict[str, Tuple[str, Any]] = {}   # artifact -> (fingerprint, value)
+        self._lock = threading.Lock()
+
+    # Declaration -------------------------------------------------------------
+
+    def add_stage(self, stage: Stage) -> Stage:
+        """Register a stage; its outputs must not be produced by another stage."""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        if not stage.outputs:
+            raise ValueError(f"Stage '{stage.name}' declares no outputs")
+        for output in stage.outputs:
+            if output in self._producers:
+                raise ValueError(f"Artifact '{output}' is already produced by stage "
+                                 f"'{self._producers[output]}'")
+        self.stages[stage.name] = stage
+        for output in stage.outputs:
+            self._producers[output] = stage.name
+        return stage
+
+    def stage(self, inputs: Union[str, Sequence[str], None] = None,
+              outputs: Union[str, Sequence[str], None] = None,
+              params: Union[str, Sequence[str], None] = None,
+              files: Iterable[Union[str, Path]] = (), name: Optional[str] = None,
+              version: str = '', persist: bool = True) -> Callable:
+        """
+        Decorator declaring a stage.
+
+        Parameters
+        ----------
+        inputs : str or list of str, optional
+            Artifacts read (outputs of other stages)
+        outputs : str or list of str, optional
+            Artifacts produced (default: the function name)
+        params : str or list of str, optional
+            Configuration keys read
+        files : iterable of path
+            Data files or directories the stage reads itself; their content
+            checksums join its fingerprint
+        name : str, optional
+            Stage name (default: the function name)
+        version : str
+            Bump to invalidate results of earlier code
+        persist : bool
+            Persist this stage's artifacts (off for cheap or unpicklable ones)
+
+        Returns
+        -------
+        callable
+            The undecorated function
+        """
+        def decorate(func):
+            self.add_stage(Stage(name or func.__name__, func, _names(inputs),
+                                 _names(outputs) or (func.__name__,), _names(params),
+                                 tuple(files), version, persist))
+            return func
+        return decorate
+
+    # Graph -------------------------------------------------------------------
+
+    def _upstream(self, stage: Stage) -> List[str]:
+        upstream = []
+        for artifact in stage.inputs:
+            producer = self._producers.get(artifact)
+            if producer is None:
+                raise ValueError(f"Stage '{stage.name}' reads unknown artifact '{artifact}'")
+            if producer not in upstream:
+                upstream.append(producer)
+        return upstream
+
+    def order(self, targets: Union[str, Sequence[str], None] = None) -> List[str]:
+        """
+        Return the stages needed for ``targets`` in dependency order.
+
+        Parameters
+        ----------
+        targets : str or list of str, optional
+            Stage or artifact names (default: every stage)
+
+        Raises
+        ------
+        ValueError
+            If a stage reads an unknown artifact or the stages form a cycle
+        """
+        wanted = []
+        for target in _names(targets) or tuple(self.stages):
+            stage_name = target if target in self.stages else self._producers.get(target)
+            if stage_name is None:
+                raise ValueError(f"Unknown stage or artifact: {target}. "
+                                 f"Must be any of: {', '.join(self.stages)}")
+            wanted.append(stage_name)
+
+        ordered: List[str] = []
+        visiting = set()
+
+        def visit(stage_name):
+            if stage_name in ordered:
+                return
+            if stage_name in visiting:
+                raise ValueError(f"Pipeline '{self.name}' has a cycle through '{stage_name}'")
+            visiting.add(stage_name)
+            for upstream in self._upstream(self.stages[stage_name]):
+                visit(upstream)
+            visiting.discard(stage_name)
+            ordered.append(stage_name)
+
+        for stage_name in wanted:
+            visit(stage_name)
+        return ordered
+
+    def downstream(self, stage_name: str) -> List[str]:
+        """Return the stages that (transitively) read ``stage_name``'s outputs."""
+        affected = {stage_name}
+        for name in self.order():
+            if any(upstream in affected for upstream in self._upstream(self.stages[name])):
+                affected.add(name)
+        return [name for name in self.order() if name in affected and name != stage_name]
+
+    # Fingerprints ------------------------------------------------------------
+
+    def _params(self, stage: Stage, config: Mapping[str, Any]) -> Dict[str, Any]:
+        missing = [param for param in stage.params if param not in config]
+        if missing:
+            raise KeyError(f"Stage '{stage.name}' needs config keys: {', '.join(missing)}")
+        return {param: config[param] for param in stage.params}
+
+    def fingerprints(self, config: Optional[Mapping[str, Any]] = None,
+                     targets: Union[str, Sequence[str], None] = None) -> Dict[str, str]:
+        """Return the fingerprint of every stage needed for ``targets``."""
+        config = {**self.config, **(config or {})}
+        result: Dict[str, str] = {}
+        for stage_name in self.order(targets):
+            stage = self.stages[stage_name]
+            kwargs = self._params(stage, config)
+            for artifact in stage.inputs:
+                kwargs[artifact] = _Upstream(result[self._producers[artifact]])
+            result[stage_name] = call_key(stage.func, (), kwargs,
+                                          version=f'{self.name}:{stage_name}:{stage.version}',
+                                          inputs=stage.files)
+        return result
+
+    @staticmethod
+    def _artifact_key(fingerprint: str, artifact: str) -> str:
+        return hashlib.sha256(f'{fingerprint}:{artifact}'.encode()).hexdigest()
+
+    def _persists(self, stage: Stage) -> bool:
+        return self.store is not None and self.persist and stage.persist
+
+    def _in_memory(self, stage: Stage, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entries = {name: self._memory.get(name) for name in stage.outputs}
+        if all(entry is not None and entry[0] == fingerprint for entry in entries.values()):
+            return {name: entry[1] for name, entry in entries.items()}
+        return None
+
+    def _lookup(self, stage: Stage, fingerprint: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Find a stage's outputs for ``fingerprint``: ('memory' | 'store' | None, values)."""
+        values = self._in_memory(stage, fingerprint)
+        if values is not None:
+            return 'memory', values
+        if not self._persists(stage):
+            return None, {}
+        values = {}
+        for name in stage.outputs:
+            value = self.store.get(self._artifact_key(fingerprint, name), _MISSING)
+            if value is _MISSING:
+                return None, {}
+            values[name] = value
+        return 'store', values
+
+    def dirty(self, config: Optional[Mapping[str, Any]] = None,
+              targets: Union[str, Sequence[str], None] = None) -> List[str]:
+        """Return the stages a run with ``config`` would compute, in order."""
+        stale = []
+        for stage_name, fingerprint in self.fingerprints(config, targets).items():
+            stage = self.stages[stage_name]
+            if self._in_memory(stage, fingerprint) is not None:
+                continue
+            if self._persists(stage) and all(
+                    self.store.contains(self._artifact_key(fingerprint, name))
+                    for name in stage.outputs):
+                continue
+            stale.append(stage_name)
+        return stale
+
+    # Execution ---------------------------------------------------------------
+
+    def _execute(self, stage: Stage, fingerprint: str, kwargs: Dict[str, Any],
+                 force: bool = False):
+        source, values = (None, {}) if force else self._lookup(stage, fingerprint)
+        start = time.perf_counter()
+        if source is None:
+            with track_stage(stage.name) as record:
+                values = stage.unpack(stage.func(**kwargs))
+                lengths = [len(v) for v in values.values() if hasattr(v, '__len__')
+                           and not isinstance(v, (str, bytes, dict))]
+                record.rows_out = lengths[0] if len(lengths) == 1 else None
+            if self._persists(stage):
+                for name, value in values.items():
+                    self.store.set(self._artifact_key(fingerprint, name), value,
+                                   f'{self.name}.{stage.name}.{name}')
+            source = 'ran'
+        else:
+            record_cache_hit()
+        with self._lock:
+            for name, value in values.items():
+                self._memory[name] = (fingerprint, value)
+        return source, values, time.perf_counter() - start
+
+    def run(self, config: Optional[Mapping[str, Any]] = None,
+            targets: Union[str, Sequence[str], None] = None,
+            force: Union[str, Sequence[str], None] = None,
+            max_workers: Optional[int] = None) -> PipelineRun:
+        """
+        Bring the artifacts of ``targets`` up to date.
+
+        Parameters
+        ----------
+        config : dict, optional
+            Overrides merged over the pipeline's config for this run (and
+            kept for later runs)
+        targets : str or list of str, optional
+            Stages or artifacts to produce (default: all)
+        force : str or list of str, optional
+            Stages to recompute even if their fingerprint is unchanged, e.g.
+            to refresh a fetch; the stages downstream of them are recomputed
+            as well
+        max_workers : int, optional
+            Concurrent stages (default: the pipeline's setting, else CPU count)
+
+        Returns
+        -------
+        PipelineRun
+        """
+        if config:
+            self.config.update(config)
+        fingerprints = self.fingerprints(targets=targets)
+        forced = set(_names(force))
+        for stage_name in list(forced):
+            forced.update(self.downstream(stage_name))
+        run = PipelineRun(fingerprints=dict(fingerprints))
+        pending = list(fingerprints)
+        done = set()
+        workers = max_workers or self.max_workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending) or 1))
+
+        def submit(executor, stage_name):
+            stage = self.stages[stage_name]
+            kwargs = self._params(stage, self.config)
+            kwargs.update((artifact, run.artifacts[artifact]) for artifact in stage.inputs)
+            # Run in a copy of the caller's context so stage records and cache
+            # hits nest under the caller's own tracked stage
+            return executor.submit(contextvars.copy_context().run, self._execute, stage,
+                                   fingerprints[stage_name], kwargs, stage_name in forced)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            while pending or running:
+                for stage_name in [s for s in pending
+                                   if all(u in done for u in self._upstream(self.stages[s]))]:
+                    pending.remove(stage_name)
+                    running[submit(executor, stage_name)] = stage_name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage_name = running.pop(future)
+                    source, values, seconds = future.result()
+                    run.artifacts.update(values)
+                    run.status[stage_name] = source
+                    run.seconds[stage_name] = seconds
+                    done.add(stage_name)
+        run.status = {name: run.status[name] for name in fingerprints}
+        return run
+
+    def __getitem__(self, artifact: str) -> Any:
+        """Return an artifact of the last run."""
+        with self._lock:
+            if artifact not in self._memory:
+                raise KeyError(f"Artifact '{artifact}' has not been computed; run the pipeline")
+            return self._memory[artifact][1]
+
+    def __repr__(self) -> str:
+        return f"Pipeline({self.name!r}, stages={list(self.stages)})"
@@ -0,0 +1,259 @@
+"""
+Decimated, WebGL-backed plotly traces for large series.
+
+County-level Lorenz curves and multi-state forecast panels put every point
+into the figure JSON. The helpers here keep figures small and fast:
+
+- :func:`lttb` (Largest-Triangle-Three-Buckets) downsamples an ordered
+  series to a point budget while keeping its visual shape (peaks, troughs,
+  curvature); :func:`decimate` applies it to ``(x, y)``
+- :func:`line_trace` / :func:`scatter_trace` build ``go.Scatter`` traces,
+  decimating ordered lines to ``max_points`` and switching to
+  ``go.Scattergl`` (WebGL) when a trace still holds more than
+  ``webgl_threshold`` points (unordered marker clouds are never decimated)
+- :func:`lorenz_curve` returns the decimated Lorenz curve of a distribution
+- :func:`cached_figure` caches built figure JSON on disk, keyed by a hash
+  of the builder and its input data, so re-running a notebook reloads the
+  figure instead of rebuilding it
+
+Example
+-------
+>>> fig = go.Figure([line_trace(dates, values, name='actual'),
+...                  line_trace(dates, forecast, name='forecast')])
+>>> @cached_figure()
+... def lorenz_figure(incomes):
+...     x, y = lorenz_curve(incomes)
+...     return go.Figure(line_trace(x, y, name='Lorenz'))
+"""
+
+import functools
+from pathlib import Path
+from typing import Callable, Tuple
+
+import numpy as np
+
+from kranalytics._fsutil import atomic_write_bytes, evict_lru, touch
+from kranalytics.results_cache import call_key
+
+DEFAULT_MAX_POINTS = 2_000
+DEFAULT_WEBGL_THRESHOLD = 5_000
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'figures'
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 ** 2
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    Select ``n_out`` points of an ordered series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The interior is split into
+    ``n_out - 2`` equal buckets; from each the point forming the largest
+    triangle with the previously selected point and the next bucket's mean
+    is kept.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Series coordinates, ``x`` non-decreasing and both finite
+    n_out : int
+        Number of points to keep (at least 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the selected points
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3")
+
+    # Interior bucket boundaries; bucket i covers [edges[i], edges[i + 1])
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+    # Mean of the following bucket (the last bucket looks ahead to the final point)
+    sums_x = np.add.reduceat(x[1:n - 1], starts - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], starts - 1)
+    sizes = stops - starts
+    next_x = np.append(sums_x[1:] / sizes[1:], x[-1])
+    next_y = np.append(sums_y[1:] / sizes[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[previous] - next_x[i]) * (by - y[previous])
+                      - (x[previous] - bx) * (next_y[i] - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def decimate(x, y, max_points: int = DEFAULT_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample an ordered series to at most ``max_points`` with LTTB.
+
+    Non-finite ``y`` values are dropped first. Datetime ``x`` values are
+    preserved.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Decimated ``(x, y)``
+    """
+    x_values = np.asarray(x)
+    y_values = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(y_values)
+    x_values, y_values = x_values[keep], y_values[keep]
+    if len(y_values) <= max_points:
+        return x_values, y_values
+    numeric_x = (x_values.astype('datetime64[ns]').astype(np.int64)
+                 if np.issubdtype(x_values.dtype, np.datetime64) else x_values)
+    index = lttb(numeric_x, y_values, max_points)
+    return x_values[index], y_values[index]
+
+
+def _is_ordered(x: np.ndarray) -> bool:
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype(np.int64)
+    elif not np.issubdtype(x.dtype, np.number):
+        return False
+    return bool(np.all(x[1:] >= x[:-1]))
+
+
+def _trace(x, y, webgl_threshold: int, **kwargs):
+    import plotly.graph_objects as go
+
+    trace_type = go.Scattergl if len(y) > webgl_threshold else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def line_trace(x, y, max_points: int = DEFAULT_MAX_POINTS,
+               webgl_threshold: int = DEFAULT_WEBGL_THRESHOLD, **kwargs):
+    """
+    Build a line trace, decimated to ``max_points`` when ``x`` is ordered.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Series coordinates
+    max_points : int
+        Point budget (roughly two points per horizontal pixel)
+    webgl_threshold : int
+        Points above which ``go.Scattergl`` is used
+    **kwargs
+        Passed to the plotly trace (``name``, ``line``, ``fill``, ...)
+
+    Returns
+    -------
+    plotly.graph_objects.Scatter or Scattergl
+    """
+    x_values = np.asarray(x)
+    if _is_ordered(x_values):
+        x, y = decimate(x_values, y, max_points)
+    kwargs.setdefault('mode', 'lines')
+    return _trace(x, y, webgl_threshold, **kwargs)
+
+
+def scatter_trace(x, y, webgl_threshold: int = DEFAULT_WEBGL_THRESHOLD, **kwargs):
+    """
+    Build a marker trace, using WebGL above ``webgl_threshold`` points.
+
+    Marker clouds (e.g. actual vs predicted) are not ordered series, so
+    every point is kept.
+    """
+    kwargs.setdefault('mode', 'markers')
+    return _trace(np.asarray(x), np.asarray(y), webgl_threshold, **kwargs)
+
+
+def lorenz_curve(values, weights=None,
+                 max_points: int = DEFAULT_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (decimated) Lorenz curve of a distribution.
+
+    Parameters
+    ----------
+    values : array-like
+        Incomes (or other non-negative amounts), one per unit or group
+    weights : array-like, optional
+        Units per value (e.g. households per income bracket)
+    max_points : int
+        Point budget
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Cumulative population share and cumulative value share, both
+        starting at 0 and ending at 1
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    population = np.concatenate([[0.0], np.cumsum(weights)])
+    amount = np.concatenate([[0.0], np.cumsum(values * weights)])
+    return decimate(population / population[-1], amount / amount[-1], max_points)
+
+
+def figure_key(func: Callable, args: tuple, kwargs: dict, version: str = '') -> str:
+    """
+    Return the cache key of ``func(*args, **kwargs)``: a hash of its code and data.
+
+    Built on :func:`~kranalytics.results_cache.call_key`, so the key is the same in
+    every process and figures are reused after a kernel restart.
+    """
+    return call_key(func, args, kwargs, version)
+
+
+def cached_figure(cache_dir=None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES, version: str = ''):
+    """
+    Cache the figures built by a function as JSON, keyed by its input data.
+
+    The key hashes the function's code, ``version`` and every argument
+    (DataFrames, Series and arrays by content). On a hit the figure is
+    loaded with ``plotly.io.from_json``; on a miss it is built, stored
+    atomically and the cache is trimmed to ``max_bytes`` (least recently
+    used first). Hits are reported to the active execution-tracking stage.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Cache directory (default: data/cache/figures)
+    max_bytes : int
+        Cache size budget
+    version : str
+        Bump to invalidate figures built by earlier code
+    """
+    directory = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            import plotly.io as pio
+
+            from kranalytics.khipu_analytics.execution_tracking import record_cache_hit
+
+            key = figure_key(func, args, kwargs, version)
+            path = directory / key[:2] / f'{key}.json'
+            try:
+                figure = pio.from_json(path.read_text())
+            except (FileNotFoundError, ValueError):
+                figure = func(*args, **kwargs)
+                atomic_write_bytes(path, figure.to_json().encode('utf-8'))
+                evict_lru(directory, max_bytes, '*.json')
+                return figure
+            touch(path)
+            record_cache_hit()
+            return figure
+
+        wrapper.cache_dir = directory
+        return wrapper
+    return decorate
+
+
+def figure_size(figure) -> int:
+    """Return the size of a figure's JSON in bytes (what a notebook output stores)."""
+    return len(figure.to_json().encode('utf-8'))
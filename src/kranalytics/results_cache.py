@@ -0,0 +1,538 @@
+"""
+Persistent memoization of derived results (fitted models, tables, features).
+
+:func:`memoize` caches what a function returns on disk, keyed by:
+
+- the function's identity: module, qualified name and compiled code
+  (nested comprehensions and lambdas included), so editing the function
+  body invalidates its results while a new process or kernel still hits
+- its arguments, bound to the signature (positional, keyword and default
+  values address the same entry); DataFrames, Series and arrays are hashed
+  by content, ``Path`` arguments by the checksum of the file or directory
+  they point to
+- the checksums of declared ``inputs`` (e.g. ``data/sample_datasets``), for
+  functions that read data files themselves
+
+Re-running a notebook after changing only a plot therefore reloads every
+fitted model and table instead of recomputing it.
+
+Storage
+-------
+Each result is a directory ``<cache_dir>/<key[:2]>/<key>/`` holding an
+``_entry.json`` record and the payload. DataFrames and Series with
+numeric, boolean, datetime, categorical or complete string columns are
+stored as typed ``.npy`` columns (:mod:`kranalytics.columnar`) and arrays
+as one ``.npy`` file; both are memory-mapped on load, so a hit costs a few
+page-table entries rather than a copy. Other objects (ARIMA/Prophet
+results, dicts) are pickled. Entries are written to a temporary directory
+and renamed into place, and the cache is kept under ``max_bytes`` by
+evicting the least recently used entries.
+
+Hits are counted on the running execution-tracking stage, and with an
+active execution every lookup is listed in its log under ``memoized``.
+
+Example
+-------
+>>> @memoize(ignore=('max_workers',))
+... def fit_state_models(df_employment, order=(1, 1, 1), max_workers=None):
+...     return forecast_panel(df_employment, order=order, max_workers=max_workers)
+>>> df_forecasts = fit_state_models(df_employment, order=T3_EMPLOYMENT_CONFIG['arima_order'])
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import touch
+from kranalytics.columnar import read_columnar, write_columnar
+from kranalytics.khipu_analytics.execution_tracking import get_active_execution, record_cache_hit
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'results'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+ENTRY_FILENAME = '_entry.json'
+
+_MISSING = object()
+# (path, size, mtime_ns) -> content checksum, so unchanged inputs are hashed once
+_checksums: Dict[Tuple[str, int, int], str] = {}
+_checksums_lock = threading.Lock()
+
+
+def file_checksum(path) -> str:
+    """
+    Return the SHA-256 checksum of a file, or of every file below a directory.
+
+    Checksums are remembered per (path, size, mtime) for the life of the
+    process, so repeated lookups of unchanged inputs do not re-read them.
+    """
+    path = Path(path)
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob('*') if p.is_file()):
+            if child.name.startswith('.tmp-'):
+                continue
+            digest.update(child.relative_to(path).as_posix().encode())
+            digest.update(file_checksum(child).encode())
+        return digest.hexdigest()
+
+    stat = path.stat()
+    signature = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _checksums_lock:
+        cached = _checksums.get(signature)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(functools.partial(f.read, 1024 * 1024), b''):
+            digest.update(block)
+    checksum = digest.hexdigest()
+    with _checksums_lock:
+        _checksums[signature] = checksum
+    return checksum
+
+
+_PRIMITIVES = (str, bytes, int, float, complex, bool, type(None), type(Ellipsis))
+
+
+def code_checksum(code: types.CodeType) -> str:
+    """
+    Return a process-independent checksum of a compiled code object.
+
+    Nested code objects (comprehensions, lambdas, inner functions) are
+    replaced by their own checksum: their ``repr`` carries a memory address
+    that differs in every process.
+    """
+    digest = hashlib.sha256()
+    digest.update(code.co_code)
+    digest.update(repr((code.co_names, code.co_varnames, code.co_freevars,
+                        code.co_cellvars)).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            digest.update(f'code:{code_checksum(const)}'.encode())
+        else:
+            _hash_update(digest, const)
+    return digest.hexdigest()
+
+
+def _hash_update(digest, value, _seen: Optional[set] = None) -> None:
+    """
+    Feed an argument into a cache key, hashing data by content.
+
+    Only process-independent representations are used: objects whose
+    ``repr`` is the default (or shows a memory address) are hashed by type
+    and attribute values, or failing that by their pickle.
+    """
+    if isinstance(value, _PRIMITIVES):
+        digest.update(f'{type(value).__name__}:{value!r}'.encode())
+        return
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        names = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        dtypes = (list(value.dtypes.astype(str)) if isinstance(value, pd.DataFrame)
+                  else [str(value.dtype)])
+        digest.update(repr((type(value).__name__, names, dtypes, value.shape)).encode())
+        return
+    if isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object
+                      else repr(value.tolist()).encode())
+        return
+    if isinstance(value, os.PathLike):
+        path = Path(value)
+        digest.update(f'path:{path.as_posix()}'.encode())
+        if path.exists():
+            digest.update(file_checksum(path).encode())
+        return
+    if isinstance(value, types.CodeType):
+        digest.update(f'code:{code_checksum(value)}'.encode())
+        return
+    if callable(value) and hasattr(value, '__code__'):
+        digest.update(f'{value.__module__}.{value.__qualname__}'.encode())
+        digest.update(code_checksum(value.__code__).encode())
+        return
+
+    # Containers and objects may be self-referencing
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        digest.update(b'<cycle>')
+        return
+    _seen = _seen | {id(value)}
+    if isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _hash_update(digest, item, _seen)
+    elif isinstance(value, (set, frozenset)):
+        # Sorted by item hash: string set order varies with PYTHONHASHSEED
+        digest.update(f'set{len(value)}'.encode())
+        for item in sorted(_item_checksum(item) for item in value):
+            digest.update(item.encode())
+    elif isinstance(value, dict):
+        digest.update(f'dict{len(value)}'.encode())
+        for key in sorted(value, key=_item_checksum):
+            _hash_update(digest, key, _seen)
+            _hash_update(digest, value[key], _seen)
+    else:
+        cls = type(value)
+        text = repr(value)
+        if cls.__repr__ is not object.__repr__ and ' at 0x' not in text:
+            digest.update(f'{cls.__module__}.{cls.__qualname__}:{text}'.encode())
+            return
+        digest.update(f'{cls.__module__}.{cls.__qualname__}'.encode())
+        state = dict(getattr(value, '__dict__', None) or {})
+        slots = getattr(cls, '__slots__', ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if hasattr(value, slot):
+                state[slot] = getattr(value, slot)
+        if state:
+            _hash_update(digest, state, _seen)
+            return
+        try:
+            digest.update(pickle.dumps(value, protocol=4))
+        except Exception as e:
+            raise TypeError(f"Cannot build a cache key from a {cls.__qualname__} argument; "
+                            f"leave it out with ignore=(...)") from e
+
+
+def _item_checksum(value) -> str:
+    digest = hashlib.sha256()
+    _hash_update(digest, value)
+    return digest.hexdigest()
+
+
+def call_key(func: Callable, args: tuple = (), kwargs: Optional[Dict] = None,
+             version: str = '', ignore: Iterable[str] = (), inputs: Iterable = ()) -> str:
+    """
+    Return the cache key of ``func(*args, **kwargs)``.
+
+    Parameters
+    ----------
+    func : callable
+        Function whose result is cached
+    args, kwargs
+        Call arguments, bound to ``func``'s signature when possible
+    version : str
+        Extra salt; bump to invalidate results of earlier code
+    ignore : iterable of str
+        Parameter names left out of the key (worker counts, verbosity)
+    inputs : iterable of path
+        Data files or directories whose content checksums join the key
+    """
+    kwargs = dict(kwargs or {})
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items()
+                     if name not in set(ignore)}
+        args, kwargs = (), arguments
+    except (TypeError, ValueError):
+        kwargs = {name: value for name, value in kwargs.items() if name not in set(ignore)}
+
+    digest = hashlib.sha256()
+    digest.update(f'{func.__module__}.{func.__qualname__}:{version}'.encode())
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        digest.update(code_checksum(code).encode())
+    _hash_update(digest, args)
+    _hash_update(digest, kwargs)
+    for path in inputs:
+        path = Path(path)
+        digest.update(path.as_posix().encode())
+        digest.update(file_checksum(path).encode() if path.exists() else b'missing')
+    return digest.hexdigest()
+
+
+def _storable(series: pd.Series) -> bool:
+    """Return True if a column round-trips through a typed ``.npy`` file."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return (not series.isna().any()
+                and all(isinstance(c, str) for c in dtype.categories))
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return getattr(dtype, 'tz', None) is None
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        if pd.api.types.is_extension_array_dtype(dtype) and series.isna().any():
+            return pd.api.types.is_integer_dtype(dtype)  # Stored as float64 with NaN
+        return True
+    if pd.api.types.is_string_dtype(dtype) and not series.isna().any():
+        return (pd.api.types.is_extension_array_dtype(dtype)
+                or bool(series.map(type).eq(str).all()))
+    return False
+
+
+def _frame_parts(value) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    Flatten a Series or DataFrame into storable columns plus what restores it.
+
+    Returns None when some column, name or index level cannot be stored
+    losslessly as ``.npy`` files (the result is pickled instead).
+    """
+    meta: Dict[str, Any] = {}
+    if isinstance(value, pd.Series):
+        if not (value.name is None or isinstance(value.name, str)):
+            return None
+        meta['series_name'] = value.name
+        value = value.to_frame('values')
+
+    names = list(value.columns)
+    if len(set(names)) != len(names) or not all(
+            isinstance(n, str) and n and '/' not in n and not n.startswith('_') for n in names):
+        return None
+    flat = value.reset_index(drop=True)
+    index = value.index
+    if not (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1):
+        if not all(n is None or isinstance(n, str) for n in index.names):
+            return None
+        meta['index_names'] = list(index.names)
+        levels = pd.DataFrame({f'_index_{i}': index.get_level_values(i)
+                               for i in range(index.nlevels)})
+        flat = pd.concat([levels, flat], axis=1)
+    if not all(_storable(flat[column]) for column in flat.columns):
+        return None
+
+    meta['dtypes'] = {column: str(flat[column].dtype) for column in flat.columns}
+    meta['categories'] = {
+        column: [list(flat[column].cat.categories), bool(flat[column].cat.ordered)]
+        for column in flat.columns if isinstance(flat[column].dtype, pd.CategoricalDtype)}
+    return flat, meta
+
+
+def _restore_frame(df: pd.DataFrame, meta: Dict[str, Any]):
+    """Inverse of :func:`_frame_parts`."""
+    casts = {}
+    for column, dtype in meta['dtypes'].items():
+        if column in meta['categories']:
+            categories, ordered = meta['categories'][column]
+            casts[column] = pd.Categorical(df[column], categories=categories, ordered=ordered)
+        elif str(df[column].dtype) != dtype:
+            casts[column] = df[column].astype(dtype)
+    if casts:
+        df = df.assign(**casts)
+    if 'index_names' in meta:
+        levels = [f'_index_{i}' for i in range(len(meta['index_names']))]
+        df = df.set_index(levels)
+        df.index.names = meta['index_names']
+    if 'series_name' in meta:
+        return df['values'].rename(meta['series_name'])
+    return df
+
+
+class ResultStore:
+    """
+    On-disk store of memoized results with memory-mapped loading and LRU eviction.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Store directory (default: data/cache/results)
+    max_bytes : int
+        Byte budget; least-recently-used entries are evicted after each
+        store that exceeds it
+    mmap : bool
+        Memory-map ``.npy`` payloads on load (read-only arrays)
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES, mmap: bool = True):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = int(max_bytes)
+        self.mmap = mmap
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def contains(self, key: str) -> bool:
+        """Return True if a result is stored under ``key`` (without loading it)."""
+        return (self._path(key) / ENTRY_FILENAME).exists()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the stored result for ``key``, or ``default`` on a miss."""
+        directory = self._path(key)
+        try:
+            entry = json.loads((directory / ENTRY_FILENAME).read_text())
+            if entry['kind'] == 'frame':
+                frame = read_columnar(directory / 'data', mmap=self.mmap)
+                value = _restore_frame(frame, entry['meta'])
+            elif entry['kind'] == 'array':
+                value = np.load(directory / 'value.npy', mmap_mode='r' if self.mmap else None,
+                                allow_pickle=False)
+            else:
+                value = pickle.loads((directory / 'value.pkl').read_bytes())
+        except (FileNotFoundError, NotADirectoryError, KeyError, ValueError,
+                pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self._count('misses')
+            return default
+        touch(directory / ENTRY_FILENAME)
+        self._count('hits')
+        return value
+
+    def set(self, key: str, value: Any, function: str = '') -> int:
+        """
+        Store a result and return its size in bytes.
+
+        DataFrames, Series and non-object arrays are written as ``.npy``
+        files; anything else is pickled.
+        """
+        parent = self._path(key).parent
+        parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=parent, prefix='.tmp-'))
+        try:
+            parts = (_frame_parts(value) if isinstance(value, (pd.DataFrame, pd.Series))
+                     else None)
+            if parts is not None:
+                kind, meta = 'frame', parts[1]
+                write_columnar(parts[0], tmp / 'data')
+            elif isinstance(value, np.ndarray) and value.dtype != object:
+                kind, meta = 'array', {}
+                np.save(tmp / 'value.npy', value, allow_pickle=False)
+            else:
+                kind, meta = 'pickle', {}
+                (tmp / 'value.pkl').write_bytes(pickle.dumps(value, protocol=5))
+            size = sum(p.stat().st_size for p in tmp.rglob('*') if p.is_file())
+            (tmp / ENTRY_FILENAME).write_text(json.dumps({
+                'function': function, 'kind': kind, 'meta': meta,
+                'bytes': size, 'stored_at': time.time(),
+            }))
+            target = self._path(key)
+            shutil.rmtree(target, ignore_errors=True)
+            try:
+                os.replace(tmp, target)
+            except OSError:
+                pass  # Stored concurrently by another process
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._count('stores')
+        self.evict()
+        return size
+
+    def _entries(self):
+        """Yield ``(last_used, bytes, directory)`` for every stored result."""
+        if not self.cache_dir.exists():
+            return
+        for record in self.cache_dir.glob(f'*/*/{ENTRY_FILENAME}'):
+            try:
+                last_used = record.stat().st_mtime
+                size = json.loads(record.read_text())['bytes']
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+            yield last_used, size, record.parent
+
+    def evict(self) -> int:
+        """Evict least-recently-used results until the store fits its budget."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, directory in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every stored result."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current store size."""
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+
+def _log(function: str, key: str, hit: bool, seconds: float) -> None:
+    """List a lookup in the active execution record."""
+    execution = get_active_execution()
+    if execution is not None:
+        execution.setdefault('memoized', []).append({
+            'function': function, 'key': key[:16], 'hit': hit, 'seconds': seconds,
+        })
+
+
+def memoize(store: Optional[ResultStore] = None, version: str = '',
+            ignore: Iterable[str] = (), inputs: Iterable = ()) -> Callable:
+    """
+    Cache a function's results on disk, keyed by its code, arguments and input data.
+
+    Parameters
+    ----------
+    store : ResultStore, optional
+        Result store (default: one shared store in data/cache/results)
+    version : str
+        Bump to invalidate results computed by earlier code
+    ignore : iterable of str
+        Parameters that do not affect the result (``max_workers``, ``verbose``)
+    inputs : iterable of path
+        Data files or directories the function reads itself; their content
+        checksums join the key
+
+    Returns
+    -------
+    callable
+        Decorator. The wrapped function has ``store`` and ``key(*args,
+        **kwargs)`` attributes. Results loaded from ``.npy`` files are
+        read-only memory maps; copy them before modifying in place.
+    """
+    ignore = tuple(ignore)
+    inputs = tuple(inputs)
+
+    def decorate(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def key(*args, **kwargs):
+            return call_key(func, args, kwargs, version, ignore, inputs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = wrapper.store if wrapper.store is not None else _default_store()
+            start = time.perf_counter()
+            result_key = key(*args, **kwargs)
+            value = active.get(result_key, _MISSING)
+            if value is not _MISSING:
+                record_cache_hit()
+                _log(name, result_key, True, time.perf_counter() - start)
+                return value
+            value = func(*args, **kwargs)
+            active.set(result_key, value, name)
+            _log(name, result_key, False, time.perf_counter() - start)
+            return value
+
+        wrapper.store = store
+        wrapper.key = key
+        return wrapper
+    return decorate
+
+
+@functools.lru_cache(maxsize=None)
+def _default_store() -> ResultStore:
+    return ResultStore()
@@ -0,0 +1,537 @@
+"""
+Quota- and rate-limit-aware request scheduling for the BLS and Census APIs.
+
+A :class:`RequestScheduler` is shared by every caller in a process:
+
+- one token bucket per (provider, API key) spaces requests to the
+  provider's sustained rate while allowing short bursts
+- daily quotas are counted on disk per provider and key (keys are stored
+  hashed), so separate runs on the same day share the budget; a request
+  that would exceed it raises :class:`QuotaExceededError` instead of
+  burning a call the API will refuse
+- 429 and 5xx responses, timeouts and connection errors are retried with
+  exponential backoff and full jitter, honoring ``Retry-After``
+- batch sizes adapt per provider: halved after a throttled or failed
+  request, grown back step by step after consecutive successes
+
+:class:`ScheduledSession` wraps a ``requests.Session`` so existing code
+paths (``ResponseCache.fetch_json``, ``fetch_bls_series``, ``fetch_acs``)
+are scheduled without changes. :class:`JobQueue` is a resumable on-disk
+queue for bulk pulls: completed jobs are persisted after every batch, so
+an interrupted or quota-limited pull continues where it stopped.
+
+Example
+-------
+>>> scheduler = RequestScheduler()
+>>> session = ScheduledSession(requests.Session(), scheduler)
+>>> df = fetch_bls_series(series_ids, 2015, 2024, api_key=key, session=session)
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from kranalytics._fsutil import atomic_write_bytes, file_lock
+from kranalytics.api_cache import infer_source
+
+DEFAULT_STATE_DIR = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'scheduler'
+
+# Sustained requests per second, burst size, daily request quota (None =
+# unlimited) and maximum batch size per provider. BLS v2 allows 500
+# queries per day with a registered key (25 without) and 50 series per
+# query; Census allows 500 queries per day per IP without a key.
+PROVIDER_LIMITS = {
+    'bls': {'rate': 5.0, 'burst': 10, 'daily_quota': 500, 'daily_quota_no_key': 25,
+            'max_batch': 50},
+    'census': {'rate': 10.0, 'burst': 20, 'daily_quota': None, 'daily_quota_no_key': 500,
+               'max_batch': 50},
+    'default': {'rate': 5.0, 'burst': 5, 'daily_quota': None, 'daily_quota_no_key': None,
+                'max_batch': 50},
+}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a request would exceed a provider's daily quota."""
+
+
+def key_id(api_key: Optional[str]) -> str:
+    """Return a short, non-reversible identifier for an API key."""
+    if not api_key:
+        return 'anonymous'
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second
+    capacity : float
+        Maximum stored tokens (burst size)
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` without blocking; return 0.0, or the seconds until available."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+class QuotaTracker:
+    """
+    Daily request counts per provider and key, persisted as JSON.
+
+    Counts are keyed by UTC date; older days are dropped on write. Updates
+    hold a thread lock and an OS file lock (``<path>.lock``), so schedulers
+    in other processes never lose each other's counts.
+    """
+
+    def __init__(self, path, clock: Callable[[], datetime] = None):
+        self.path = Path(path)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def used(self, provider: str, api_key: Optional[str] = None) -> int:
+        """Return today's request count for a provider and key."""
+        today = self.clock().date().isoformat()
+        return self._load().get(today, {}).get(f'{provider}:{key_id(api_key)}', 0)
+
+    def consume(self, provider: str, api_key: Optional[str], limit: Optional[int]) -> int:
+        """
+        Count one request, raising QuotaExceededError if the limit is reached.
+
+        Returns
+        -------
+        int
+            Requests used today including this one
+        """
+        today = self.clock().date().isoformat()
+        name = f'{provider}:{key_id(api_key)}'
+        with self._lock, file_lock(self.path):
+            counts = self._load()
+            day = counts.get(today, {})
+            used = day.get(name, 0)
+            if limit is not None and used >= limit:
+                raise QuotaExceededError(f"Daily {provider} quota of {limit} requests "
+                                         f"reached for key {key_id(api_key)}")
+            day[name] = used + 1
+            atomic_write_bytes(self.path, json.dumps({today: day}, indent=2).encode('utf-8'))
+        return used + 1
+
+    def exhaust(self, provider: str, api_key: Optional[str], limit: Optional[int]) -> None:
+        """Mark today's quota as used up (the API reported its threshold)."""
+        if limit is None:
+            return
+        today = self.clock().date().isoformat()
+        with self._lock, file_lock(self.path):
+            counts = self._load()
+            day = counts.get(today, {})
+            day[f'{provider}:{key_id(api_key)}'] = limit
+            atomic_write_bytes(self.path, json.dumps({today: day}, indent=2).encode('utf-8'))
+
+
+class RequestScheduler:
+    """
+    Shared rate limiting, quota accounting, retries and batch sizing.
+
+    Parameters
+    ----------
+    limits : dict, optional
+        Per-provider overrides merged over PROVIDER_LIMITS
+    state_dir : str or Path, optional
+        Directory for the quota file (default: data/cache/scheduler)
+    max_retries : int
+        Retries after the first attempt for retryable failures
+    backoff_base, backoff_max : float
+        Exponential backoff parameters in seconds; the delay before retry
+        ``n`` is uniform in ``[0, min(backoff_max, backoff_base * 2**n)]``
+    clock, sleep : callable, optional
+        Time source and sleep function (injectable for tests)
+    seed : int, optional
+        Seed for the jitter random generator
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, Mapping]] = None, state_dir=None,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, seed: Optional[int] = None):
+        self.limits = {name: dict(values) for name, values in PROVIDER_LIMITS.items()}
+        for name, values in (limits or {}).items():
+            self.limits.setdefault(name, dict(PROVIDER_LIMITS['default'])).update(values)
+        state_dir = Path(state_dir) if state_dir is not None else DEFAULT_STATE_DIR
+        self.quota = QuotaTracker(state_dir / 'quota.json')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.sleep = sleep
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'waited_seconds': 0.0}
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._batch: Dict[str, int] = {}
+        self._successes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self, provider: str) -> Dict[str, Any]:
+        return self.limits.get(provider, self.limits['default'])
+
+    def daily_quota(self, provider: str, api_key: Optional[str] = None) -> Optional[int]:
+        """Return the daily request quota for a provider and key (None = unlimited)."""
+        limits = self._limits(provider)
+        return limits['daily_quota'] if api_key else limits['daily_quota_no_key']
+
+    def remaining_quota(self, provider: str, api_key: Optional[str] = None) -> Optional[int]:
+        """Return today's remaining requests (None = unlimited)."""
+        quota = self.daily_quota(provider, api_key)
+        return None if quota is None else max(0, quota - self.quota.used(provider, api_key))
+
+    def bucket(self, provider: str, api_key: Optional[str] = None) -> TokenBucket:
+        """Return the token bucket for a provider and key."""
+        name = (provider, key_id(api_key))
+        with self._lock:
+            if name not in self._buckets:
+                limits = self._limits(provider)
+                self._buckets[name] = TokenBucket(limits['rate'], limits['burst'],
+                                                  clock=self.clock, sleep=self.sleep)
+            return self._buckets[name]
+
+    def batch_size(self, provider: str) -> int:
+        """Return the current adaptive batch size for a provider."""
+        with self._lock:
+            return self._batch.get(provider, self._limits(provider)['max_batch'])
+
+    def _record_outcome(self, provider: str, ok: bool) -> None:
+        maximum = self._limits(provider)['max_batch']
+        with self._lock:
+            current = self._batch.get(provider, maximum)
+            if ok:
+                streak = self._successes.get(provider, 0) + 1
+                # Additive increase after a streak, multiplicative decrease on failure
+                if streak >= 3 and current < maximum:
+                    current = min(maximum, current + max(1, maximum // 10))
+                    streak = 0
+                self._successes[provider] = streak
+            else:
+                current = max(1, current // 2)
+                self._successes[provider] = 0
+            self._batch[provider] = current
+
+    def report_batch_failure(self, provider: str) -> None:
+        """Shrink the batch size after a batch failed for a non-HTTP reason."""
+        self._record_outcome(provider, ok=False)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = self.random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _count(self, name: str, amount=1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def send(self, request: Callable[[], Any], provider: str = 'default',
+             api_key: Optional[str] = None) -> Any:
+        """
+        Run ``request()`` under the provider's rate limit, quota and retry policy.
+
+        Parameters
+        ----------
+        request : callable
+            Performs one HTTP request and returns a ``requests.Response``
+        provider : str
+            'bls', 'census' or another configured provider
+        api_key : str, optional
+            Key the request is made with (for per-key buckets and quotas)
+
+        Returns
+        -------
+        requests.Response
+            The first non-retryable response, or the last response once
+            retries are exhausted (callers still ``raise_for_status``)
+
+        Raises
+        ------
+        QuotaExceededError
+            If the daily quota for the provider and key is used up
+        """
+        import requests
+
+        quota = self.daily_quota(provider, api_key)
+        for attempt in range(self.max_retries + 1):
+            self.quota.consume(provider, api_key, quota)
+            waited = self.bucket(provider, api_key).acquire()
+            self._count('requests')
+            self._count('waited_seconds', waited)
+
+            try:
+                response = request()
+            except (requests.ConnectionError, requests.Timeout):
+                self._record_outcome(provider, ok=False)
+                if attempt == self.max_retries:
+                    raise
+                self._retry(attempt, None)
+                continue
+
+            if _quota_reported(provider, response):
+                self.quota.exhaust(provider, api_key, quota)
+                raise QuotaExceededError(f"{provider} API reports its daily threshold "
+                                         f"reached for key {key_id(api_key)}")
+            if response.status_code not in RETRY_STATUSES:
+                self._record_outcome(provider, ok=True)
+                return response
+
+            self._record_outcome(provider, ok=False)
+            if response.status_code == 429:
+                self._count('throttled')
+            if attempt == self.max_retries:
+                return response
+            retry_after = _retry_after(response)
+            response.close()
+            self._retry(attempt, retry_after)
+
+    def _retry(self, attempt: int, retry_after: Optional[float]) -> None:
+        self._count('retries')
+        delay = self._backoff(attempt, retry_after)
+        self._count('waited_seconds', delay)
+        self.sleep(delay)
+
+
+def _retry_after(response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc))
+                       .total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+def _quota_reported(provider: str, response) -> bool:
+    """Detect BLS 'daily threshold' refusals, which arrive as HTTP 200."""
+    if provider != 'bls' or response.status_code != 200:
+        return False
+    try:
+        result = response.json()
+    except ValueError:
+        return False
+    if not isinstance(result, dict) or result.get('status') != 'REQUEST_NOT_PROCESSED':
+        return False
+    return any('threshold' in str(message).lower() for message in result.get('message', []))
+
+
+class ScheduledSession:
+    """
+    ``requests.Session`` stand-in that routes every request through a scheduler.
+
+    The provider is inferred from the URL host and the API key from the
+    ``key`` query parameter (Census) or ``registrationkey`` in the JSON
+    payload (BLS) unless given explicitly.
+    """
+
+    def __init__(self, session, scheduler: RequestScheduler, provider: Optional[str] = None,
+                 api_key: Optional[str] = None):
+        self.session = session
+        self.scheduler = scheduler
+        self.provider = provider
+        self.api_key = api_key
+
+    def _send(self, url: str, api_key: Optional[str], request: Callable[[], Any]):
+        provider = self.provider or infer_source(url)
+        return self.scheduler.send(request, provider, self.api_key or api_key)
+
+    def get(self, url, params=None, **kwargs):
+        api_key = (params or {}).get('key') if isinstance(params, Mapping) else None
+        return self._send(url, api_key, lambda: self.session.get(url, params=params, **kwargs))
+
+    def post(self, url, data=None, json=None, **kwargs):
+        api_key = None
+        try:
+            body = json if json is not None else _json_loads(data)
+            api_key = body.get('registrationkey') if isinstance(body, Mapping) else None
+        except ValueError:
+            pass
+        return self._send(url, api_key,
+                          lambda: self.session.post(url, data=data, json=json, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+def _json_loads(data):
+    if data is None:
+        return None
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data) if isinstance(data, str) else data
+
+
+class JobQueue:
+    """
+    Resumable on-disk job queue.
+
+    Jobs are identified by a string ID and carry a JSON-serializable
+    payload. The queue file is rewritten atomically after every change, so
+    a crashed or interrupted run resumes with only the unfinished jobs.
+
+    Parameters
+    ----------
+    path : str or Path
+        Queue file (JSON)
+    max_attempts : int
+        Failures after which a job is marked 'failed' and no longer taken
+    """
+
+    def __init__(self, path, max_attempts: int = 3):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        try:
+            self.jobs: Dict[str, Dict] = json.loads(self.path.read_text())['jobs']
+        except FileNotFoundError:
+            self.jobs = {}
+
+    def _save(self) -> None:
+        atomic_write_bytes(self.path, json.dumps({'jobs': self.jobs}, indent=1).encode('utf-8'))
+
+    def add(self, jobs: Mapping[str, Any]) -> int:
+        """
+        Enqueue jobs by ID; IDs already in the queue are left untouched.
+
+        Returns
+        -------
+        int
+            Number of newly added jobs
+        """
+        with self._lock:
+            added = 0
+            for job_id, payload in jobs.items():
+                if job_id not in self.jobs:
+                    self.jobs[job_id] = {'payload': payload, 'status': 'pending',
+                                         'attempts': 0, 'error': None}
+                    added += 1
+            if added:
+                self._save()
+            return added
+
+    def pending(self) -> List[str]:
+        """Return the IDs of jobs still to run, in insertion order."""
+        return [job_id for job_id, job in self.jobs.items() if job['status'] == 'pending']
+
+    def take(self, n: int, key: Optional[Callable[[Any], Any]] = None) -> List[str]:
+        """
+        Return up to ``n`` pending job IDs.
+
+        With ``key``, only jobs whose ``key(payload)`` equals that of the
+        first pending job are returned (e.g. jobs sharing a year window).
+        """
+        batch = []
+        group = None
+        for job_id in self.pending():
+            payload = self.jobs[job_id]['payload']
+            if key is not None:
+                if group is None:
+                    group = key(payload)
+                elif key(payload) != group:
+                    continue
+            batch.append(job_id)
+            if len(batch) >= n:
+                break
+        return batch
+
+    def payload(self, job_id: str) -> Any:
+        return self.jobs[job_id]['payload']
+
+    def complete(self, job_ids: Iterable[str]) -> None:
+        """Mark jobs done and persist the queue."""
+        with self._lock:
+            for job_id in job_ids:
+                self.jobs[job_id]['status'] = 'done'
+                self.jobs[job_id]['error'] = None
+            self._save()
+
+    def fail(self, job_ids: Iterable[str], error: str) -> None:
+        """Record a failed attempt; jobs over ``max_attempts`` become 'failed'."""
+        with self._lock:
+            for job_id in job_ids:
+                job = self.jobs[job_id]
+                job['attempts'] += 1
+                job['error'] = error
+                if job['attempts'] >= self.max_attempts:
+                    job['status'] = 'failed'
+            self._save()
+
+    def retry_failed(self) -> int:
+        """
+        Return failed jobs to 'pending' with a fresh attempt budget.
+
+        Returns
+        -------
+        int
+            Number of re-queued jobs
+        """
+        with self._lock:
+            failed = [job for job in self.jobs.values() if job['status'] == 'failed']
+            for job in failed:
+                job['status'] = 'pending'
+                job['attempts'] = 0
+            if failed:
+                self._save()
+            return len(failed)
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        counts = {'pending': 0, 'done': 0, 'failed': 0}
+        for job in self.jobs.values():
+            counts[job['status']] += 1
+        return counts
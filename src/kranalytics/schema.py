@@ -0,0 +1,317 @@
+"""
+Compact dtype schemas for sample and API-derived datasets.
+
+Each dataset's entry in ``MANIFEST.json`` carries a ``dtypes`` mapping
+(column -> pandas dtype string) that :func:`apply_schema` applies on load:
+
+- repeated strings (state names, ``source``, ``generated_date``, BLS
+  ``series_id``/``period``/``period_name``, FIPS codes) become categoricals
+- integers use ``int32`` when their range fits and ``int64`` otherwise;
+  columns with missing values use the nullable ``Int32``/``Int64`` types.
+  ``int8``/``int16`` would be lossless too, but ordinary arithmetic on them
+  (``year * 100``, ``weekly_wage * 52``) silently wraps around
+- floats become ``float32`` when every value survives the round trip at
+  the number of decimals it is stored with (rates, percentiles, indices)
+
+Inference is lossless. :func:`fit_memory_budget` goes further when a frame
+is still over a byte budget, downcasting every remaining float to
+``float32``, every integer to the smallest type holding its range and every
+string column to a categorical, and reports the savings in
+``df.attrs['memory_report']``.
+
+Example
+-------
+>>> schema = infer_schema(df)
+>>> register_schema('bls_employment_national', schema)
+>>> df = apply_schema(pd.read_csv(path), schema)
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+from kranalytics.columnar import DEFAULT_DATA_DIR, is_code_column
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = 'MANIFEST.json'
+
+# Share of distinct values below which a string column is stored as a categorical
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# Most decimals a float column may carry and still be considered for float32
+FLOAT32_MAX_DECIMALS = 6
+
+_INT_TYPES = [('int8', np.int8), ('int16', np.int16), ('int32', np.int32), ('int64', np.int64)]
+# Narrowest integer type inference picks; narrower ones are left to fit_memory_budget
+MIN_INT_DTYPE = 'int32'
+_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+_BUDGET = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmg]?b?)\s*$', re.IGNORECASE)
+
+
+def _int_dtype(values: np.ndarray, nullable: bool, narrowest: str = MIN_INT_DTYPE) -> str:
+    low, high = values.min(), values.max()
+    names = [name for name, _ in _INT_TYPES]
+    for name, kind in _INT_TYPES[names.index(narrowest):]:
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            return name.capitalize() if nullable else name
+    return 'Int64' if nullable else 'int64'
+
+
+def _decimals(values: np.ndarray) -> Optional[int]:
+    """Return the fewest decimals that represent every value exactly, if <= 6."""
+    for decimals in range(FLOAT32_MAX_DECIMALS + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            return decimals
+    return None
+
+
+def _float_dtype(values: np.ndarray) -> str:
+    if not len(values) or not np.isfinite(values).all():
+        return 'float64'
+    decimals = _decimals(values)
+    if decimals is None or np.abs(values).max() >= np.finfo(np.float32).max:
+        return 'float64'
+    restored = np.round(values.astype(np.float32).astype(np.float64), decimals)
+    return 'float32' if np.array_equal(restored, values) else 'float64'
+
+
+def infer_dtype(series: pd.Series) -> str:
+    """
+    Return the most compact lossless dtype for a column.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Column values
+
+    Returns
+    -------
+    str
+        pandas dtype string ('category', 'int32', 'Int32', 'float32', ...)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(series):
+        return str(series.dtype)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return str(series.dtype)
+
+    if pd.api.types.is_numeric_dtype(series):
+        present = series.dropna().to_numpy(dtype='float64')
+        nullable = len(present) < len(series)
+        if not len(present):
+            return str(series.dtype)
+        whole = np.isfinite(present).all() and np.array_equal(np.floor(present), present)
+        if pd.api.types.is_integer_dtype(series) or (
+                whole and np.abs(present).max() < 2 ** 53):
+            return _int_dtype(present, nullable)
+        return _float_dtype(present)
+
+    present = series.dropna()
+    if is_code_column(str(series.name)) or (
+            present.nunique() <= max(1, CATEGORY_MAX_UNIQUE_RATIO * len(series))):
+        return 'category'
+    return 'str'
+
+
+def infer_schema(df: pd.DataFrame) -> Dict[str, str]:
+    """Return ``{column: dtype}`` with the compact lossless dtype of every column."""
+    return {str(column): infer_dtype(df[column]) for column in df.columns}
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """
+    Cast columns to their declared dtypes.
+
+    Columns absent from the schema are left unchanged. A schema is a hint
+    recorded from earlier data, so a cast that would lose information for
+    the current values (fractions in a column declared integer, values
+    outside a declared integer range) is skipped; numpy integer types are
+    promoted to their nullable counterparts when the column has missing
+    values.
+
+    Returns
+    -------
+    pandas.DataFrame
+        New frame; the input is not modified
+    """
+    casts = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        series = df[column]
+        if dtype == 'str' and (pd.api.types.is_object_dtype(series)
+                               or pd.api.types.is_string_dtype(series)):
+            continue
+        if dtype in dict(_INT_TYPES) and series.isna().any():
+            dtype = dtype.capitalize()
+        try:
+            if dtype[:3].lower() == 'int' and pd.api.types.is_numeric_dtype(series):
+                present = series.dropna().to_numpy(dtype='float64')
+                info = np.iinfo(dtype.lower())
+                if len(present) and (present.min() < info.min or present.max() > info.max
+                                     or not np.array_equal(np.floor(present), present)):
+                    continue
+            casts[column] = series.astype(dtype)
+        except (TypeError, ValueError):
+            continue
+    if not casts:
+        return df.copy()
+    return df.assign(**casts)
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """Return the deep memory usage of a frame in bytes."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def parse_memory_budget(budget: Union[int, float, str]) -> int:
+    """
+    Parse a memory budget given in bytes or with a unit ('64MB', '1.5 GB').
+
+    Raises
+    ------
+    ValueError
+        If the budget cannot be parsed or is not positive
+    """
+    if isinstance(budget, (int, float)) and not isinstance(budget, bool):
+        value = int(budget)
+    else:
+        match = _BUDGET.match(str(budget))
+        if not match:
+            raise ValueError(f"Invalid memory budget: {budget!r}")
+        value = int(float(match.group(1)) * _UNITS[match.group(2).lower().rstrip('b')])
+    if value <= 0:
+        raise ValueError(f"Memory budget must be positive, got {budget!r}")
+    return value
+
+
+def fit_memory_budget(df: pd.DataFrame, memory_budget: Union[int, float, str],
+                      schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Downcast a frame towards a memory budget and report the savings.
+
+    The declared ``schema`` (or the inferred lossless one) is applied first.
+    If the frame is still over budget, remaining ``float64`` columns become
+    ``float32``, integers take the smallest type holding their range and
+    remaining string columns become categoricals. This may round floats
+    beyond their stored precision, and arithmetic on ``int8``/``int16``
+    columns can overflow.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Frame to shrink
+    memory_budget : int, float or str
+        Budget in bytes, or with a unit ('64MB')
+    schema : dict, optional
+        Declared dtypes (default: ``infer_schema(df)``)
+
+    Returns
+    -------
+    pandas.DataFrame
+        Downcast frame; ``attrs['memory_report']`` holds bytes before and
+        after, bytes saved, the budget, whether it was met and the per-column
+        dtype changes
+    """
+    budget = parse_memory_budget(memory_budget)
+    before = memory_bytes(df)
+    result = apply_schema(df, infer_schema(df) if schema is None else schema)
+
+    if memory_bytes(result) > budget:
+        casts = {}
+        for column in result.columns:
+            series = result[column]
+            if series.dtype == np.float64:
+                casts[column] = series.astype(np.float32)
+            elif pd.api.types.is_integer_dtype(series) and series.notna().any():
+                present = series.dropna().to_numpy(dtype='int64')
+                dtype = _int_dtype(present, series.hasnans, narrowest='int8')
+                if dtype.lower() != str(series.dtype).lower():
+                    casts[column] = series.astype(dtype)
+            elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                casts[column] = series.astype('category')
+        if casts:
+            result = result.assign(**casts)
+
+    after = memory_bytes(result)
+    report = {
+        'bytes_before': before,
+        'bytes_after': after,
+        'saved_bytes': before - after,
+        'ratio': before / after if after else float('inf'),
+        'budget_bytes': budget,
+        'within_budget': after <= budget,
+        'changed': {str(c): [str(df[c].dtype), str(result[c].dtype)]
+                    for c in df.columns if df[c].dtype != result[c].dtype},
+    }
+    result.attrs['memory_report'] = report
+    message = (f"Memory: {before / 1024:.1f} KB -> {after / 1024:.1f} KB "
+               f"({report['ratio']:.1f}x smaller, budget {budget / 1024:.1f} KB)")
+    if report['within_budget']:
+        logger.info(message)
+    else:
+        logger.warning(f"{message}; still over budget")
+    return result
+
+
+def _manifest_path(data_dir=None) -> Path:
+    data_dir = Path(data_dir) if data_dir is not None else DEFAULT_DATA_DIR
+    return data_dir / MANIFEST_FILENAME
+
+
+def load_schema(name: str, data_dir=None) -> Optional[Dict[str, str]]:
+    """
+    Return the registered dtypes of a dataset from ``MANIFEST.json``.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name, with or without ``.csv``
+    data_dir : str or Path, optional
+        Sample dataset directory (default: data/sample_datasets)
+
+    Returns
+    -------
+    dict or None
+        ``{column: dtype}``, or None if the dataset has no registered schema
+    """
+    try:
+        manifest = json.loads(_manifest_path(data_dir).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    stem = Path(name).stem
+    for entry in manifest.get('files', []):
+        if Path(entry.get('filename', '')).stem == stem:
+            return entry.get('dtypes')
+    return None
+
+
+def register_schema(name: str, schema: Dict[str, str], data_dir=None) -> Path:
+    """
+    Store a dataset's dtypes in ``MANIFEST.json``, adding an entry if needed.
+
+    Returns
+    -------
+    Path
+        The manifest file
+    """
+    path = _manifest_path(data_dir)
+    try:
+        manifest = json.loads(path.read_text())
+    except FileNotFoundError:
+        manifest = {'files': []}
+    filename = f'{Path(name).stem}.csv'
+    for entry in manifest.setdefault('files', []):
+        if Path(entry.get('filename', '')).stem == Path(name).stem:
+            entry['dtypes'] = dict(schema)
+            break
+    else:
+        manifest['files'].append({'filename': filename, 'dtypes': dict(schema)})
+    atomic_write_bytes(path, json.dumps(manifest, indent=2).encode('utf-8'))
+    return path
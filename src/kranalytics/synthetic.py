@@ -0,0 +1,314 @@
+"""
+Chunked, out-of-core synthetic data generation.
+
+Large fallback and load-test datasets (10^7-10^8 county-year rows) are
+generated in fixed-size blocks of entities (counties, series, geographies).
+Block ``b`` draws from its own ``numpy.random.Generator`` seeded by
+``SeedSequence(seed, spawn_key=(b,))``, so a dataset depends only on
+``(name, n_entities, seed, block_entities, params)``: the same rows come
+out whether they are streamed in small or large chunks, sequentially or on
+any number of worker processes.
+
+:func:`iter_chunks` streams DataFrames with bounded memory.
+:func:`generate_partitioned` generates chunks in parallel and writes each
+one as a typed columnar partition (see :mod:`kranalytics.columnar`), plus a
+``_dataset.json`` manifest; :func:`read_partitioned` and
+:func:`iter_partitions` load them back, memory-mapped.
+
+Layout
+------
+output_dir/
+    _dataset.json
+    part-00000/
+        _schema.json
+        county_id.npy
+        ...
+    part-00001/
+        ...
+
+Example
+-------
+>>> info = generate_partitioned('county_crime', 1_000_000, 'data/synthetic/crime',
+...                             max_workers=8)          # 14M county-year rows
+>>> for df in iter_partitions('data/synthetic/crime', ['year', 'crime_count']):
+...     totals.append(df.groupby('year')['crime_count'].sum())
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from kranalytics._fsutil import atomic_write_bytes
+from kranalytics.columnar import read_columnar, write_columnar
+
+DEFAULT_BLOCK_ENTITIES = 1_024
+DEFAULT_CHUNK_ROWS = 1_000_000
+MANIFEST_FILENAME = '_dataset.json'
+
+CENSUS_REGIONS = np.array(['Northeast', 'Midwest', 'South', 'West'])
+
+DATASETS: Dict[str, Dict[str, Callable]] = {}
+
+
+def synthetic_dataset(name: str, rows_per_entity: Callable[..., int] = lambda **params: 1):
+    """
+    Register a synthetic dataset.
+
+    The decorated function receives a block's generator, the global entity
+    indices of the block and the dataset parameters, and returns a dict of
+    equal-length column arrays (``len(entities) * rows_per_entity(**params)``
+    rows, entity-major).
+    """
+    def register(func):
+        DATASETS[name] = {'block': func, 'rows_per_entity': rows_per_entity}
+        return func
+    return register
+
+
+def _years(start_year: int = 2010, end_year: int = 2023) -> np.ndarray:
+    return np.arange(start_year, end_year + 1)
+
+
+@synthetic_dataset('county_crime', rows_per_entity=lambda **params: len(_years(**params)))
+def _county_crime(rng: np.random.Generator, entities: np.ndarray, start_year: int = 2010,
+                  end_year: int = 2023) -> Dict[str, np.ndarray]:
+    """County-year panel following the Crime Prediction tutorial's generator."""
+    years = _years(start_year, end_year)
+    n, t = len(entities), len(years)
+    elapsed = years - years[0]
+
+    population0 = rng.lognormal(10.5, 1.2, n)
+    area = rng.uniform(100, 2000, n)
+    growth = rng.normal(0.005, 0.01, n)
+    police = rng.normal(2.5, 0.8, n).clip(1.0, 5.0)
+    income = rng.normal(60, 15, n).clip(30, 120)
+    poverty = (rng.normal(15, 5, n)[:, np.newaxis] + rng.normal(0, 1, (n, t))).clip(5, 35)
+    unemployment = (rng.normal(5.5, 2, n)[:, np.newaxis] + rng.normal(0, 0.8, (n, t))).clip(2, 15)
+
+    population = np.maximum(population0[:, np.newaxis] * (1 + growth[:, np.newaxis]) ** elapsed,
+                            1).astype(np.int32)
+    density = population / area[:, np.newaxis]
+    expected_rate = np.maximum(500 + poverty * 15 + density * 0.05
+                               - police[:, np.newaxis] * 10 + unemployment * 20, 50)
+    crime_count = rng.negative_binomial(5, 5 / (5 + expected_rate / 100000 * population))
+
+    return {
+        'county_id': np.repeat(entities + 1, t).astype(np.int32),
+        'year': np.tile(years, n).astype(np.int16),
+        'population': population.ravel(),
+        'area_sq_miles': np.repeat(area.round(1), t).astype(np.float32),
+        'population_density': density.ravel().round(1).astype(np.float32),
+        'poverty_rate': poverty.ravel().round(1).astype(np.float32),
+        'unemployment_rate': unemployment.ravel().round(1).astype(np.float32),
+        'police_per_1000': np.repeat(police.round(2), t).astype(np.float32),
+        'median_income': np.repeat(income.round(1), t).astype(np.float32),
+        'crime_count': crime_count.ravel().astype(np.int32),
+        'crime_rate_per_100k': (crime_count / population * 100000).ravel().round(1)
+                               .astype(np.float32),
+    }
+
+
+def _months(start: str = '2020-01', end: str = '2024-09') -> pd.DatetimeIndex:
+    return pd.date_range(start, end, freq='MS')
+
+
+@synthetic_dataset('state_unemployment', rows_per_entity=lambda **params: len(_months(**params)))
+def _state_unemployment(rng: np.random.Generator, entities: np.ndarray, start: str = '2020-01',
+                        end: str = '2024-09') -> Dict[str, np.ndarray]:
+    """Monthly LAUS-style unemployment series with the tutorial's COVID spike."""
+    months = _months(start, end)
+    n, t = len(entities), len(months)
+    month = months.month.to_numpy()
+    base = rng.uniform(2.5, 6.0, n)[:, np.newaxis]
+    spike = base + rng.uniform(7.0, 11.0, n)[:, np.newaxis]
+    seasonal = rng.uniform(0.2, 0.6, n)[:, np.newaxis] * np.sin(2 * np.pi * month / 12)
+    covid = np.asarray((months >= '2020-04-01') & (months <= '2020-08-01'))
+    value = np.where(covid, spike + rng.normal(0, 0.5, (n, t)),
+                     base + seasonal + rng.normal(0, 0.2, (n, t)))
+
+    state_fips = np.char.zfill((entities % 56 + 1).astype(str), 2)
+    return {
+        'series_index': np.repeat(entities, t).astype(np.int32),
+        'state_fips': np.repeat(state_fips, t),
+        'year': np.tile(months.year.to_numpy(), n).astype(np.int16),
+        'month': np.tile(month, n).astype(np.int8),
+        'value': value.clip(1.0, 25.0).round(1).ravel().astype(np.float32),
+    }
+
+
+@synthetic_dataset('state_income')
+def _state_income(rng: np.random.Generator, entities: np.ndarray) -> Dict[str, np.ndarray]:
+    """Geography cross-section with the Income Analysis tutorial's columns."""
+    n = len(entities)
+    median_income = rng.lognormal(np.log(70000), 0.18, n)
+    poverty_rate = (32 - median_income / 4000 + rng.normal(0, 1.5, n)).clip(4, 30)
+    return {
+        'geo_id': entities.astype(np.int32),
+        'region': CENSUS_REGIONS[rng.integers(0, len(CENSUS_REGIONS), n)],
+        'median_income': median_income.astype(np.int32),
+        'poverty_rate': poverty_rate.round(1).astype(np.float32),
+        'population': rng.lognormal(14.5, 1.0, n).astype(np.int32),
+    }
+
+
+def _dataset(name: str) -> Dict[str, Callable]:
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{name}'. Choose from: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+
+def _block_rng(seed: int, block: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+
+
+def _generate_blocks(name: str, first_block: int, last_block: int, n_entities: int,
+                     block_entities: int, seed: int, params: Dict) -> pd.DataFrame:
+    block = _dataset(name)['block']
+    parts = []
+    for b in range(first_block, last_block):
+        entities = np.arange(b * block_entities, min(n_entities, (b + 1) * block_entities))
+        parts.append(block(_block_rng(seed, b), entities, **params))
+    return pd.DataFrame({column: np.concatenate([part[column] for part in parts])
+                         for column in parts[0]})
+
+
+def _chunk_plan(name: str, n_entities: int, chunk_rows: int, block_entities: int,
+                params: Dict) -> List[tuple]:
+    """Return (first_block, last_block) pairs covering all entities."""
+    if n_entities < 1:
+        raise ValueError("n_entities must be at least 1")
+    rows_per_block = block_entities * _dataset(name)['rows_per_entity'](**params)
+    blocks_per_chunk = max(1, chunk_rows // rows_per_block)
+    n_blocks = -(-n_entities // block_entities)
+    return [(first, min(n_blocks, first + blocks_per_chunk))
+            for first in range(0, n_blocks, blocks_per_chunk)]
+
+
+def n_rows(name: str, n_entities: int, **params) -> int:
+    """Return the number of rows a dataset has for ``n_entities`` entities."""
+    return n_entities * _dataset(name)['rows_per_entity'](**params)
+
+
+def iter_chunks(name: str, n_entities: int, chunk_rows: int = DEFAULT_CHUNK_ROWS, seed: int = 42,
+                block_entities: int = DEFAULT_BLOCK_ENTITIES, **params) -> Iterator[pd.DataFrame]:
+    """
+    Stream a synthetic dataset in chunks.
+
+    Parameters
+    ----------
+    name : str
+        Registered dataset ('county_crime', 'state_unemployment', 'state_income')
+    n_entities : int
+        Number of counties, series or geographies
+    chunk_rows : int
+        Target rows per chunk; chunks hold whole blocks, so they are rounded
+        down to a multiple of the block's row count (at least one block)
+    seed : int
+        Root seed
+    block_entities : int
+        Entities per random stream; changing it changes the data
+    **params
+        Dataset parameters (e.g. ``start_year``/``end_year``)
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks; their concatenation does not depend on ``chunk_rows``
+    """
+    for first, last in _chunk_plan(name, n_entities, chunk_rows, block_entities, params):
+        yield _generate_blocks(name, first, last, n_entities, block_entities, seed, params)
+
+
+def _write_partition(task) -> Dict:
+    name, index, first, last, n_entities, block_entities, seed, params, output_dir = task
+    df = _generate_blocks(name, first, last, n_entities, block_entities, seed, params)
+    directory = Path(output_dir) / f'part-{index:05d}'
+    write_columnar(df, directory)
+    return {'path': directory.name, 'rows': len(df),
+            'first_entity': first * block_entities,
+            'last_entity': min(n_entities, last * block_entities)}
+
+
+def generate_partitioned(name: str, n_entities: int, output_dir, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                         seed: int = 42, block_entities: int = DEFAULT_BLOCK_ENTITIES,
+                         max_workers: Optional[int] = None, **params) -> Dict:
+    """
+    Generate a synthetic dataset in parallel as columnar partitions.
+
+    Each worker generates one chunk at a time and writes it straight to
+    ``output_dir/part-NNNNN``, so peak memory is about one chunk per
+    worker. Partitions of an earlier run in ``output_dir`` are replaced.
+
+    Parameters
+    ----------
+    name, n_entities, chunk_rows, seed, block_entities, **params
+        As in :func:`iter_chunks`
+    output_dir : str or Path
+        Dataset directory
+    max_workers : int, optional
+        Worker processes (default: CPU count; 1 runs in-process)
+
+    Returns
+    -------
+    dict
+        The ``_dataset.json`` manifest: name, seed, block_entities, params,
+        rows, columns (dtypes) and the partition list
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plan = _chunk_plan(name, n_entities, chunk_rows, block_entities, params)
+
+    manifest_path = output_dir / MANIFEST_FILENAME
+    if manifest_path.exists():
+        manifest_path.unlink()
+    for stale in output_dir.glob('part-*'):
+        shutil.rmtree(stale)
+
+    tasks = [(name, i, first, last, n_entities, block_entities, seed, params, str(output_dir))
+             for i, (first, last) in enumerate(plan)]
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        partitions = [_write_partition(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partitions = list(executor.map(_write_partition, tasks, chunksize=chunksize))
+
+    schema = json.loads((output_dir / partitions[0]['path'] / '_schema.json').read_text())
+    manifest = {
+        'name': name,
+        'n_entities': n_entities,
+        'seed': seed,
+        'block_entities': block_entities,
+        'params': params,
+        'rows': sum(p['rows'] for p in partitions),
+        'columns': schema['columns'],
+        'partitions': partitions,
+    }
+    atomic_write_bytes(manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def read_manifest(directory) -> Dict:
+    """Return the ``_dataset.json`` manifest of a partitioned dataset."""
+    return json.loads((Path(directory) / MANIFEST_FILENAME).read_text())
+
+
+def iter_partitions(directory, columns: Optional[Sequence[str]] = None,
+                    mmap: bool = True) -> Iterator[pd.DataFrame]:
+    """Yield the partitions of a dataset in order, mapping only ``columns``."""
+    directory = Path(directory)
+    for partition in read_manifest(directory)['partitions']:
+        yield read_columnar(directory / partition['path'], columns, mmap=mmap)
+
+
+def read_partitioned(directory, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load a whole partitioned dataset (or a column projection) into one frame."""
+    return pd.concat(iter_partitions(directory, columns, mmap=False), ignore_index=True)
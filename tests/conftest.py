@@ -1,5 +1,6 @@
 """Pytest configuration and shared fixtures for KRAnalytics tests."""
 
+import sys
 import pytest
 from pathlib import Path
 
@@ -8,6 +9,9 @@ PROJECT_ROOT = Path(__file__).parent.parent
 NOTEBOOKS_DIR = PROJECT_ROOT / "notebooks" / "examples"
 DATA_DIR = PROJECT_ROOT / "data" / "sample_datasets"
 
+# Make the kranalytics package importable without installation
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
 
 @pytest.fixture
 def project_root():
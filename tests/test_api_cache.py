@@ -0,0 +1,136 @@
+"""Tests for the on-disk API response cache."""
+
+import os
+import time
+
+from kranalytics import api_cache
+from kranalytics.api_cache import ResponseCache, cache_key, infer_source
+
+CENSUS_URL = "https://api.census.gov/data/2022/acs/acs5"
+BLS_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Session stand-in that counts requests."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.payload)
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.payload)
+
+
+def test_cache_key_ignores_credentials_and_param_order():
+    """Test that keys are normalized and never depend on API keys."""
+    a = cache_key(CENSUS_URL, {'get': 'NAME', 'for': 'state:*', 'key': 'secret-1'})
+    b = cache_key(CENSUS_URL, {'for': 'state:*', 'get': 'NAME', 'key': 'secret-2'})
+    assert a == b
+    assert a != cache_key(CENSUS_URL.replace('2022', '2021'), {'get': 'NAME', 'for': 'state:*'})
+    assert infer_source(CENSUS_URL) == 'census'
+    assert infer_source(BLS_URL) == 'bls'
+
+
+def test_fetch_json_hits_cache_on_second_call(tmp_path):
+    """Test that repeated requests are served from disk."""
+    cache = ResponseCache(tmp_path)
+    session = FakeSession([['NAME', 'state'], ['Alabama', '01']])
+    params = {'get': 'NAME', 'for': 'state:*', 'key': 'secret'}
+
+    first = cache.fetch_json(session, CENSUS_URL, params=params)
+    second = ResponseCache(tmp_path).fetch_json(session, CENSUS_URL, params=params)
+
+    assert first == second
+    assert session.calls == 1
+    assert cache.stats()['misses'] == 1
+    assert b'secret' not in next(tmp_path.rglob('*.json')).read_bytes()
+
+
+def test_expired_and_uncacheable_responses_are_refetched(tmp_path):
+    """Test TTL expiry and the cacheable predicate."""
+    cache = ResponseCache(tmp_path, ttls={'bls': 0})
+    session = FakeSession({'status': 'REQUEST_SUCCEEDED'})
+    payload = {'seriesid': ['LNS14000000'], 'registrationkey': 'secret'}
+    cache.fetch_json(session, BLS_URL, payload=payload)
+    time.sleep(0.01)
+    cache.fetch_json(session, BLS_URL, payload=payload)
+    assert session.calls == 2
+
+    cache = ResponseCache(tmp_path / 'other')
+    session = FakeSession({'status': 'REQUEST_NOT_PROCESSED'})
+    for _ in range(2):
+        cache.fetch_json(session, BLS_URL, payload=payload,
+                         cacheable=lambda r: r['status'] == 'REQUEST_SUCCEEDED')
+    assert session.calls == 2
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path):
+    """Test that least-recently-used entries are evicted first."""
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    blob = 'x' * 3000
+    for i in range(3):
+        cache.set(CENSUS_URL, blob, {'for': f'state:{i:02d}'})
+        path = tmp_path / cache_key(CENSUS_URL, {'for': f'state:{i:02d}'})[:2]
+        for entry in path.iterdir():
+            os.utime(entry, (1000 + i, 1000 + i))
+
+    assert cache.get(CENSUS_URL, {'for': 'state:00'}) is not None  # refresh LRU position
+    cache.set(CENSUS_URL, blob, {'for': 'state:03'})
+
+    assert cache.get(CENSUS_URL, {'for': 'state:01'}) is None
+    assert cache.get(CENSUS_URL, {'for': 'state:00'}) is not None
+    assert cache.stats()['evictions'] >= 1
+    assert cache.stats()['bytes'] <= 10_000
+
+
+def test_stores_scan_the_directory_only_beyond_the_budget(tmp_path, monkeypatch):
+    """Test the running size total spares a directory walk on every write."""
+    scans = []
+    real_evict = api_cache.evict_lru_sized
+    monkeypatch.setattr(api_cache, 'evict_lru_sized',
+                        lambda *args: scans.append(args) or real_evict(*args))
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    for i in range(3):
+        cache.set(CENSUS_URL, 'x' * 3000, {'for': f'state:{i:02d}'})
+    cache.set(CENSUS_URL, 'y' * 3000, {'for': 'state:00'})  # Overwrite, same size
+    assert len(scans) == 1  # The first store measures the existing directory
+
+    cache.set(CENSUS_URL, 'x' * 3000, {'for': 'state:03'})
+    assert len(scans) == 2 and cache.evictions == 2  # Trimmed to the low-water mark
+    assert cache.stats()['bytes'] == cache._bytes <= 9_000
+
+
+def test_writes_into_a_full_cache_scan_only_after_the_headroom_is_used(tmp_path, monkeypatch):
+    """Test eviction leaves room for several writes instead of scanning on each one."""
+    scans = []
+    real_evict = api_cache.evict_lru_sized
+    monkeypatch.setattr(api_cache, 'evict_lru_sized',
+                        lambda *args: scans.append(args) or real_evict(*args))
+    cache = ResponseCache(tmp_path, max_bytes=100_000)
+    i = 0
+    while cache.evictions == 0:
+        cache.set(CENSUS_URL, 'x' * 1000, {'for': f'county:{i:03d}'})
+        i += 1
+    scans.clear()
+
+    for j in range(i, i + 100):
+        cache.set(CENSUS_URL, 'x' * 1000, {'for': f'county:{j:03d}'})
+        assert cache._bytes <= 100_000
+    assert 5 <= len(scans) <= 15  # One scan per ~9 writes of ~1.1 KB into 10 KB headroom
+    assert cache.stats()['bytes'] == cache._bytes
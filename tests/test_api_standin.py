@@ -0,0 +1,103 @@
+"""Tests for the record/replay Census and BLS API stand-in."""
+
+import requests
+import pytest
+
+from kranalytics.api_cache import infer_source
+from kranalytics.api_standin import FixtureStore, RecordingSession, StandInServer, \
+    seed_from_samples
+from kranalytics.bls_sync import BLS_API_URL, fetch_bls_series
+from kranalytics.census_acs import ACS_BASE_URL, fetch_acs
+from kranalytics.scheduler import RequestScheduler, ScheduledSession
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    return seed_from_samples(FixtureStore(tmp_path_factory.mktemp('fixtures')))
+
+
+def test_county_responses_are_synthesized_from_state_fixtures(store):
+    """Test a full county pull is served offline, deterministically."""
+    with StandInServer(store, counties_per_state=62) as server:
+        url = server.url_for(ACS_BASE_URL)
+        assert infer_source(url) == 'census'
+        df = fetch_acs(['B19013_001E', 'B19083_001E'], 'county', base_url=url, max_workers=4)
+        again = fetch_acs(['B19013_001E', 'B19083_001E'], 'county', base_url=url,
+                          state_fips=['06'])
+        states = fetch_acs(['B19013_001E'], 'state', base_url=url, state_fips=['06', '48'])
+
+    assert len(df) == 51 * 62 and not df.duplicated(['state', 'county']).any()
+    assert (df['B19013_001E'] % 1 == 0).all() and df['B19083_001E'].between(0, 1).all()
+    california = df[df['state'] == '06'].reset_index(drop=True)
+    assert california.equals(again)
+    assert california['NAME'].iloc[0] == 'County 001, California'
+    assert states['NAME'].tolist() == ['California', 'Texas']
+    assert server.stats['synthesized'] == 52 and server.stats['assembled'] == 1
+
+
+def test_recorded_responses_replay_exactly(store, tmp_path):
+    """Test the recorder captures responses the server then replays verbatim."""
+    recorded = FixtureStore(tmp_path / 'recorded')
+    with StandInServer(store) as upstream:
+        session = RecordingSession(requests.Session(), recorded)
+        live = fetch_acs(['B19083_001E'], 'state', base_url=upstream.url_for(ACS_BASE_URL),
+                         api_key='secret', session=session)
+    assert len(recorded) == 1
+    assert 'secret' not in next(iter(recorded.directory.glob('*/*.json'))).read_text()
+
+    with StandInServer(recorded, counties_per_state=0) as replay:
+        offline = fetch_acs(['B19083_001E'], 'state', base_url=replay.url_for(ACS_BASE_URL))
+        with pytest.raises(requests.HTTPError):
+            fetch_acs(['B19083_001E'], 'county', base_url=replay.url_for(ACS_BASE_URL),
+                      state_fips=['06'])
+    assert offline.equals(live)
+    assert replay.stats['replayed'] == 1 and replay.stats['missing'] == 1
+
+
+def test_injected_errors_and_throttling(store, tmp_path):
+    """Test 5xx errors are retried by the scheduler and 429s carry Retry-After."""
+    scheduler = RequestScheduler(state_dir=tmp_path, sleep=lambda seconds: None, seed=0)
+    session = ScheduledSession(requests.Session(), scheduler)
+    with StandInServer(store, error_rate=0.3, seed=1) as server:
+        df = fetch_acs(['B19013_001E'], 'county', base_url=server.url_for(ACS_BASE_URL),
+                       session=session, state_fips=['01', '02', '04', '05', '06'])
+    assert len(df) == 5 * 62
+    assert server.stats['errors'] > 0 and scheduler.stats['retries'] == server.stats['errors']
+
+    with StandInServer(store, rate=0.5, burst=2) as server:
+        url = server.url_for(ACS_BASE_URL) + '/2022/acs/acs5'
+        params = {'get': 'NAME,B19013_001E', 'for': 'state:*'}
+        statuses = [requests.get(url, params=params) for _ in range(3)]
+    assert [r.status_code for r in statuses] == [200, 200, 429]
+    assert int(statuses[-1].headers['Retry-After']) >= 1
+
+
+def test_bls_batches_are_assembled_per_series(store):
+    """Test recorded series are filtered by year and unknown series synthesized."""
+    with StandInServer(store, latency=0.01) as server:
+        df = fetch_bls_series(['LNS14000000', 'LAUST060000000000003'], 2022, 2023,
+                              url=server.url_for(BLS_API_URL))
+    counts = df.groupby('series_id').size().to_dict()
+    assert counts == {'LAUST060000000000003': 24, 'LNS14000000': 24}
+    assert df['year'].between(2022, 2023).all()
+    recorded = df[df['series_id'] == 'LNS14000000'].set_index(['year', 'period'])['value']
+    assert recorded.loc[(2023, 'M12')] == 3.8
+
+
+def test_indexes_follow_responses_recorded_while_serving(tmp_path):
+    """Test responses recorded after the first request are assembled from too."""
+    store = FixtureStore(tmp_path / 'fixtures')
+    server = StandInServer(store, synthesize_series=False)
+    path = '/' + BLS_API_URL.split('://', 1)[1].rstrip('/')
+    request = {'seriesid': ['LNS14000000'], 'startyear': '2023', 'endyear': '2023'}
+    assert server.respond('POST', path, request)[0] == 404
+
+    data = [{'year': year, 'period': 'M12', 'periodName': 'December', 'value': value,
+             'footnotes': [{}]} for year, value in (('2023', '3.8'), ('2022', '3.5'))]
+    store.record(BLS_API_URL, {'seriesid': ['LNS14000000'], 'startyear': '2022',
+                               'endyear': '2023'},
+                 {'status': 'REQUEST_SUCCEEDED',
+                  'Results': {'series': [{'seriesID': 'LNS14000000', 'data': data}]}}, 'POST')
+    status, _, body = server.respond('POST', path, request)
+    assert status == 200 and server.stats['assembled'] == 1
+    assert body['Results']['series'][0]['data'] == data[:1]
@@ -0,0 +1,89 @@
+"""Tests for automatic ARIMA order selection."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("statsmodels")
+
+from kranalytics.auto_arima import SELECTION_COLUMNS, ndiffs, nsdiffs, select_order, select_orders
+from kranalytics.forecasting import RESULT_COLUMNS, forecast_panel
+
+
+def _ar2_walk(periods=180, seed=0):
+    """Integrated AR(2): needs one difference, then a short AR model."""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0, 0.1, periods)
+    x = np.zeros(periods)
+    for t in range(2, periods):
+        x[t] = 0.6 * x[t - 1] - 0.25 * x[t - 2] + shocks[t]
+    return 5 + np.cumsum(x)
+
+
+def _panel(n_series=3, periods=72, seed=0):
+    dates = pd.date_range('2015-01-01', periods=periods, freq='MS')
+    return pd.concat([
+        pd.DataFrame({'series_id': f'LASST{i:02d}0000000000003', 'date': dates,
+                      'value': _ar2_walk(periods, seed + i)})
+        for i in range(n_series)
+    ], ignore_index=True)
+
+
+def test_differencing_orders_from_unit_root_and_seasonal_tests():
+    """Test d and D are estimated once per series from the tests."""
+    rng = np.random.default_rng(1)
+    assert ndiffs(rng.normal(0, 1, 120)) == 0
+    assert ndiffs(np.cumsum(rng.normal(0, 1, 120))) == 1
+    assert ndiffs(np.cumsum(rng.normal(0, 1, 120)), test='adf') == 1
+
+    months = np.arange(144)
+    seasonal = 5 + 2 * np.sin(2 * np.pi * months / 12) + rng.normal(0, 0.1, 144)
+    assert nsdiffs(seasonal, 12) == 1
+    assert nsdiffs(rng.normal(0, 1, 144), 12) == 0
+
+    with pytest.raises(ValueError, match='Invalid test'):
+        ndiffs(seasonal, test='pp')
+
+
+def test_pruned_search_fits_fewer_candidates_than_the_grid():
+    """Test pruning skips candidates and stays close to the grid optimum."""
+    values = _ar2_walk()
+    pruned = select_order(values, max_workers=2)
+    exhaustive = select_order(values, prune_delta=None, fit=False, max_workers=1)
+
+    assert pruned.order == (2, 1, 0)
+    assert pruned.n_fits < exhaustive.n_fits == exhaustive.n_grid
+    assert pruned.candidates['ic'].is_monotonic_increasing
+    assert exhaustive.ic <= pruned.ic <= exhaustive.ic + 2.0
+    assert pruned.results.forecast(6).shape == (6,)
+
+    with pytest.raises(ValueError, match='Invalid criterion'):
+        select_order(values, criterion='mse')
+
+
+def test_panel_selection_in_processes_matches_in_process_run():
+    """Test every panel series gets an order and failures are isolated."""
+    df = pd.concat([_panel(), pd.DataFrame({
+        'series_id': 'gappy', 'date': pd.date_range('2020-01-01', periods=24, freq='MS'),
+        'value': np.r_[np.arange(23.0), np.nan]})], ignore_index=True)
+    serial = select_orders(df, max_p=2, max_q=2, max_workers=1)
+    parallel = select_orders(df, max_p=2, max_q=2, max_workers=2)
+
+    assert list(serial.columns) == SELECTION_COLUMNS
+    pd.testing.assert_frame_equal(serial, parallel)
+    failed = serial[serial['status'] == 'failed']
+    assert list(failed['series_id']) == ['gappy']
+    assert 'missing values' in failed['error'].iloc[0]
+    assert (serial.loc[serial['status'] == 'ok', 'd'] == 1).all()
+
+
+def test_forecast_panel_with_automatic_orders():
+    """Test order='auto' picks orders on the train window and forecasts."""
+    df = _panel(n_series=2)
+    result = forecast_panel(df, order='auto', horizon=6, max_workers=1,
+                            selection_params={'max_p': 2, 'max_q': 2})
+
+    assert list(result.columns) == RESULT_COLUMNS
+    assert (result['status'] == 'ok').all()
+    counts = result.groupby(['series_id', 'segment']).size().unstack()
+    assert (counts['forecast'] == 6).all()
@@ -0,0 +1,77 @@
+"""Tests for rolling-origin backtesting."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("statsmodels")
+
+from kranalytics.backtesting import backtest_metrics, backtest_panel, rolling_origin_backtest
+
+
+def _series(periods=120, seed=0):
+    rng = np.random.default_rng(seed)
+    return 4 + np.cumsum(rng.normal(0, 0.1, periods))
+
+
+def _reference(values, origins, fit_window, horizon, order=(1, 1, 1)):
+    """Per-origin forecasts from re-filtering with the first fit's parameters."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        results = ARIMA(values[fit_window], order=order).fit()
+        return np.vstack([results.apply(values[window]).forecast(horizon)
+                          for window in origins])
+
+
+def test_expanding_backtest_matches_per_origin_filtering():
+    """Test that the vectorized recursion equals filtering each origin separately."""
+    values = _series()
+    bt = rolling_origin_backtest(values, horizon=6, n_origins=20)
+
+    assert bt['fits'] == 1
+    assert list(bt['origins']) == list(range(100, 120))
+    expected = _reference(values, [slice(0, o) for o in bt['origins']], slice(0, 100), 6)
+    np.testing.assert_allclose(bt['forecasts'], expected, atol=1e-10)
+
+
+def test_sliding_backtest_uses_fixed_window():
+    """Test that sliding windows re-filter only the most recent observations."""
+    values = _series()
+    bt = rolling_origin_backtest(values, horizon=3, n_origins=10, window='sliding',
+                                 window_size=48)
+    expected = _reference(values, [slice(o - 48, o) for o in bt['origins']],
+                          slice(bt['origins'][0] - 48, bt['origins'][0]), 3)
+    np.testing.assert_allclose(bt['forecasts'], expected, atol=1e-10)
+
+
+def test_metrics_ignore_horizons_past_series_end():
+    """Test that actuals beyond the data are NaN and excluded from metrics."""
+    errors = np.array([[1.0, -2.0], [3.0, np.nan]])
+    metrics = backtest_metrics(errors)
+
+    assert list(metrics['count']) == [2, 1, 3]
+    assert metrics.loc[1, 'mae'] == pytest.approx(2.0)
+    assert metrics.loc[2, 'rmse'] == pytest.approx(2.0)
+    assert metrics.loc['all', 'bias'] == pytest.approx(2 / 3)
+
+    bt = rolling_origin_backtest(_series(), horizon=4, n_origins=5, refit_every=2)
+    assert bt['fits'] == 3
+    assert np.isnan(bt['actuals'][-1, 1:]).all()
+
+
+def test_backtest_panel_isolates_failures():
+    """Test that each series gets metric rows and short series fail alone."""
+    dates = pd.date_range('2015-01-01', periods=120, freq='MS')
+    df = pd.concat([
+        pd.DataFrame({'series_id': 'A', 'date': dates, 'value': _series(seed=1)}),
+        pd.DataFrame({'series_id': 'B', 'date': dates[:10], 'value': np.arange(10.0)}),
+    ])
+    result = backtest_panel(df, horizon=3, n_origins=12, max_workers=1)
+
+    assert list(result.loc[result['series_id'] == 'A', 'horizon']) == [1, 2, 3, 'all']
+    failed = result[result['status'] == 'failed']
+    assert list(failed['series_id']) == ['B']
@@ -0,0 +1,57 @@
+"""Tests for the performance benchmark suite."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from kranalytics.benchmarks import (WORKLOADS, compare_to_baseline, load_baseline,
+                                    run_benchmarks, save_baseline)
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'scripts' / 'run_benchmarks.py'
+
+
+def test_every_workload_runs_at_small_scale():
+    """Test that each workload reports time, memory and throughput."""
+    results = run_benchmarks(size=20, repeat=1)
+
+    assert [r['name'] for r in results] == list(WORKLOADS)
+    for result in results:
+        assert result['n'] == 20 and result['rows'] >= 20
+        assert result['wall_time'] > 0
+        assert result['peak_memory_bytes'] > 0
+        assert result['throughput'] > 0
+
+
+def test_first_comparison_records_a_baseline(tmp_path):
+    """Test that --compare without a baseline saves one instead of failing."""
+    baseline = tmp_path / 'baseline.json'
+    command = [sys.executable, str(SCRIPT), '--size', '20', '--repeat', '1',
+               '--workload', 'csv_load', '--compare', '--baseline', str(baseline)]
+    first = subprocess.run(command, capture_output=True, text=True)
+
+    assert first.returncode == 0, first.stdout + first.stderr
+    assert [r['name'] for r in load_baseline(baseline)['results']] == ['csv_load']
+    assert 'Comparison against' in subprocess.run(command, capture_output=True,
+                                                  text=True).stdout
+
+
+def test_baseline_round_trip_and_regression_report(tmp_path):
+    """Test that slower or larger runs are flagged against a saved baseline."""
+    baseline = [{'name': 'a', 'size': 'small', 'wall_time': 1.0, 'peak_memory_bytes': 100},
+                {'name': 'b', 'size': 'small', 'wall_time': 1.0, 'peak_memory_bytes': 100}]
+    path = save_baseline(baseline, tmp_path / 'baseline.json')
+    stored = load_baseline(path)
+    assert stored['results'] == baseline
+    assert 'numpy' in stored['environment']
+
+    current = [{'name': 'a', 'size': 'small', 'wall_time': 1.1, 'peak_memory_bytes': 100},
+               {'name': 'b', 'size': 'small', 'wall_time': 1.0, 'peak_memory_bytes': 200},
+               {'name': 'c', 'size': 'small', 'wall_time': 9.0, 'peak_memory_bytes': 100}]
+    report = compare_to_baseline(current, stored, tolerance=0.2).set_index('name')
+
+    assert list(report.index) == ['a', 'b']
+    assert report.loc['a', 'time_ratio'] == pytest.approx(1.1)
+    assert not report.loc['a', 'regression']
+    assert report.loc['b', 'regression']
@@ -0,0 +1,76 @@
+"""Tests for incremental BLS series sync."""
+
+import pandas as pd
+
+from kranalytics.bls_sync import BLSSeriesStore, parse_bls_response, plan_sync, sync_bls_series
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+
+class FakeBLS:
+    """Serve monthly observations for any series and record requests."""
+
+    def __init__(self, last_year, last_month=12, revised=None):
+        self.last_year = last_year
+        self.last_month = last_month
+        self.revised = revised or {}
+        self.requests = []
+
+    def __call__(self, batch, start_year, end_year):
+        self.requests.append((tuple(batch), start_year, end_year))
+        series = []
+        for series_id in batch:
+            data = []
+            for year in range(end_year, start_year - 1, -1):
+                for month in range(12, 0, -1):
+                    if (year, month) > (self.last_year, self.last_month):
+                        continue
+                    value = self.revised.get((year, month), 3.0 + month / 10)
+                    data.append({'year': str(year), 'period': f'M{month:02d}',
+                                 'periodName': MONTHS[month - 1], 'value': str(value),
+                                 'footnotes': [{}]})
+            series.append({'seriesID': series_id, 'data': data})
+        return parse_bls_response({'status': 'REQUEST_SUCCEEDED',
+                                   'Results': {'series': series}})
+
+
+def test_first_sync_pulls_full_window(tmp_path):
+    """Test that an empty store requests the whole window in 50-series batches."""
+    store = BLSSeriesStore(tmp_path)
+    series_ids = [f'LAUST{i:02d}0000000000003' for i in range(60)]
+    fake = FakeBLS(last_year=2023)
+
+    summary = sync_bls_series(series_ids, store, 2020, 2023, fetch=fake)
+
+    assert summary == {'requests': 2, 'series': 60, 'added': 60 * 48, 'revised': 0}
+    assert [len(batch) for batch, _, _ in fake.requests] == [50, 10]
+    assert store.last_period(series_ids[0]) == (2023, 'M12')
+
+
+def test_delta_sync_requests_only_recent_years_and_applies_revisions(tmp_path):
+    """Test that later syncs only ask for the revision window and merge in place."""
+    store = BLSSeriesStore(tmp_path)
+    series_ids = ['LAUST060000000000003', 'LAUST480000000000003']
+    sync_bls_series(series_ids, store, 2015, 2024, fetch=FakeBLS(last_year=2024, last_month=3))
+
+    fake = FakeBLS(last_year=2024, last_month=5, revised={(2024, 2): 9.9})
+    summary = sync_bls_series(series_ids, store, 2015, 2024, revision_months=2, fetch=fake)
+
+    assert fake.requests == [(tuple(series_ids), 2024, 2024)]
+    assert summary['added'] == 4
+    assert summary['revised'] == 2
+    df = store.to_frame(['LAUST060000000000003'])
+    assert len(df) == 10 * 12 - 7
+    assert df.iloc[0]['period'] == 'M05'
+    assert df.loc[(df['year'] == 2024) & (df['period'] == 'M02'), 'value'].item() == 9.9
+
+
+def test_plan_groups_series_by_start_year(tmp_path):
+    """Test that series with different histories get separate windows."""
+    store = BLSSeriesStore(tmp_path)
+    store.upsert(pd.DataFrame([{
+        'series_id': 'A', 'year': 2022, 'period': 'M01', 'period_name': 'January',
+        'value': 1.0, 'footnotes': ''}]))
+    plan = plan_sync(store, ['A', 'B'], 2010, 2024, revision_months=1)
+    assert plan == [(2010, ['B']), (2021, ['A'])]
@@ -0,0 +1,95 @@
+"""Tests for the sharded, streaming Census ACS fetcher."""
+
+import json
+
+import numpy as np
+import pytest
+
+from kranalytics.census_acs import build_shards, fetch_acs, parse_census_json
+
+
+def _chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_streaming_parser_handles_any_chunk_boundary():
+    """Test that values split across chunks are parsed into typed columns."""
+    body = json.dumps([
+        ["NAME", "B19013_001E", "state"],
+        ["Alabama", "59609", "01"],
+        ["Puerto \"PR\" Rico", None, "72"],
+        ["Nowhere", "-666666666", "99"],
+    ])
+    for size in (1, 3, 7, len(body)):
+        df = parse_census_json(_chunked(body, size), numeric_columns=['B19013_001E'])
+        assert list(df.columns) == ["NAME", "B19013_001E", "state"]
+        assert df['B19013_001E'].dtype == np.float64
+        assert df['B19013_001E'].iloc[0] == 59609
+        assert np.isnan(df['B19013_001E'].iloc[1:]).all()
+        assert list(df['state']) == ['01', '72', '99']
+        assert df['NAME'].iloc[1] == 'Puerto "PR" Rico'
+
+
+def test_parser_rejects_truncated_body():
+    """Test that a cut-off response raises instead of returning partial data."""
+    with pytest.raises(ValueError):
+        parse_census_json(['[["NAME","state"],["Alabama","01"]'])
+
+
+def test_build_shards_splits_states_and_variable_groups():
+    """Test state sharding and the per-call variable limit."""
+    variables = [f'B19001_{i:03d}E' for i in range(1, 61)]
+    shards = build_shards(variables, 'county', state_fips=['01', '06'])
+    assert len(shards) == 4
+    assert all(len(s['get'].split(',')) <= 50 for s in shards)
+    assert shards[0]['get'].startswith('NAME,')
+    assert {s['in'] for s in shards} == {'state:01', 'state:06'}
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body.encode('utf-8')
+        self.status_code = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), 5):
+            yield self.body[i:i + 5]
+
+
+class FakeCensus:
+    """Serve two counties per state for any requested variables."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params, **kwargs):
+        self.calls.append(params)
+        columns = params['get'].split(',')
+        state = params['in'].split(':')[1]
+        rows = [columns + ['state', 'county']]
+        for county in ('001', '003'):
+            values = [f'County {county}' if c == 'NAME' else str(int(state) * 1000 + int(county))
+                      for c in columns]
+            rows.append(values + [state, county])
+        return FakeResponse(json.dumps(rows))
+
+
+def test_fetch_acs_merges_state_and_variable_shards():
+    """Test that concurrent shards are reassembled into one frame."""
+    session = FakeCensus()
+    df = fetch_acs(['B19013_001E', 'B19301_001E'], 'county', state_fips=['01', '06'],
+                   variables_per_request=2, session=session, max_workers=4)
+
+    assert len(session.calls) == 4
+    assert list(df.columns) == ['NAME', 'B19013_001E', 'B19301_001E', 'state', 'county']
+    assert list(df['state']) == ['01', '01', '06', '06']
+    assert df['B19301_001E'].tolist() == [1001.0, 1003.0, 6001.0, 6003.0]
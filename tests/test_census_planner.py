@@ -0,0 +1,102 @@
+"""Tests for the Census ACS query planner."""
+
+import threading
+
+import pytest
+
+from kranalytics.census_planner import ACSQuery, fetch_queries, naive_request_count, plan_queries
+
+BRACKETS = [f'B19001_{i:03d}E' for i in range(1, 61)]
+
+
+def _value(variable, fips):
+    return float(int(fips) * 1000 + int(variable[7:10]))
+
+
+class FakeCensusJSON:
+    """Answer ``fetch_json(url, params)`` for three states or their counties."""
+
+    STATES = ('01', '06', '48')
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, params):
+        with self.lock:
+            self.calls.append((url, params))
+        assert len(params['get'].split(',')) <= 50 and params['key'] == 'k'
+        columns = params['get'].split(',')
+        level, _, states = params['for'].partition(':')
+        if level == 'county':
+            rows = [columns + ['state', 'county']]
+            fips = params['in'].split(':')[1]
+            for county in ('001', '003'):
+                rows.append([f'County {fips}{county}' if c == 'NAME'
+                             else str(_value(c, fips + county)) for c in columns] + [fips, county])
+            return rows
+        wanted = self.STATES if states == '*' else states.split(',')
+        return [columns + ['state']] + [
+            [f'State {fips}' if c == 'NAME' else str(_value(c, fips)) for c in columns] + [fips]
+            for fips in wanted]
+
+
+def test_compatible_queries_share_requests():
+    """Test overlapping state pulls merge and long variable lists split at the cap."""
+    income = ACSQuery('income', ['B19013_001E', 'B19301_001E', 'B19001_001E'])
+    inequality = ACSQuery('inequality', ['B19083_001E', 'B19001_001E'])
+    plan = plan_queries([income, inequality])
+    assert len(plan) == 1 and naive_request_count([income, inequality]) == 2
+    assert plan[0].params == {'get': 'NAME,B19013_001E,B19301_001E,B19001_001E,B19083_001E',
+                              'for': 'state:*'}
+    assert plan[0].queries == ['income', 'inequality']
+
+    brackets = ACSQuery('brackets', BRACKETS)
+    other_vintage = ACSQuery('income_2021', ['B19013_001E'], year=2021)
+    plan = plan_queries([income, brackets, other_vintage])
+    assert len(plan) == 3 and {r.year for r in plan} == {2021, 2022}
+    assert all(len(r.params['get'].split(',')) <= 50 for r in plan)
+
+
+def test_state_sharded_levels_merge_per_state():
+    """Test a query restricted to a few states never widens another query's pull."""
+    queries = [ACSQuery('a', ['B19013_001E'], 'county', state_fips=['1', '06']),
+               ACSQuery('b', ['B19083_001E'], 'county', state_fips=['06'])]
+    plan = plan_queries(queries)
+    assert [(r.params['in'], r.variables) for r in plan] == [
+        ('state:01', ['B19013_001E']), ('state:06', ['B19013_001E', 'B19083_001E'])]
+    assert naive_request_count(queries) == 3
+
+
+def test_results_are_reassembled_per_query():
+    """Test each caller gets its own rows, columns and names back."""
+    fake = FakeCensusJSON()
+    queries = [
+        ACSQuery('income', {'B19013_001E': 'median_household_income'}, state_fips=['06', '48']),
+        ACSQuery('brackets', BRACKETS),
+        ACSQuery('counties', ['B19083_001E'], 'county', state_fips=['48']),
+    ]
+    frames = fetch_queries(queries, api_key='k', fetch_json=fake, max_workers=4)
+
+    assert len(fake.calls) == 3
+    income = frames['income']
+    assert list(income.columns) == ['NAME', 'median_household_income', 'state']
+    assert income['state'].tolist() == ['06', '48']
+    assert income['median_household_income'].tolist() == [6001.0, 48001.0]
+
+    brackets = frames['brackets']
+    assert list(brackets.columns) == ['NAME'] + BRACKETS + ['state'] and len(brackets) == 3
+    assert brackets.loc[brackets['state'] == '06', 'B19001_060E'].item() == 6060.0
+
+    counties = frames['counties']
+    assert list(counties.columns) == ['NAME', 'B19083_001E', 'state', 'county']
+    assert counties['B19083_001E'].tolist() == [48001001.0, 48003001.0]
+
+
+def test_invalid_queries_are_rejected():
+    """Test unknown geographies and duplicate names fail before any request."""
+    with pytest.raises(ValueError, match='Invalid geography'):
+        ACSQuery('tracts', ['B19013_001E'], geography='tract')
+    with pytest.raises(ValueError, match='Duplicate query names: a'):
+        plan_queries([ACSQuery('a', ['B19013_001E']), ACSQuery('a', ['B19083_001E'])])
+    assert fetch_queries([], fetch_json=FakeCensusJSON()) == {}
@@ -0,0 +1,56 @@
+"""Tests for columnar sample dataset storage."""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from kranalytics.columnar import (
+    columnar_path,
+    convert_csv,
+    load_sample_dataset,
+    read_columnar,
+    write_columnar,
+)
+
+
+def test_round_trip_preserves_types(tmp_path):
+    """Test that codes, numbers and missing values survive a round trip."""
+    df = pd.DataFrame({
+        'state_fips': ['01', '02', '56'],
+        'gini_index': [0.48, 0.43, np.nan],
+        'year': [2022, 2022, 2022],
+        'footnotes': ['', None, 'P'],
+    })
+    schema = write_columnar(df, tmp_path / 'ds')
+    assert schema['state_fips'] == '<U2'
+
+    loaded = read_columnar(tmp_path / 'ds')
+    assert list(loaded['state_fips']) == ['01', '02', '56']
+    assert loaded['year'].dtype == np.int64
+    assert np.isnan(loaded['gini_index'].iloc[2])
+    assert list(loaded['footnotes']) == ['', '', 'P']
+
+
+def test_projection_reads_only_requested_columns(tmp_path):
+    """Test that unrequested column files are never opened."""
+    df = pd.DataFrame({'state_fips': ['01'], 'gini_index': [0.5], 'other': [1]})
+    write_columnar(df, tmp_path / 'ds')
+    (tmp_path / 'ds' / 'other.npy').unlink()
+
+    loaded = read_columnar(tmp_path / 'ds', columns=['state_fips', 'gini_index'])
+    assert list(loaded.columns) == ['state_fips', 'gini_index']
+
+
+def test_load_sample_dataset_prefers_columnar(tmp_path, data_dir):
+    """Test CSV fallback and columnar loading of a shipped sample dataset."""
+    shutil.copy(data_dir / 'census_inequality_2022.csv', tmp_path)
+    from_csv = load_sample_dataset('census_inequality_2022', ['state_fips', 'gini_index'],
+                                   data_dir=tmp_path)
+    assert from_csv['state_fips'].iloc[0] == '01'
+
+    convert_csv(tmp_path / 'census_inequality_2022.csv')
+    assert columnar_path('census_inequality_2022.csv', tmp_path).exists()
+    from_npy = load_sample_dataset('census_inequality_2022.csv', ['state_fips', 'gini_index'],
+                                   data_dir=tmp_path)
+    pd.testing.assert_frame_equal(from_npy, from_csv, check_dtype=False)
@@ -0,0 +1,96 @@
+"""Tests for the scalable count-model fitting path."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics.count_models import (DesignMatrix, fit_count_models, fit_negative_binomial,
+                                      fit_poisson)
+from kranalytics.synthetic import iter_chunks
+
+NUMERIC = ['poverty_rate', 'unemployment_rate', 'police_per_1000']
+
+
+@pytest.fixture(scope='module')
+def panel():
+    """County-year crime panel with a state fixed effect."""
+    df = pd.concat(iter_chunks('county_crime', 300, start_year=2016, end_year=2023),
+                   ignore_index=True)
+    df['state'] = 'S' + (df['county_id'] % 20).astype(str)
+    return df
+
+
+def _dense_design(df):
+    import statsmodels.api as sm
+
+    dummies = [pd.get_dummies(df[column], prefix=column, drop_first=True, dtype=float)
+               for column in ['state', 'year']]
+    return sm.add_constant(pd.concat([df[NUMERIC].astype(float)] + dummies, axis=1))
+
+
+def test_design_matrix_is_sparse_float32_with_dropped_baseline(panel):
+    """Test the one-hot layout, names and unseen-level handling."""
+    design = DesignMatrix(NUMERIC, ['state', 'year'])
+    X = design.fit_transform(panel)
+
+    assert X.dtype == np.float32 and X.format == 'csr'
+    assert X.shape == (len(panel), 1 + 3 + 19 + 7) == (len(panel), len(design.names))
+    assert design.names[4] == 'state[S1]' and design.names[-1] == 'year[2023]'
+    assert X[:, 4:].sum(axis=1).max() == 2
+
+    new = panel.head(2).assign(state='unseen')
+    assert design.transform(new)[:, 4:23].nnz == 0
+
+
+def test_poisson_irls_matches_statsmodels(panel):
+    """Test coefficients and standard errors against statsmodels' GLM."""
+    sm = pytest.importorskip('statsmodels.api')
+    offset = np.log(panel['population'])
+    design = DesignMatrix(NUMERIC, ['state', 'year'])
+    X = design.fit_transform(panel)
+
+    fit = fit_poisson(X, panel['crime_count'], offset, design=design, chunk_rows=500)
+    reference = sm.GLM(panel['crime_count'], _dense_design(panel),
+                       family=sm.families.Poisson(), offset=offset).fit()
+
+    assert fit.converged
+    names = ['const'] + NUMERIC
+    np.testing.assert_allclose(fit.params[names], reference.params[names], rtol=1e-6)
+    np.testing.assert_allclose(fit.bse[names], reference.bse[names], rtol=1e-4)
+    assert fit.deviance == pytest.approx(reference.deviance, rel=1e-8)
+
+
+def test_negative_binomial_warm_start_matches_statsmodels(panel):
+    """Test NB2 coefficients, dispersion and log-likelihood against statsmodels."""
+    pytest.importorskip('statsmodels')
+    from statsmodels.discrete.discrete_model import NegativeBinomial
+
+    offset = np.log(panel['population'])
+    design = DesignMatrix(NUMERIC, ['state', 'year'])
+    X = design.fit_transform(panel)
+    poisson = fit_poisson(X, panel['crime_count'], offset, design=design)
+
+    fit = fit_negative_binomial(X, panel['crime_count'], offset, start=poisson, design=design)
+    reference = NegativeBinomial(panel['crime_count'], _dense_design(panel),
+                                 offset=offset).fit(method='newton', disp=0, maxiter=200)
+
+    assert fit.alpha == pytest.approx(reference.params['alpha'], rel=1e-4)
+    assert fit.loglike == pytest.approx(reference.llf, rel=1e-8)
+    names = ['const'] + NUMERIC
+    np.testing.assert_allclose(fit.params[names], reference.params[names], rtol=1e-4)
+    assert fit.loglike > poisson.loglike
+
+
+def test_fit_count_models_compares_all_models(panel):
+    """Test the train/test comparison table over the three model families."""
+    train, test = panel[panel['year'] < 2022], panel[panel['year'] >= 2022]
+
+    fits, metrics = fit_count_models(train, test, 'crime_count', NUMERIC, ['state'],
+                                     exposure='population')
+
+    assert set(fits) == {'poisson', 'negative_binomial', 'hist_gradient_boosting'}
+    assert list(metrics.columns) == ['Model', 'MAE', 'RMSE', 'R²', 'MAPE (%)']
+    assert metrics['RMSE'].is_monotonic_increasing
+    assert (metrics['R²'] > 0.3).all()
+    with pytest.raises(ValueError, match='Unknown models'):
+        fit_count_models(train, test, 'crime_count', NUMERIC, models=['forest'])
@@ -0,0 +1,136 @@
+"""Tests for the shared-memory data service."""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics import data_service
+from kranalytics.columnar import DEFAULT_DATA_DIR
+from kranalytics.data_service import DataService, DataServiceClient
+from kranalytics.data_utils import load_data_with_fallback, load_sample_data
+
+LOADER_CALLS = []
+
+
+def slow_county_loader(year=2022):
+    """Stand-in for a Census API call that takes a while."""
+    LOADER_CALLS.append(year)
+    time.sleep(0.3)
+    return pd.DataFrame({'fips': np.arange(3143, dtype=np.int32),
+                         'income': np.linspace(30000, 150000, 3143), 'year': year})
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_service, 'ALLOWED_LOADERS', {})
+    data_service.allow_loader(slow_county_loader)
+    with DataService(tmp_path / 's.sock', tmp_path / 'shm') as running:
+        monkeypatch.setenv(data_service.ENV_VARIABLE, str(running.socket_path))
+        yield running
+
+
+def test_concurrent_requests_share_one_load(service):
+    """Test simultaneous clients coalesce onto one loader call and one copy."""
+    LOADER_CALLS.clear()
+    spec = data_service.loader_spec(slow_county_loader)
+    frames = []
+
+    def fetch():
+        frames.append(DataServiceClient(service.socket_path).get('census_income_2022',
+                                                                 loader=spec, year=2021))
+
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert LOADER_CALLS == [2021]
+    assert len(frames) == 6 and all(len(df) == 3143 for df in frames)
+    assert all(df.attrs['data_source'] == 'api' for df in frames)
+    income = frames[0]['income'].values
+    assert isinstance(income, np.memmap) and not income.flags.writeable
+    stats = DataServiceClient(service.socket_path).stats()
+    assert stats['loads'] == 1 and stats['requests'] == 6
+    assert stats['coalesced'] + stats['hits'] == 5
+
+
+def test_data_utils_use_the_service_when_configured(service):
+    """Test the loaders return the served copy with the same dtypes as a local load."""
+    local = load_sample_data('bls_employment_national', data_dir=DEFAULT_DATA_DIR)
+    served = load_sample_data('bls_employment_national')
+    pd.testing.assert_frame_equal(served.copy(), local, check_index_type=False)
+    assert service.stats['loads'] == 1
+
+    projected = load_sample_data('bls_employment_national', columns=['value'])
+    assert list(projected.columns) == ['value'] and service.stats['hits'] == 1
+
+    df = load_data_with_fallback(slow_county_loader, 'census_income_2022', year=2020)
+    assert df.attrs['data_source'] == 'api' and service.stats['loads'] == 2
+
+
+def test_falls_back_to_local_loading(tmp_path, monkeypatch):
+    """Test an unreachable service or an unservable loader never breaks loading."""
+    monkeypatch.setenv(data_service.ENV_VARIABLE, str(tmp_path / 'missing.sock'))
+    df = load_sample_data('census_income_2022')
+    assert len(df) > 0
+
+    with DataService(tmp_path / 's.sock', tmp_path / 'shm') as service:
+        monkeypatch.setenv(data_service.ENV_VARIABLE, str(service.socket_path))
+        df = load_data_with_fallback(lambda: slow_county_loader(1999), 'census_income_2022')
+        assert df.attrs['data_source'] == 'api' and service.stats['requests'] == 0
+
+
+def test_errors_are_reported_to_clients(service):
+    """Test unknown datasets and ops return errors without killing the service."""
+    client = DataServiceClient(service.socket_path)
+    with pytest.raises(RuntimeError, match='no_such_dataset'):
+        client.get('no_such_dataset')
+    with pytest.raises(RuntimeError, match='No loader registered'):
+        client.get('census_income_2022', year=2020)
+    assert client.request('frobnicate')['status'] == 'error'
+    assert client.request('ping')['status'] == 'ok'
+    assert service.stats['errors'] == 2
+
+
+def test_only_registered_loaders_run_in_the_service(service, monkeypatch):
+    """Test client-named loaders are looked up, never imported, and others run locally."""
+    client = DataServiceClient(service.socket_path)
+    with pytest.raises(RuntimeError, match='not registered'):
+        client.get('census_income_2022', loader='os:getcwd')
+    with pytest.raises(RuntimeError, match='not registered'):
+        client.get('census_income_2022', loader='kranalytics.data_utils:load_sample_data')
+
+    monkeypatch.setattr(data_service, 'ALLOWED_LOADERS', {})
+    LOADER_CALLS.clear()
+    df = load_data_with_fallback(slow_county_loader, 'census_income_2022', year=2019)
+    assert df.attrs['data_source'] == 'api' and LOADER_CALLS == [2019]
+    assert service.stats['loads'] == 0 and service.stats['errors'] == 3
+
+    monkeypatch.setattr(data_service, 'LOADERS', {})
+    data_service.register_loader('county_income', slow_county_loader)
+    spec = data_service.loader_spec(slow_county_loader)
+    assert len(client.get('census_income_2022', loader=spec, year=2018)) == 3143
+
+
+def test_regenerated_sample_files_are_not_served_stale(tmp_path):
+    """Test a rewritten sample CSV is reloaded, also by a restarted service on the same store."""
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    csv = data_dir / 'rates.csv'
+    pd.DataFrame({'rate': [1.5, 2.5]}).to_csv(csv, index=False)
+
+    with DataService(tmp_path / 's.sock', tmp_path / 'shm', data_dir=data_dir) as service:
+        client = DataServiceClient(service.socket_path)
+        assert client.get('rates')['rate'].tolist() == [1.5, 2.5]
+        pd.DataFrame({'rate': [3.25, 4.25, 5.25]}).to_csv(csv, index=False)
+        assert client.get('rates')['rate'].tolist() == [3.25, 4.25, 5.25]
+        assert service.stats['loads'] == 2
+
+    pd.DataFrame({'rate': [6.5, 7.5, 8.5]}).to_csv(csv, index=False)
+    with DataService(tmp_path / 's.sock', tmp_path / 'shm', data_dir=data_dir) as service:
+        client = DataServiceClient(service.socket_path)
+        assert client.get('rates')['rate'].tolist() == [6.5, 7.5, 8.5]
@@ -0,0 +1,74 @@
+"""Tests for execution tracking and stage instrumentation."""
+
+import time
+
+import pytest
+
+from kranalytics.api_cache import ResponseCache
+from kranalytics.khipu_analytics.execution_tracking import (
+    finalize_notebook_tracking, get_execution_summary, list_recent_executions,
+    setup_notebook_tracking, slowest_stages, track_stage, tracked_stage)
+
+
+def test_stages_are_written_to_execution_log(tmp_path):
+    """Test that stage timing, rows and nesting end up in the JSON log."""
+    metadata = setup_notebook_tracking('Demo.ipynb', seed=7, log_dir=tmp_path)
+
+    @tracked_stage('clean')
+    def clean(rows):
+        return rows[:2]
+
+    with track_stage('fetch') as stage:
+        time.sleep(0.01)
+        stage.rows_out = 3
+        clean([1, 2, 3])
+    final = finalize_notebook_tracking(metadata, results={'data_points': 3})
+
+    record = get_execution_summary(final['execution_id'], log_dir=tmp_path)
+    assert record['status'] == 'completed'
+    assert [s['name'] for s in record['stages']] == ['clean', 'fetch']
+    clean_stage, fetch_stage = record['stages']
+    assert (clean_stage['parent'], clean_stage['rows_in'], clean_stage['rows_out']) == ('fetch', 3, 2)
+    assert fetch_stage['wall_seconds'] >= 0.01
+    assert fetch_stage['cpu_seconds'] >= 0
+    assert fetch_stage['peak_rss_delta_bytes'] >= 0
+
+
+def test_failed_stage_is_recorded_and_reraised(tmp_path):
+    """Test that an exception marks the stage failed without being swallowed."""
+    metadata = setup_notebook_tracking('Demo.ipynb', log_dir=tmp_path)
+    with pytest.raises(ValueError):
+        with track_stage('fit'):
+            raise ValueError('diverged')
+    assert metadata['stages'][0]['status'] == 'failed'
+    finalize_notebook_tracking(metadata, errors=['diverged'])
+    assert list_recent_executions(log_dir=tmp_path)[0]['status'] == 'failed'
+
+
+def test_cache_hits_are_attributed_to_current_stage(tmp_path):
+    """Test that ResponseCache hits inside a stage are counted on it."""
+    cache = ResponseCache(tmp_path / 'cache')
+    cache.set('https://api.census.gov/data/2022/acs/acs5', [['NAME']], {'get': 'NAME'})
+    metadata = setup_notebook_tracking('Demo.ipynb', save_log=False)
+    with track_stage('fetch'):
+        for _ in range(3):
+            cache.get('https://api.census.gov/data/2022/acs/acs5', {'get': 'NAME'})
+    finalize_notebook_tracking(metadata)
+    assert metadata['stages'][0]['cache_hits'] == 3
+
+
+def test_slowest_stages_ranks_across_executions(tmp_path):
+    """Test that stage totals are aggregated over recent executions."""
+    for fit_seconds in (0.02, 0.03):
+        metadata = setup_notebook_tracking('Demo.ipynb', log_dir=tmp_path)
+        with track_stage('fetch'):
+            pass
+        with track_stage('fit'):
+            time.sleep(fit_seconds)
+        finalize_notebook_tracking(metadata)
+
+    summary = slowest_stages(limit=5, log_dir=tmp_path)
+    assert list(summary['stage']) == ['fit', 'fetch']
+    assert summary.loc[0, 'runs'] == 2
+    assert summary.loc[0, 'total_wall_seconds'] >= 0.05
+    assert summary['share_of_time'].sum() == pytest.approx(1.0)
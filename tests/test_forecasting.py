@@ -0,0 +1,87 @@
+"""Tests for the multi-series forecasting engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("statsmodels")
+
+from kranalytics.forecasting import (PROPHET_PARAMS, RESULT_COLUMNS, _prophet_warm_start,
+                                     fit_arima_series, fit_prophet_series, forecast_panel)
+
+
+def _panel(n_series=3, periods=60, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2018-01-01', periods=periods, freq='MS')
+    return pd.concat([
+        pd.DataFrame({'series_id': f'LASST{i:02d}0000000000003', 'date': dates,
+                      'value': 4 + np.cumsum(rng.normal(0, 0.1, periods))})
+        for i in range(n_series)
+    ], ignore_index=True)
+
+
+def test_forecast_panel_returns_tidy_frame():
+    """Test that every series gets test rows, forecast rows and metrics."""
+    df = _panel()
+    result = forecast_panel(df, horizon=6, max_workers=1)
+
+    assert list(result.columns) == RESULT_COLUMNS
+    assert (result['status'] == 'ok').all()
+    counts = result.groupby(['series_id', 'segment']).size().unstack()
+    assert (counts['test'] == 12).all() and (counts['forecast'] == 6).all()
+
+    forecast = result[result['segment'] == 'forecast']
+    assert forecast['actual'].isna().all()
+    assert (forecast['date'].min() > df['date'].max())
+    assert (forecast['yhat_lower'] <= forecast['yhat']).all()
+    assert (forecast['yhat'] <= forecast['yhat_upper']).all()
+
+
+def test_failed_series_are_isolated():
+    """Test that a short series is reported as failed without losing the others."""
+    df = pd.concat([_panel(n_series=2), pd.DataFrame({
+        'series_id': 'short', 'date': pd.date_range('2020-01-01', periods=8, freq='MS'),
+        'value': np.arange(8.0)})], ignore_index=True)
+    result = forecast_panel(df, max_workers=1)
+
+    failed = result[result['status'] == 'failed']
+    assert list(failed['series_id']) == ['short']
+    assert 'too short' in failed['error'].iloc[0]
+    assert set(result.loc[result['status'] == 'ok', 'series_id']) == set(df['series_id']) - {'short'}
+
+
+def test_process_pool_matches_in_process_run():
+    """Test that fitting in worker processes gives the same forecasts."""
+    df = _panel(n_series=4)
+    serial = forecast_panel(df, max_workers=1)
+    parallel = forecast_panel(df, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_warm_started_refit_matches_cold_fit():
+    """Test that starting the full refit from train parameters reaches the same optimum."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    df = _panel(n_series=1, periods=96)
+    result = fit_arima_series(pd.DatetimeIndex(df['date']), df['value'].to_numpy())
+    cold = ARIMA(df['value'].to_numpy(), order=(1, 1, 1)).fit()
+    np.testing.assert_allclose(result['params'], cold.params, rtol=1e-2, atol=1e-3)
+
+
+def test_prophet_refit_of_a_short_series_falls_back_to_a_cold_fit():
+    """Test train-window parameters with fewer changepoints are not used as the init."""
+    pytest.importorskip('prophet')
+    from prophet import Prophet
+
+    df = _panel(n_series=1, periods=24)
+    dates, values = pd.DatetimeIndex(df['date']), df['value'].to_numpy()
+    history = pd.DataFrame({'ds': dates, 'y': values})
+    settings = {**PROPHET_PARAMS, 'interval_width': 0.95}
+    train_model = Prophet(**settings).fit(history.iloc[:19])
+    assert _prophet_warm_start(train_model, settings, history) is None
+
+    result = fit_prophet_series(dates, values)
+    cold = Prophet(**settings).fit(history).predict(result['forecast'][['date']]
+                                                    .rename(columns={'date': 'ds'}))
+    assert len(result['forecast']) == 12
+    np.testing.assert_allclose(result['forecast']['yhat'], cold['yhat'])
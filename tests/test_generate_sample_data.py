@@ -0,0 +1,86 @@
+"""Tests for the sample data generation script."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+pytest.importorskip("pandas")
+
+import generate_sample_data  # noqa: E402
+from generate_sample_data import SampleDataGenerator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_api_keys(monkeypatch):
+    """Run every generator as if no API key were configured (no live requests)."""
+    monkeypatch.setattr(generate_sample_data, 'get_api_key',
+                        lambda key_name, required=True: None)
+
+
+def _fake_generator(generator, name, delay, success=True):
+    """Build a generate_* stand-in that records one manifest entry."""
+    def generate():
+        time.sleep(delay)
+        if not success:
+            generator._record_error(f"{name} failed")
+            return False
+        generator._record_manifest({
+            'filename': f"{name}.csv",
+            'description': name,
+            'records': 1,
+            'source': 'test',
+        })
+        return True
+    generate.__name__ = f"generate_{name}"
+    return generate
+
+
+def test_generate_all_concurrent_order_is_deterministic(tmp_path, monkeypatch):
+    """Test that concurrent generation merges results in declared order."""
+    generator = SampleDataGenerator(output_dir=tmp_path, max_workers=6)
+    delays = {
+        'generate_census_income_data': 0.15,
+        'generate_census_inequality_data': 0.10,
+        'generate_bls_employment_data': 0.05,
+        'generate_bls_qcew_data': 0.0,
+        'generate_epa_environmental_data': 0.02,
+        'generate_fbi_crime_data': 0.01,
+    }
+    for method, delay in delays.items():
+        success = method != 'generate_bls_employment_data'
+        monkeypatch.setattr(generator, method,
+                            _fake_generator(generator, method[9:], delay, success))
+
+    assert generator.generate_all() is False
+
+    assert [m['filename'] for m in generator.manifest] == [
+        'census_income_data.csv',
+        'census_inequality_data.csv',
+        'bls_qcew_data.csv',
+        'epa_environmental_data.csv',
+        'fbi_crime_data.csv',
+    ]
+    assert generator.errors == ['bls_employment_data failed']
+
+
+def test_sessions_are_pooled_per_host(tmp_path):
+    """Test that one HTTP session is shared per provider host."""
+    generator = SampleDataGenerator(output_dir=tmp_path, max_workers=2)
+    census = generator._get_session("https://api.census.gov/data/2022/acs/acs5")
+    assert generator._get_session("https://api.census.gov/data/2021/acs/acs1") is census
+    assert generator._get_session("https://api.bls.gov/publicAPI/v2/timeseries/data/") is not census
+    generator.close()
+    assert generator._sessions == {}
+
+
+def test_missing_api_keys_skip_live_pulls(tmp_path):
+    """Test that generators without a key record the skip instead of calling the API."""
+    generator = SampleDataGenerator(output_dir=tmp_path, max_workers=1)
+    assert generator.generate_census_income_data() is False
+    assert generator.errors == ['Census API key not available']
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,109 @@
+"""Tests for the geography index and integer-keyed panel builder."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics import geography
+from kranalytics.columnar import load_sample_dataset
+from kranalytics.geography import (GeographyIndex, PanelSource, build_panel,
+                                   load_geography_index, register_source)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return load_geography_index(tmp_path / 'geography', rebuild=True)
+
+
+def test_resolves_codes_names_and_abbreviations(index, tmp_path):
+    """Test every key form maps to integer FIPS and the index persists."""
+    states = index.resolve(['California', 'ca', ' CALIFORNIA ', '06', 6, 'District of Columbia',
+                            'Washington, D.C.', 'Calif', None], level='state')
+    assert states.tolist() == [6, 6, 6, 6, 6, 11, 11, -1, -1]
+
+    counties = index.resolve(['06037', 6037, 'Los Angeles, CA', 'Los Angeles County, California',
+                              'Miami-Dade, FL', 'Nowhere, TX'], level='county')
+    assert counties.tolist() == [6037, 6037, 6037, 6037, 12086, -1]
+    assert index.names([6037], 'county').tolist() == ['Los Angeles']
+    assert index.abbreviations([6, 72]).tolist() == ['CA', 'PR']
+    assert GeographyIndex.state_of([6037, 53033]).tolist() == [6, 53]
+
+    reloaded = GeographyIndex.load(tmp_path / 'geography')
+    assert len(reloaded) == len(index) == 56 + 10
+    assert reloaded.resolve(['King, WA'], 'county').tolist() == [53033]
+
+
+def test_state_panel_matches_string_merges(index):
+    """Test the integer-keyed panel against the notebooks' string merges."""
+    panel = build_panel(['census_income_2022', 'fbi_crime_stats_sample',
+                         'epa_environmental_burden_sample'], index=index)
+    income = load_sample_dataset('census_income_2022')
+    crime = load_sample_dataset('fbi_crime_stats_sample')
+    merged = income.merge(crime, left_on=['state_name', 'year'], right_on=['state', 'year'])
+
+    assert panel['fips'].dtype == np.int32 and panel['year'].dtype == np.int16
+    assert not panel.duplicated(['fips', 'year']).any()
+    assert panel['median_household_income'].notna().sum() == len(income)
+    assert panel['violent_crime'].notna().sum() == len(crime)
+    both = panel.dropna(subset=['median_household_income', 'violent_crime'])
+    assert len(both) == len(merged)
+    row = both.set_index('name').loc['Texas']
+    expected = merged.set_index('state').loc['Texas']
+    assert row['violent_crime_rate'] == expected['violent_crime_rate']
+    assert row['median_household_income'] == expected['median_household_income']
+    assert panel.attrs['unmatched'] == {}
+
+
+def test_county_panel_broadcasts_state_sources(index):
+    """Test county rows carry their state's values and reject state-level mixing."""
+    panel = build_panel(['bls_employment_counties_sample', 'census_income_2022'],
+                        level='county', index=index)
+    assert len(panel) == 10 and panel['fips'].is_monotonic_increasing
+    la = panel.set_index('fips').loc[6037]
+    assert la['name'] == 'Los Angeles' and la['state_fips'] == 6
+    assert la['total_employment'] == 4_200_000
+    assert la['median_household_income'] == panel.set_index('fips').loc[6073,
+                                                                         'median_household_income']
+    with pytest.raises(ValueError, match='aggregate'):
+        build_panel(['bls_employment_counties_sample'], level='state', index=index)
+
+
+def test_unmatched_geographies_are_reported(index, monkeypatch):
+    """Test rows with unknown names are listed, never silently dropped."""
+    monkeypatch.setattr(geography, 'SOURCES', dict(geography.SOURCES))
+    typo = pd.DataFrame({'state': ['Texas', 'Calfornia', 'NY'], 'score': [1, 2, 3]})
+    register_source(PanelSource('scores', 'state', year=2022, loader=lambda: typo))
+
+    panel = build_panel(['census_income_2022', 'scores'], index=index)
+    assert panel.attrs['unmatched'] == {'scores': ['Calfornia']}
+    assert panel.set_index('name').loc['New York', 'score'] == 3
+    assert str(panel['score'].dtype) == 'Int64'
+    with pytest.raises(ValueError, match='Calfornia'):
+        build_panel(['scores'], index=index, strict=True)
+
+
+def test_sources_without_rows_in_the_selected_years(index):
+    """Test a source with no rows left after the year filter contributes gaps."""
+    panel = build_panel(['census_income_2022', 'fbi_crime_stats_sample'], years=[2021],
+                        index=index)
+    assert panel.empty or panel['median_household_income'].isna().all()
+    assert {'median_household_income', 'violent_crime'} <= set(panel.columns)
+
+
+def test_index_cache_follows_directory_and_registered_sources(tmp_path, monkeypatch):
+    """Test each directory gets its own index, rebuilt when a county source is added."""
+    monkeypatch.setattr(geography, 'SOURCES', dict(geography.SOURCES))
+    first = load_geography_index(tmp_path / 'a')
+    assert load_geography_index(tmp_path / 'a') is first
+    assert load_geography_index(tmp_path / 'b') is not first
+
+    counties = pd.DataFrame({'area_fips': ['48301'], 'county_name': ['Loving, TX']})
+    register_source(PanelSource('loving', 'area_fips', level='county',
+                                county_names='county_name', loader=lambda: counties))
+    assert first.resolve(['Loving, TX'], 'county').tolist() == [-1]
+    rebuilt = load_geography_index(tmp_path / 'a')
+    assert rebuilt.resolve(['Loving, TX'], 'county').tolist() == [48301]
+    # The persisted index records its sources, so a new process reuses it
+    monkeypatch.setattr(geography, '_indexes', {})
+    assert load_geography_index(tmp_path / 'a').resolve(['Loving, TX'], 'county').tolist() \
+        == [48301]
@@ -0,0 +1,77 @@
+"""Import-time budget checks for the lazily loaded package."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Generous enough for slow CI machines, far below the cost of the ML stack
+IMPORT_BUDGET_SECONDS = 0.5
+
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'statsmodels', 'sklearn', 'prophet',
+                 'plotly', 'matplotlib', 'seaborn', 'requests')
+
+
+def _run(code):
+    env = {**os.environ, 'PYTHONPATH': str(SRC)}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            env=env, check=True)
+    return result.stdout.splitlines()
+
+
+def test_package_import_is_within_budget():
+    """Test that importing the package loads no heavy dependency and is fast."""
+    elapsed, loaded = _run(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import kranalytics, kranalytics.khipu_analytics\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    assert loaded == ''
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_api_key_helper_import_is_within_budget():
+    """Test that scripts importing get_api_key do not pay for the data stack."""
+    elapsed, loaded = _run(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from kranalytics.data_utils import get_api_key\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    assert loaded == ''
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_csv_loading_does_not_import_modelling_stack():
+    """Test that the sample loading path stays free of ML and plotting imports."""
+    loaded = _run(
+        "import sys\n"
+        "from kranalytics import load_sample_dataset\n"
+        f"print(','.join(m for m in {HEAVY_MODULES[2:]!r} if m in sys.modules))\n"
+    )
+    assert loaded == ['']
+
+
+def test_public_api_resolves_on_first_access():
+    """Test that exported names and submodules load lazily and are cached."""
+    import kranalytics
+    from kranalytics.inequality import compute_inequality_indices
+
+    assert kranalytics.compute_inequality_indices is compute_inequality_indices
+    assert 'compute_inequality_indices' in vars(kranalytics)
+    assert kranalytics.khipu_analytics.track_stage.__module__.endswith('execution_tracking')
+    assert 'forecast_panel' in dir(kranalytics)
+    # Exports never share a name with a submodule, which would shadow them
+    assert not set(kranalytics.__all__) & kranalytics._SUBMODULES
+    import kranalytics.results_cache  # noqa: F401  (binds the submodule on the package)
+    from kranalytics import memoize
+    assert callable(kranalytics.memoize) and memoize is kranalytics.results_cache.memoize
+    with pytest.raises(AttributeError):
+        kranalytics.not_a_feature
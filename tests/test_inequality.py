@@ -0,0 +1,88 @@
+"""Tests for the vectorized inequality engine."""
+
+import numpy as np
+import pytest
+
+from kranalytics.inequality import compute_inequality_indices, lorenz_curves
+
+MIDPOINTS = np.array([5000, 12500, 17500, 22500, 27500, 32500, 37500, 42500,
+                      47500, 55000, 67500, 87500, 112500, 137500, 175000, 250000], dtype=float)
+
+
+# Reference implementations from the Inequality Analysis tutorial (one geography per call)
+def reference_gini(brackets, counts):
+    mask = counts > 0
+    brackets, counts = brackets[mask], counts[mask]
+    if len(brackets) == 0:
+        return np.nan
+    total_income = (brackets * counts).sum()
+    if total_income == 0:
+        return 0
+    x = np.concatenate([[0], np.cumsum(counts) / counts.sum()])
+    y = np.concatenate([[0], np.cumsum(brackets * counts) / total_income])
+    area = ((x[1:] - x[:-1]) * (y[1:] + y[:-1]) / 2).sum()
+    return max(0, min(1, 1 - 2 * area))
+
+
+def reference_theil(brackets, counts):
+    mean_income = (brackets * counts).sum() / counts.sum()
+    return sum(c / counts.sum() * b / mean_income * np.log(b / mean_income)
+               for b, c in zip(brackets, counts) if c > 0 and b > 0)
+
+
+def reference_atkinson(brackets, counts, epsilon):
+    p = counts / counts.sum()
+    mean_income = (brackets * counts).sum() / counts.sum()
+    if epsilon == 1.0:
+        return 1 - np.exp((p * np.log(brackets))[counts > 0].sum()) / mean_income
+    return 1 - ((p * brackets ** (1 - epsilon)).sum() ** (1 / (1 - epsilon))) / mean_income
+
+
+def reference_palma(brackets, counts):
+    cum_hh = np.cumsum(counts)
+    cum_inc = np.cumsum(brackets * counts)
+    i40 = np.searchsorted(cum_hh, 0.4 * counts.sum())
+    i90 = np.searchsorted(cum_hh, 0.9 * counts.sum())
+    bottom_40 = cum_inc[i40] / cum_inc[-1]
+    top_10 = 1 - cum_inc[i90] / cum_inc[-1]
+    return top_10 / bottom_40
+
+
+@pytest.fixture
+def counts():
+    rng = np.random.default_rng(7)
+    counts = rng.integers(0, 50000, size=(200, len(MIDPOINTS))).astype(float)
+    counts[rng.random(counts.shape) < 0.1] = 0
+    return counts
+
+
+def test_batch_matches_per_geography_reference(counts):
+    """Test every index against the tutorial's per-call definitions."""
+    df = compute_inequality_indices(counts, MIDPOINTS)
+    for i in range(0, len(counts), 17):
+        row = counts[i]
+        assert df['gini_coefficient'].iloc[i] == pytest.approx(reference_gini(MIDPOINTS, row))
+        assert df['theil_index'].iloc[i] == pytest.approx(reference_theil(MIDPOINTS, row))
+        assert df['atkinson_05'].iloc[i] == pytest.approx(reference_atkinson(MIDPOINTS, row, 0.5))
+        assert df['atkinson_10'].iloc[i] == pytest.approx(reference_atkinson(MIDPOINTS, row, 1.0))
+        assert df['palma_ratio'].iloc[i] == pytest.approx(reference_palma(MIDPOINTS, row))
+
+
+def test_float32_and_empty_geographies(counts):
+    """Test float32 computation and rows without households."""
+    counts[3] = 0
+    df64 = compute_inequality_indices(counts, MIDPOINTS)
+    df32 = compute_inequality_indices(counts, MIDPOINTS, dtype=np.float32)
+
+    assert df32['gini_coefficient'].dtype == np.float32
+    assert np.isnan(df64.loc[3, 'gini_coefficient'])
+    assert np.isnan(df64.loc[3, 'palma_ratio'])
+    np.testing.assert_allclose(df32['gini_coefficient'], df64['gini_coefficient'], rtol=1e-4)
+
+
+def test_lorenz_curves_shape_and_endpoints(counts):
+    """Test that Lorenz curves start at 0 and end at 1."""
+    x, y = lorenz_curves(counts[:5], MIDPOINTS)
+    assert x.shape == (5, len(MIDPOINTS) + 1)
+    np.testing.assert_allclose(x[:, [0, -1]], [[0, 1]] * 5)
+    np.testing.assert_allclose(y[:, [0, -1]], [[0, 1]] * 5)
@@ -0,0 +1,89 @@
+"""Tests for vectorized bootstrap intervals of inequality indices."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from kranalytics.inequality import compute_inequality_indices, theil_indices
+from kranalytics.inequality_bootstrap import bootstrap_inequality_indices
+
+MIDPOINTS = np.array([5000, 12500, 17500, 22500, 27500, 32500, 37500, 42500,
+                      47500, 55000, 67500, 87500, 112500, 137500, 175000, 250000], dtype=float)
+
+
+@pytest.fixture
+def counts():
+    rng = np.random.default_rng(3)
+    counts = rng.integers(0, 400, size=(12, len(MIDPOINTS))).astype(float)
+    counts[5] = 0
+    return counts
+
+
+def test_bca_matches_household_level_bootstrap():
+    """Test the grouped BCa interval against scipy on expanded household data."""
+    counts = np.array([20, 10, 8, 12, 9, 11, 7, 10, 9, 14, 20, 18, 12, 6, 5, 4], dtype=float)
+    households = np.repeat(np.arange(len(counts)), counts.astype(int))
+
+    def theil(sample, axis=-1):
+        binned = np.apply_along_axis(np.bincount, axis, sample, minlength=len(counts))
+        return theil_indices(binned.reshape(-1, len(counts)), MIDPOINTS).reshape(binned.shape[:-1])
+
+    reference = stats.bootstrap((households,), theil, n_resamples=20_000, method='BCa',
+                                vectorized=True, random_state=1).confidence_interval
+    ci = bootstrap_inequality_indices(counts, MIDPOINTS, replicates=20_000, max_workers=1)
+    row = ci.set_index('measure').loc['theil_index']
+
+    assert row['lower'] == pytest.approx(reference.low, abs=0.004)
+    assert row['upper'] == pytest.approx(reference.high, abs=0.004)
+
+
+def test_estimates_and_reproducibility_across_blocks(counts):
+    """Test point estimates, interval ordering and block-independent draws."""
+    ci = bootstrap_inequality_indices(counts, MIDPOINTS, replicates=200, interval='percentile',
+                                      index=[f'G{i}' for i in range(len(counts))],
+                                      max_workers=1)
+    again = bootstrap_inequality_indices(counts, MIDPOINTS, replicates=200, interval='percentile',
+                                         index=[f'G{i}' for i in range(len(counts))],
+                                         block_geographies=5, max_workers=2)
+    point = compute_inequality_indices(counts, MIDPOINTS)
+
+    assert len(ci) == len(counts) * 6 and ci['geography'].iloc[0] == 'G0'
+    gini = ci[ci['measure'] == 'gini_coefficient']
+    np.testing.assert_allclose(gini['estimate'], point['gini_coefficient'])
+    valid = gini.drop(index=gini.index[5])
+    assert (valid['lower'] <= valid['estimate']).all()
+    assert (valid['estimate'] <= valid['upper']).all()
+    assert (valid['std_error'] > 0).all()
+    assert gini.iloc[5][['estimate', 'lower', 'upper']].isna().all()
+    assert ci.equals(again)
+
+
+def test_sample_size_widens_and_poisson_weights(counts):
+    """Test that a smaller ACS sample widens intervals for both resampling schemes."""
+    full = bootstrap_inequality_indices(counts[:3], MIDPOINTS, replicates=300, max_workers=1)
+    small = bootstrap_inequality_indices(counts[:3], MIDPOINTS, replicates=300,
+                                         sample_size=counts[:3].sum(axis=1) / 10, max_workers=1)
+    poisson = bootstrap_inequality_indices(counts[:3], MIDPOINTS, replicates=300,
+                                           method='poisson', max_workers=1)
+
+    # Smooth indices scale with 1/sqrt(n); the bracket-level Palma ratio moves in jumps
+    smooth = full['measure'] != 'palma_ratio'
+    assert (small['std_error'][smooth] > 2 * full['std_error'][smooth]).all()
+    assert (small['std_error'] > full['std_error']).all()
+    np.testing.assert_allclose(poisson['std_error'][smooth], full['std_error'][smooth], rtol=0.3)
+
+
+def test_moe_draws_and_validation(counts):
+    """Test margin-of-error replicates and argument checks."""
+    exact = bootstrap_inequality_indices(counts[:2], MIDPOINTS, replicates=50, method='moe',
+                                         moe=np.zeros_like(counts[:2]), max_workers=1)
+    noisy = bootstrap_inequality_indices(counts[:2], MIDPOINTS, replicates=50, method='moe',
+                                         moe=counts[:2] * 0.2, max_workers=1)
+
+    np.testing.assert_allclose(exact['std_error'], 0, atol=1e-12)
+    np.testing.assert_allclose(exact['lower'], exact['upper'])
+    assert (noisy['std_error'] > 0).all()
+    with pytest.raises(ValueError, match='moe'):
+        bootstrap_inequality_indices(counts, MIDPOINTS, method='moe')
+    with pytest.raises(ValueError, match='Unknown method'):
+        bootstrap_inequality_indices(counts, MIDPOINTS, method='jackknife')
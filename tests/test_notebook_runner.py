@@ -0,0 +1,107 @@
+"""Tests for the parallel notebook execution harness."""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("IPython")
+
+from kranalytics import notebook_runner
+from kranalytics.notebook_runner import (DEFAULT_INPUT_PATHS, PACKAGE_DIR, cell_keys,
+                                         cell_timings, fingerprint_inputs, run_notebooks)
+
+
+def _write_notebook(path, cells):
+    path.write_text(json.dumps({
+        'cells': [{'cell_type': 'code', 'source': source, 'metadata': {}, 'outputs': [],
+                   'execution_count': None} for source in cells]
+        + [{'cell_type': 'markdown', 'source': '# Notes', 'metadata': {}}],
+        'metadata': {}, 'nbformat': 4, 'nbformat_minor': 5,
+    }))
+    return path
+
+
+CELLS = [
+    "import numpy as np\nnp.random.seed(7)\nvalues = np.arange(10)",
+    "def double(v):\n    return v * 2\nprint(double(values).sum())",
+    "draw = np.random.rand()",
+    "print(round(draw, 6), double(2))",
+]
+
+
+def test_notebooks_run_in_parallel_with_cell_timings(tmp_path):
+    """Test that cells are timed, outputs captured and errors stop the notebook."""
+    good = _write_notebook(tmp_path / 'good.ipynb', CELLS)
+    bad = _write_notebook(tmp_path / 'bad.ipynb', ["x = 1", "1 / 0", "print('unreachable')"])
+    results = run_notebooks([good, bad], max_workers=2, cache_dir=tmp_path / 'cache',
+                            input_paths=[])
+
+    assert [r['status'] for r in results] == ['ok', 'error']
+    assert results[0]['cells'][1]['stdout'] == '90\n'
+    assert [c['status'] for c in results[1]['cells']] == ['ok', 'error', 'not_run']
+    assert 'ZeroDivisionError' in results[1]['cells'][1]['error']
+
+    timings = cell_timings(results)
+    assert len(timings) == 7
+    assert timings['wall_seconds'].iloc[0] == timings['wall_seconds'].max()
+
+
+def test_unchanged_cells_are_restored_from_cache(tmp_path):
+    """Test that editing the last cell re-runs only that cell with restored state."""
+    path = _write_notebook(tmp_path / 'nb.ipynb', CELLS)
+    cache_dir = tmp_path / 'cache'
+    first = run_notebooks([path], max_workers=1, cache_dir=cache_dir, input_paths=[])[0]
+    assert (first['executed'], first['cached']) == (4, 0)
+
+    second = run_notebooks([path], max_workers=1, cache_dir=cache_dir, input_paths=[])[0]
+    assert (second['executed'], second['cached']) == (0, 4)
+
+    _write_notebook(path, CELLS[:3] + ["print(round(draw, 6), double(3))"])
+    third = run_notebooks([path], max_workers=1, cache_dir=cache_dir, input_paths=[])[0]
+    assert (third['executed'], third['cached']) == (1, 3)
+    # Restored variables, functions and random state match a full run
+    expected = first['cells'][3]['stdout'].split()[0]
+    assert third['cells'][3]['stdout'] == f'{expected} 6\n'
+
+
+def test_input_changes_invalidate_cache(tmp_path):
+    """Test that modifying an input file re-runs every cell."""
+    data = tmp_path / 'data.csv'
+    data.write_text('a\n1\n')
+    path = _write_notebook(tmp_path / 'nb.ipynb', CELLS[:2])
+    run_notebooks([path], max_workers=1, cache_dir=tmp_path / 'cache', input_paths=[data])
+
+    data.write_text('a\n1\n2\n')
+    result = run_notebooks([path], max_workers=1, cache_dir=tmp_path / 'cache',
+                           input_paths=[data])[0]
+    assert (result['executed'], result['cached']) == (2, 0)
+
+
+def test_library_and_environment_changes_invalidate_cache(tmp_path, monkeypatch):
+    """Test package sources and installed versions are part of every cell key."""
+    assert PACKAGE_DIR in DEFAULT_INPUT_PATHS
+    package = tmp_path / 'kranalytics'
+    (package / '__pycache__').mkdir(parents=True)
+    module = package / 'inequality.py'
+    module.write_text('def gini(values):\n    return 0.0\n')
+    fingerprint = fingerprint_inputs([package])
+
+    (package / '__pycache__' / 'inequality.cpython-311.pyc').write_bytes(b'compiled')
+    assert fingerprint_inputs([package]) == fingerprint
+    module.write_text('def gini(values):\n    return 0.5\n')
+    assert fingerprint_inputs([package]) != fingerprint
+
+    keys = cell_keys(CELLS, fingerprint)
+    monkeypatch.setattr(notebook_runner, 'environment_fingerprint', lambda: 'pandas==9.9')
+    assert cell_keys(CELLS, fingerprint)[0] != keys[0]
+
+
+@pytest.mark.skipif(not os.environ.get('KRANALYTICS_RUN_NOTEBOOKS'),
+                    reason="set KRANALYTICS_RUN_NOTEBOOKS=1 to execute the tutorials")
+def test_tutorial_notebooks_execute(notebook_files):
+    """Test that every tutorial runs end to end against the sample data."""
+    results = run_notebooks(sorted(notebook_files))
+    failures = {r['notebook']: [c['error'] for c in r['cells'] if c['error']] or r.get('error')
+                for r in results if r['status'] != 'ok'}
+    assert not failures, failures
@@ -0,0 +1,183 @@
+"""Tests for the declarative staged pipeline."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics.khipu_analytics.execution_tracking import setup_notebook_tracking
+from kranalytics.results_cache import ResultStore
+from kranalytics.pipeline import Pipeline
+
+CONFIG = {'api_start_year': 2019, 'api_end_year': 2020, 'forecast_horizon': 6}
+
+
+def employment_pipeline(store, calls):
+    pipeline = Pipeline('employment', config=CONFIG, store=store)
+
+    @pipeline.stage(outputs='df_raw', params=('api_start_year', 'api_end_year'))
+    def fetch(api_start_year, api_end_year):
+        calls.append('fetch')
+        dates = pd.date_range(f'{api_start_year}-01-01', f'{api_end_year}-12-01', freq='MS')
+        return pd.DataFrame({'date': dates, 'value': np.arange(len(dates), dtype=float)})
+
+    @pipeline.stage(inputs='df_raw', outputs='df_employment')
+    def clean(df_raw):
+        calls.append('clean')
+        return df_raw.dropna(subset=['value'])
+
+    @pipeline.stage(inputs='df_employment', outputs='df_forecast',
+                    params=('forecast_horizon',))
+    def forecast(df_employment, forecast_horizon):
+        calls.append('forecast')
+        dates = pd.date_range(df_employment['date'].max(), periods=forecast_horizon + 1,
+                              freq='MS')[1:]
+        return pd.DataFrame({'date': dates, 'value': df_employment['value'].iloc[-1]})
+
+    @pipeline.stage(inputs=('df_employment', 'df_forecast'), outputs='summary')
+    def export(df_employment, df_forecast):
+        calls.append('export')
+        return {'observed': len(df_employment), 'forecast': len(df_forecast)}
+
+    return pipeline
+
+
+def test_config_change_reruns_only_downstream_stages(tmp_path):
+    """Test changing the forecast horizon re-runs forecast and export only."""
+    calls = []
+    pipeline = employment_pipeline(ResultStore(tmp_path / 'results'), calls)
+
+    run = pipeline.run()
+    assert calls == ['fetch', 'clean', 'forecast', 'export']
+    assert run['summary'] == {'observed': 24, 'forecast': 6}
+
+    calls.clear()
+    assert pipeline.dirty({'forecast_horizon': 12}) == ['forecast', 'export']
+    run = pipeline.run(config={'forecast_horizon': 12})
+    assert calls == ['forecast', 'export']
+    assert run.status == {'fetch': 'memory', 'clean': 'memory',
+                          'forecast': 'ran', 'export': 'ran'}
+    assert run['summary'] == {'observed': 24, 'forecast': 12}
+
+    calls.clear()
+    assert pipeline.run().ran == []
+    assert calls == []
+
+    run = pipeline.run(force='clean')
+    assert calls == ['clean', 'forecast', 'export']
+    assert run.status['fetch'] == 'memory'
+
+
+def test_persisted_intermediates_resume_in_a_new_pipeline(tmp_path):
+    """Test a fresh pipeline (e.g. after a kernel restart) loads stored artifacts."""
+    store = ResultStore(tmp_path / 'results')
+    employment_pipeline(store, []).run()
+
+    calls = []
+    pipeline = employment_pipeline(ResultStore(tmp_path / 'results'), calls)
+    execution = setup_notebook_tracking('pipeline_resume')
+    run = pipeline.run(targets='df_forecast')
+
+    assert calls == []
+    assert set(run.status) == {'fetch', 'clean', 'forecast'}
+    assert set(run.status.values()) == {'store'}
+    pd.testing.assert_frame_equal(run['df_employment'].reset_index(drop=True),
+                                  pipeline['df_employment'].reset_index(drop=True))
+    assert execution['stages'] == []
+
+    run = pipeline.run(config={'api_end_year': 2021})
+    assert calls == ['fetch', 'clean', 'forecast', 'export']
+    assert [stage['name'] for stage in execution['stages']] == calls
+    assert run['summary']['observed'] == 36
+
+
+def test_fresh_processes_reuse_persisted_stages(tmp_path):
+    """Test a second kernel recomputes nothing, even for stages with lambdas."""
+    script = tmp_path / 'run.py'
+    script.write_text(textwrap.dedent(f"""
+        import json
+        from kranalytics.results_cache import ResultStore
+        from kranalytics.pipeline import Pipeline
+
+        pipeline = Pipeline('restart', config={{'states': ['CA', 'TX']}},
+                            store=ResultStore({str(tmp_path / 'results')!r}))
+
+        @pipeline.stage(outputs='rows', params='states')
+        def fetch(states):
+            return [{{'state': s, 'value': len(s) * 2.0}} for s in states]
+
+        @pipeline.stage(inputs='rows', outputs='total')
+        def summarize(rows):
+            return sum(map(lambda row: row['value'], rows))
+
+        run = pipeline.run()
+        print(json.dumps({{'ran': run.ran, 'total': run['total']}}))
+    """))
+    src = Path(__file__).resolve().parent.parent / 'src'
+    runs = [json.loads(subprocess.run(
+        [sys.executable, str(script)], capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': str(src), 'PYTHONHASHSEED': seed}).stdout)
+        for seed in ('1', '2')]
+
+    assert runs[0] == {'ran': ['fetch', 'summarize'], 'total': 8.0}
+    assert runs[1] == {'ran': [], 'total': 8.0}
+
+
+def test_independent_branches_run_concurrently(tmp_path):
+    """Test stages whose inputs are ready run at the same time."""
+    pipeline = Pipeline('branches', store=ResultStore(tmp_path / 'results'), max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    @pipeline.stage(outputs='series')
+    def load():
+        return pd.Series(np.arange(10.0))
+
+    @pipeline.stage(inputs='series', outputs='arima')
+    def fit_arima(series):
+        barrier.wait()
+        return series.mean()
+
+    @pipeline.stage(inputs='series', outputs=('prophet', 'components'))
+    def fit_prophet(series):
+        barrier.wait()
+        return series.median(), {'trend': series.iloc[-1]}
+
+    @pipeline.stage(inputs=('arima', 'prophet'), outputs='best')
+    def compare(arima, prophet):
+        return min(arima, prophet)
+
+    run = pipeline.run()
+    assert run['best'] == 4.5
+    assert run['components'] == {'trend': 9.0}
+    assert pipeline.downstream('load') == ['fit_arima', 'fit_prophet', 'compare']
+
+
+def test_invalid_graphs_are_rejected(tmp_path):
+    """Test duplicate outputs, unknown inputs and cycles raise ValueError."""
+    pipeline = Pipeline('invalid', persist=False)
+
+    @pipeline.stage(outputs='a')
+    def first():
+        return 1
+
+    with pytest.raises(ValueError, match='already produced'):
+        pipeline.stage(outputs='a', name='second')(lambda: 2)
+
+    pipeline.stage(inputs='missing', outputs='b', name='orphan')(lambda missing: missing)
+    with pytest.raises(ValueError, match='unknown artifact'):
+        pipeline.run()
+
+    cyclic = Pipeline('cyclic', persist=False)
+    cyclic.stage(inputs='y', outputs='x', name='f')(lambda y: y)
+    cyclic.stage(inputs='x', outputs='y', name='g')(lambda x: x)
+    with pytest.raises(ValueError, match='cycle'):
+        cyclic.order()
+    with pytest.raises(ValueError, match='Unknown stage or artifact'):
+        cyclic.order('z')
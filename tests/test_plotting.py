@@ -0,0 +1,127 @@
+"""Tests for decimated, WebGL-backed plotting helpers and the figure cache."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('plotly')
+
+import plotly.graph_objects as go  # noqa: E402
+
+from kranalytics.plotting import (cached_figure, decimate, figure_size, line_trace,  # noqa: E402
+                                  lorenz_curve, lttb, scatter_trace)
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """Test that decimation preserves the shape of a series."""
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 5_000)
+    y[31_337] = 50.0
+    index = lttb(x, y, 500)
+
+    assert len(index) == 500 and np.all(np.diff(index) > 0)
+    assert index[0] == 0 and index[-1] == len(x) - 1
+    assert 31_337 in index
+    assert np.abs(y[index]).max() == 50.0
+    with pytest.raises(ValueError):
+        lttb(x, y, 2)
+
+
+def test_decimate_drops_non_finite_values_and_keeps_datetimes():
+    """Test gaps are removed before decimation and datetime x values survive."""
+    dates = pd.date_range('2020-01-01', periods=5_000, freq='D').to_numpy()
+    values = np.sin(np.arange(len(dates)) / 200)
+    values[[10, 2_000, 4_999]] = [np.nan, np.inf, -np.inf]
+
+    x, y = decimate(dates, values, max_points=400)
+    assert len(x) == len(y) == 400 and np.isfinite(y).all()
+    assert x.dtype == dates.dtype and np.isin(x, dates).all()
+    assert x[0] == dates[0] and x[-1] == dates[-2]
+
+    x, y = decimate(dates[:20], values[:20])
+    assert len(x) == 19 and dates[10] not in x
+
+
+def test_line_trace_decimates_and_switches_to_webgl():
+    """Test the point budget, datetime x values and the WebGL threshold."""
+    dates = pd.date_range('2000-01-01', periods=20_000, freq='h')
+    values = np.cumsum(np.random.default_rng(0).normal(size=len(dates)))
+
+    small = line_trace(dates, values, max_points=1_000, name='actual')
+    assert isinstance(small, go.Scatter) and len(small.y) == 1_000
+    assert small.x[0] == dates[0] and small.x[-1] == dates[-1]
+
+    full = line_trace(dates, values, max_points=len(dates))
+    assert isinstance(full, go.Scattergl) and len(full.y) == len(dates)
+
+    cloud = scatter_trace(values, values[::-1], webgl_threshold=10_000)
+    assert isinstance(cloud, go.Scattergl) and len(cloud.x) == len(dates)
+    assert figure_size(go.Figure(small)) * 10 < figure_size(go.Figure(full))
+
+
+def test_lorenz_curve_bounds_and_budget():
+    """Test a county-scale Lorenz curve stays convex and within budget."""
+    incomes = np.random.default_rng(1).lognormal(10, 1, 50_000)
+    x, y = lorenz_curve(incomes, max_points=300)
+
+    assert len(x) == 300
+    assert (x[0], y[0], x[-1], y[-1]) == (0.0, 0.0, 1.0, 1.0)
+    assert np.all(y <= x + 1e-12)
+
+    bx, by = lorenz_curve([1, 2, 3], weights=[2, 1, 1])
+    assert np.allclose(bx, [0, 0.5, 0.75, 1]) and np.allclose(by, [0, 2 / 7, 4 / 7, 1])
+
+
+def test_cached_figure_reuses_json_by_input_hash(tmp_path):
+    """Test that identical data hits the cache and changed data rebuilds."""
+    calls = []
+
+    @cached_figure(cache_dir=tmp_path)
+    def build(df, title='Unemployment'):
+        calls.append(title)
+        return go.Figure(line_trace(df['month'], df['rate']), layout={'title': title})
+
+    df = pd.DataFrame({'month': np.arange(120), 'rate': np.linspace(3, 9, 120)})
+    first = build(df)
+    again = build(df.copy())
+    assert len(calls) == 1
+    assert json.loads(again.to_json()) == json.loads(first.to_json())
+    assert len(list(tmp_path.rglob('*.json'))) == 1
+
+    changed = df.assign(rate=df['rate'] + 1)
+    build(changed)
+    build(df, title='Other')
+    assert len(calls) == 3
+
+
+def test_cached_figure_hits_in_a_new_process(tmp_path):
+    """Test builders with comprehensions and lambdas hit the cache after a restart."""
+    script = tmp_path / 'figure.py'
+    script.write_text(textwrap.dedent(f"""
+        import numpy as np
+        import plotly.graph_objects as go
+        from kranalytics.plotting import cached_figure
+
+        built = []
+
+        @cached_figure(cache_dir={str(tmp_path / 'cache')!r})
+        def build(rates, states):
+            built.append(True)
+            traces = [go.Scatter(y=rates * (i + 1), name=s) for i, s in enumerate(states)]
+            return go.Figure(sorted(traces, key=lambda trace: trace.name))
+
+        build(np.linspace(3, 9, 50), ['TX', 'CA'])
+        print(len(built))
+    """))
+    env = {**os.environ, 'PYTHONPATH': str(Path(__file__).resolve().parent.parent / 'src')}
+    builds = [subprocess.run([sys.executable, str(script)], capture_output=True, text=True,
+                             check=True, env={**env, 'PYTHONHASHSEED': seed}).stdout.strip()
+              for seed in ('1', '2')]
+    assert builds == ['1', '0']
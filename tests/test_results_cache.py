@@ -0,0 +1,135 @@
+"""Tests for the results memoization decorator and store."""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics.khipu_analytics.execution_tracking import setup_notebook_tracking, track_stage
+from kranalytics.results_cache import ResultStore, call_key, memoize
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / 'results')
+
+
+@pytest.fixture
+def df_employment():
+    dates = pd.date_range('2020-01-01', periods=24, freq='MS')
+    return pd.DataFrame({
+        'series_id': pd.Categorical(np.repeat(['CA', 'TX'], 24)),
+        'date': np.tile(dates, 2),
+        'value': np.linspace(100, 130, 48),
+        'flag': pd.array([1, None] * 24, dtype='Int8'),
+    })
+
+
+def test_hits_depend_on_data_and_parameters(store, df_employment):
+    """Test keys cover data content and bound parameters, not ignored ones."""
+    calls = []
+
+    @memoize(store=store, ignore=('max_workers',))
+    def fit(df, order=(1, 1, 1), max_workers=None):
+        calls.append(order)
+        return df.groupby('series_id', observed=True)['value'].mean() * order[0]
+
+    first = fit(df_employment)
+    fit(df_employment.copy(), (1, 1, 1), max_workers=8)
+    fit(df_employment, order=(1, 1, 1))
+    assert len(calls) == 1
+
+    fit(df_employment, order=(2, 1, 1))
+    fit(df_employment.assign(value=df_employment['value'] + 1))
+    assert len(calls) == 3
+    assert store.stats()['hits'] == 2 and store.stats()['entries'] == 3
+    pd.testing.assert_series_equal(fit(df_employment), first, check_index_type=False)
+
+
+def test_frames_round_trip_memory_mapped(store, df_employment):
+    """Test typed columns, indexes and the pickle fallback for other objects."""
+    indexed = df_employment.set_index(['series_id', 'date'])
+    store.set('a' * 64, indexed)
+    store.set('b' * 64, np.arange(12.0).reshape(3, 4))
+    store.set('c' * 64, {'order': (1, 1, 1), 'aic': 12.5})
+
+    restored = store.get('a' * 64)
+    pd.testing.assert_frame_equal(restored, indexed)
+    assert isinstance(restored['value'].values, np.memmap)
+    array = store.get('b' * 64)
+    assert isinstance(array, np.memmap) and not array.flags.writeable
+    assert store.get('c' * 64) == {'order': (1, 1, 1), 'aic': 12.5}
+    assert store.get('d' * 64, 'missing') == 'missing'
+
+
+def test_input_checksums_and_lru_eviction(tmp_path):
+    """Test declared input files invalidate results and the size cap evicts LRU."""
+    data = tmp_path / 'census.csv'
+    data.write_text('state,income\nCA,90000\n')
+    store = ResultStore(tmp_path / 'results', max_bytes=3000)
+
+    @memoize(store=store, inputs=[data])
+    def table(n):
+        return np.zeros(n)
+
+    key = table.key(10)
+    assert key == call_key(table.__wrapped__, (10,), {}, inputs=[data])
+    data.write_text('state,income\nCA,91000\n')
+    assert table.key(10) != key
+
+    for n in (100, 101, 102):
+        table(n)
+    table(100)                  # Refresh: 101 is now least recently used
+    table(103)
+    assert store.stats()['evictions'] >= 1
+    assert store.get(table.key(101)) is None
+    assert store.get(table.key(103)) is not None
+
+
+def test_hits_are_reported_in_the_execution_log(store):
+    """Test stage cache hits and the per-lookup ``memoized`` log entries."""
+    @memoize(store=store)
+    def features(values):
+        return np.asarray(values) ** 2
+
+    metadata = setup_notebook_tracking('memo.ipynb', save_log=False)
+    with track_stage('feature') as stage:
+        features([1, 2, 3])
+        features([1, 2, 3])
+    assert stage.cache_hits == 1
+    assert [entry['hit'] for entry in metadata['memoized']] == [False, True]
+    assert metadata['memoized'][0]['function'].endswith('features')
+
+
+def test_keys_are_stable_across_processes(tmp_path):
+    """Test a fresh interpreter computes the same key (kernel restarts still hit)."""
+    script = tmp_path / 'key.py'
+    script.write_text(textwrap.dedent("""
+        from kranalytics.results_cache import call_key
+
+        class Options:
+            def __init__(self):
+                self.order = (1, 1, 1)
+                self.states = {'CA', 'TX', 'NY'}
+
+        def build(rows, options, scale=2):
+            def inner(v):
+                return v * scale
+            squares = [inner(r) for r in rows if r in {'a', 'b'}]
+            return sorted(squares, key=lambda v: -v), options
+
+        print(call_key(build, (['a', 'b'], Options())))
+    """))
+    src = Path(__file__).resolve().parent.parent / 'src'
+    keys = {
+        subprocess.run([sys.executable, str(script)], capture_output=True, text=True,
+                       check=True, env={**os.environ, 'PYTHONPATH': str(src),
+                                        'PYTHONHASHSEED': seed}).stdout.strip()
+        for seed in ('1', '2')
+    }
+    assert len(keys) == 1 and len(keys.pop()) == 64
@@ -0,0 +1,182 @@
+"""Tests for the quota- and rate-limit-aware request scheduler."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from kranalytics.bls_sync import BLSSeriesStore, queued_sync_bls_series
+from kranalytics.scheduler import (JobQueue, QuotaExceededError, QuotaTracker,
+                                   RequestScheduler, ScheduledSession, TokenBucket)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+    def close(self):
+        pass
+
+
+class FakeBLSSession:
+    """Answers BLS POSTs, optionally throttling the first calls."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.batches = []
+
+    def post(self, url, data=None, **kwargs):
+        import json
+        if self.statuses:
+            return FakeResponse(self.statuses.pop(0))
+        body = json.loads(data)
+        self.batches.append(body['seriesid'])
+        series = [{'seriesID': s, 'data': [{'year': '2024', 'period': 'M01',
+                                            'periodName': 'January', 'value': '1.0',
+                                            'footnotes': [{}]}]}
+                  for s in body['seriesid']]
+        return FakeResponse(200, {'status': 'REQUEST_SUCCEEDED', 'Results': {'series': series}})
+
+
+def make_scheduler(tmp_path, clock, **limits):
+    return RequestScheduler(limits={'bls': limits} if limits else None, state_dir=tmp_path,
+                            clock=clock, sleep=clock.sleep, seed=0)
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    """Test that requests beyond the burst wait for refilled tokens."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5) and waits[3] == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_retries_throttled_requests_and_adapts_batch_size(tmp_path):
+    """Test backoff on 429/503 honoring Retry-After, and batch shrink/regrow."""
+    clock = FakeClock()
+    scheduler = make_scheduler(tmp_path, clock, rate=100.0, burst=100)
+    responses = [FakeResponse(429, headers={'Retry-After': '7'}), FakeResponse(503),
+                 FakeResponse(200)]
+
+    response = scheduler.send(lambda: responses.pop(0), 'bls', 'key')
+
+    assert response.status_code == 200
+    assert scheduler.stats['retries'] == 2 and scheduler.stats['throttled'] == 1
+    assert clock.sleeps[0] >= 7.0
+    assert scheduler.batch_size('bls') == 50 // 4
+
+    for _ in range(3):
+        scheduler.send(lambda: FakeResponse(200), 'bls', 'key')
+    assert scheduler.batch_size('bls') == 50 // 4 + 5
+
+    failing = RequestScheduler(state_dir=tmp_path / 'b', max_retries=1, clock=clock,
+                               sleep=clock.sleep)
+    assert failing.send(lambda: FakeResponse(500), 'census').status_code == 500
+
+
+def test_daily_quota_is_shared_across_schedulers(tmp_path):
+    """Test that quota counts persist on disk and refuse requests once used up."""
+    clock = FakeClock()
+    first = make_scheduler(tmp_path, clock, daily_quota=3)
+    for _ in range(2):
+        first.send(lambda: FakeResponse(200), 'bls', 'secret-key')
+
+    second = make_scheduler(tmp_path, clock, daily_quota=3)
+    assert second.remaining_quota('bls', 'secret-key') == 1
+    second.send(lambda: FakeResponse(200), 'bls', 'secret-key')
+    with pytest.raises(QuotaExceededError):
+        second.send(lambda: FakeResponse(200), 'bls', 'secret-key')
+
+    assert 'secret-key' not in (tmp_path / 'quota.json').read_text()
+    assert second.remaining_quota('bls', 'other-key') == 3
+
+
+def test_quota_counts_are_not_lost_across_processes(tmp_path):
+    """Test concurrent processes sharing a quota file count every request."""
+    code = ("import sys\n"
+            "from kranalytics.scheduler import QuotaTracker\n"
+            "tracker = QuotaTracker(sys.argv[1])\n"
+            "for _ in range(40):\n"
+            "    tracker.consume('bls', 'key', None)\n")
+    env = {**os.environ, 'PYTHONPATH': str(Path(__file__).resolve().parent.parent / 'src')}
+    workers = [subprocess.Popen([sys.executable, '-c', code, str(tmp_path / 'quota.json')],
+                                env=env) for _ in range(4)]
+    assert [worker.wait(timeout=60) for worker in workers] == [0] * 4
+    assert QuotaTracker(tmp_path / 'quota.json').used('bls', 'key') == 160
+
+
+def test_failed_jobs_are_retried_on_later_runs(tmp_path):
+    """Test failed series are re-queued next run and the queue file then removed."""
+    clock = FakeClock()
+    store = BLSSeriesStore(tmp_path / 'store')
+    queue_path = tmp_path / 'queue.json'
+    series_ids = ['S001', 'S002']
+
+    broken = FakeBLSSession(statuses=[400] * 3)
+    summary = queued_sync_bls_series(series_ids, store, 2020, 2024, queue_path,
+                                     scheduler=make_scheduler(tmp_path, clock), api_key='key',
+                                     session=broken)
+    assert summary['failed'] == 2 and queue_path.exists()
+
+    session = FakeBLSSession()
+    summary = queued_sync_bls_series(series_ids, store, 2020, 2024, queue_path,
+                                     scheduler=make_scheduler(tmp_path, clock), api_key='key',
+                                     session=session)
+    assert (summary['done'], summary['failed']) == (2, 0)
+    assert session.batches == [series_ids]
+    assert not queue_path.exists()
+
+
+def test_queued_bls_sync_resumes_after_quota(tmp_path):
+    """Test that a quota-limited bulk pull continues from its on-disk queue."""
+    clock = FakeClock()
+    store = BLSSeriesStore(tmp_path / 'store')
+    queue_path = tmp_path / 'queue.json'
+    series_ids = [f'S{i:03d}' for i in range(120)]
+    session = FakeBLSSession()
+
+    scheduler = make_scheduler(tmp_path, clock, daily_quota=2)
+    summary = queued_sync_bls_series(series_ids, store, 2020, 2024, queue_path,
+                                     scheduler=scheduler, api_key='key', session=session)
+    assert summary['stopped'] == 'quota'
+    assert summary['done'] == 100 and summary['pending'] == 20
+    assert JobQueue(queue_path).counts()['pending'] == 20
+
+    scheduler = make_scheduler(tmp_path / 'next-day', clock)
+    summary = queued_sync_bls_series(series_ids, store, 2020, 2024, queue_path,
+                                     scheduler=scheduler, api_key='key', session=session)
+    assert summary['stopped'] is None and summary['pending'] == 0
+    assert [len(batch) for batch in session.batches] == [50, 50, 20]
+    assert not queue_path.exists()
+    assert sorted(store.series_ids()) == series_ids
+
+    scheduled = ScheduledSession(FakeBLSSession(), scheduler)
+    assert scheduled.post('https://api.bls.gov/x', data='{"seriesid": ["A"]}').status_code == 200
@@ -0,0 +1,108 @@
+"""Tests for the compact dtype schema registry and memory-budget loading."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kranalytics.columnar import DEFAULT_DATA_DIR
+from kranalytics.data_utils import load_data_with_fallback, load_sample_data, save_sample_data
+from kranalytics.schema import (apply_schema, fit_memory_budget, infer_schema, load_schema,
+                                memory_bytes, parse_memory_budget)
+
+
+@pytest.fixture
+def bls_long():
+    """Long-format BLS panel with repeated string metadata on every row."""
+    n = 2400
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'series_id': np.repeat([f'LAUST{i:02d}0000000000003' for i in range(20)], n // 20),
+        'year': np.tile(np.repeat(np.arange(2015, 2025), 12), 20),
+        'period': np.tile([f'M{m:02d}' for m in range(1, 13)], n // 12),
+        'value': np.round(rng.uniform(2, 12, n), 1),
+        'employed': rng.integers(0, 40_000, n).astype(float),
+        'source': 'BLS Local Area Unemployment Statistics',
+        'state_fips': np.repeat([f'{i:02d}' for i in range(1, 21)], n // 20),
+    })
+
+
+def test_infer_schema_is_compact_and_lossless(bls_long):
+    """Test categoricals, small ints and float32 only where values survive."""
+    bls_long.loc[3, 'employed'] = np.nan
+    bls_long['precise'] = np.linspace(0, 1, len(bls_long)) / 3
+    schema = infer_schema(bls_long)
+
+    assert schema['series_id'] == schema['period'] == schema['source'] == 'category'
+    assert schema['state_fips'] == 'category'
+    assert schema['year'] == 'int32' and schema['employed'] == 'Int32'
+    assert schema['value'] == 'float32' and schema['precise'] == 'float64'
+
+    compact = apply_schema(bls_long, schema)
+    assert memory_bytes(compact) * 4 < memory_bytes(bls_long)
+    assert np.array_equal(compact['value'].astype(float).round(1), bls_long['value'])
+    assert compact['state_fips'].iloc[0] == '01'
+    assert pd.isna(compact.loc[3, 'employed'])
+
+
+def test_apply_schema_skips_casts_that_would_lose_data():
+    """Test that a stale schema never truncates fractions or overflows ints."""
+    df = pd.DataFrame({'a': [1.5, 2.0], 'b': [1, 100_000], 'c': [1.0, None], 'd': ['x', 'y']})
+    out = apply_schema(df, {'a': 'int8', 'b': 'int8', 'c': 'int8', 'd': 'str', 'e': 'int8'})
+
+    assert out['a'].tolist() == [1.5, 2.0]
+    assert out['b'].dtype == np.int64
+    assert str(out['c'].dtype) == 'Int8'
+    assert out['d'].tolist() == ['x', 'y']
+
+
+def test_memory_budget_downcasts_further_and_reports(bls_long):
+    """Test the lossy second pass and the savings report."""
+    bls_long['precise'] = np.linspace(0, 1, len(bls_long)) / 3
+    lossless = apply_schema(bls_long, infer_schema(bls_long))
+
+    out = fit_memory_budget(bls_long, memory_bytes(lossless) - 1)
+    report = out.attrs['memory_report']
+
+    assert out['precise'].dtype == np.float32
+    assert out['year'].dtype == np.int16 and report['changed']['year'] == ['int64', 'int16']
+    assert report['bytes_before'] == memory_bytes(bls_long)
+    assert report['saved_bytes'] == report['bytes_before'] - report['bytes_after'] > 0
+    assert report['within_budget']
+    assert report['changed']['precise'] == ['float64', 'float32']
+    assert parse_memory_budget('1.5 KB') == 1536 and parse_memory_budget('2m') == 2 * 1024 ** 2
+    with pytest.raises(ValueError):
+        parse_memory_budget('lots')
+
+
+def test_sample_data_round_trip_uses_registered_schema(tmp_path, bls_long):
+    """Test that saved datasets register dtypes which both load paths apply."""
+    save_sample_data(bls_long, 'bls_long', data_dir=tmp_path)
+    manifest = json.loads((tmp_path / 'MANIFEST.json').read_text())
+    assert manifest['files'][0]['dtypes'] == load_schema('bls_long.csv', tmp_path)
+
+    df = load_sample_data('bls_long', data_dir=tmp_path)
+    assert df['series_id'].dtype == 'category' and df['year'].dtype == np.int32
+    assert df['state_fips'].iloc[-1] == '20'
+
+    def broken_api():
+        raise ConnectionError('offline')
+
+    fallback = load_data_with_fallback(broken_api, 'bls_long', data_dir=tmp_path)
+    live = load_data_with_fallback(lambda: bls_long, 'bls_long', data_dir=tmp_path)
+    assert fallback.attrs['data_source'] == 'sample' and live.attrs['data_source'] == 'api'
+    assert dict(fallback.dtypes) == dict(live.dtypes)
+
+
+def test_arithmetic_on_loaded_sample_data_does_not_overflow():
+    """Test whole-number measures load wide enough for ordinary arithmetic."""
+    counties = load_sample_data('bls_employment_counties_sample', data_dir=DEFAULT_DATA_DIR)
+    raw = pd.read_csv(DEFAULT_DATA_DIR / 'bls_employment_counties_sample.csv')
+    assert (counties['average_weekly_wage'] * 52).tolist() == \
+        (raw['average_weekly_wage'] * 52).tolist()
+
+    income = load_sample_data('census_income_2022', data_dir=DEFAULT_DATA_DIR)
+    assert (income['year'] * 100 + 1).iloc[0] == 202201
+    assert all(np.dtype(dtype).itemsize >= 4 for dtype in income.dtypes
+               if pd.api.types.is_integer_dtype(dtype))
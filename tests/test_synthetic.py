@@ -0,0 +1,55 @@
+"""Tests for chunked, out-of-core synthetic data generation."""
+
+import pandas as pd
+import pytest
+
+from kranalytics.synthetic import (DATASETS, generate_partitioned, iter_chunks, iter_partitions,
+                                   n_rows, read_manifest, read_partitioned)
+
+
+def _concat(chunks):
+    return pd.concat(list(chunks), ignore_index=True)
+
+
+@pytest.mark.parametrize('name', sorted(DATASETS))
+def test_output_is_invariant_to_chunk_size(name):
+    """Test that small and single chunks produce identical rows."""
+    small = list(iter_chunks(name, 700, chunk_rows=1, block_entities=64))
+    whole = list(iter_chunks(name, 700, chunk_rows=10 ** 9, block_entities=64))
+
+    assert len(small) == 11 and len(whole) == 1
+    assert _concat(small).equals(whole[0])
+    assert len(whole[0]) == n_rows(name, 700)
+    assert not whole[0].equals(_concat(iter_chunks(name, 700, seed=7, block_entities=64)))
+
+
+def test_county_crime_panel_is_consistent_per_county():
+    """Test the county-year layout and that county attributes hold across years."""
+    df = _concat(iter_chunks('county_crime', 50, start_year=2015, end_year=2019))
+
+    assert len(df) == 250
+    assert df.groupby('county_id')['year'].apply(list).iloc[0] == list(range(2015, 2020))
+    assert (df.groupby('county_id')['area_sq_miles'].nunique() == 1).all()
+    assert (df['crime_count'] >= 0).all() and df['population'].min() >= 1
+
+
+def test_partitioned_output_matches_stream_for_any_worker_count(tmp_path):
+    """Test that parallel partitions reassemble to the sequential stream."""
+    expected = _concat(iter_chunks('county_crime', 300, block_entities=32))
+
+    sequential = generate_partitioned('county_crime', 300, tmp_path / 'a', chunk_rows=1000,
+                                      block_entities=32, max_workers=1)
+    parallel = generate_partitioned('county_crime', 300, tmp_path / 'b', chunk_rows=1000,
+                                    block_entities=32, max_workers=2)
+
+    assert len(parallel['partitions']) == len(sequential['partitions']) == 5
+    assert read_partitioned(tmp_path / 'a').equals(expected)
+    assert read_partitioned(tmp_path / 'b').equals(expected)
+    assert read_manifest(tmp_path / 'b')['rows'] == len(expected)
+    assert parallel['columns']['year'] == '<i2'
+
+    years = [df['year'].sum() for df in iter_partitions(tmp_path / 'b', ['year'])]
+    assert sum(years) == expected['year'].sum()
+
+    generate_partitioned('county_crime', 40, tmp_path / 'b', block_entities=32, max_workers=1)
+    assert len(list((tmp_path / 'b').glob('part-*'))) == 1